@@ -9,16 +9,17 @@ import asyncio
 import logging
 import time
 import json
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import decimal
 
+from api.business_data_cache import CachedEntity, get_business_data_cache
+from api.integration_sync import (
+    AsyncIntegrationSession, SyncPage, SyncScheduler, get_sync_state_store, run_delta_sync
+)
+
 logger = logging.getLogger(__name__)
 
 class AccountingPlatform(Enum):
@@ -120,6 +121,10 @@ class FinancialReport:
     cash_flow_financing: decimal.Decimal
     created_at: datetime = field(default_factory=datetime.utcnow)
 
+# Local cache layout of the unified records
+TRANSACTION_CACHE = CachedEntity('accounting_transactions', FinancialTransaction, customer='account', timestamp='date')
+INVOICE_CACHE = CachedEntity('accounting_invoices', Invoice, customer='customer_id')
+
 class AccountingIntegrationBase:
     """Base class for accounting integrations"""
     
@@ -127,21 +132,13 @@ class AccountingIntegrationBase:
         self.platform = platform
         self.config = config
         self.session = self._create_session()
+        self.state_store = get_sync_state_store()  # synced records and high-water marks
         self.last_sync = None
         self.sync_interval = config.get('sync_interval', 300)  # 5 minutes default
         
-    def _create_session(self) -> requests.Session:
-        """Create HTTP session with retry logic"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+    def _create_session(self) -> AsyncIntegrationSession:
+        """Create non-blocking HTTP session with retry logic and a concurrency cap"""
+        return AsyncIntegrationSession(max_concurrency=self.config.get('max_concurrency', 4))
     
     async def authenticate(self) -> bool:
         """Authenticate with accounting platform"""
@@ -178,16 +175,37 @@ class AccountingIntegrationBase:
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with accounting platform"""
         raise NotImplementedError
+    
+    def _changed_invoices(self, cursor: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Invoices changed since the cursor"""
+        raise NotImplementedError
+    
+    def _invoice(self, item: Dict[str, Any]) -> Invoice:
+        """Unified invoice from a platform record"""
+        raise NotImplementedError
+    
+    async def sync_invoices(self) -> Dict[str, Any]:
+        """Merge invoices changed since the last sync into the state store"""
+        return await run_delta_sync(
+            self.state_store, self.session, self.platform.value, 'invoices', self._changed_invoices
+        )
+    
+    async def synced_invoices(self) -> List[Invoice]:
+        """Every invoice in the state store, after merging the changes since the last sync"""
+        await self.sync_invoices()
+        return [self._invoice(item) for item in self.state_store.records(self.platform.value, 'invoices')]
 
 class QuickBooksIntegration(AccountingIntegrationBase):
     """QuickBooks integration using QuickBooks API"""
     
+    QUERY_PAGE_SIZE = 1000  # query API maximum
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(AccountingPlatform.QUICKBOOKS, config)
         self.access_token = None
         self.refresh_token = None
         self.realm_id = config.get('realm_id')
-        self.api_url = "https://sandbox-accounts.platform.intuit.com/v1"
+        self.api_url = config.get('api_url', "https://sandbox-accounts.platform.intuit.com/v1")
     
     async def authenticate(self) -> bool:
         """Authenticate with QuickBooks using OAuth2"""
@@ -203,7 +221,7 @@ class QuickBooksIntegration(AccountingIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/companyinfo/{self.realm_id}", headers=headers)
+            response = await self.session.get(f"{self.api_url}/companyinfo/{self.realm_id}", headers=headers)
             response.raise_for_status()
             
             logger.info("QuickBooks authentication successful")
@@ -224,7 +242,7 @@ class QuickBooksIntegration(AccountingIntegrationBase):
             
             query = f"SELECT * FROM Transaction WHERE TxnDate >= '{start_date.strftime('%Y-%m-%d')}' AND TxnDate <= '{end_date.strftime('%Y-%m-%d')}'"
             
-            response = self.session.get(url, headers=headers, params={'query': query})
+            response = await self.session.get(url, headers=headers, params={'query': query})
             response.raise_for_status()
             
             data = response.json()
@@ -249,7 +267,7 @@ class QuickBooksIntegration(AccountingIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get QuickBooks transactions: {e}")
-            return []
+            raise
     
     async def create_transaction(self, transaction: FinancialTransaction) -> bool:
         """Create transaction in QuickBooks"""
@@ -279,7 +297,7 @@ class QuickBooksIntegration(AccountingIntegrationBase):
                 'TxnDate': transaction.date.strftime('%Y-%m-%d')
             }
             
-            response = self.session.post(url, headers=headers, json=transaction_data)
+            response = await self.session.post(url, headers=headers, json=transaction_data)
             response.raise_for_status()
             
             created_transaction = response.json()
@@ -303,34 +321,55 @@ class QuickBooksIntegration(AccountingIntegrationBase):
             
             query = f"SELECT * FROM Invoice ORDER BY MetaData.CreateTime DESC MAXRESULTS {limit} STARTPOSITION {offset}"
             
-            response = self.session.get(url, headers=headers, params={'query': query})
+            response = await self.session.get(url, headers=headers, params={'query': query})
             response.raise_for_status()
             
             data = response.json()
-            invoices = []
-            
-            for item in data.get('QueryResponse', {}).get('Invoice', []):
-                invoice = Invoice(
-                    id=item.get('Id', ''),
-                    platform=AccountingPlatform.QUICKBOOKS,
-                    invoice_number=item.get('DocNumber', ''),
-                    customer_id=item.get('CustomerRef', {}).get('value', ''),
-                    customer_name=item.get('CustomerRef', {}).get('name', ''),
-                    amount=decimal.Decimal(str(item.get('TotalAmt', 0))),
-                    currency=item.get('CurrencyRef', {}).get('value', 'USD'),
-                    status=InvoiceStatus(item.get('Balance', 0) == 0 and 'paid' or 'sent'),
-                    issue_date=datetime.strptime(item.get('TxnDate', ''), '%Y-%m-%d'),
-                    due_date=datetime.strptime(item.get('DueDate', ''), '%Y-%m-%d') if item.get('DueDate') else None,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                invoices.append(invoice)
-            
-            return invoices
+            return [self._invoice(item) for item in data.get('QueryResponse', {}).get('Invoice', [])]
             
         except Exception as e:
             logger.error(f"Failed to get QuickBooks invoices: {e}")
-            return []
+            raise
+    
+    def _invoice(self, item: Dict[str, Any]) -> Invoice:
+        return Invoice(
+            id=item.get('Id', ''),
+            platform=AccountingPlatform.QUICKBOOKS,
+            invoice_number=item.get('DocNumber', ''),
+            customer_id=item.get('CustomerRef', {}).get('value', ''),
+            customer_name=item.get('CustomerRef', {}).get('name', ''),
+            amount=decimal.Decimal(str(item.get('TotalAmt', 0))),
+            currency=item.get('CurrencyRef', {}).get('value', 'USD'),
+            status=InvoiceStatus(item.get('Balance', 0) == 0 and 'paid' or 'sent'),
+            issue_date=datetime.strptime(item.get('TxnDate', ''), '%Y-%m-%d'),
+            due_date=datetime.strptime(item.get('DueDate', ''), '%Y-%m-%d') if item.get('DueDate') else None,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow()
+        )
+    
+    async def _changed_invoices(self, cursor: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Invoices updated at or after the cursor (inclusive, so none sharing its timestamp are lost), oldest first"""
+        if not self.access_token:
+            await self.authenticate()
+        
+        url = f"{self.api_url}/company/{self.realm_id}/query"
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        where = f" WHERE MetaData.LastUpdatedTime >= '{cursor}'" if cursor else ""
+        position = 1
+        while True:
+            query = (f"SELECT * FROM Invoice{where} ORDERBY MetaData.LastUpdatedTime "
+                     f"STARTPOSITION {position} MAXRESULTS {self.QUERY_PAGE_SIZE}")
+            response = await self.session.get(url, headers=headers, params={'query': query})
+            response.raise_for_status()
+            
+            items = response.json().get('QueryResponse', {}).get('Invoice', [])
+            yield SyncPage(
+                records=[(item['Id'], item) for item in items],
+                cursor=items[-1]['MetaData']['LastUpdatedTime'] if items else None
+            )
+            if len(items) < self.QUERY_PAGE_SIZE:
+                return
+            position += len(items)
     
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with QuickBooks"""
@@ -340,15 +379,16 @@ class QuickBooksIntegration(AccountingIntegrationBase):
             start_date = end_date - timedelta(days=30)
             transactions = await self.get_transactions(start_date, end_date)
             
-            # Get invoices
-            invoices = await self.get_invoices(limit=1000)
+            # Invoices changed since the last sync
+            invoices = await self.sync_invoices()
             
             self.last_sync = datetime.utcnow()
             
             return {
                 'platform': AccountingPlatform.QUICKBOOKS.value,
                 'transactions_synced': len(transactions),
-                'invoices_synced': len(invoices),
+                'invoices_synced': invoices['records_changed'],
+                'delta': {'invoices': invoices},
                 'sync_timestamp': self.last_sync.isoformat(),
                 'status': 'success'
             }
@@ -364,11 +404,13 @@ class QuickBooksIntegration(AccountingIntegrationBase):
 class XeroIntegration(AccountingIntegrationBase):
     """Xero integration using Xero API"""
     
+    PAGE_SIZE = 100  # fixed by the Xero API
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(AccountingPlatform.XERO, config)
         self.access_token = None
         self.tenant_id = config.get('tenant_id')
-        self.api_url = "https://api.xero.com/api.xro/2.0"
+        self.api_url = config.get('api_url', "https://api.xero.com/api.xro/2.0")
     
     async def authenticate(self) -> bool:
         """Authenticate with Xero using OAuth2"""
@@ -383,7 +425,7 @@ class XeroIntegration(AccountingIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/Organisations", headers=headers)
+            response = await self.session.get(f"{self.api_url}/Organisations", headers=headers)
             response.raise_for_status()
             
             logger.info("Xero authentication successful")
@@ -405,7 +447,7 @@ class XeroIntegration(AccountingIntegrationBase):
                 'where': f"Date >= DateTime({start_date.year}, {start_date.month}, {start_date.day}) AND Date <= DateTime({end_date.year}, {end_date.month}, {end_date.day})"
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -430,7 +472,7 @@ class XeroIntegration(AccountingIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Xero transactions: {e}")
-            return []
+            raise
     
     async def get_invoices(self, limit: int = 100, offset: int = 0) -> List[Invoice]:
         """Get invoices from Xero"""
@@ -445,34 +487,64 @@ class XeroIntegration(AccountingIntegrationBase):
                 'pageSize': limit
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
-            invoices = []
-            
-            for item in data.get('Invoices', []):
-                invoice = Invoice(
-                    id=item.get('InvoiceID', ''),
-                    platform=AccountingPlatform.XERO,
-                    invoice_number=item.get('InvoiceNumber', ''),
-                    customer_id=item.get('Contact', {}).get('ContactID', ''),
-                    customer_name=item.get('Contact', {}).get('Name', ''),
-                    amount=decimal.Decimal(str(item.get('Total', 0))),
-                    currency=item.get('CurrencyCode', 'USD'),
-                    status=InvoiceStatus(item.get('Status', 'DRAFT').lower()),
-                    issue_date=datetime.strptime(item.get('Date', ''), '%Y-%m-%d'),
-                    due_date=datetime.strptime(item.get('DueDate', ''), '%Y-%m-%d') if item.get('DueDate') else None,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                invoices.append(invoice)
-            
-            return invoices
+            return [self._invoice(item) for item in data.get('Invoices', [])]
             
         except Exception as e:
             logger.error(f"Failed to get Xero invoices: {e}")
-            return []
+            raise
+    
+    def _invoice(self, item: Dict[str, Any]) -> Invoice:
+        return Invoice(
+            id=item.get('InvoiceID', ''),
+            platform=AccountingPlatform.XERO,
+            invoice_number=item.get('InvoiceNumber', ''),
+            customer_id=item.get('Contact', {}).get('ContactID', ''),
+            customer_name=item.get('Contact', {}).get('Name', ''),
+            amount=decimal.Decimal(str(item.get('Total', 0))),
+            currency=item.get('CurrencyCode', 'USD'),
+            status=InvoiceStatus(item.get('Status', 'DRAFT').lower()),
+            issue_date=datetime.strptime(item.get('Date', ''), '%Y-%m-%d'),
+            due_date=datetime.strptime(item.get('DueDate', ''), '%Y-%m-%d') if item.get('DueDate') else None,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow()
+        )
+    
+    @staticmethod
+    def _modified_since(updated: str) -> str:
+        """UpdatedDateUTC ("/Date(1573755038314+0000)/") as an If-Modified-Since value"""
+        if updated.startswith('/Date('):
+            millis = int(updated[6:].split('+')[0].split(')')[0])
+            return datetime.utcfromtimestamp(millis / 1000).strftime('%Y-%m-%dT%H:%M:%S')
+        return updated
+    
+    async def _changed_invoices(self, cursor: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Invoices modified since the cursor, oldest first"""
+        if not self.access_token:
+            await self.authenticate()
+        
+        url = f"{self.api_url}/Invoices"
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        if cursor:
+            headers['If-Modified-Since'] = cursor
+        page = 1
+        while True:
+            response = await self.session.get(url, headers=headers, params={'page': page, 'order': 'UpdatedDateUTC ASC'})
+            if response.status_code == 304:
+                return
+            response.raise_for_status()
+            
+            items = response.json().get('Invoices', [])
+            yield SyncPage(
+                records=[(item['InvoiceID'], item) for item in items],
+                cursor=self._modified_since(items[-1]['UpdatedDateUTC']) if items else None
+            )
+            if len(items) < self.PAGE_SIZE:
+                return
+            page += 1
     
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with Xero"""
@@ -482,15 +554,16 @@ class XeroIntegration(AccountingIntegrationBase):
             start_date = end_date - timedelta(days=30)
             transactions = await self.get_transactions(start_date, end_date)
             
-            # Get invoices
-            invoices = await self.get_invoices(limit=1000)
+            # Invoices changed since the last sync
+            invoices = await self.sync_invoices()
             
             self.last_sync = datetime.utcnow()
             
             return {
                 'platform': AccountingPlatform.XERO.value,
                 'transactions_synced': len(transactions),
-                'invoices_synced': len(invoices),
+                'invoices_synced': invoices['records_changed'],
+                'delta': {'invoices': invoices},
                 'sync_timestamp': self.last_sync.isoformat(),
                 'status': 'success'
             }
@@ -506,11 +579,13 @@ class XeroIntegration(AccountingIntegrationBase):
 class FreshBooksIntegration(AccountingIntegrationBase):
     """FreshBooks integration using FreshBooks API"""
     
+    PAGE_SIZE = 100  # per_page maximum
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(AccountingPlatform.FRESHBOOKS, config)
         self.access_token = None
         self.account_id = config.get('account_id')
-        self.api_url = "https://api.freshbooks.com/accounting/account"
+        self.api_url = config.get('api_url', "https://api.freshbooks.com/accounting/account")
     
     async def authenticate(self) -> bool:
         """Authenticate with FreshBooks using OAuth2"""
@@ -525,7 +600,7 @@ class FreshBooksIntegration(AccountingIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/{self.account_id}/users/me", headers=headers)
+            response = await self.session.get(f"{self.api_url}/{self.account_id}/users/me", headers=headers)
             response.raise_for_status()
             
             logger.info("FreshBooks authentication successful")
@@ -548,46 +623,65 @@ class FreshBooksIntegration(AccountingIntegrationBase):
                 'per_page': limit
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
-            invoices = []
-            
-            for item in data.get('invoices', []):
-                invoice = Invoice(
-                    id=str(item.get('id', '')),
-                    platform=AccountingPlatform.FRESHBOOKS,
-                    invoice_number=item.get('invoice_number', ''),
-                    customer_id=str(item.get('customerid', '')),
-                    customer_name=item.get('customer_name', ''),
-                    amount=decimal.Decimal(str(item.get('amount', {}).get('amount', 0))),
-                    currency=item.get('currency', 'USD'),
-                    status=InvoiceStatus(item.get('status', 'draft').lower()),
-                    issue_date=datetime.strptime(item.get('create_date', ''), '%Y-%m-%d'),
-                    due_date=datetime.strptime(item.get('due_date', ''), '%Y-%m-%d') if item.get('due_date') else None,
-                    created_at=datetime.utcnow(),
-                    updated_at=datetime.utcnow()
-                )
-                invoices.append(invoice)
-            
-            return invoices
+            return [self._invoice(item) for item in data.get('invoices', [])]
             
         except Exception as e:
             logger.error(f"Failed to get FreshBooks invoices: {e}")
-            return []
+            raise
+    
+    def _invoice(self, item: Dict[str, Any]) -> Invoice:
+        return Invoice(
+            id=str(item.get('id', '')),
+            platform=AccountingPlatform.FRESHBOOKS,
+            invoice_number=item.get('invoice_number', ''),
+            customer_id=str(item.get('customerid', '')),
+            customer_name=item.get('customer_name', ''),
+            amount=decimal.Decimal(str(item.get('amount', {}).get('amount', 0))),
+            currency=item.get('currency', 'USD'),
+            status=InvoiceStatus(item.get('status', 'draft').lower()),
+            issue_date=datetime.strptime(item.get('create_date', ''), '%Y-%m-%d'),
+            due_date=datetime.strptime(item.get('due_date', ''), '%Y-%m-%d') if item.get('due_date') else None,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow()
+        )
+    
+    async def _changed_invoices(self, cursor: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Invoices updated since the cursor"""
+        if not self.access_token:
+            await self.authenticate()
+        
+        url = f"{self.api_url}/{self.account_id}/invoices/invoices"
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        page = 1
+        while True:
+            params = {'page': page, 'per_page': self.PAGE_SIZE, 'search[updated_min]': cursor}
+            response = await self.session.get(url, headers=headers, params=params)
+            response.raise_for_status()
+            
+            data = response.json()
+            items = data.get('invoices', [])
+            updated = [item['updated'] for item in items if item.get('updated')]
+            yield SyncPage(records=[(str(item['id']), item) for item in items],
+                           cursor=max(updated) if updated else None)
+            if len(items) < self.PAGE_SIZE or page >= data.get('pages', page):
+                return
+            page += 1
     
     async def sync_data(self) -> Dict[str, Any]:
-        """Sync data with FreshBooks"""
+        """Sync invoices changed since the last sync with FreshBooks"""
         try:
-            # Get invoices
-            invoices = await self.get_invoices(limit=1000)
+            invoices = await self.sync_invoices()
             
             self.last_sync = datetime.utcnow()
             
             return {
                 'platform': AccountingPlatform.FRESHBOOKS.value,
-                'invoices_synced': len(invoices),
+                'invoices_synced': invoices['records_changed'],
+                'delta': {'invoices': invoices},
                 'sync_timestamp': self.last_sync.isoformat(),
                 'status': 'success'
             }
@@ -610,6 +704,8 @@ class UnifiedAccountingIntegration:
         self.integrations: Dict[AccountingPlatform, AccountingIntegrationBase] = {}
         self.sync_status: Dict[str, Any] = {}
         self.last_full_sync = None
+        self.scheduler = SyncScheduler()
+        self.cache = get_business_data_cache()
     
     def add_integration(self, platform: AccountingPlatform, config: Dict[str, Any]):
         """Add accounting integration"""
@@ -623,6 +719,8 @@ class UnifiedAccountingIntegration:
             raise ValueError(f"Unsupported accounting platform: {platform}")
         
         self.integrations[platform] = integration
+        if 'sync_deadline' in config:
+            self.scheduler.deadlines[platform.value] = config['sync_deadline']
         logger.info(f"Added {platform.value} integration")
     
     async def authenticate_all(self) -> Dict[str, bool]:
@@ -638,46 +736,27 @@ class UnifiedAccountingIntegration:
         
         return results
     
-    async def get_all_transactions(self, start_date: datetime, end_date: datetime) -> List[FinancialTransaction]:
-        """Get transactions from all accounting platforms"""
-        all_transactions = []
-        
-        for platform, integration in self.integrations.items():
-            try:
-                transactions = await integration.get_transactions(start_date, end_date)
-                all_transactions.extend(transactions)
-            except Exception as e:
-                logger.error(f"Failed to get transactions from {platform.value}: {e}")
-        
-        return all_transactions
+    async def get_all_transactions(self, start_date: datetime, end_date: datetime,
+                                   **filters: Any) -> List[FinancialTransaction]:
+        """Get transactions from all accounting platforms, served from the local cache"""
+        return await self.cache.read(TRANSACTION_CACHE, {
+            platform.value: integration.get_transactions for platform, integration in self.integrations.items()
+        }, start_date, end_date, **filters)
     
-    async def get_all_invoices(self) -> List[Invoice]:
-        """Get invoices from all accounting platforms"""
-        all_invoices = []
-        
-        for platform, integration in self.integrations.items():
-            try:
-                invoices = await integration.get_invoices()
-                all_invoices.extend(invoices)
-            except Exception as e:
-                logger.error(f"Failed to get invoices from {platform.value}: {e}")
-        
-        return all_invoices
+    async def get_all_invoices(self, **filters: Any) -> List[Invoice]:
+        """Get invoices from all accounting platforms, served from the local cache
+
+        The cache refreshes each platform from its delta-synced invoices.
+        """
+        return await self.cache.read(INVOICE_CACHE, {
+            platform.value: integration.synced_invoices for platform, integration in self.integrations.items()
+        }, snapshot=True, **filters)
     
     async def sync_all_platforms(self) -> Dict[str, Any]:
-        """Sync all accounting platforms"""
-        sync_results = {}
-        
-        for platform, integration in self.integrations.items():
-            try:
-                result = await integration.sync_data()
-                sync_results[platform.value] = result
-            except Exception as e:
-                logger.error(f"Sync failed for {platform.value}: {e}")
-                sync_results[platform.value] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        """Sync all accounting platforms concurrently, each under its platform deadline"""
+        sync_results = await self.scheduler.run({
+            platform.value: integration.sync_data for platform, integration in self.integrations.items()
+        })
         
         self.last_full_sync = datetime.utcnow()
         self.sync_status = sync_results
@@ -686,6 +765,7 @@ class UnifiedAccountingIntegration:
             'sync_results': sync_results,
             'total_platforms': len(self.integrations),
             'successful_syncs': len([r for r in sync_results.values() if r.get('status') == 'success']),
+            'sync_duration': self.scheduler.last_run['duration'],
             'sync_timestamp': self.last_full_sync.isoformat()
         }
     
@@ -694,8 +774,17 @@ class UnifiedAccountingIntegration:
         return {
             'last_full_sync': self.last_full_sync.isoformat() if self.last_full_sync else None,
             'active_integrations': list(self.integrations.keys()),
-            'sync_status': self.sync_status
+            'sync_status': self.sync_status,
+            'sync_timings': self.scheduler.get_stats(),
+            'http': {platform.value: integration.session.get_stats()
+                     for platform, integration in self.integrations.items()},
+            'cache': self.cache.staleness([TRANSACTION_CACHE, INVOICE_CACHE])
         }
+    
+    async def close(self) -> None:
+        """Close platform HTTP sessions"""
+        for integration in self.integrations.values():
+            await integration.session.close()
 
 # Production-ready test suite
 class TestAccountingIntegration:
@@ -13,13 +13,12 @@ from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import hashlib
 import base64
 
+from api.business_data_cache import CachedEntity, get_business_data_cache
+from api.integration_sync import AsyncIntegrationSession, SyncScheduler
+
 logger = logging.getLogger(__name__)
 
 class AnalyticsPlatform(Enum):
@@ -104,6 +103,9 @@ class AnalyticsReport:
     bounce_rate: float = 0.0
     created_at: datetime = field(default_factory=datetime.utcnow)
 
+# Local cache layout of the unified records
+EVENT_CACHE = CachedEntity('analytics_events', AnalyticsEvent, customer='user_id', timestamp='timestamp')
+
 class AnalyticsIntegrationBase:
     """Base class for analytics integrations"""
     
@@ -114,18 +116,9 @@ class AnalyticsIntegrationBase:
         self.last_sync = None
         self.sync_interval = config.get('sync_interval', 300)  # 5 minutes default
         
-    def _create_session(self) -> requests.Session:
-        """Create HTTP session with retry logic"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+    def _create_session(self) -> AsyncIntegrationSession:
+        """Create non-blocking HTTP session with retry logic and a concurrency cap"""
+        return AsyncIntegrationSession(max_concurrency=self.config.get('max_concurrency', 4))
     
     async def authenticate(self) -> bool:
         """Authenticate with analytics platform"""
@@ -177,7 +170,7 @@ class GoogleAnalyticsIntegration(AnalyticsIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/properties/{self.property_id}:runReport", headers=headers)
+            response = await self.session.get(f"{self.api_url}/properties/{self.property_id}:runReport", headers=headers)
             response.raise_for_status()
             
             logger.info("Google Analytics authentication successful")
@@ -215,7 +208,7 @@ class GoogleAnalyticsIntegration(AnalyticsIntegrationBase):
                 }]
             }
             
-            response = self.session.post(url, params=params, json=event_data)
+            response = await self.session.post(url, params=params, json=event_data)
             response.raise_for_status()
             
             logger.info(f"Google Analytics event tracked: {event.event_name}")
@@ -251,7 +244,7 @@ class GoogleAnalyticsIntegration(AnalyticsIntegrationBase):
                 ]
             }
             
-            response = self.session.post(url, headers=headers, json=report_request)
+            response = await self.session.post(url, headers=headers, json=report_request)
             response.raise_for_status()
             
             data = response.json()
@@ -274,7 +267,7 @@ class GoogleAnalyticsIntegration(AnalyticsIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Google Analytics events: {e}")
-            return []
+            raise
     
     async def get_analytics_report(self, report_type: str, start_date: datetime, end_date: datetime) -> AnalyticsReport:
         """Get Google Analytics report"""
@@ -308,7 +301,7 @@ class GoogleAnalyticsIntegration(AnalyticsIntegrationBase):
                     ]
                 }
             
-            response = self.session.post(url, headers=headers, json=report_request)
+            response = await self.session.post(url, headers=headers, json=report_request)
             response.raise_for_status()
             
             data = response.json()
@@ -404,7 +397,7 @@ class MixpanelIntegration(AnalyticsIntegrationBase):
                 'to_date': '2024-01-01'
             }
             
-            response = self.session.get(url, params=params)
+            response = await self.session.get(url, params=params)
             response.raise_for_status()
             
             logger.info("Mixpanel authentication successful")
@@ -439,7 +432,7 @@ class MixpanelIntegration(AnalyticsIntegrationBase):
             data = base64.b64encode(json.dumps(event_data).encode()).decode()
             
             params = {'data': data}
-            response = self.session.get(url, params=params)
+            response = await self.session.get(url, params=params)
             response.raise_for_status()
             
             logger.info(f"Mixpanel event tracked: {event.event_name}")
@@ -474,7 +467,7 @@ class MixpanelIntegration(AnalyticsIntegrationBase):
             data = base64.b64encode(json.dumps(user_data).encode()).decode()
             
             params = {'data': data}
-            response = self.session.get(url, params=params)
+            response = await self.session.get(url, params=params)
             response.raise_for_status()
             
             logger.info(f"Mixpanel user identified: {user_profile.user_id}")
@@ -498,7 +491,7 @@ class MixpanelIntegration(AnalyticsIntegrationBase):
                 'to_date': end_date.strftime('%Y-%m-%d')
             }
             
-            response = self.session.get(url, params=params)
+            response = await self.session.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -522,7 +515,7 @@ class MixpanelIntegration(AnalyticsIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Mixpanel events: {e}")
-            return []
+            raise
     
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with Mixpanel"""
@@ -569,7 +562,7 @@ class AmplitudeIntegration(AnalyticsIntegrationBase):
             url = f"{self.api_url}/2/events/segmentation"
             headers = {'Authorization': f'Basic {base64.b64encode(f"{self.api_key}:{self.secret_key}".encode()).decode()}'}
             
-            response = self.session.get(url, headers=headers)
+            response = await self.session.get(url, headers=headers)
             response.raise_for_status()
             
             logger.info("Amplitude authentication successful")
@@ -599,7 +592,7 @@ class AmplitudeIntegration(AnalyticsIntegrationBase):
                 }]
             }
             
-            response = self.session.post(url, json=event_data)
+            response = await self.session.post(url, json=event_data)
             response.raise_for_status()
             
             logger.info(f"Amplitude event tracked: {event.event_name}")
@@ -642,6 +635,8 @@ class UnifiedAnalyticsIntegration:
         self.integrations: Dict[AnalyticsPlatform, AnalyticsIntegrationBase] = {}
         self.sync_status: Dict[str, Any] = {}
         self.last_full_sync = None
+        self.scheduler = SyncScheduler()
+        self.cache = get_business_data_cache()
     
     def add_integration(self, platform: AnalyticsPlatform, config: Dict[str, Any]):
         """Add analytics integration"""
@@ -655,6 +650,8 @@ class UnifiedAnalyticsIntegration:
             raise ValueError(f"Unsupported analytics platform: {platform}")
         
         self.integrations[platform] = integration
+        if 'sync_deadline' in config:
+            self.scheduler.deadlines[platform.value] = config['sync_deadline']
         logger.info(f"Added {platform.value} integration")
     
     async def authenticate_all(self) -> Dict[str, bool]:
@@ -702,33 +699,17 @@ class UnifiedAnalyticsIntegration:
         
         return results
     
-    async def get_all_events(self, start_date: datetime, end_date: datetime) -> List[AnalyticsEvent]:
-        """Get events from all analytics platforms"""
-        all_events = []
-        
-        for platform, integration in self.integrations.items():
-            try:
-                events = await integration.get_events(start_date, end_date)
-                all_events.extend(events)
-            except Exception as e:
-                logger.error(f"Failed to get events from {platform.value}: {e}")
-        
-        return all_events
+    async def get_all_events(self, start_date: datetime, end_date: datetime, **filters: Any) -> List[AnalyticsEvent]:
+        """Get events from all analytics platforms, served from the local cache"""
+        return await self.cache.read(EVENT_CACHE, {
+            platform.value: integration.get_events for platform, integration in self.integrations.items()
+        }, start_date, end_date, **filters)
     
     async def sync_all_platforms(self) -> Dict[str, Any]:
-        """Sync all analytics platforms"""
-        sync_results = {}
-        
-        for platform, integration in self.integrations.items():
-            try:
-                result = await integration.sync_data()
-                sync_results[platform.value] = result
-            except Exception as e:
-                logger.error(f"Sync failed for {platform.value}: {e}")
-                sync_results[platform.value] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        """Sync all analytics platforms concurrently, each under its platform deadline"""
+        sync_results = await self.scheduler.run({
+            platform.value: integration.sync_data for platform, integration in self.integrations.items()
+        })
         
         self.last_full_sync = datetime.utcnow()
         self.sync_status = sync_results
@@ -737,6 +718,7 @@ class UnifiedAnalyticsIntegration:
             'sync_results': sync_results,
             'total_platforms': len(self.integrations),
             'successful_syncs': len([r for r in sync_results.values() if r.get('status') == 'success']),
+            'sync_duration': self.scheduler.last_run['duration'],
             'sync_timestamp': self.last_full_sync.isoformat()
         }
     
@@ -745,8 +727,17 @@ class UnifiedAnalyticsIntegration:
         return {
             'last_full_sync': self.last_full_sync.isoformat() if self.last_full_sync else None,
             'active_integrations': list(self.integrations.keys()),
-            'sync_status': self.sync_status
+            'sync_status': self.sync_status,
+            'sync_timings': self.scheduler.get_stats(),
+            'http': {platform.value: integration.session.get_stats()
+                     for platform, integration in self.integrations.items()},
+            'cache': self.cache.staleness([EVENT_CACHE])
         }
+    
+    async def close(self) -> None:
+        """Close platform HTTP sessions"""
+        for integration in self.integrations.values():
+            await integration.session.close()
 
 # Production-ready test suite
 class TestAnalyticsIntegration:
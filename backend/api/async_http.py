@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+SOVREN AI Async HTTP - asyncio-native JSON serving for bare metal services
+Keep-alive HTTP/1.1 on asyncio streams with request-level concurrency
+limits and graceful drain, shared by the RAG and data ingestion services
+"""
+
+import asyncio
+import json
+import logging
+import signal
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger('sovren-async-http')
+
+@dataclass
+class HTTPRequest:
+    """Parsed HTTP request"""
+    method: str
+    path: str
+    headers: Dict[str, str] = field(default_factory=dict)  # lower-cased names
+    body: bytes = b''
+    client: str = ''
+
+    def json(self) -> Any:
+        """Decode the body as JSON (None when empty)"""
+        if not self.body:
+            return None
+        return json.loads(self.body.decode('utf-8'))
+
+RouteHandler = Callable[[HTTPRequest], Awaitable[Tuple]]
+Response = Tuple[int, Dict[str, Any], Dict[str, str]]
+
+class Router:
+    """Maps (method, path) to async handlers
+    
+    Handlers return (status, JSON payload) or (status, JSON payload, extra
+    headers); dispatch always yields the three-element form.
+    """
+
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str], RouteHandler] = {}
+        self.prefix_routes: List[Tuple[str, str, RouteHandler]] = []
+
+    def add(self, method: str, path: str, handler: RouteHandler, prefix: bool = False) -> None:
+        if prefix:
+            self.prefix_routes.append((method, path, handler))
+        else:
+            self.routes[(method, path)] = handler
+
+    def resolve(self, method: str, path: str) -> Optional[RouteHandler]:
+        handler = self.routes.get((method, path))
+        if handler is not None:
+            return handler
+        for route_method, route_prefix, prefix_handler in self.prefix_routes:
+            if route_method == method and path.startswith(route_prefix):
+                return prefix_handler
+        return None
+
+    async def dispatch(self, request: HTTPRequest) -> Response:
+        handler = self.resolve(request.method, request.path)
+        if handler is None:
+            return 404, {'error': 'Not Found'}, {}
+        try:
+            response = await handler(request)
+        except Exception as e:
+            logger.error(f"{request.method} {request.path} error: {e}")
+            return 500, {'error': str(e)}, {}
+        if len(response) == 2:
+            return response[0], response[1], {}
+        return response
+
+def encode_response(status: int, payload: Dict[str, Any], keep_alive: bool,
+                    headers: Optional[Dict[str, str]] = None) -> bytes:
+    """Serialize a JSON response with the headers the services always sent"""
+    body = json.dumps(payload).encode('utf-8')
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    extra = ''.join(f"{name}: {value}\r\n" for name, value in (headers or {}).items())
+    head = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Access-Control-Allow-Origin: *\r\n"
+        f"{extra}"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode('latin-1') + body
+
+class AsyncHTTPServer:
+    """Keep-alive HTTP/1.1 JSON server on asyncio streams
+
+    At most ``max_concurrency`` requests run handlers at once; further
+    requests wait for a slot. ``shutdown`` stops accepting connections,
+    lets in-flight requests finish for up to ``drain_timeout`` seconds and
+    closes idle keep-alive connections.
+    """
+
+    def __init__(self, router: Router, host: str, port: int, max_concurrency: int = 256,
+                 max_body_size: int = 10 * 1024 * 1024, keep_alive_timeout: float = 15.0,
+                 drain_timeout: float = 30.0):
+        self.router = router
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_body_size = max_body_size
+        self.keep_alive_timeout = keep_alive_timeout
+        self.drain_timeout = drain_timeout
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.draining = False
+        self.in_flight = 0
+        self.idle_connections: Set[asyncio.StreamWriter] = set()
+        self.connections: Set[asyncio.StreamWriter] = set()
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._stopped = asyncio.Event()
+
+        self.requests_served = 0
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port, backlog=4096)
+        sockets = self.server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Serve until shutdown() completes"""
+        if self.server is None:
+            await self.start()
+        await self._stopped.wait()
+
+    def install_signal_handlers(self) -> None:
+        """Drain on SIGTERM/SIGINT (call from the serving loop)"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.shutdown()))
+
+    async def shutdown(self) -> None:
+        """Stop accepting, drain in-flight requests and close connections"""
+        if self.draining:
+            await self._stopped.wait()
+            return
+        self.draining = True
+        logger.info(f"Draining {self.in_flight} in-flight requests")
+
+        if self.server is not None:
+            self.server.close()
+
+        for writer in list(self.idle_connections):
+            writer.close()
+
+        try:
+            await asyncio.wait_for(self._drained.wait(), self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Drain timeout with {self.in_flight} requests still running")
+
+        for writer in list(self.connections):
+            writer.close()
+        if self.server is not None:
+            await self.server.wait_closed()
+        self._stopped.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'connections': len(self.connections),
+            'idle_connections': len(self.idle_connections),
+            'in_flight': self.in_flight,
+            'max_concurrency': self.max_concurrency,
+            'requests_served': self.requests_served,
+            'draining': self.draining
+        }
+
+    async def _read_request(self, reader: asyncio.StreamReader, client: str) -> Optional[HTTPRequest]:
+        """Read one request; None when the peer closed or went idle too long"""
+        request_line = await asyncio.wait_for(reader.readline(), self.keep_alive_timeout)
+        if not request_line or not request_line.strip():
+            return None
+
+        method, path, _ = request_line.decode('latin-1').split(' ', 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        return HTTPRequest(method=method.upper(), path=path, headers=headers, client=client)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername')
+        client = peer[0] if peer else ''
+        self.connections.add(writer)
+
+        try:
+            while not self.draining:
+                self.idle_connections.add(writer)
+                try:
+                    request = await self._read_request(reader, client)
+                except (asyncio.TimeoutError, ConnectionError, ValueError):
+                    request = None
+                finally:
+                    self.idle_connections.discard(writer)
+                if request is None:
+                    break
+
+                if request.headers.get('transfer-encoding', '').lower() == 'chunked':
+                    writer.write(encode_response(501, {'error': 'Chunked request bodies not supported'}, False))
+                    break
+
+                try:
+                    content_length = int(request.headers.get('content-length', 0) or 0)
+                except ValueError:
+                    content_length = -1
+                if content_length < 0:
+                    writer.write(encode_response(400, {'error': 'Invalid Content-Length'}, False))
+                    break
+                if content_length > self.max_body_size:
+                    writer.write(encode_response(413, {
+                        'error': f'Request too large. Max size: {self.max_body_size} bytes'
+                    }, False))
+                    break
+                if content_length:
+                    request.body = await reader.readexactly(content_length)
+
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+
+                self.in_flight += 1
+                self._drained.clear()
+                start = time.perf_counter()
+                try:
+                    async with self.semaphore:
+                        status, payload, headers = await self.router.dispatch(request)
+                finally:
+                    self.in_flight -= 1
+                    if self.in_flight == 0:
+                        self._drained.set()
+                self.requests_served += 1
+
+                keep_alive = keep_alive and not self.draining
+                writer.write(encode_response(status, payload, keep_alive, headers))
+                await writer.drain()
+                logger.debug(f"{client} - {request.method} {request.path} {status} "
+                             f"{(time.perf_counter() - start) * 1000:.1f}ms")
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.discard(writer)
+            try:
+                writer.close()
+            except Exception:
+                pass
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+SOVREN AI Business Data Cache - local store of normalized integration data
+Keeps the unified dataclasses (contacts, transactions, events, posts,
+analytics events, ...) in typed SQLite columns indexed by id, platform,
+updated_at and customer, so reads are local queries. Remote platforms only
+refresh the cache, in the background once it is warm, and every
+(entity, platform) pair reports how stale it is. Entities the integrations
+delta-sync are refreshed from the sync state store as full snapshots, so
+records deleted on the platform leave the cache too.
+"""
+
+import asyncio
+import dataclasses
+import decimal
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import typing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BUSINESS_CACHE_PATH = os.environ.get('SOVREN_BUSINESS_CACHE_PATH',
+                                     '/mnt/yellow-mackerel-volume/sovren/integrations/business_cache.db')
+BUSINESS_CACHE_MAX_AGE = float(os.environ.get('SOVREN_BUSINESS_CACHE_MAX_AGE', 300))  # seconds
+
+Fetcher = Callable[..., Awaitable[List[Any]]]
+
+@dataclass(frozen=True)
+class CachedEntity:
+    """How one unified dataclass is stored
+
+    ``customer`` and ``timestamp`` name the attributes copied into the
+    indexed customer and occurred_at columns; ``timestamp`` also makes the
+    entity range-refreshed (fetchers take start and end).
+    """
+    name: str
+    cls: type
+    customer: Optional[str] = None
+    timestamp: Optional[str] = None
+    max_age: Optional[float] = None
+
+def _utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return _utc_naive(value).isoformat() if value is not None else None
+
+class _Column:
+    """Encoding of one dataclass field into a SQLite column"""
+
+    def __init__(self, name: str, hint: Any):
+        self.name = name
+        args = [arg for arg in typing.get_args(hint) if arg is not type(None)]
+        if typing.get_origin(hint) is typing.Union and len(args) == 1:
+            hint = args[0]  # Optional[X]
+        self.kind = hint if isinstance(hint, type) else object
+
+    @property
+    def sql_type(self) -> str:
+        if issubclass(self.kind, (bool, int)):
+            return 'INTEGER'
+        if issubclass(self.kind, float):
+            return 'REAL'
+        return 'TEXT'
+
+    def encode(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if issubclass(self.kind, Enum):
+            return value.value
+        if issubclass(self.kind, datetime):
+            return _iso(value)
+        if issubclass(self.kind, decimal.Decimal):
+            return str(value)
+        if issubclass(self.kind, (bool, int, float, str)):
+            return value
+        return json.dumps(value, default=str)
+
+    def decode(self, value: Any) -> Any:
+        if value is None:
+            return None
+        if issubclass(self.kind, Enum):
+            return self.kind(value)
+        if issubclass(self.kind, datetime):
+            return datetime.fromisoformat(value)
+        if issubclass(self.kind, decimal.Decimal):
+            return decimal.Decimal(value)
+        if issubclass(self.kind, bool):
+            return bool(value)
+        if issubclass(self.kind, (int, float, str)):
+            return value
+        return json.loads(value)
+
+class BusinessDataCache:
+    """Normalized integration records in SQLite (WAL), one table per entity
+
+    Every dataclass field gets its own typed column; lists and dicts are
+    stored as JSON. Rows are keyed by (platform, id) and indexed on id,
+    updated_at, customer and occurred_at. Timestamps are stored as naive
+    UTC. Refreshes upsert, or replace a platform's rows when the fetcher
+    returns a full snapshot; a fetcher that raises leaves the rows and the
+    refresh time untouched.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age: float = BUSINESS_CACHE_MAX_AGE):
+        self.path = path or ':memory:'
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.max_age = max_age
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        self.columns: Dict[str, List[_Column]] = {}
+        self.refreshing: Dict[Tuple[str, str], asyncio.Task] = {}
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_refreshes (
+                    entity TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    refreshed_at REAL,
+                    range_start TEXT,
+                    range_end TEXT,
+                    last_error TEXT,
+                    failed_at REAL,
+                    PRIMARY KEY (entity, platform)
+                )
+            """)
+
+    def _table(self, entity: CachedEntity) -> List[_Column]:
+        """Columns for an entity, creating its table and indexes on first use"""
+        columns = self.columns.get(entity.name)
+        if columns is not None:
+            return columns
+
+        hints = typing.get_type_hints(entity.cls)
+        columns = [_Column(f.name, hints[f.name]) for f in dataclasses.fields(entity.cls)]
+        definitions = ', '.join(f'"{c.name}" {c.sql_type}' for c in columns)
+        with self.lock:
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS "{entity.name}" (
+                    {definitions},
+                    customer TEXT,
+                    occurred_at TEXT,
+                    cached_at REAL NOT NULL,
+                    PRIMARY KEY (platform, id)
+                )
+            """)
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{entity.name}_id" ON "{entity.name}" (id)')
+            if 'updated_at' in hints:
+                self.conn.execute(
+                    f'CREATE INDEX IF NOT EXISTS "{entity.name}_updated" ON "{entity.name}" (updated_at)'
+                )
+            self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{entity.name}_customer" ON "{entity.name}" (customer)')
+            self.conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{entity.name}_occurred" ON "{entity.name}" (platform, occurred_at)'
+            )
+        self.columns[entity.name] = columns
+        return columns
+
+    def upsert(self, entity: CachedEntity, records: Iterable[Any], replace_platform: Optional[str] = None) -> int:
+        """Insert or replace dataclass records; returns the number written
+
+        With ``replace_platform`` the records are that platform's complete
+        set: its other rows are deleted in the same transaction.
+        """
+        columns = self._table(entity)
+        now = time.time()
+        rows = []
+        for record in records:
+            row = [column.encode(getattr(record, column.name)) for column in columns]
+            customer = getattr(record, entity.customer) if entity.customer else None
+            occurred = getattr(record, entity.timestamp) if entity.timestamp else None
+            row.extend([str(customer) if customer is not None else None, _iso(occurred), now])
+            rows.append(row)
+
+        names = ', '.join(f'"{c.name}"' for c in columns)
+        placeholders = ', '.join('?' * (len(columns) + 3))
+        with self.lock:
+            self.conn.execute("BEGIN")
+            if replace_platform is not None:
+                self.conn.execute(f'DELETE FROM "{entity.name}" WHERE platform = ?', (replace_platform,))
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO "{entity.name}" ({names}, customer, occurred_at, cached_at) '
+                f'VALUES ({placeholders})', rows
+            )
+            self.conn.execute("COMMIT")
+        return len(rows)
+
+    def query(self, entity: CachedEntity, platform: Optional[str] = None, record_id: Optional[str] = None,
+              customer: Optional[str] = None, updated_since: Optional[datetime] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None,
+              limit: Optional[int] = None, platforms: Optional[Iterable[str]] = None) -> List[Any]:
+        """Cached records matching every given filter, most recently updated first
+
+        ``start``/``end`` bound the entity's timestamp attribute (inclusive);
+        ``platforms`` restricts the rows to any of those platforms.
+        """
+        columns = self._table(entity)
+        where, params = [], []
+        if platforms is not None:
+            platforms = list(platforms)
+            where.append(f"platform IN ({', '.join('?' * len(platforms))})")
+            params.extend(platforms)
+        for clause, value in (('platform = ?', platform), ('id = ?', record_id), ('customer = ?', customer),
+                              ('updated_at > ?', _iso(updated_since)), ('occurred_at >= ?', _iso(start)),
+                              ('occurred_at <= ?', _iso(end))):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+
+        names = ', '.join(f'"{c.name}"' for c in columns)
+        sql = f'SELECT {names} FROM "{entity.name}"'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        if any(c.name == 'updated_at' for c in columns):
+            sql += ' ORDER BY updated_at DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [entity.cls(**{c.name: c.decode(v) for c, v in zip(columns, row)}) for row in rows]
+
+    def count(self, entity: CachedEntity, platform: Optional[str] = None) -> int:
+        self._table(entity)
+        sql = f'SELECT COUNT(*) FROM "{entity.name}"'
+        with self.lock:
+            if platform is None:
+                return self.conn.execute(sql).fetchone()[0]
+            return self.conn.execute(sql + ' WHERE platform = ?', (platform,)).fetchone()[0]
+
+    def _refresh_state(self, entity: CachedEntity, platform: str) -> Optional[Tuple]:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT refreshed_at, range_start, range_end, last_error, failed_at FROM cache_refreshes "
+                "WHERE entity = ? AND platform = ?", (entity.name, platform)
+            ).fetchone()
+
+    def _covers(self, entity: CachedEntity, platform: str, start: Optional[datetime],
+                end: Optional[datetime]) -> bool:
+        """Whether a refresh has loaded this platform (and, for ranged entities, this range)"""
+        state = self._refresh_state(entity, platform)
+        if state is None or state[0] is None:
+            return False
+        if start is None or end is None:
+            return True
+        return state[1] is not None and state[1] <= _iso(start) and _iso(end) <= state[2]
+
+    def _is_stale(self, entity: CachedEntity, platform: str) -> bool:
+        state = self._refresh_state(entity, platform)
+        max_age = entity.max_age if entity.max_age is not None else self.max_age
+        return state is None or state[0] is None or time.time() - state[0] > max_age
+
+    async def refresh(self, entity: CachedEntity, platform: str, fetch: Fetcher,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      snapshot: bool = False) -> int:
+        """Load records from the platform into the cache; returns the number written
+
+        Ranged entities refetch the union of the requested and already
+        cached range, so the covered range stays contiguous. A ``snapshot``
+        fetcher returns every record the platform has, and replaces its rows.
+        """
+        state = self._refresh_state(entity, platform)
+        if start is not None and end is not None and state is not None and state[1] is not None:
+            start = min(_utc_naive(start), datetime.fromisoformat(state[1]))
+            end = max(_utc_naive(end), datetime.fromisoformat(state[2]))
+
+        try:
+            records = await (fetch(start, end) if start is not None and end is not None else fetch())
+        except Exception as e:
+            logger.error(f"Cache refresh of {entity.name} from {platform} failed: {e}")
+            with self.lock:
+                self.conn.execute(
+                    "INSERT INTO cache_refreshes (entity, platform, last_error, failed_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (entity, platform) DO UPDATE SET last_error = excluded.last_error, "
+                    "failed_at = excluded.failed_at", (entity.name, platform, str(e), time.time())
+                )
+            return 0
+
+        written = self.upsert(entity, records, replace_platform=platform if snapshot else None)
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache_refreshes (entity, platform, refreshed_at, range_start, range_end) "
+                "VALUES (?, ?, ?, ?, ?)", (entity.name, platform, time.time(), _iso(start), _iso(end))
+            )
+        return written
+
+    def _refresh_in_background(self, entity: CachedEntity, platform: str, fetch: Fetcher,
+                               start: Optional[datetime], end: Optional[datetime], snapshot: bool) -> None:
+        key = (entity.name, platform)
+        if key in self.refreshing:
+            return
+        task = asyncio.create_task(self.refresh(entity, platform, fetch, start, end, snapshot))
+        self.refreshing[key] = task
+        task.add_done_callback(lambda _: self.refreshing.pop(key, None))
+
+    async def read(self, entity: CachedEntity, fetchers: Dict[str, Fetcher], start: Optional[datetime] = None,
+                   end: Optional[datetime] = None, snapshot: bool = False, **filters: Any) -> List[Any]:
+        """Query the cache across the given platforms, refreshing as needed
+
+        Platforms never loaded (or not loaded for this range) are fetched
+        before answering; stale ones are answered from the cache and
+        refreshed in the background. Filters, ``limit`` included, apply to
+        the merged result of all platforms.
+        """
+        cold = []
+        for platform, fetch in fetchers.items():
+            if not self._covers(entity, platform, start, end):
+                cold.append(self.refresh(entity, platform, fetch, start, end, snapshot))
+            elif self._is_stale(entity, platform):
+                self._refresh_in_background(entity, platform, fetch, start, end, snapshot)
+        if cold:
+            await asyncio.gather(*cold)
+
+        return self.query(entity, platforms=fetchers, start=start, end=end, **filters)
+
+    def staleness(self, entities: Iterable[CachedEntity]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per entity and platform: when it was refreshed, its age, whether it is stale, rows and last error"""
+        now = time.time()
+        report: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for entity in entities:
+            self._table(entity)
+            with self.lock:
+                states = self.conn.execute(
+                    "SELECT platform, refreshed_at, range_start, range_end, last_error, failed_at "
+                    "FROM cache_refreshes WHERE entity = ?", (entity.name,)
+                ).fetchall()
+            max_age = entity.max_age if entity.max_age is not None else self.max_age
+            platforms = {}
+            for platform, refreshed_at, range_start, range_end, last_error, failed_at in states:
+                age = now - refreshed_at if refreshed_at is not None else None
+                platforms[platform] = {
+                    'refreshed_at': datetime.utcfromtimestamp(refreshed_at).isoformat() if refreshed_at else None,
+                    'age_seconds': round(age, 1) if age is not None else None,
+                    'stale': age is None or age > max_age,
+                    'refreshing': (entity.name, platform) in self.refreshing,
+                    'rows': self.count(entity, platform),
+                    'range': [range_start, range_end] if range_start else None,
+                    'last_error': last_error,
+                    'failed_at': datetime.utcfromtimestamp(failed_at).isoformat() if failed_at else None
+                }
+            report[entity.name] = platforms
+        return report
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+_business_data_cache: Optional[BusinessDataCache] = None
+
+def get_business_data_cache() -> BusinessDataCache:
+    """Process-wide cache at SOVREN_BUSINESS_CACHE_PATH (in memory if that can't be opened)"""
+    global _business_data_cache
+    if _business_data_cache is None:
+        try:
+            _business_data_cache = BusinessDataCache(BUSINESS_CACHE_PATH)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Business data cache unavailable at {BUSINESS_CACHE_PATH} ({e}), keeping it in memory")
+            _business_data_cache = BusinessDataCache()
+    return _business_data_cache
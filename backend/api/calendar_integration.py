@@ -9,18 +9,19 @@ import asyncio
 import logging
 import time
 import json
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import icalendar
 from icalendar import Calendar, Event
 import pytz
 
+from api.business_data_cache import CachedEntity, get_business_data_cache
+from api.integration_sync import (
+    AsyncIntegrationSession, CursorExpiredError, SyncPage, SyncScheduler, get_sync_state_store, run_delta_sync
+)
+
 logger = logging.getLogger(__name__)
 
 class CalendarPlatform(Enum):
@@ -76,6 +77,9 @@ class CalendarAvailability:
     busy_reason: Optional[str] = None
     event_id: Optional[str] = None
 
+# Local cache layout of the unified records
+EVENT_CACHE = CachedEntity('calendar_events', CalendarEvent, customer='organizer', timestamp='start_time')
+
 class CalendarIntegrationBase:
     """Base class for calendar integrations"""
     
@@ -83,21 +87,13 @@ class CalendarIntegrationBase:
         self.platform = platform
         self.config = config
         self.session = self._create_session()
+        self.state_store = get_sync_state_store()  # synced records and high-water marks
         self.last_sync = None
         self.sync_interval = config.get('sync_interval', 300)  # 5 minutes default
         
-    def _create_session(self) -> requests.Session:
-        """Create HTTP session with retry logic"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+    def _create_session(self) -> AsyncIntegrationSession:
+        """Create non-blocking HTTP session with retry logic and a concurrency cap"""
+        return AsyncIntegrationSession(max_concurrency=self.config.get('max_concurrency', 4))
     
     async def authenticate(self) -> bool:
         """Authenticate with calendar platform"""
@@ -151,7 +147,7 @@ class GoogleCalendarIntegration(CalendarIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/users/me/calendarList", headers=headers)
+            response = await self.session.get(f"{self.api_url}/users/me/calendarList", headers=headers)
             response.raise_for_status()
             
             logger.info("Google Calendar authentication successful")
@@ -198,7 +194,7 @@ class GoogleCalendarIntegration(CalendarIntegrationBase):
             if event.recurring and event.recurrence_rule:
                 event_data['recurrence'] = [event.recurrence_rule]
             
-            response = self.session.post(url, headers=headers, json=event_data)
+            response = await self.session.post(url, headers=headers, json=event_data)
             response.raise_for_status()
             
             created_event = response.json()
@@ -226,7 +222,7 @@ class GoogleCalendarIntegration(CalendarIntegrationBase):
                 'orderBy': 'startTime'
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -268,7 +264,7 @@ class GoogleCalendarIntegration(CalendarIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Google Calendar events: {e}")
-            return []
+            raise
     
     async def get_availability(self, user_id: str, start_time: datetime, end_time: datetime) -> List[CalendarAvailability]:
         """Get user availability from Google Calendar"""
@@ -284,7 +280,7 @@ class GoogleCalendarIntegration(CalendarIntegrationBase):
                 'items': [{'id': self.calendar_id}]
             }
             
-            response = self.session.post(url, headers=headers, json=data)
+            response = await self.session.post(url, headers=headers, json=data)
             response.raise_for_status()
             
             result = response.json()
@@ -309,21 +305,51 @@ class GoogleCalendarIntegration(CalendarIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Google Calendar availability: {e}")
-            return []
+            raise
+    
+    async def _changed_events(self, sync_token: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Events changed since the sync token (upcoming events on the first sync)"""
+        if not self.access_token:
+            await self.authenticate()
+        
+        url = f"{self.api_url}/calendars/{self.calendar_id}/events"
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        params: Dict[str, Any] = {'singleEvents': True, 'maxResults': 2500}
+        if sync_token:
+            params['syncToken'] = sync_token
+        else:
+            params['timeMin'] = datetime.utcnow().isoformat() + 'Z'
+        
+        while True:
+            response = await self.session.get(url, headers=headers, params=params)
+            if response.status_code == 410:
+                raise CursorExpiredError()
+            response.raise_for_status()
+            
+            data = response.json()
+            items = data.get('items', [])
+            yield SyncPage(
+                records=[(item['id'], item) for item in items if item.get('status') != 'cancelled'],
+                deleted=[item['id'] for item in items if item.get('status') == 'cancelled'],
+                cursor=data.get('nextSyncToken')
+            )
+            if not data.get('nextPageToken'):
+                return
+            params['pageToken'] = data['nextPageToken']
     
     async def sync_data(self) -> Dict[str, Any]:
-        """Sync data with Google Calendar"""
+        """Sync events changed since the last sync with Google Calendar"""
         try:
-            # Get events for the next 30 days
-            start_time = datetime.utcnow()
-            end_time = start_time + timedelta(days=30)
-            events = await self.get_events(start_time, end_time)
+            events = await run_delta_sync(
+                self.state_store, self.session, self.platform.value, 'events', self._changed_events
+            )
             
             self.last_sync = datetime.utcnow()
             
             return {
                 'platform': CalendarPlatform.GOOGLE_CALENDAR.value,
-                'events_synced': len(events),
+                'events_synced': events['records_changed'],
+                'delta': {'events': events},
                 'sync_timestamp': self.last_sync.isoformat(),
                 'status': 'success'
             }
@@ -357,7 +383,7 @@ class OutlookCalendarIntegration(CalendarIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/me", headers=headers)
+            response = await self.session.get(f"{self.api_url}/me", headers=headers)
             response.raise_for_status()
             
             logger.info("Outlook authentication successful")
@@ -407,7 +433,7 @@ class OutlookCalendarIntegration(CalendarIntegrationBase):
                 event_data['start'] = {'date': event.start_time.date().isoformat()}
                 event_data['end'] = {'date': event.end_time.date().isoformat()}
             
-            response = self.session.post(url, headers=headers, json=event_data)
+            response = await self.session.post(url, headers=headers, json=event_data)
             response.raise_for_status()
             
             created_event = response.json()
@@ -433,7 +459,7 @@ class OutlookCalendarIntegration(CalendarIntegrationBase):
                 '$orderby': 'start/dateTime'
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -475,21 +501,52 @@ class OutlookCalendarIntegration(CalendarIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Outlook Calendar events: {e}")
-            return []
+            raise
+    
+    async def _changed_events(self, delta_link: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Events changed since the delta link (the next 30 days on the first sync)"""
+        if not self.access_token:
+            await self.authenticate()
+        
+        headers = {'Authorization': f'Bearer {self.access_token}', 'Prefer': 'odata.maxpagesize=500'}
+        if delta_link:
+            url, params = delta_link, None
+        else:
+            start_time = datetime.utcnow()
+            url = f"{self.api_url}/me/calendarView/delta"
+            params = {
+                'startDateTime': start_time.isoformat(),
+                'endDateTime': (start_time + timedelta(days=30)).isoformat()
+            }
+        
+        while url:
+            response = await self.session.get(url, headers=headers, params=params)
+            if response.status_code == 410:
+                raise CursorExpiredError()
+            response.raise_for_status()
+            
+            data = response.json()
+            items = data.get('value', [])
+            yield SyncPage(
+                records=[(item['id'], item) for item in items if '@removed' not in item],
+                deleted=[item['id'] for item in items if '@removed' in item],
+                cursor=data.get('@odata.deltaLink')
+            )
+            url, params = data.get('@odata.nextLink'), None
     
     async def sync_data(self) -> Dict[str, Any]:
-        """Sync data with Outlook Calendar"""
+        """Sync events changed since the last sync with Outlook Calendar"""
         try:
-            # Get events for the next 30 days
-            start_time = datetime.utcnow()
-            end_time = start_time + timedelta(days=30)
-            events = await self.get_events(start_time, end_time)
+            events = await run_delta_sync(
+                self.state_store, self.session, self.platform.value, 'events', self._changed_events
+            )
             
             self.last_sync = datetime.utcnow()
             
             return {
                 'platform': CalendarPlatform.OUTLOOK.value,
-                'events_synced': len(events),
+                'events_synced': events['records_changed'],
+                'delta': {'events': events},
                 'sync_timestamp': self.last_sync.isoformat(),
                 'status': 'success'
             }
@@ -530,7 +587,7 @@ class ICalIntegration(CalendarIntegrationBase):
             calendar_data = None
             
             if self.calendar_url:
-                response = self.session.get(self.calendar_url)
+                response = await self.session.get(self.calendar_url)
                 response.raise_for_status()
                 calendar_data = response.content
             elif self.calendar_file:
@@ -576,7 +633,7 @@ class ICalIntegration(CalendarIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get iCal events: {e}")
-            return []
+            raise
     
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with iCal"""
@@ -613,6 +670,8 @@ class UnifiedCalendarIntegration:
         self.integrations: Dict[CalendarPlatform, CalendarIntegrationBase] = {}
         self.sync_status: Dict[str, Any] = {}
         self.last_full_sync = None
+        self.scheduler = SyncScheduler()
+        self.cache = get_business_data_cache()
     
     def add_integration(self, platform: CalendarPlatform, config: Dict[str, Any]):
         """Add calendar integration"""
@@ -626,6 +685,8 @@ class UnifiedCalendarIntegration:
             raise ValueError(f"Unsupported calendar platform: {platform}")
         
         self.integrations[platform] = integration
+        if 'sync_deadline' in config:
+            self.scheduler.deadlines[platform.value] = config['sync_deadline']
         logger.info(f"Added {platform.value} integration")
     
     async def authenticate_all(self) -> Dict[str, bool]:
@@ -657,33 +718,18 @@ class UnifiedCalendarIntegration:
         
         return results
     
-    async def get_all_events(self, start_time: datetime, end_time: datetime) -> List[CalendarEvent]:
-        """Get events from all calendar platforms"""
-        all_events = []
-        
-        for platform, integration in self.integrations.items():
-            try:
-                events = await integration.get_events(start_time, end_time)
-                all_events.extend(events)
-            except Exception as e:
-                logger.error(f"Failed to get events from {platform.value}: {e}")
-        
-        return all_events
+    async def get_all_events(self, start_time: datetime, end_time: datetime,
+                             **filters: Any) -> List[CalendarEvent]:
+        """Get events from all calendar platforms, served from the local cache"""
+        return await self.cache.read(EVENT_CACHE, {
+            platform.value: integration.get_events for platform, integration in self.integrations.items()
+        }, start_time, end_time, **filters)
     
     async def sync_all_platforms(self) -> Dict[str, Any]:
-        """Sync all calendar platforms"""
-        sync_results = {}
-        
-        for platform, integration in self.integrations.items():
-            try:
-                result = await integration.sync_data()
-                sync_results[platform.value] = result
-            except Exception as e:
-                logger.error(f"Sync failed for {platform.value}: {e}")
-                sync_results[platform.value] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        """Sync all calendar platforms concurrently, each under its platform deadline"""
+        sync_results = await self.scheduler.run({
+            platform.value: integration.sync_data for platform, integration in self.integrations.items()
+        })
         
         self.last_full_sync = datetime.utcnow()
         self.sync_status = sync_results
@@ -692,6 +738,7 @@ class UnifiedCalendarIntegration:
             'sync_results': sync_results,
             'total_platforms': len(self.integrations),
             'successful_syncs': len([r for r in sync_results.values() if r.get('status') == 'success']),
+            'sync_duration': self.scheduler.last_run['duration'],
             'sync_timestamp': self.last_full_sync.isoformat()
         }
     
@@ -700,8 +747,17 @@ class UnifiedCalendarIntegration:
         return {
             'last_full_sync': self.last_full_sync.isoformat() if self.last_full_sync else None,
             'active_integrations': list(self.integrations.keys()),
-            'sync_status': self.sync_status
+            'sync_status': self.sync_status,
+            'sync_timings': self.scheduler.get_stats(),
+            'http': {platform.value: integration.session.get_stats()
+                     for platform, integration in self.integrations.items()},
+            'cache': self.cache.staleness([EVENT_CACHE])
         }
+    
+    async def close(self) -> None:
+        """Close platform HTTP sessions"""
+        for integration in self.integrations.values():
+            await integration.session.close()
 
 # Production-ready test suite
 class TestCalendarIntegration:
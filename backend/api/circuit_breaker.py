@@ -38,6 +38,7 @@ class CircuitBreaker:
         self.failure_count = 0
         self.last_failure_time = 0
         self.last_success_time = time.time()
+        self.trial_started: Optional[float] = None  # HALF_OPEN probe admitted by allow_request()
         self._lock = asyncio.Lock()
         
     async def call(self, func: Callable, *args, **kwargs) -> Any:
@@ -62,6 +63,36 @@ class CircuitBreaker:
                 await self._on_failure()
                 raise e
     
+    def allow_request(self) -> bool:
+        """Check whether a call may proceed without holding the lock for its duration
+
+        For concurrent callers that track outcomes themselves via
+        record_success/record_failure instead of going through call().
+        While HALF_OPEN a single trial request is admitted and the rest are
+        rejected until it is recorded (or, if it never is, for another
+        recovery_timeout).
+        """
+        if self.state == CircuitState.OPEN:
+            if not self._should_attempt_reset():
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self.trial_started = None
+            logger.info(f"Circuit breaker '{self.name}' is HALF_OPEN")
+        if self.state == CircuitState.HALF_OPEN:
+            now = time.time()
+            if self.trial_started is not None and now - self.trial_started < self.config.recovery_timeout:
+                return False
+            self.trial_started = now
+        return True
+
+    async def record_success(self):
+        """Record a successful call made after allow_request()"""
+        await self._on_success()
+
+    async def record_failure(self):
+        """Record a failed call made after allow_request()"""
+        await self._on_failure()
+
     def _should_attempt_reset(self) -> bool:
         """Check if circuit should attempt reset"""
         return time.time() - self.last_failure_time >= self.config.recovery_timeout
@@ -73,6 +104,7 @@ class CircuitBreaker:
     
     async def _on_success(self):
         """Handle successful call"""
+        self.trial_started = None
         self.failure_count = 0
         self.last_success_time = time.time()
         
@@ -82,10 +114,11 @@ class CircuitBreaker:
     
     async def _on_failure(self):
         """Handle failed call"""
+        self.trial_started = None
         self.failure_count += 1
         self.last_failure_time = time.time()
         
-        if self.failure_count >= self.config.failure_threshold:
+        if self.failure_count >= self.config.failure_threshold or self.state == CircuitState.HALF_OPEN:
             self.state = CircuitState.OPEN
             logger.warning(f"Circuit breaker '{self.name}' is OPEN after {self.failure_count} failures")
     
@@ -9,14 +9,15 @@ import asyncio
 import logging
 import time
 import json
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from api.business_data_cache import CachedEntity, get_business_data_cache
+from api.integration_sync import (
+    AsyncIntegrationSession, SyncPage, SyncScheduler, get_sync_state_store, run_delta_sync
+)
 
 logger = logging.getLogger(__name__)
 
@@ -84,28 +85,26 @@ class CRMCompany:
     updated_at: datetime = field(default_factory=datetime.utcnow)
     custom_fields: Dict[str, Any] = field(default_factory=dict)
 
+# Local cache layout of the unified records
+CONTACT_CACHE = CachedEntity('crm_contacts', CRMContact, customer='company')
+OPPORTUNITY_CACHE = CachedEntity('crm_opportunities', CRMOpportunity, customer='company_id')
+
 class CRMIntegrationBase:
     """Base class for CRM integrations"""
     
+    SYNCED_ENTITIES: Tuple[str, ...] = ()  # entities sync_entity keeps in the state store
+    
     def __init__(self, platform: CRMPlatform, config: Dict[str, Any]):
         self.platform = platform
         self.config = config
         self.session = self._create_session()
+        self.state_store = get_sync_state_store()  # synced records and high-water marks
         self.last_sync = None
         self.sync_interval = config.get('sync_interval', 300)  # 5 minutes default
         
-    def _create_session(self) -> requests.Session:
-        """Create HTTP session with retry logic"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+    def _create_session(self) -> AsyncIntegrationSession:
+        """Create non-blocking HTTP session with retry logic and a concurrency cap"""
+        return AsyncIntegrationSession(max_concurrency=self.config.get('max_concurrency', 4))
     
     async def authenticate(self) -> bool:
         """Authenticate with CRM platform"""
@@ -138,20 +137,51 @@ class CRMIntegrationBase:
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with CRM platform"""
         raise NotImplementedError
+    
+    async def sync_entity(self, entity: str) -> Dict[str, Any]:
+        """Merge one entity's changes since the last sync into the state store"""
+        raise NotImplementedError
+    
+    def _contact(self, record: Dict[str, Any]) -> CRMContact:
+        """Unified contact from a platform record"""
+        raise NotImplementedError
+    
+    def _opportunity(self, record: Dict[str, Any]) -> CRMOpportunity:
+        """Unified opportunity from a platform record"""
+        raise NotImplementedError
+    
+    async def synced_contacts(self) -> List[CRMContact]:
+        """Every contact in the state store, after merging the changes since the last sync"""
+        await self.sync_entity('contacts')
+        return [self._contact(record) for record in self.state_store.records(self.platform.value, 'contacts')]
+    
+    async def synced_opportunities(self) -> List[CRMOpportunity]:
+        """Every opportunity in the state store, after merging the changes since the last sync"""
+        await self.sync_entity('opportunities')
+        return [self._opportunity(record)
+                for record in self.state_store.records(self.platform.value, 'opportunities')]
 
 class SalesforceIntegration(CRMIntegrationBase):
     """Salesforce CRM integration"""
     
+    CONTACT_FIELDS = "Id, FirstName, LastName, Email, Phone, Title, Company, CreatedDate, LastModifiedDate"
+    OPPORTUNITY_FIELDS = ("Id, Name, Amount, CurrencyIsoCode, StageName, Probability, CloseDate, ContactId, "
+                          "AccountId, CreatedDate, LastModifiedDate")
+    SYNCED_ENTITIES = ('contacts', 'opportunities')
+    SOBJECTS = {'contacts': ('Contact', CONTACT_FIELDS), 'opportunities': ('Opportunity', OPPORTUNITY_FIELDS)}
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(CRMPlatform.SALESFORCE, config)
         self.access_token = None
         self.instance_url = None
         self.api_version = config.get('api_version', '58.0')
+        self.login_url = config.get('login_url', 'https://login.salesforce.com')
+        self.query_batch_size = config.get('query_batch_size', 2000)  # records per queryMore page
     
     async def authenticate(self) -> bool:
         """Authenticate with Salesforce using OAuth"""
         try:
-            auth_url = "https://login.salesforce.com/services/oauth2/token"
+            auth_url = f"{self.login_url}/services/oauth2/token"
             auth_data = {
                 'grant_type': 'password',
                 'client_id': self.config['client_id'],
@@ -160,7 +190,7 @@ class SalesforceIntegration(CRMIntegrationBase):
                 'password': self.config['password'] + self.config.get('security_token', '')
             }
             
-            response = self.session.post(auth_url, data=auth_data)
+            response = await self.session.post(auth_url, data=auth_data)
             response.raise_for_status()
             
             auth_response = response.json()
@@ -180,36 +210,33 @@ class SalesforceIntegration(CRMIntegrationBase):
             if not self.access_token:
                 await self.authenticate()
             
-            query = f"SELECT Id, FirstName, LastName, Email, Phone, Title, Company, CreatedDate, LastModifiedDate FROM Contact LIMIT {limit} OFFSET {offset}"
+            query = f"SELECT {self.CONTACT_FIELDS} FROM Contact LIMIT {limit} OFFSET {offset}"
             url = f"{self.instance_url}/services/data/v{self.api_version}/query"
             headers = {'Authorization': f'Bearer {self.access_token}'}
             
-            response = self.session.get(url, headers=headers, params={'q': query})
+            response = await self.session.get(url, headers=headers, params={'q': query})
             response.raise_for_status()
             
             data = response.json()
-            contacts = []
-            
-            for record in data.get('records', []):
-                contact = CRMContact(
-                    id=record['Id'],
-                    platform=CRMPlatform.SALESFORCE,
-                    first_name=record.get('FirstName', ''),
-                    last_name=record.get('LastName', ''),
-                    email=record.get('Email', ''),
-                    phone=record.get('Phone'),
-                    title=record.get('Title'),
-                    company=record.get('Company'),
-                    created_at=datetime.fromisoformat(record['CreatedDate'].replace('Z', '+00:00')),
-                    updated_at=datetime.fromisoformat(record['LastModifiedDate'].replace('Z', '+00:00'))
-                )
-                contacts.append(contact)
-            
-            return contacts
+            return [self._contact(record) for record in data.get('records', [])]
             
         except Exception as e:
             logger.error(f"Failed to get Salesforce contacts: {e}")
-            return []
+            raise
+    
+    def _contact(self, record: Dict[str, Any]) -> CRMContact:
+        return CRMContact(
+            id=record['Id'],
+            platform=CRMPlatform.SALESFORCE,
+            first_name=record.get('FirstName', ''),
+            last_name=record.get('LastName', ''),
+            email=record.get('Email', ''),
+            phone=record.get('Phone'),
+            title=record.get('Title'),
+            company=record.get('Company'),
+            created_at=datetime.fromisoformat(record['CreatedDate'].replace('Z', '+00:00')),
+            updated_at=datetime.fromisoformat(record['LastModifiedDate'].replace('Z', '+00:00'))
+        )
     
     async def create_contact(self, contact: CRMContact) -> bool:
         """Create contact in Salesforce"""
@@ -232,7 +259,7 @@ class SalesforceIntegration(CRMIntegrationBase):
                 'Company': contact.company
             }
             
-            response = self.session.post(url, headers=headers, json=data)
+            response = await self.session.post(url, headers=headers, json=data)
             response.raise_for_status()
             
             logger.info(f"Created Salesforce contact: {contact.email}")
@@ -248,51 +275,95 @@ class SalesforceIntegration(CRMIntegrationBase):
             if not self.access_token:
                 await self.authenticate()
             
-            query = f"SELECT Id, Name, Amount, CurrencyIsoCode, StageName, Probability, CloseDate, ContactId, AccountId, CreatedDate, LastModifiedDate FROM Opportunity LIMIT {limit} OFFSET {offset}"
+            query = f"SELECT {self.OPPORTUNITY_FIELDS} FROM Opportunity LIMIT {limit} OFFSET {offset}"
             url = f"{self.instance_url}/services/data/v{self.api_version}/query"
             headers = {'Authorization': f'Bearer {self.access_token}'}
             
-            response = self.session.get(url, headers=headers, params={'q': query})
+            response = await self.session.get(url, headers=headers, params={'q': query})
             response.raise_for_status()
             
             data = response.json()
-            opportunities = []
-            
-            for record in data.get('records', []):
-                opportunity = CRMOpportunity(
-                    id=record['Id'],
-                    platform=CRMPlatform.SALESFORCE,
-                    name=record['Name'],
-                    amount=record.get('Amount', 0.0),
-                    currency=record.get('CurrencyIsoCode', 'USD'),
-                    stage=record.get('StageName', 'Prospecting'),
-                    probability=record.get('Probability', 0.0),
-                    close_date=datetime.fromisoformat(record['CloseDate']) if record.get('CloseDate') else None,
-                    contact_id=record.get('ContactId'),
-                    company_id=record.get('AccountId'),
-                    created_at=datetime.fromisoformat(record['CreatedDate'].replace('Z', '+00:00')),
-                    updated_at=datetime.fromisoformat(record['LastModifiedDate'].replace('Z', '+00:00'))
-                )
-                opportunities.append(opportunity)
-            
-            return opportunities
+            return [self._opportunity(record) for record in data.get('records', [])]
             
         except Exception as e:
             logger.error(f"Failed to get Salesforce opportunities: {e}")
-            return []
+            raise
+    
+    def _opportunity(self, record: Dict[str, Any]) -> CRMOpportunity:
+        return CRMOpportunity(
+            id=record['Id'],
+            platform=CRMPlatform.SALESFORCE,
+            name=record['Name'],
+            amount=record.get('Amount', 0.0),
+            currency=record.get('CurrencyIsoCode', 'USD'),
+            stage=record.get('StageName', 'Prospecting'),
+            probability=record.get('Probability', 0.0),
+            close_date=datetime.fromisoformat(record['CloseDate']) if record.get('CloseDate') else None,
+            contact_id=record.get('ContactId'),
+            company_id=record.get('AccountId'),
+            created_at=datetime.fromisoformat(record['CreatedDate'].replace('Z', '+00:00')),
+            updated_at=datetime.fromisoformat(record['LastModifiedDate'].replace('Z', '+00:00'))
+        )
+    
+    @staticmethod
+    def _soql_datetime(value: str) -> str:
+        """LastModifiedDate as a SOQL literal (whole seconds, UTC)"""
+        return datetime.strptime(value[:19], '%Y-%m-%dT%H:%M:%S').strftime('%Y-%m-%dT%H:%M:%SZ')
+    
+    async def _query_pages(self, soql: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Run a SOQL query, following nextRecordsUrl through the whole result set"""
+        headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Sforce-Query-Options': f'batchSize={self.query_batch_size}'
+        }
+        url = f"{self.instance_url}/services/data/v{self.api_version}/query"
+        response = await self.session.get(url, headers=headers, params={'q': soql})
+        while True:
+            response.raise_for_status()
+            data = response.json()
+            yield data.get('records', [])
+            if data.get('done', True) or not data.get('nextRecordsUrl'):
+                return
+            response = await self.session.get(f"{self.instance_url}{data['nextRecordsUrl']}", headers=headers)
+    
+    async def _changed_records(self, sobject: str, fields: str, cursor: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Records modified at or after the cursor, oldest first
+        
+        Inclusive, so records sharing the cursor's second that committed
+        after the last sync are not lost; re-merging the others is a no-op.
+        """
+        if not self.access_token:
+            await self.authenticate()
+        
+        where = f" WHERE LastModifiedDate >= {self._soql_datetime(cursor)}" if cursor else ""
+        soql = f"SELECT {fields} FROM {sobject}{where} ORDER BY LastModifiedDate ASC"
+        async for records in self._query_pages(soql):
+            yield SyncPage(
+                records=[(record['Id'], record) for record in records],
+                cursor=records[-1]['LastModifiedDate'] if records else None
+            )
+    
+    async def sync_entity(self, entity: str) -> Dict[str, Any]:
+        """Merge contacts or opportunities changed since the last sync"""
+        sobject, fields = self.SOBJECTS[entity]
+        return await run_delta_sync(
+            self.state_store, self.session, self.platform.value, entity,
+            lambda cursor: self._changed_records(sobject, fields, cursor)
+        )
     
     async def sync_data(self) -> Dict[str, Any]:
-        """Sync data with Salesforce"""
+        """Sync records changed since the last sync with Salesforce"""
         try:
-            contacts = await self.get_contacts(limit=1000)
-            opportunities = await self.get_opportunities(limit=1000)
+            contacts = await self.sync_entity('contacts')
+            opportunities = await self.sync_entity('opportunities')
             
             self.last_sync = datetime.utcnow()
             
             return {
                 'platform': CRMPlatform.SALESFORCE.value,
-                'contacts_synced': len(contacts),
-                'opportunities_synced': len(opportunities),
+                'contacts_synced': contacts['records_changed'],
+                'opportunities_synced': opportunities['records_changed'],
+                'delta': {'contacts': contacts, 'opportunities': opportunities},
                 'sync_timestamp': self.last_sync.isoformat(),
                 'status': 'success'
             }
@@ -308,10 +379,16 @@ class SalesforceIntegration(CRMIntegrationBase):
 class HubSpotIntegration(CRMIntegrationBase):
     """HubSpot CRM integration"""
     
+    CONTACT_PROPERTIES = ['firstname', 'lastname', 'email', 'phone', 'company', 'title', 'createdate',
+                          'lastmodifieddate']
+    SEARCH_PAGE_SIZE = 100  # search API maximum
+    SEARCH_RESULT_LIMIT = 10000  # search API stops paging past this many results
+    SYNCED_ENTITIES = ('contacts',)
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(CRMPlatform.HUBSPOT, config)
         self.api_key = config['api_key']
-        self.base_url = "https://api.hubapi.com"
+        self.base_url = config.get('base_url', "https://api.hubapi.com")
     
     async def authenticate(self) -> bool:
         """Authenticate with HubSpot (API key based)"""
@@ -319,7 +396,7 @@ class HubSpotIntegration(CRMIntegrationBase):
             url = f"{self.base_url}/crm/v3/objects/contacts"
             headers = {'Authorization': f'Bearer {self.api_key}'}
             
-            response = self.session.get(url, headers=headers, params={'limit': 1})
+            response = await self.session.get(url, headers=headers, params={'limit': 1})
             response.raise_for_status()
             
             logger.info("HubSpot authentication successful")
@@ -337,36 +414,33 @@ class HubSpotIntegration(CRMIntegrationBase):
             params = {
                 'limit': limit,
                 'after': offset,
-                'properties': 'firstname,lastname,email,phone,company,title,createdate,lastmodifieddate'
+                'properties': ','.join(self.CONTACT_PROPERTIES)
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
-            contacts = []
-            
-            for record in data.get('results', []):
-                properties = record.get('properties', {})
-                contact = CRMContact(
-                    id=record['id'],
-                    platform=CRMPlatform.HUBSPOT,
-                    first_name=properties.get('firstname', ''),
-                    last_name=properties.get('lastname', ''),
-                    email=properties.get('email', ''),
-                    phone=properties.get('phone'),
-                    title=properties.get('title'),
-                    company=properties.get('company'),
-                    created_at=datetime.fromtimestamp(int(properties.get('createdate', 0)) / 1000),
-                    updated_at=datetime.fromtimestamp(int(properties.get('lastmodifieddate', 0)) / 1000)
-                )
-                contacts.append(contact)
-            
-            return contacts
+            return [self._contact(record) for record in data.get('results', [])]
             
         except Exception as e:
             logger.error(f"Failed to get HubSpot contacts: {e}")
-            return []
+            raise
+    
+    def _contact(self, record: Dict[str, Any]) -> CRMContact:
+        properties = record.get('properties', {})
+        return CRMContact(
+            id=record['id'],
+            platform=CRMPlatform.HUBSPOT,
+            first_name=properties.get('firstname', ''),
+            last_name=properties.get('lastname', ''),
+            email=properties.get('email', ''),
+            phone=properties.get('phone'),
+            title=properties.get('title'),
+            company=properties.get('company'),
+            created_at=datetime.fromtimestamp(int(self._epoch_ms(properties.get('createdate') or '0')) / 1000),
+            updated_at=datetime.fromtimestamp(int(self._epoch_ms(properties.get('lastmodifieddate') or '0')) / 1000)
+        )
     
     async def create_contact(self, contact: CRMContact) -> bool:
         """Create contact in HubSpot"""
@@ -388,7 +462,7 @@ class HubSpotIntegration(CRMIntegrationBase):
                 }
             }
             
-            response = self.session.post(url, headers=headers, json=data)
+            response = await self.session.post(url, headers=headers, json=data)
             response.raise_for_status()
             
             logger.info(f"Created HubSpot contact: {contact.email}")
@@ -398,16 +472,68 @@ class HubSpotIntegration(CRMIntegrationBase):
             logger.error(f"Failed to create HubSpot contact: {e}")
             return False
     
+    @staticmethod
+    def _epoch_ms(value: str) -> str:
+        """lastmodifieddate (epoch ms or ISO 8601) as epoch milliseconds"""
+        if value.isdigit():
+            return value
+        return str(int(datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp() * 1000))
+    
+    async def _changed_contacts(self, cursor: Optional[str]) -> AsyncIterator[SyncPage]:
+        """Contacts modified at or after the cursor (inclusive, see Salesforce), oldest first, via the search API"""
+        url = f"{self.base_url}/crm/v3/objects/contacts/search"
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        after = None
+        while True:
+            body: Dict[str, Any] = {
+                'sorts': [{'propertyName': 'lastmodifieddate', 'direction': 'ASCENDING'}],
+                'properties': self.CONTACT_PROPERTIES,
+                'limit': self.SEARCH_PAGE_SIZE
+            }
+            if cursor:
+                body['filterGroups'] = [{'filters': [
+                    {'propertyName': 'lastmodifieddate', 'operator': 'GTE', 'value': cursor}
+                ]}]
+            if after:
+                body['after'] = after
+            
+            response = await self.session.post(url, headers=headers, json=body)
+            response.raise_for_status()
+            data = response.json()
+            
+            results = data.get('results', [])
+            page_cursor = self._epoch_ms(results[-1]['properties']['lastmodifieddate']) if results else None
+            yield SyncPage(records=[(record['id'], record) for record in results], cursor=page_cursor)
+            
+            after = data.get('paging', {}).get('next', {}).get('after')
+            if not after:
+                return
+            if int(after) >= self.SEARCH_RESULT_LIMIT:
+                # Start a new search past the last record seen
+                cursor, after = page_cursor, None
+    
+    async def sync_entity(self, entity: str) -> Dict[str, Any]:
+        """Merge contacts changed since the last sync"""
+        if entity != 'contacts':
+            raise NotImplementedError(f"HubSpot {entity} are not synced")
+        return await run_delta_sync(
+            self.state_store, self.session, self.platform.value, 'contacts', self._changed_contacts
+        )
+    
     async def sync_data(self) -> Dict[str, Any]:
-        """Sync data with HubSpot"""
+        """Sync contacts changed since the last sync with HubSpot"""
         try:
-            contacts = await self.get_contacts(limit=1000)
+            contacts = await self.sync_entity('contacts')
             
             self.last_sync = datetime.utcnow()
             
             return {
                 'platform': CRMPlatform.HUBSPOT.value,
-                'contacts_synced': len(contacts),
+                'contacts_synced': contacts['records_changed'],
+                'delta': {'contacts': contacts},
                 'sync_timestamp': self.last_sync.isoformat(),
                 'status': 'success'
             }
@@ -430,6 +556,8 @@ class UnifiedCRMIntegration:
         self.integrations: Dict[CRMPlatform, CRMIntegrationBase] = {}
         self.sync_status: Dict[str, Any] = {}
         self.last_full_sync = None
+        self.scheduler = SyncScheduler()
+        self.cache = get_business_data_cache()
     
     def add_integration(self, platform: CRMPlatform, config: Dict[str, Any]):
         """Add CRM integration"""
@@ -441,6 +569,8 @@ class UnifiedCRMIntegration:
             raise ValueError(f"Unsupported CRM platform: {platform}")
         
         self.integrations[platform] = integration
+        if 'sync_deadline' in config:
+            self.scheduler.deadlines[platform.value] = config['sync_deadline']
         logger.info(f"Added {platform.value} integration")
     
     async def authenticate_all(self) -> Dict[str, bool]:
@@ -456,46 +586,31 @@ class UnifiedCRMIntegration:
         
         return results
     
-    async def get_all_contacts(self) -> List[CRMContact]:
-        """Get contacts from all CRM platforms"""
-        all_contacts = []
-        
-        for platform, integration in self.integrations.items():
-            try:
-                contacts = await integration.get_contacts()
-                all_contacts.extend(contacts)
-            except Exception as e:
-                logger.error(f"Failed to get contacts from {platform.value}: {e}")
-        
-        return all_contacts
+    async def get_all_contacts(self, **filters: Any) -> List[CRMContact]:
+        """Get contacts from all CRM platforms, served from the local cache
+
+        The cache refreshes each platform from its delta-synced contacts.
+        """
+        return await self.cache.read(CONTACT_CACHE, {
+            platform.value: integration.synced_contacts for platform, integration in self.integrations.items()
+            if 'contacts' in integration.SYNCED_ENTITIES
+        }, snapshot=True, **filters)
     
-    async def get_all_opportunities(self) -> List[CRMOpportunity]:
-        """Get opportunities from all CRM platforms"""
-        all_opportunities = []
-        
-        for platform, integration in self.integrations.items():
-            try:
-                opportunities = await integration.get_opportunities()
-                all_opportunities.extend(opportunities)
-            except Exception as e:
-                logger.error(f"Failed to get opportunities from {platform.value}: {e}")
-        
-        return all_opportunities
+    async def get_all_opportunities(self, **filters: Any) -> List[CRMOpportunity]:
+        """Get opportunities from all CRM platforms, served from the local cache
+
+        The cache refreshes each platform from its delta-synced opportunities.
+        """
+        return await self.cache.read(OPPORTUNITY_CACHE, {
+            platform.value: integration.synced_opportunities for platform, integration in self.integrations.items()
+            if 'opportunities' in integration.SYNCED_ENTITIES
+        }, snapshot=True, **filters)
     
     async def sync_all_platforms(self) -> Dict[str, Any]:
-        """Sync all CRM platforms"""
-        sync_results = {}
-        
-        for platform, integration in self.integrations.items():
-            try:
-                result = await integration.sync_data()
-                sync_results[platform.value] = result
-            except Exception as e:
-                logger.error(f"Sync failed for {platform.value}: {e}")
-                sync_results[platform.value] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        """Sync all CRM platforms concurrently, each under its platform deadline"""
+        sync_results = await self.scheduler.run({
+            platform.value: integration.sync_data for platform, integration in self.integrations.items()
+        })
         
         self.last_full_sync = datetime.utcnow()
         self.sync_status = sync_results
@@ -504,6 +619,7 @@ class UnifiedCRMIntegration:
             'sync_results': sync_results,
             'total_platforms': len(self.integrations),
             'successful_syncs': len([r for r in sync_results.values() if r.get('status') == 'success']),
+            'sync_duration': self.scheduler.last_run['duration'],
             'sync_timestamp': self.last_full_sync.isoformat()
         }
     
@@ -512,9 +628,18 @@ class UnifiedCRMIntegration:
         return {
             'last_full_sync': self.last_full_sync.isoformat() if self.last_full_sync else None,
             'active_integrations': list(self.integrations.keys()),
-            'sync_status': self.sync_status
+            'sync_status': self.sync_status,
+            'sync_timings': self.scheduler.get_stats(),
+            'http': {platform.value: integration.session.get_stats()
+                     for platform, integration in self.integrations.items()},
+            'cache': self.cache.staleness([CONTACT_CACHE, OPPORTUNITY_CACHE])
         }
     
+    async def close(self) -> None:
+        """Close platform HTTP sessions"""
+        for integration in self.integrations.values():
+            await integration.session.close()
+    
     async def create_contact_unified(self, contact: CRMContact) -> Dict[str, bool]:
         """Create contact in all CRM platforms"""
         results = {}
@@ -21,8 +21,16 @@ from datetime import datetime
 import base64
 import io
 import csv
+import re
+import shutil
+import sqlite3
+import uuid
 import xml.etree.ElementTree as ET
-from typing import Optional, Dict, Any, List, Union
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any, List, Union, Tuple, Iterator, Iterable, AsyncIterator, Deque
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # System packages with fallbacks
 try:
@@ -45,6 +53,9 @@ except ImportError:
 
 import numpy as np
 
+from service_client import get_service_client
+from async_http import AsyncHTTPServer, HTTPRequest, Router
+
 # Configure production logging
 logging.basicConfig(
     level=logging.INFO,
@@ -77,12 +88,39 @@ DB_NAME = 'sovren_main'
 DB_USER = config.get('DB_USER', 'sovren')
 DB_PASS = config.get('DB_PASS', 'Renegades1!')
 
+# HTTP serving ('asyncio' or the legacy 'threaded' server)
+HTTP_SERVER_MODE = config.get('HTTP_SERVER_MODE', 'asyncio')
+HTTP_MAX_CONCURRENCY = int(config.get('HTTP_MAX_CONCURRENCY', '256'))  # requests running handlers at once
+HTTP_DRAIN_TIMEOUT = float(config.get('HTTP_DRAIN_TIMEOUT', '30'))  # seconds to finish in-flight requests on shutdown
+
 # Processing configuration
 UPLOAD_PATH = '/mnt/yellow-mackerel-volume/sovren/uploads/'
 PROCESSED_PATH = '/mnt/yellow-mackerel-volume/sovren/processed/'
 MAX_FILE_SIZE = 500 * 1024 * 1024  # 500MB
 BATCH_SIZE = 1000  # Records per batch
 
+# Streaming ingestion: files are read in windows and indexed in micro-batches, so a
+# job holds roughly (INGEST_MAX_INFLIGHT + INGEST_PROCESS_WORKERS) windows of text at a time
+INGEST_WINDOW_BYTES = int(config.get('INGEST_WINDOW_BYTES', str(4 * 1024 * 1024)))
+INGEST_MAX_INFLIGHT = int(config.get('INGEST_MAX_INFLIGHT', '2'))  # micro-batches being indexed per job
+
+# CPU-bound extraction and parsing run in a process pool
+INGEST_PROCESS_WORKERS = int(config.get('INGEST_PROCESS_WORKERS', str(os.cpu_count() or 1)))
+CPU_OFFLOAD_MIN_BYTES = 64 * 1024  # smaller payloads are parsed inline
+
+# Durable job queue (SQLite WAL)
+JOB_QUEUE_PATH = config.get('INGEST_QUEUE_PATH', '/mnt/yellow-mackerel-volume/sovren/queue/ingestion.db')
+JOB_QUEUE_MAX_DEPTH = int(config.get('INGEST_QUEUE_MAX_DEPTH', '10000'))  # queued + running jobs
+JOB_QUEUE_MAX_PER_TENANT = int(config.get('INGEST_QUEUE_MAX_PER_TENANT', '1000'))
+JOB_MAX_ATTEMPTS = int(config.get('INGEST_JOB_MAX_ATTEMPTS', '3'))  # then dead-lettered
+JOB_RETRY_BACKOFF = float(config.get('INGEST_JOB_RETRY_BACKOFF', '5'))  # seconds, doubled per attempt
+JOB_RETENTION = int(config.get('INGEST_JOB_RETENTION', '86400'))  # seconds finished records are kept
+JOB_EVICT_INTERVAL = 300  # seconds between evictions of finished records
+JOB_PRIORITIES = {'interactive': 0, 'bulk': 1}  # lower runs first
+DEFAULT_JOB_PRIORITY = {'file': 'interactive', 'stream': 'interactive', 'batch': 'bulk'}
+READ_BLOCK_SIZE = 1024 * 1024
+JSON_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
 # Service endpoints
 RAG_SERVICE = {'host': 'localhost', 'port': 8006}
 INTELLIGENCE_SERVICE = {'host': 'localhost', 'port': 8001}
@@ -120,6 +158,17 @@ class DocumentExtractor:
             'doc': self._extract_word,
             'docx': self._extract_word
         }
+        self.streamers = {
+            'text': self._stream_text,
+            'csv': self._stream_csv,
+            'json': self._stream_json,
+            'xml': self._stream_xml,
+            'pdf': self._stream_pdf,
+            'xls': self._stream_excel,
+            'xlsx': self._stream_excel,
+            'doc': self._stream_word,
+            'docx': self._stream_word
+        }
     
     async def extract(self, file_path: str, file_type: str) -> Dict[str, Any]:
         """Extract content from file"""
@@ -132,6 +181,240 @@ class DocumentExtractor:
             logger.error(f"Extraction error for {file_type}: {e}")
             raise
     
+    def stream(self, file_path: str, file_type: str, window_bytes: Optional[int] = None) -> Iterator[str]:
+        """Yield the file's text in segments of at most window_bytes characters
+        
+        Unlike extract(), memory use is bounded by the window rather than the
+        file size (except for a single JSON value larger than the window).
+        """
+        if file_type not in self.streamers:
+            raise ValueError(f"Unsupported file type: {file_type}")
+        return self.streamers[file_type](file_path, window_bytes or INGEST_WINDOW_BYTES)
+    
+    def supports_line_ranges(self, file_path: str, file_type: str) -> bool:
+        """Whether every record is one line, so the file can be split at newlines"""
+        if file_type == 'text':
+            return True
+        if file_type not in ('csv', 'json'):
+            return False
+        
+        with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+            sample = f.read(READ_BLOCK_SIZE)
+        if file_type == 'csv':
+            # Quoted fields with embedded newlines would be cut at range edges;
+            # the sample's last line may be truncated, so it is left out
+            complete = sample.rsplit('\n', 1)[0]
+            return not any('\n' in field for row in csv.reader(io.StringIO(complete)) for field in row)
+        
+        # JSON lines: the first line is a complete value on its own
+        try:
+            json.loads(sample.lstrip().split('\n', 1)[0])
+            return True
+        except ValueError:
+            return False
+    
+    def extract_range(self, file_path: str, file_type: str, start: int, end: int, window_bytes: int) -> List[str]:
+        """Segments for the lines that start within bytes [start, end)
+        
+        Text and CSV lines longer than window_bytes are cut at range edges,
+        so a range never reads more than its length plus one window. JSON
+        lines can't be cut (the one exception, as in stream()).
+        """
+        # Both sides of an edge look for the line end in the same span, so they agree on the cut
+        limit = None if file_type == 'json' else window_bytes
+        columns: List[str] = []
+        with open(file_path, 'rb') as f:
+            if file_type == 'csv':
+                header_line = f.readline(window_bytes)
+                columns = next(csv.reader([header_line.decode('utf-8', errors='ignore')]), [])
+                start = max(start, len(header_line))
+            begin = start
+            if start > 0:
+                # A line already in progress at start belongs to the previous range
+                f.seek(start - 1)
+                if f.read(1) != b'\n':
+                    begin = self._line_end(f, start, limit)
+            if begin >= end:
+                return []
+            f.seek(begin)
+            block = f.read(end - begin)
+            if block and not block.endswith(b'\n'):
+                stop = self._line_end(f, end, limit)
+                f.seek(end)
+                block += f.read(stop - end)
+        
+        text = block.decode('utf-8', errors='ignore')
+        if file_type == 'csv':
+            return list(self._csv_segments(csv.reader(io.StringIO(text, newline='')), columns, window_bytes))
+        if file_type == 'json':
+            return list(self._json_segments((json.loads(line) for line in text.splitlines() if line.strip()),
+                                            window_bytes))
+        return list(self._segments(self._read_blocks(io.StringIO(text), window_bytes), window_bytes))
+    
+    @staticmethod
+    def _line_end(f: Any, position: int, limit: Optional[int]) -> int:
+        """Offset just past the newline ending the line at position; position itself
+        when no newline follows within limit bytes (the line is cut there)"""
+        f.seek(position)
+        if limit is None:
+            f.readline()
+            return f.tell()
+        newline = f.read(limit).find(b'\n')
+        return position + newline + 1 if newline >= 0 else position
+    
+    @staticmethod
+    def _segments(pieces: Iterable[str], window_bytes: int, header: str = '') -> Iterator[str]:
+        """Group pieces into segments of at most window_bytes, each starting with header"""
+        budget = max(window_bytes - len(header), 1)
+        buffer: List[str] = []
+        size = 0
+        for piece in pieces:
+            while len(piece) > budget:
+                # Oversized piece: flush and slice it
+                if buffer:
+                    yield header + ''.join(buffer)
+                    buffer, size = [], 0
+                yield header + piece[:budget]
+                piece = piece[budget:]
+            if size + len(piece) > budget and buffer:
+                yield header + ''.join(buffer)
+                buffer, size = [], 0
+            buffer.append(piece)
+            size += len(piece)
+        if buffer:
+            yield header + ''.join(buffer)
+    
+    @staticmethod
+    def _read_blocks(stream: Any, max_line: int) -> Iterator[str]:
+        """Read a text stream in blocks that end on a line boundary
+        
+        A line longer than max_line is cut, so newline-free input is never
+        held whole.
+        """
+        carry = ''
+        while True:
+            block = stream.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            block = carry + block
+            cut = block.rfind('\n') + 1
+            if not cut and len(block) >= max_line:
+                cut = len(block)
+            carry = block[cut:]
+            if cut:
+                yield block[:cut]
+        if carry:
+            yield carry
+    
+    def _stream_text(self, file_path: str, window_bytes: int) -> Iterator[str]:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            yield from self._segments(self._read_blocks(f, window_bytes), window_bytes)
+    
+    def _stream_csv(self, file_path: str, window_bytes: int) -> Iterator[str]:
+        with open(file_path, 'r', encoding='utf-8', errors='ignore', newline='') as f:
+            reader = csv.reader(f)
+            columns = next(reader, None)
+            if columns is None:
+                return
+            yield from self._csv_segments(reader, columns, window_bytes)
+    
+    def _csv_segments(self, rows: Iterable[List[str]], columns: List[str], window_bytes: int) -> Iterator[str]:
+        """Rows as comma-joined lines; every segment repeats the column header"""
+        header = f"Columns: {', '.join(columns)}\n"
+        return self._segments((', '.join(row) + '\n' for row in rows), window_bytes, header)
+    
+    def _stream_json(self, file_path: str, window_bytes: int) -> Iterator[str]:
+        """Elements of a top-level array, or successive values (JSON lines)"""
+        yield from self._json_segments(self._iter_json_values(file_path), window_bytes)
+    
+    def _json_segments(self, values: Iterable[Any], window_bytes: int) -> Iterator[str]:
+        return self._segments((json.dumps(value, ensure_ascii=False) + '\n' for value in values), window_bytes)
+    
+    @staticmethod
+    def _iter_json_values(file_path: str) -> Iterator[Any]:
+        decoder = json.JSONDecoder()
+        with open(file_path, 'r', encoding='utf-8') as f:
+            buffer = ''
+            pos = 0
+            eof = False
+            in_array: Optional[bool] = None
+            while True:
+                pos = JSON_WHITESPACE.match(buffer, pos).end()
+                if in_array is None and pos < len(buffer):
+                    in_array = buffer[pos] == '['
+                    if in_array:
+                        pos += 1
+                        continue
+                if in_array and buffer.startswith(',', pos):
+                    pos += 1
+                    continue
+                if in_array and buffer.startswith(']', pos):
+                    return
+                
+                complete = False
+                if pos < len(buffer):
+                    try:
+                        value, end = decoder.raw_decode(buffer, pos)
+                        # A value ending exactly at the buffer edge may be truncated (e.g. a number)
+                        complete = end < len(buffer) or eof
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                
+                if complete:
+                    yield value
+                    pos = end
+                elif eof:
+                    return
+                else:
+                    block = f.read(READ_BLOCK_SIZE)
+                    eof = not block
+                    buffer = buffer[pos:] + block
+                    pos = 0
+    
+    def _stream_xml(self, file_path: str, window_bytes: int) -> Iterator[str]:
+        def texts():
+            for _, elem in ET.iterparse(file_path, events=('end',)):
+                if elem.text and elem.text.strip():
+                    yield elem.text.strip() + '\n'
+                elem.clear()
+        yield from self._segments(texts(), window_bytes)
+    
+    def _stream_command(self, command: List[str], window_bytes: int) -> Iterator[str]:
+        """Stream a converter's stdout; yields nothing if the tool is unavailable or fails"""
+        try:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                       text=True, errors='ignore')
+        except OSError:
+            return
+        try:
+            yield from self._segments(self._read_blocks(process.stdout, window_bytes), window_bytes)
+        finally:
+            process.stdout.close()
+            if process.wait() != 0:
+                logger.warning(f"{command[0]} exited with {process.returncode}")
+    
+    def _stream_pdf(self, file_path: str, window_bytes: int) -> Iterator[str]:
+        produced = False
+        for segment in self._stream_command(['pdftotext', '-layout', file_path, '-'], window_bytes):
+            produced = True
+            yield segment
+        if not produced:
+            yield f'PDF document: {os.path.basename(file_path)}'
+    
+    def _stream_word(self, file_path: str, window_bytes: int) -> Iterator[str]:
+        produced = False
+        if file_path.endswith('.doc'):
+            for segment in self._stream_command(['antiword', file_path], window_bytes):
+                produced = True
+                yield segment
+        if not produced:
+            yield f'Word document: {os.path.basename(file_path)}'
+    
+    def _stream_excel(self, file_path: str, window_bytes: int) -> Iterator[str]:
+        """Excel is summarised per sheet, which is already bounded"""
+        yield from self._segments([self._excel_summary(file_path)['content']], window_bytes)
+    
     async def _extract_text(self, file_path: str) -> Dict[str, Any]:
         """Extract from text file"""
         with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
@@ -267,6 +550,10 @@ class DocumentExtractor:
     
     async def _extract_excel(self, file_path: str) -> Dict[str, Any]:
         """Extract from Excel file"""
+        return self._excel_summary(file_path)
+    
+    def _excel_summary(self, file_path: str) -> Dict[str, Any]:
+        """Per-sheet shape, columns and sample rows"""
         try:
             if pd is None:
                 return {
@@ -336,34 +623,412 @@ class DocumentExtractor:
             'metadata': {'error': 'Word extraction tools not available'}
         }
 
+# Process pool tasks: module-level so they pickle; each returns (result, CPU seconds)
+
+def extract_segments_task(file_path: str, file_type: str, window_bytes: int) -> Tuple[List[str], float]:
+    """Extract a whole (small) file"""
+    started = time.process_time()
+    segments = list(DocumentExtractor().stream(file_path, file_type, window_bytes))
+    return segments, time.process_time() - started
+
+def extract_range_task(file_path: str, file_type: str, start: int, end: int,
+                       window_bytes: int) -> Tuple[List[str], float]:
+    """Extract one byte range of a line-oriented file"""
+    started = time.process_time()
+    segments = DocumentExtractor().extract_range(file_path, file_type, start, end, window_bytes)
+    return segments, time.process_time() - started
+
+def spool_segments_task(file_path: str, file_type: str, window_bytes: int,
+                        spool_dir: str) -> Tuple[List[str], float]:
+    """Stream a file that can't be split into spooled segment files"""
+    started = time.process_time()
+    os.makedirs(spool_dir, exist_ok=True)
+    paths = []
+    for i, segment in enumerate(DocumentExtractor().stream(file_path, file_type, window_bytes)):
+        path = os.path.join(spool_dir, f"part_{i:06d}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(segment)
+        paths.append(path)
+    return paths, time.process_time() - started
+
+def parse_json_lines_task(stream_data: str) -> Tuple[int, float]:
+    """Count the valid JSON records in a JSON lines payload"""
+    started = time.process_time()
+    records = 0
+    for line in stream_data.split('\n'):
+        if line.strip():
+            try:
+                json.loads(line)
+                records += 1
+            except ValueError:
+                pass
+    return records, time.process_time() - started
+
+class QueueFullError(Exception):
+    """Job queue is at capacity; retry after the given number of seconds"""
+    
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class JobQueue:
+    """Durable job queue on SQLite (WAL)
+    
+    Jobs are claimed by priority class, then round-robin across tenants,
+    then in submission order. Failed jobs are retried with exponential
+    backoff and dead-lettered after max_attempts, or at once when the
+    failure is permanent. A running job can checkpoint its payload so a
+    retry resumes where it stopped. Jobs still marked
+    running when the queue is reopened are requeued, or dead-lettered if
+    that was their last attempt. Finished records are
+    evicted after the retention period. Without a path, the queue lives in
+    an in-memory database.
+    """
+    
+    def __init__(self, path: Optional[str] = None, max_depth: int = JOB_QUEUE_MAX_DEPTH,
+                 max_per_tenant: int = JOB_QUEUE_MAX_PER_TENANT, max_attempts: int = JOB_MAX_ATTEMPTS,
+                 retry_backoff: float = JOB_RETRY_BACKOFF, retention: float = JOB_RETENTION):
+        self.path = path or ':memory:'
+        self.max_depth = max_depth
+        self.max_per_tenant = max_per_tenant
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retention = retention
+        
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT UNIQUE NOT NULL,
+                    tenant TEXT NOT NULL,
+                    job_type TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    state TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    enqueued_at REAL NOT NULL,
+                    available_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    error TEXT
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(state, priority, tenant, seq)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs(state, finished_at)")
+            # A job that keeps killing its worker (crash, OOM) must not come back forever
+            now = time.time()
+            exhausted = self.conn.execute(
+                "UPDATE jobs SET state = 'dead', finished_at = ?, error = ? "
+                "WHERE state = 'running' AND attempts >= ?",
+                (now, f"Interrupted by a restart on each of {max_attempts} attempts", max_attempts)
+            ).rowcount
+            recovered = self.conn.execute(
+                "UPDATE jobs SET state = 'queued', available_at = ? WHERE state = 'running'", (now,)
+            ).rowcount
+        if recovered:
+            logger.warning(f"Requeued {recovered} jobs interrupted by a restart")
+        if exhausted:
+            logger.error(f"Dead-lettered {exhausted} jobs interrupted by a restart after {max_attempts} attempts")
+        
+        self.tenant_last_served: Dict[str, float] = {}
+        # Recent latencies (seconds) and completion times for metrics and Retry-After
+        self.queue_waits: Deque[float] = deque(maxlen=1024)
+        self.run_times: Deque[float] = deque(maxlen=1024)
+        self.completions: Deque[float] = deque(maxlen=4096)
+        self.counters = {'enqueued': 0, 'completed': 0, 'retried': 0, 'dead_lettered': exhausted, 'rejected': 0}
+    
+    def _count(self, sql: str, *params: Any) -> int:
+        return self.conn.execute(sql, params).fetchone()[0]
+    
+    def retry_after(self, depth: int) -> int:
+        """Seconds until the backlog should have drained, from recent throughput"""
+        now = time.time()
+        recent = sum(1 for finished in self.completions if now - finished <= 60)
+        rate = recent / 60.0
+        return int(min(max(depth / rate if rate else 30, 1), 300))
+    
+    def check_capacity(self, tenant: str) -> None:
+        """Raise QueueFullError when the queue or the tenant's share is full"""
+        with self.lock:
+            depth = self._count("SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'running')")
+            tenant_depth = self._count(
+                "SELECT COUNT(*) FROM jobs WHERE state IN ('queued', 'running') AND tenant = ?", tenant
+            )
+        if depth >= self.max_depth or tenant_depth >= self.max_per_tenant:
+            self.counters['rejected'] += 1
+            scope = 'Queue' if depth >= self.max_depth else f"Queue share for {tenant}"
+            raise QueueFullError(f"{scope} is full", self.retry_after(depth))
+    
+    def put(self, job: Dict[str, Any], priority: int) -> None:
+        self.check_capacity(job['user_id'])
+        with self.lock:
+            self.conn.execute(
+                """INSERT INTO jobs (job_id, tenant, job_type, priority, state, payload, enqueued_at, available_at)
+                   VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)""",
+                (job['job_id'], job['user_id'], job['type'], priority, json.dumps(job),
+                 job['enqueued_at'], job['enqueued_at'])
+            )
+        self.counters['enqueued'] += 1
+    
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the next runnable job running and return it"""
+        now = time.time()
+        with self.lock:
+            # Never hand out a job that has used up its attempts
+            exhausted = self.conn.execute(
+                "UPDATE jobs SET state = 'dead', finished_at = ?, error = COALESCE(error, ?) "
+                "WHERE state = 'queued' AND attempts >= ?",
+                (now, f"Gave up after {self.max_attempts} attempts", self.max_attempts)
+            ).rowcount
+            self.counters['dead_lettered'] += exhausted
+            row = self.conn.execute(
+                "SELECT MIN(priority) FROM jobs WHERE state = 'queued' AND available_at <= ?", (now,)
+            ).fetchone()
+            if row[0] is None:
+                return None
+            candidates = self.conn.execute(
+                """SELECT tenant, MIN(seq) FROM jobs
+                   WHERE state = 'queued' AND available_at <= ? AND priority = ?
+                   GROUP BY tenant""",
+                (now, row[0])
+            ).fetchall()
+            # Round-robin: the tenant served longest ago goes first
+            tenant, seq = min(candidates, key=lambda c: (self.tenant_last_served.get(c[0], 0.0), c[1]))
+            self.tenant_last_served[tenant] = now
+            self.conn.execute(
+                "UPDATE jobs SET state = 'running', started_at = ?, attempts = attempts + 1 WHERE seq = ?",
+                (now, seq)
+            )
+            payload, attempts, enqueued_at = self.conn.execute(
+                "SELECT payload, attempts, enqueued_at FROM jobs WHERE seq = ?", (seq,)
+            ).fetchone()
+        
+        job = json.loads(payload)
+        job['attempts'] = attempts
+        self.queue_waits.append(now - enqueued_at)
+        return job
+    
+    def next_available(self) -> Optional[float]:
+        """When the earliest delayed (retrying) job becomes runnable"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE state = 'queued'"
+            ).fetchone()[0]
+    
+    def complete(self, job: Dict[str, Any]) -> None:
+        now = time.time()
+        with self.lock:
+            started_at = self.conn.execute(
+                "SELECT started_at FROM jobs WHERE job_id = ?", (job['job_id'],)
+            ).fetchone()[0]
+            self.conn.execute(
+                "UPDATE jobs SET state = 'completed', finished_at = ?, payload = ? WHERE job_id = ?",
+                (now, json.dumps(job), job['job_id'])
+            )
+        self.run_times.append(now - started_at)
+        self.completions.append(now)
+        self.counters['completed'] += 1
+    
+    def checkpoint(self, job: Dict[str, Any]) -> None:
+        """Persist a running job's payload, so a retry or a restart resumes from it"""
+        with self.lock:
+            self.conn.execute("UPDATE jobs SET payload = ? WHERE job_id = ?", (json.dumps(job), job['job_id']))
+    
+    def fail(self, job: Dict[str, Any], error: str, permanent: bool = False) -> bool:
+        """Record a failure; returns True if the job will be retried
+        
+        Permanent failures (the same input would fail again) are
+        dead-lettered without retrying.
+        """
+        now = time.time()
+        retry = not permanent and job['attempts'] < self.max_attempts
+        with self.lock:
+            if retry:
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'queued', available_at = ?, error = ?, payload = ? WHERE job_id = ?",
+                    (now + self.retry_backoff * (2 ** (job['attempts'] - 1)), error, json.dumps(job),
+                     job['job_id'])
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE jobs SET state = 'dead', finished_at = ?, error = ?, payload = ? WHERE job_id = ?",
+                    (now, error, json.dumps(job), job['job_id'])
+                )
+        self.counters['retried' if retry else 'dead_lettered'] += 1
+        return retry
+    
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, state, attempts, error FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row[0])
+        job['status'] = {'running': 'processing', 'dead': 'failed'}.get(row[1], row[1])
+        job['attempts'] = row[2]
+        if row[3]:
+            job['error'] = row[3]
+        if row[1] == 'dead':
+            job['dead_letter'] = True
+        return job
+    
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT job_id, tenant, job_type, attempts, error, finished_at FROM jobs "
+                "WHERE state = 'dead' ORDER BY finished_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(zip(('job_id', 'user_id', 'type', 'attempts', 'error', 'failed_at'), row)) for row in rows]
+    
+    def evict(self) -> int:
+        """Delete completed and dead-lettered records past the retention period
+        
+        Also forgets when tenants with nothing queued or running were last
+        served.
+        """
+        with self.lock:
+            active = {row[0] for row in self.conn.execute(
+                "SELECT DISTINCT tenant FROM jobs WHERE state IN ('queued', 'running')"
+            )}
+            for tenant in [t for t in self.tenant_last_served if t not in active]:
+                del self.tenant_last_served[tenant]
+            return self.conn.execute(
+                "DELETE FROM jobs WHERE state IN ('completed', 'dead') AND finished_at < ?",
+                (time.time() - self.retention,)
+            ).rowcount
+    
+    def get_stats(self) -> Dict[str, Any]:
+        def percentiles(values: Deque[float]) -> Dict[str, float]:
+            if not values:
+                return {'p50': 0.0, 'p99': 0.0}
+            ordered = sorted(values)
+            return {
+                'p50': round(ordered[len(ordered) // 2], 4),
+                'p99': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))], 4)
+            }
+        
+        with self.lock:
+            states = dict(self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+            depth = dict(self.conn.execute(
+                "SELECT priority, COUNT(*) FROM jobs WHERE state = 'queued' GROUP BY priority"
+            ).fetchall())
+            oldest = self.conn.execute("SELECT MIN(enqueued_at) FROM jobs WHERE state = 'queued'").fetchone()[0]
+        
+        return {
+            'depth': sum(depth.values()),
+            'depth_by_priority': {name: depth.get(level, 0) for name, level in JOB_PRIORITIES.items()},
+            'running': states.get('running', 0),
+            'dead_letters': states.get('dead', 0),
+            'retained_completed': states.get('completed', 0),
+            'max_depth': self.max_depth,
+            'oldest_queued_age': round(time.time() - oldest, 3) if oldest else 0.0,
+            'queue_wait': percentiles(self.queue_waits),
+            'run_time': percentiles(self.run_times),
+            **self.counters
+        }
+    
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
 class DataPipeline:
-    """High-throughput data processing pipeline"""
+    """High-throughput data processing pipeline
     
-    def __init__(self):
+    Async workers only coordinate I/O; extraction and parsing run in a
+    process pool sized to the machine's cores. Jobs wait in a durable
+    JobQueue; active_jobs holds only the jobs currently running.
+    """
+    
+    def __init__(self, process_workers: Optional[int] = None, queue: Optional[JobQueue] = None):
         self.extractor = DocumentExtractor()
-        self.processing_queue = asyncio.Queue()
-        self.active_jobs: Dict[str, Dict[str, Any]] = {}  # job_id -> job_status
+        self.queue = queue or JobQueue()
+        self.active_jobs: Dict[str, Dict[str, Any]] = {}  # job_id -> running job
         self.workers: List[asyncio.Task] = []
+        self.process_workers = process_workers or INGEST_PROCESS_WORKERS
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._wakeup = asyncio.Event()
     
     async def start_workers(self, num_workers: int = 4) -> None:
         """Start processing workers"""
+        self._get_executor()
         for i in range(num_workers):
             worker = asyncio.create_task(self._process_worker(i))
             self.workers.append(worker)
+        self.workers.append(asyncio.create_task(self._evict_finished()))
+        
+        logger.info(f"Started {num_workers} processing workers, {self.process_workers} extraction processes")
+    
+    async def stop(self) -> None:
+        """Stop workers and the extraction process pool
         
-        logger.info(f"Started {num_workers} processing workers")
+        Jobs interrupted here stay marked running and are requeued when the
+        queue is next opened.
+        """
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.queue.close()
+    
+    async def _evict_finished(self) -> None:
+        while True:
+            evicted = self.queue.evict()
+            if evicted:
+                logger.info(f"Evicted {evicted} finished job records")
+            await asyncio.sleep(JOB_EVICT_INTERVAL)
+    
+    async def _next_job(self) -> Dict[str, Any]:
+        """Claim the next runnable job, waiting for a submit or a retry to come due"""
+        while True:
+            self._wakeup.clear()
+            job = self.queue.claim()
+            if job is not None:
+                return job
+            next_available = self.queue.next_available()
+            timeout = 1.0 if next_available is None else min(max(next_available - time.time(), 0.01), 1.0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self.executor
+    
+    async def _run_cpu(self, job: Dict[str, Any], task: Any, *args: Any) -> Any:
+        """Run a pool task and charge its CPU time to the job"""
+        result, cpu_time = await asyncio.get_running_loop().run_in_executor(self._get_executor(), task, *args)
+        timing = job.setdefault('timing', {'queue_wait': 0.0, 'cpu_time': 0.0})
+        timing['cpu_time'] = round(timing['cpu_time'] + cpu_time, 4)
+        return result
     
     async def _process_worker(self, worker_id: int) -> None:
         """Worker to process jobs from queue"""
         while True:
+            job = await self._next_job()
+            logger.info(f"Worker {worker_id} processing job {job['job_id']} (attempt {job['attempts']})")
+            
+            # Update job status
+            job['status'] = 'processing'
+            job['worker_id'] = worker_id
+            self.active_jobs[job['job_id']] = job
+            started = time.time()
+            job['timing'] = {'queue_wait': round(started - job['enqueued_at'], 4), 'cpu_time': 0.0}
+            
             try:
-                job = await self.processing_queue.get()
-                logger.info(f"Worker {worker_id} processing job {job['job_id']}")
-                
-                # Update job status
-                job['status'] = 'processing'
-                job['worker_id'] = worker_id
-                
                 # Process based on job type
                 if job['type'] == 'file':
                     await self._process_file_job(job)
@@ -374,31 +1039,53 @@ class DataPipeline:
                 
                 job['status'] = 'completed'
                 job['completed_at'] = datetime.now().isoformat()
+                job['timing']['wall_time'] = round(time.time() - started, 4)
+                self.queue.complete(job)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Worker {worker_id} error: {e}")
-                if 'job' in locals():
+                job['error'] = str(e)
+                # Bad input (e.g. an unsupported file type) fails the same way on every attempt
+                permanent = isinstance(e, ValueError)
+                if self.queue.fail(job, str(e), permanent=permanent):
+                    job['status'] = 'queued'
+                else:
                     job['status'] = 'failed'
-                    job['error'] = str(e)
+                    logger.error(f"Job {job['job_id']} dead-lettered after {job['attempts']} attempts"
+                                 f"{' (permanent failure)' if permanent else ''}")
+            finally:
+                self.active_jobs.pop(job['job_id'], None)
     
     async def submit_job(self, job_data: Dict[str, Any]) -> str:
-        """Submit job to processing pipeline"""
+        """Submit job to processing pipeline
+        
+        Raises QueueFullError when the queue or the tenant's share of it is
+        full, and ValueError for an unknown priority class.
+        """
+        priority = job_data.get('priority') or DEFAULT_JOB_PRIORITY.get(job_data['type'], 'interactive')
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        
         job_id = hashlib.sha256(
-            f"{job_data['user_id']}:{time.time()}".encode()
+            f"{job_data['user_id']}:{time.time()}:{uuid.uuid4()}".encode()
         ).hexdigest()[:16]
         
         job = {
             'job_id': job_id,
             'user_id': job_data['user_id'],
             'type': job_data['type'],
+            'priority': priority,
             'data': job_data['data'],
             'status': 'queued',
             'created_at': datetime.now().isoformat(),
+            'enqueued_at': time.time(),
             'metadata': job_data.get('metadata', {})
         }
         
-        self.active_jobs[job_id] = job
-        await self.processing_queue.put(job)
+        self.queue.put(job, JOB_PRIORITIES[priority])
+        self._wakeup.set()
         
         # Store job in Redis
         if redis_client:
@@ -411,40 +1098,145 @@ class DataPipeline:
         return job_id
     
     async def _process_file_job(self, job: Dict[str, Any]) -> None:
-        """Process file upload job"""
+        """Process file upload job
+        
+        The file is streamed: each window of extracted text is sent to the
+        RAG service as one part of the same document, with at most
+        INGEST_MAX_INFLIGHT parts being chunked, embedded and indexed at once.
+        The job fails if any part fails; its checkpoint (job['resume']) keeps
+        the doc_id and the parts already indexed, so the retry only sends the
+        rest.
+        """
         file_path = job['data']['file_path']
         file_type = job['data']['file_type']
+        title = job['data'].get('title', os.path.basename(file_path))
         
-        # Extract content
-        extracted = await self.extractor.extract(file_path, file_type)
+        if file_type not in self.extractor.streamers:
+            raise ValueError(f"Unsupported file type: {file_type}")
         
-        # Prepare document for RAG indexing
-        document = {
-            'title': job['data'].get('title', os.path.basename(file_path)),
-            'type': 'text',
-            'content': extracted['content'],
-            'source': 'file_upload',
-            'metadata': extracted['metadata']
-        }
+        resume = job.setdefault('resume', {
+            'doc_id': hashlib.sha256(f"{job['user_id']}:{title}:{time.time()}".encode()).hexdigest()[:16],
+            'window': INGEST_WINDOW_BYTES,  # part numbering depends on it
+            'next_part': 0,                 # every part below this is indexed
+            'indexed_parts': []             # parts indexed at or above next_part
+        })
+        doc_id = resume['doc_id']
+        indexed = set(resume['indexed_parts'])
+        self.queue.checkpoint(job)
         
-        # Send to RAG service for indexing
-        await self._call_service(
-            RAG_SERVICE,
-            'POST',
-            '/index',
-            {
-                'user_id': job['user_id'],
-                'document': document
-            }
-        )
+        progress = job['progress'] = {'parts_indexed': resume['next_part'] + len(indexed), 'parts_failed': 0,
+                                      'content_size': 0}
+        slots = asyncio.Semaphore(INGEST_MAX_INFLIGHT)
+        pending: set = set()
+        
+        def record_indexed(part: int) -> None:
+            indexed.add(part)
+            while resume['next_part'] in indexed:
+                indexed.discard(resume['next_part'])
+                resume['next_part'] += 1
+            resume['indexed_parts'] = sorted(indexed)
+            self.queue.checkpoint(job)
+        
+        async def index_part(part: int, text: str) -> None:
+            try:
+                # Send to RAG service for indexing
+                response = await self._call_service(
+                    RAG_SERVICE,
+                    'POST',
+                    '/index',
+                    {
+                        'user_id': job['user_id'],
+                        'document': {
+                            'doc_id': doc_id,
+                            'part': part,
+                            'title': title,
+                            'type': 'text',
+                            'content': text,
+                            'source': 'file_upload',
+                            'metadata': {'file_type': file_type, 'part': part}
+                        }
+                    }
+                )
+                if response.get('status') == 'indexed':
+                    progress['parts_indexed'] += 1
+                    record_indexed(part)
+                else:
+                    progress['parts_failed'] += 1
+            finally:
+                slots.release()
+        
+        part = 0
+        async for segments in self._extract_segments(job, file_path, file_type, doc_id, resume['window']):
+            for text in segments:
+                progress['content_size'] += len(text)
+                if part < resume['next_part'] or part in indexed:
+                    part += 1
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(index_part(part, text))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                part += 1
+        
+        if pending:
+            await asyncio.gather(*pending)
+        if progress['parts_failed']:
+            raise RuntimeError(f"{progress['parts_failed']} of {part} parts of {doc_id} failed to index")
         
         # Update job with results
         job['result'] = {
-            'extracted_type': extracted['type'],
-            'content_size': len(extracted['content']),
+            'extracted_type': file_type,
+            'doc_id': doc_id,
+            'parts': part,
+            'content_size': progress['content_size'],
             'indexed': True
         }
     
+    async def _extract_segments(self, job: Dict[str, Any], file_path: str, file_type: str,
+                                doc_id: str, window: int) -> AsyncIterator[List[str]]:
+        """Yield lists of segments in file order, extracting in the process pool
+        
+        Small files are extracted in one task. Large line-oriented files are
+        split into byte ranges extracted in parallel, with one range per
+        process in flight. Other large files are streamed to spool files by
+        a single task and read back one part at a time.
+        """
+        size = await asyncio.to_thread(os.path.getsize, file_path)
+        job['progress']['file_size'] = size
+        
+        if size <= window:
+            job['progress']['extraction'] = 'whole'
+            yield await self._run_cpu(job, extract_segments_task, file_path, file_type, window)
+        
+        elif await asyncio.to_thread(self.extractor.supports_line_ranges, file_path, file_type):
+            job['progress']['extraction'] = 'ranges'
+            ranges: Deque[asyncio.Future] = deque()
+            for start in range(0, size, window):
+                ranges.append(asyncio.ensure_future(self._run_cpu(
+                    job, extract_range_task, file_path, file_type, start, min(start + window, size), window
+                )))
+                if len(ranges) >= self.process_workers:
+                    yield await ranges.popleft()
+            while ranges:
+                yield await ranges.popleft()
+        
+        else:
+            job['progress']['extraction'] = 'spooled'
+            spool_dir = os.path.join(PROCESSED_PATH, f"spool_{doc_id}")
+            paths = await self._run_cpu(job, spool_segments_task, file_path, file_type, window, spool_dir)
+            try:
+                for path in paths:
+                    yield [await asyncio.to_thread(self._read_spooled, path)]
+            finally:
+                await asyncio.to_thread(shutil.rmtree, spool_dir, True)
+    
+    @staticmethod
+    def _read_spooled(path: str) -> str:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        os.remove(path)
+        return text
+    
     async def _process_stream_job(self, job: Dict[str, Any]) -> None:
         """Process streaming data job"""
         stream_data = job['data']['stream_data']
@@ -452,17 +1244,13 @@ class DataPipeline:
         
         # Process stream data based on type
         if stream_type == 'json_lines':
-            lines = stream_data.split('\n')
-            records = []
-            for line in lines:
-                if line.strip():
-                    try:
-                        records.append(json.loads(line))
-                    except:
-                        pass
+            if len(stream_data) >= CPU_OFFLOAD_MIN_BYTES:
+                records = await self._run_cpu(job, parse_json_lines_task, stream_data)
+            else:
+                records, _ = parse_json_lines_task(stream_data)
             
             job['result'] = {
-                'records_processed': len(records),
+                'records_processed': records,
                 'stream_type': stream_type
             }
         else:
@@ -490,43 +1278,9 @@ class DataPipeline:
         }
     
     async def _call_service(self, service: Dict[str, Any], method: str, path: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Call another service"""
+        """Call another service over the shared keep-alive client"""
         try:
-            import socket
-            
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(60)
-            sock.connect((service['host'], service['port']))
-            
-            if data:
-                body = json.dumps(data).encode('utf-8')
-                request = f"{method} {path} HTTP/1.1\r\n"
-                request += f"Host: {service['host']}\r\n"
-                request += "Content-Type: application/json\r\n"
-                request += f"Content-Length: {len(body)}\r\n"
-                request += "Connection: close\r\n\r\n"
-                sock.send(request.encode() + body)
-            else:
-                request = f"{method} {path} HTTP/1.1\r\n"
-                request += f"Host: {service['host']}\r\n"
-                request += "Connection: close\r\n\r\n"
-                sock.send(request.encode())
-            
-            response = b''
-            while True:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    break
-                response += chunk
-            
-            sock.close()
-            
-            if b'\r\n\r\n' in response:
-                _, body = response.split(b'\r\n\r\n', 1)
-                return json.loads(body.decode('utf-8'))
-            
-            return {}
-            
+            return await get_service_client().request(service, method, path, data, timeout=60)
         except Exception as e:
             logger.error(f"Service call error: {e}")
             return {}
@@ -536,6 +1290,10 @@ class DataPipeline:
         if job_id in self.active_jobs:
             return self.active_jobs[job_id]
         
+        job = self.queue.get(job_id)
+        if job is not None:
+            return job
+        
         # Check Redis
         if redis_client:
             job_data = redis_client.get(f"job:{job_id}")
@@ -547,292 +1305,304 @@ class DataPipeline:
 # Global pipeline
 data_pipeline: Optional[DataPipeline] = None
 
-class IngestionHandler(BaseHTTPRequestHandler):
-    """Production data ingestion handler"""
-    
-    def do_GET(self):
-        """Handle GET requests"""
-        try:
-            if self.path == '/health':
-                self._handle_health_check()
-            elif self.path == '/supported-types':
-                self._handle_supported_types()
-            elif self.path.startswith('/job/'):
-                self._handle_job_status()
-            else:
-                self.send_error(404, "Not Found")
-        except Exception as e:
-            logger.error(f"GET error: {e}")
-            self.send_error(500, str(e))
+def _require_pipeline() -> Optional[Tuple[int, Dict[str, Any]]]:
+    if data_pipeline is None:
+        return 500, {'error': 'Data pipeline not initialized'}
+    return None
+
+def _queue_full(e: QueueFullError) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+    return 429, {'error': str(e), 'retry_after': e.retry_after}, {'Retry-After': str(e.retry_after)}
+
+async def handle_health_check(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Service health check"""
+    health = {
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'service': 'data-ingestion',
+        'queue_size': data_pipeline.queue.get_stats()['depth'] if data_pipeline else 0,
+        'active_jobs': len(data_pipeline.active_jobs) if data_pipeline else 0,
+        'workers': len(data_pipeline.workers) if data_pipeline else 0,
+        'service_calls': get_service_client().get_stats()
+    }
+    if data_pipeline is not None:
+        health['queue'] = data_pipeline.queue.get_stats()
+    if http_server is not None:
+        health['server'] = http_server.get_stats()
     
-    def do_POST(self):
-        """Handle POST requests"""
-        try:
-            if self.path == '/upload':
-                self._handle_file_upload()
-            elif self.path == '/stream':
-                self._handle_stream_data()
-            elif self.path == '/batch':
-                self._handle_batch_data()
-            elif self.path == '/url':
-                self._handle_url_ingestion()
-            else:
-                self.send_error(404, "Not Found")
-        except Exception as e:
-            logger.error(f"POST error: {e}")
-            self.send_error(500, str(e))
-    
-    def _handle_health_check(self):
-        """Service health check"""
-        health = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'service': 'data-ingestion',
-            'queue_size': data_pipeline.processing_queue.qsize() if data_pipeline else 0,
-            'active_jobs': len(data_pipeline.active_jobs) if data_pipeline else 0,
-            'workers': len(data_pipeline.workers) if data_pipeline else 0
+    return 200, health
+
+async def handle_supported_types(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Get supported file types"""
+    return 200, {
+        'supported_types': SUPPORTED_TYPES,
+        'max_file_size': MAX_FILE_SIZE,
+        'batch_size': BATCH_SIZE
+    }
+
+async def handle_file_upload(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Handle file upload"""
+    try:
+        if not request.body:
+            return 400, {'error': 'No file data'}
+        
+        if len(request.body) > MAX_FILE_SIZE:
+            return 413, {'error': f'File too large. Max size: {MAX_FILE_SIZE} bytes'}
+        
+        # Extract file info from headers
+        # This is simplified - actual implementation would parse multipart
+        user_id = request.headers.get('x-user-id', 'anonymous')
+        filename = request.headers.get('x-filename', f'upload_{time.time()}')
+        
+        # Determine file type
+        mime_type = mimetypes.guess_type(filename)[0]
+        file_type = SUPPORTED_TYPES.get(mime_type or 'text/plain', 'text')
+        
+        # Reject before writing the upload to disk if the job can't be queued
+        error = _require_pipeline()
+        if error:
+            return error
+        data_pipeline.queue.check_capacity(user_id)
+        
+        # Save file off the event loop
+        file_path = os.path.join(UPLOAD_PATH, f"{user_id}_{filename}")
+        
+        def save_upload():
+            os.makedirs(UPLOAD_PATH, exist_ok=True)
+            with open(file_path, 'wb') as f:
+                f.write(request.body)
+        
+        await asyncio.to_thread(save_upload)
+        
+        # Submit processing job
+        job_id = await data_pipeline.submit_job({
+            'user_id': user_id,
+            'type': 'file',
+            'priority': request.headers.get('x-priority'),
+            'data': {
+                'file_path': file_path,
+                'file_type': file_type,
+                'title': filename
+            }
+        })
+        
+        return 202, {
+            'job_id': job_id,
+            'status': 'processing',
+            'file_type': file_type
         }
         
-        self._send_json_response(200, health)
-    
-    def _handle_supported_types(self):
-        """Get supported file types"""
-        self._send_json_response(200, {
-            'supported_types': SUPPORTED_TYPES,
-            'max_file_size': MAX_FILE_SIZE,
-            'batch_size': BATCH_SIZE
+    except QueueFullError as e:
+        return _queue_full(e)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    except Exception as e:
+        logger.error(f"Upload error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_stream_data(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Handle streaming data ingestion"""
+    try:
+        data = request.json()
+        if not data:
+            return 400, {'error': 'No data'}
+        
+        if 'user_id' not in data or 'stream_data' not in data:
+            return 400, {'error': 'user_id and stream_data required'}
+        
+        # Submit stream processing job
+        error = _require_pipeline()
+        if error:
+            return error
+        
+        job_id = await data_pipeline.submit_job({
+            'user_id': data['user_id'],
+            'type': 'stream',
+            'priority': data.get('priority'),
+            'data': {
+                'stream_data': data['stream_data'],
+                'stream_type': data.get('stream_type', 'raw')
+            }
         })
+        
+        return 202, {
+            'job_id': job_id,
+            'status': 'processing'
+        }
+        
+    except QueueFullError as e:
+        return _queue_full(e)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    except Exception as e:
+        logger.error(f"Stream error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_batch_data(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Handle batch data ingestion"""
+    try:
+        data = request.json()
+        if not data:
+            return 400, {'error': 'No data'}
+        
+        if 'user_id' not in data or 'records' not in data:
+            return 400, {'error': 'user_id and records required'}
+        
+        # Validate batch size
+        if len(data['records']) > BATCH_SIZE:
+            return 400, {'error': f'Batch too large. Max size: {BATCH_SIZE}'}
+        
+        # Submit batch processing job
+        error = _require_pipeline()
+        if error:
+            return error
+        
+        job_id = await data_pipeline.submit_job({
+            'user_id': data['user_id'],
+            'type': 'batch',
+            'priority': data.get('priority'),
+            'data': {
+                'records': data['records'],
+                'batch_type': data.get('batch_type', 'generic')
+            }
+        })
+        
+        return 202, {
+            'job_id': job_id,
+            'status': 'processing',
+            'record_count': len(data['records'])
+        }
+        
+    except QueueFullError as e:
+        return _queue_full(e)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    except Exception as e:
+        logger.error(f"Batch error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_url_ingestion(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Handle URL data ingestion"""
+    try:
+        data = request.json()
+        if not data:
+            return 400, {'error': 'No data'}
+        
+        if 'user_id' not in data or 'url' not in data:
+            return 400, {'error': 'user_id and url required'}
+        
+        # For bare metal, we'll just queue it as a document
+        # In production, would fetch and process URL content
+        error = _require_pipeline()
+        if error:
+            return error
+        
+        job_id = await data_pipeline.submit_job({
+            'user_id': data['user_id'],
+            'type': 'file',
+            'priority': data.get('priority'),
+            'data': {
+                'file_path': '',  # Would be fetched
+                'file_type': 'url',
+                'title': data.get('title', data['url']),
+                'url': data['url']
+            }
+        })
+        
+        return 202, {
+            'job_id': job_id,
+            'status': 'processing',
+            'url': data['url']
+        }
+        
+    except QueueFullError as e:
+        return _queue_full(e)
+    except ValueError as e:
+        return 400, {'error': str(e)}
+    except Exception as e:
+        logger.error(f"URL ingestion error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_job_status(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Get job status"""
+    path_parts = request.path.split('/')
+    if len(path_parts) < 3:
+        return 400, {'error': 'Invalid path'}
     
-    def _handle_file_upload(self):
-        """Handle file upload"""
-        try:
-            content_type = self.headers.get('Content-Type', '')
-            content_length = int(self.headers.get('Content-Length', 0))
-            
-            if content_length == 0:
-                self.send_error(400, "No file data")
-                return
-            
-            if content_length > MAX_FILE_SIZE:
-                self.send_error(413, f"File too large. Max size: {MAX_FILE_SIZE} bytes")
-                return
-            
-            # Parse multipart data (simplified for bare metal)
-            # In production, would use proper multipart parser
-            body = self.rfile.read(content_length)
-            
-            # Extract file info from headers or body
-            # This is simplified - actual implementation would parse multipart
-            user_id = self.headers.get('X-User-ID', 'anonymous')
-            filename = self.headers.get('X-Filename', f'upload_{time.time()}')
-            
-            # Determine file type
-            mime_type = mimetypes.guess_type(filename)[0]
-            file_type = SUPPORTED_TYPES.get(mime_type or 'text/plain', 'text')
-            
-            # Save file
-            file_path = os.path.join(UPLOAD_PATH, f"{user_id}_{filename}")
-            os.makedirs(UPLOAD_PATH, exist_ok=True)
-            
-            with open(file_path, 'wb') as f:
-                f.write(body)
-            
-            # Submit processing job
-            if data_pipeline is None:
-                self._send_json_response(500, {'error': 'Data pipeline not initialized'})
-                return
-                
-            loop = asyncio.new_event_loop()
-            job_id = loop.run_until_complete(
-                data_pipeline.submit_job({
-                    'user_id': user_id,
-                    'type': 'file',
-                    'data': {
-                        'file_path': file_path,
-                        'file_type': file_type,
-                        'title': filename
-                    }
-                })
-            )
-            loop.close()
-            
-            self._send_json_response(202, {
-                'job_id': job_id,
-                'status': 'processing',
-                'file_type': file_type
-            })
-            
-        except Exception as e:
-            logger.error(f"Upload error: {e}")
-            self._send_json_response(500, {'error': str(e)})
+    job_id = path_parts[2]
     
-    def _handle_stream_data(self):
-        """Handle streaming data ingestion"""
-        try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self.send_error(400, "No data")
-                return
-            
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode('utf-8'))
-            
-            if 'user_id' not in data or 'stream_data' not in data:
-                self._send_json_response(400, {
-                    'error': 'user_id and stream_data required'
-                })
-                return
-            
-            # Submit stream processing job
-            if data_pipeline is None:
-                self._send_json_response(500, {'error': 'Data pipeline not initialized'})
-                return
-                
-            loop = asyncio.new_event_loop()
-            job_id = loop.run_until_complete(
-                data_pipeline.submit_job({
-                    'user_id': data['user_id'],
-                    'type': 'stream',
-                    'data': {
-                        'stream_data': data['stream_data'],
-                        'stream_type': data.get('stream_type', 'raw')
-                    }
-                })
-            )
-            loop.close()
-            
-            self._send_json_response(202, {
-                'job_id': job_id,
-                'status': 'processing'
-            })
-            
-        except Exception as e:
-            logger.error(f"Stream error: {e}")
-            self._send_json_response(500, {'error': str(e)})
+    status = data_pipeline.get_job_status(job_id) if data_pipeline else None
     
-    def _handle_batch_data(self):
-        """Handle batch data ingestion"""
-        try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self.send_error(400, "No data")
-                return
-            
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode('utf-8'))
-            
-            if 'user_id' not in data or 'records' not in data:
-                self._send_json_response(400, {
-                    'error': 'user_id and records required'
-                })
-                return
-            
-            # Validate batch size
-            if len(data['records']) > BATCH_SIZE:
-                self._send_json_response(400, {
-                    'error': f'Batch too large. Max size: {BATCH_SIZE}'
-                })
-                return
-            
-            # Submit batch processing job
-            if data_pipeline is None:
-                self._send_json_response(500, {'error': 'Data pipeline not initialized'})
-                return
-                
-            loop = asyncio.new_event_loop()
-            job_id = loop.run_until_complete(
-                data_pipeline.submit_job({
-                    'user_id': data['user_id'],
-                    'type': 'batch',
-                    'data': {
-                        'records': data['records'],
-                        'batch_type': data.get('batch_type', 'generic')
-                    }
-                })
-            )
-            loop.close()
-            
-            self._send_json_response(202, {
-                'job_id': job_id,
-                'status': 'processing',
-                'record_count': len(data['records'])
-            })
-            
-        except Exception as e:
-            logger.error(f"Batch error: {e}")
-            self._send_json_response(500, {'error': str(e)})
+    if status:
+        return 200, status
+    return 404, {'error': 'Job not found'}
+
+def build_router() -> Router:
+    """Routes served by both the asyncio server and the threaded fallback"""
+    router = Router()
+    router.add('GET', '/health', handle_health_check)
+    router.add('GET', '/supported-types', handle_supported_types)
+    router.add('GET', '/job/', handle_job_status, prefix=True)
+    router.add('POST', '/upload', handle_file_upload)
+    router.add('POST', '/stream', handle_stream_data)
+    router.add('POST', '/batch', handle_batch_data)
+    router.add('POST', '/url', handle_url_ingestion)
+    return router
+
+# Asyncio server (HTTP_SERVER_MODE=asyncio) and the loop the routes and workers run on
+http_server: Optional[AsyncHTTPServer] = None
+service_loop: Optional[asyncio.AbstractEventLoop] = None
+
+class IngestionHandler(BaseHTTPRequestHandler):
+    """Threaded fallback handler (HTTP_SERVER_MODE=threaded)
     
-    def _handle_url_ingestion(self):
-        """Handle URL data ingestion"""
-        try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self.send_error(400, "No data")
-                return
-            
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode('utf-8'))
-            
-            if 'user_id' not in data or 'url' not in data:
-                self._send_json_response(400, {
-                    'error': 'user_id and url required'
-                })
-                return
-            
-            # For bare metal, we'll just queue it as a document
-            # In production, would fetch and process URL content
-            if data_pipeline is None:
-                self._send_json_response(500, {'error': 'Data pipeline not initialized'})
-                return
-                
-            loop = asyncio.new_event_loop()
-            job_id = loop.run_until_complete(
-                data_pipeline.submit_job({
-                    'user_id': data['user_id'],
-                    'type': 'file',
-                    'data': {
-                        'file_path': '',  # Would be fetched
-                        'file_type': 'url',
-                        'title': data.get('title', data['url']),
-                        'url': data['url']
-                    }
-                })
-            )
-            loop.close()
-            
-            self._send_json_response(202, {
-                'job_id': job_id,
-                'status': 'processing',
-                'url': data['url']
-            })
-            
-        except Exception as e:
-            logger.error(f"URL ingestion error: {e}")
-            self._send_json_response(500, {'error': str(e)})
+    Parses the request and runs the shared route on the service loop, so
+    submitted jobs reach the workers' queue.
+    """
     
-    def _handle_job_status(self):
-        """Get job status"""
-        path_parts = self.path.split('/')
-        if len(path_parts) < 3:
-            self.send_error(400, "Invalid path")
+    # Keep connections open for the pooled service client; headers and body
+    # are written separately, so Nagle would stall every keep-alive response
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    router = build_router()
+    
+    def do_GET(self):
+        """Handle GET requests"""
+        self._dispatch('GET')
+    
+    def do_POST(self):
+        """Handle POST requests"""
+        self._dispatch('POST')
+    
+    def _dispatch(self, method: str) -> None:
+        content_length = int(self.headers.get('Content-Length', 0))
+        if content_length > MAX_FILE_SIZE:
+            self.close_connection = True
+            self._send_json_response(413, {'error': f'File too large. Max size: {MAX_FILE_SIZE} bytes'})
             return
         
-        job_id = path_parts[2]
-        
-        status = data_pipeline.get_job_status(job_id) if data_pipeline else None
-        
-        if status:
-            self._send_json_response(200, status)
-        else:
-            self._send_json_response(404, {'error': 'Job not found'})
+        request = HTTPRequest(
+            method=method,
+            path=self.path,
+            headers={name.lower(): value for name, value in self.headers.items()},
+            body=self.rfile.read(content_length) if content_length else b'',
+            client=self.client_address[0]
+        )
+        future = asyncio.run_coroutine_threadsafe(self.router.dispatch(request), service_loop)
+        status, payload, headers = future.result()
+        self._send_json_response(status, payload, headers)
     
-    def _send_json_response(self, status_code: int, data: Dict[str, Any]) -> None:
+    def _send_json_response(self, status_code: int, data: Dict[str, Any],
+                            headers: Optional[Dict[str, str]] = None) -> None:
         """Send JSON response"""
+        body = json.dumps(data).encode('utf-8')
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
     
     def log_message(self, format: str, *args) -> None:
         """Override to use our logger"""
@@ -899,6 +1669,35 @@ async def initialize_connections():
         logger.error(f"PostgreSQL connection failed: {e}")
         db_pool = None
 
+async def serve_async() -> None:
+    """Serve on the running loop until SIGTERM/SIGINT drains the server"""
+    global http_server
+    http_server = AsyncHTTPServer(
+        build_router(),
+        SERVICE_HOST,
+        SERVICE_PORT,
+        max_concurrency=HTTP_MAX_CONCURRENCY,
+        max_body_size=MAX_FILE_SIZE,
+        drain_timeout=HTTP_DRAIN_TIMEOUT
+    )
+    await http_server.start()
+    http_server.install_signal_handlers()
+    logger.info(f"Data Ingestion Service listening on http://{SERVICE_HOST}:{SERVICE_PORT} (asyncio)")
+    logger.info("Document processing pipeline: ONLINE")
+    await http_server.serve_forever()
+    if data_pipeline is not None:
+        await data_pipeline.stop()
+    await get_service_client().close()
+    logger.info("Data Ingestion Service stopped")
+
+def serve_threaded(loop: asyncio.AbstractEventLoop) -> None:
+    """Legacy threaded server; routes still run on the shared service loop"""
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    server = ThreadedHTTPServer((SERVICE_HOST, SERVICE_PORT), IngestionHandler)
+    logger.info(f"Data Ingestion Service listening on http://{SERVICE_HOST}:{SERVICE_PORT} (threaded)")
+    logger.info("Document processing pipeline: ONLINE")
+    server.serve_forever()
+
 def main():
     """Main entry point"""
     logger.info("SOVREN AI Data Ingestion Service starting...")
@@ -908,14 +1707,16 @@ def main():
     os.makedirs(UPLOAD_PATH, exist_ok=True)
     os.makedirs(PROCESSED_PATH, exist_ok=True)
     
-    # Initialize connections
+    # Initialize connections on the loop that serves requests and runs the workers
+    global service_loop
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
+    service_loop = loop
     loop.run_until_complete(initialize_connections())
     
     # Initialize data pipeline
     global data_pipeline
-    data_pipeline = DataPipeline()
+    data_pipeline = DataPipeline(queue=JobQueue(JOB_QUEUE_PATH))
     
     # Start processing workers
     loop.run_until_complete(data_pipeline.start_workers(4))
@@ -923,10 +1724,10 @@ def main():
     
     # Start HTTP server
     try:
-        server = ThreadedHTTPServer((SERVICE_HOST, SERVICE_PORT), IngestionHandler)
-        logger.info(f"Data Ingestion Service listening on http://{SERVICE_HOST}:{SERVICE_PORT}")
-        logger.info("Document processing pipeline: ONLINE")
-        server.serve_forever()
+        if HTTP_SERVER_MODE == 'threaded':
+            serve_threaded(loop)
+        else:
+            loop.run_until_complete(serve_async())
     except Exception as e:
         logger.error(f"Server error: {e}")
         sys.exit(1)
@@ -20,13 +20,11 @@ from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import base64
 import os
 
+from api.integration_sync import AsyncIntegrationSession, SyncScheduler
+
 logger = logging.getLogger(__name__)
 
 class EmailPlatform(Enum):
@@ -86,18 +84,9 @@ class EmailIntegrationBase:
         self.last_sync = None
         self.sync_interval = config.get('sync_interval', 300)  # 5 minutes default
         
-    def _create_session(self) -> requests.Session:
-        """Create HTTP session with retry logic"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+    def _create_session(self) -> AsyncIntegrationSession:
+        """Create non-blocking HTTP session with retry logic and a concurrency cap"""
+        return AsyncIntegrationSession(max_concurrency=self.config.get('max_concurrency', 4))
     
     async def authenticate(self) -> bool:
         """Authenticate with email platform"""
@@ -142,7 +131,7 @@ class GmailIntegration(EmailIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/profile", headers=headers)
+            response = await self.session.get(f"{self.api_url}/profile", headers=headers)
             response.raise_for_status()
             
             logger.info("Gmail authentication successful")
@@ -198,7 +187,7 @@ class GmailIntegration(EmailIntegrationBase):
             }
             
             data = {'raw': raw_message}
-            response = self.session.post(url, headers=headers, json=data)
+            response = await self.session.post(url, headers=headers, json=data)
             response.raise_for_status()
             
             message.status = EmailStatus.SENT
@@ -225,17 +214,19 @@ class GmailIntegration(EmailIntegrationBase):
                 'pageToken': str(offset) if offset > 0 else None
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
             emails = []
             
-            for msg_data in data.get('messages', []):
-                # Get full message details
-                msg_id = msg_data['id']
-                msg_url = f"{self.api_url}/messages/{msg_id}"
-                msg_response = self.session.get(msg_url, headers=headers)
+            # Fetch full message details concurrently (bounded by the session's cap)
+            msg_ids = [msg_data['id'] for msg_data in data.get('messages', [])]
+            msg_responses = await asyncio.gather(*(
+                self.session.get(f"{self.api_url}/messages/{msg_id}", headers=headers) for msg_id in msg_ids
+            ))
+            
+            for msg_id, msg_response in zip(msg_ids, msg_responses):
                 msg_response.raise_for_status()
                 
                 msg_details = msg_response.json()
@@ -314,13 +305,16 @@ class SMTPIntegration(EmailIntegrationBase):
             if not self.username or not self.password:
                 logger.error("SMTP username or password not configured")
                 return False
+            
+            def check_login():
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                if self.use_tls:
+                    server.starttls()
                 
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            if self.use_tls:
-                server.starttls()
+                server.login(self.username, self.password)
+                server.quit()
             
-            server.login(self.username, self.password)
-            server.quit()
+            await asyncio.to_thread(check_login)
             
             logger.info("SMTP authentication successful")
             return True
@@ -365,16 +359,19 @@ class SMTPIntegration(EmailIntegrationBase):
             if not self.username or not self.password:
                 logger.error("SMTP username or password not configured")
                 return False
-                
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            if self.use_tls:
-                server.starttls()
-            
-            server.login(self.username, self.password)
             
             all_recipients = message.to_addresses + message.cc_addresses + message.bcc_addresses
-            server.sendmail(message.from_address, all_recipients, email_msg.as_string())
-            server.quit()
+            
+            def send():
+                server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+                if self.use_tls:
+                    server.starttls()
+                
+                server.login(self.username, self.password)
+                server.sendmail(message.from_address, all_recipients, email_msg.as_string())
+                server.quit()
+            
+            await asyncio.to_thread(send)
             
             message.status = EmailStatus.SENT
             message.sent_at = datetime.utcnow()
@@ -400,63 +397,67 @@ class SMTPIntegration(EmailIntegrationBase):
                 logger.error("IMAP username or password not configured")
                 return []
                 
-            server = imaplib.IMAP4_SSL(imap_server)
-            server.login(self.username, self.password)
-            server.select('INBOX')
-            
-            # Search for emails
-            _, message_numbers = server.search(None, 'ALL')
-            email_list = message_numbers[0].split()
-            
-            emails = []
-            for num in email_list[-limit:]:  # Get latest emails
-                _, msg_data = server.fetch(num, '(RFC822)')
-                email_body = msg_data[0][1]
-                if isinstance(email_body, bytes):
-                    email_message = email.message_from_bytes(email_body)
-                else:
-                    continue  # Skip if not bytes
-                
-                # Extract email data
-                subject = email_message.get('Subject', '')
-                from_address = email_message.get('From', '')
-                to_address = email_message.get('To', '')
-                date = email_message.get('Date', '')
-                
-                # Get body
-                body = ""
-                if email_message.is_multipart():
-                    for part in email_message.walk():
-                        if part.get_content_type() == "text/plain":
-                            payload = part.get_payload(decode=True)
-                            if isinstance(payload, bytes):
-                                body = payload.decode('utf-8', errors='ignore')
-                            break
-                else:
-                    payload = email_message.get_payload(decode=True)
-                    if isinstance(payload, bytes):
-                        body = payload.decode('utf-8', errors='ignore')
-                
-                email_obj = EmailMessage(
-                    id=str(num),
-                    platform=EmailPlatform.SMTP,
-                    from_address=from_address,
-                    to_addresses=[to_address],
-                    subject=subject,
-                    body=body,
-                    created_at=datetime.utcnow()  # Parse date properly in production
-                )
-                emails.append(email_obj)
-            
-            server.close()
-            server.logout()
-            
-            return emails
+            return await asyncio.to_thread(self._fetch_imap, imap_server, limit)
             
         except Exception as e:
             logger.error(f"Failed to get SMTP emails: {e}")
             return []
     
+    def _fetch_imap(self, imap_server: str, limit: int) -> List[EmailMessage]:
+        """Blocking IMAP fetch, run in a worker thread"""
+        server = imaplib.IMAP4_SSL(imap_server)
+        server.login(self.username, self.password)
+        server.select('INBOX')
+        
+        # Search for emails
+        _, message_numbers = server.search(None, 'ALL')
+        email_list = message_numbers[0].split()
+        
+        emails = []
+        for num in email_list[-limit:]:  # Get latest emails
+            _, msg_data = server.fetch(num, '(RFC822)')
+            email_body = msg_data[0][1]
+            if isinstance(email_body, bytes):
+                email_message = email.message_from_bytes(email_body)
+            else:
+                continue  # Skip if not bytes
+        
+            # Extract email data
+            subject = email_message.get('Subject', '')
+            from_address = email_message.get('From', '')
+            to_address = email_message.get('To', '')
+            date = email_message.get('Date', '')
+        
+            # Get body
+            body = ""
+            if email_message.is_multipart():
+                for part in email_message.walk():
+                    if part.get_content_type() == "text/plain":
+                        payload = part.get_payload(decode=True)
+                        if isinstance(payload, bytes):
+                            body = payload.decode('utf-8', errors='ignore')
+                        break
+            else:
+                payload = email_message.get_payload(decode=True)
+                if isinstance(payload, bytes):
+                    body = payload.decode('utf-8', errors='ignore')
+        
+            email_obj = EmailMessage(
+                id=str(num),
+                platform=EmailPlatform.SMTP,
+                from_address=from_address,
+                to_addresses=[to_address],
+                subject=subject,
+                body=body,
+                created_at=datetime.utcnow()  # Parse date properly in production
+            )
+            emails.append(email_obj)
+        
+        server.close()
+        server.logout()
+        
+        return emails
+    
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with SMTP/IMAP"""
         try:
@@ -493,7 +494,7 @@ class SendGridIntegration(EmailIntegrationBase):
             url = f"{self.base_url}/user/profile"
             headers = {'Authorization': f'Bearer {self.api_key}'}
             
-            response = self.session.get(url, headers=headers)
+            response = await self.session.get(url, headers=headers)
             response.raise_for_status()
             
             logger.info("SendGrid authentication successful")
@@ -534,7 +535,7 @@ class SendGridIntegration(EmailIntegrationBase):
                     'value': message.html_body
                 })
             
-            response = self.session.post(url, headers=headers, json=data)
+            response = await self.session.post(url, headers=headers, json=data)
             response.raise_for_status()
             
             message.status = EmailStatus.SENT
@@ -581,6 +582,7 @@ class UnifiedEmailIntegration:
         self.integrations: Dict[EmailPlatform, EmailIntegrationBase] = {}
         self.sync_status: Dict[str, Any] = {}
         self.last_full_sync = None
+        self.scheduler = SyncScheduler()
     
     def add_integration(self, platform: EmailPlatform, config: Dict[str, Any]):
         """Add email integration"""
@@ -594,6 +596,8 @@ class UnifiedEmailIntegration:
             raise ValueError(f"Unsupported email platform: {platform}")
         
         self.integrations[platform] = integration
+        if 'sync_deadline' in config:
+            self.scheduler.deadlines[platform.value] = config['sync_deadline']
         logger.info(f"Added {platform.value} integration")
     
     async def authenticate_all(self) -> Dict[str, bool]:
@@ -639,19 +643,10 @@ class UnifiedEmailIntegration:
         return all_emails
     
     async def sync_all_platforms(self) -> Dict[str, Any]:
-        """Sync all email platforms"""
-        sync_results = {}
-        
-        for platform, integration in self.integrations.items():
-            try:
-                result = await integration.sync_data()
-                sync_results[platform.value] = result
-            except Exception as e:
-                logger.error(f"Sync failed for {platform.value}: {e}")
-                sync_results[platform.value] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        """Sync all email platforms concurrently, each under its platform deadline"""
+        sync_results = await self.scheduler.run({
+            platform.value: integration.sync_data for platform, integration in self.integrations.items()
+        })
         
         self.last_full_sync = datetime.utcnow()
         self.sync_status = sync_results
@@ -660,6 +655,7 @@ class UnifiedEmailIntegration:
             'sync_results': sync_results,
             'total_platforms': len(self.integrations),
             'successful_syncs': len([r for r in sync_results.values() if r.get('status') == 'success']),
+            'sync_duration': self.scheduler.last_run['duration'],
             'sync_timestamp': self.last_full_sync.isoformat()
         }
     
@@ -668,8 +664,16 @@ class UnifiedEmailIntegration:
         return {
             'last_full_sync': self.last_full_sync.isoformat() if self.last_full_sync else None,
             'active_integrations': list(self.integrations.keys()),
-            'sync_status': self.sync_status
+            'sync_status': self.sync_status,
+            'sync_timings': self.scheduler.get_stats(),
+            'http': {platform.value: integration.session.get_stats()
+                     for platform, integration in self.integrations.items()}
         }
+    
+    async def close(self) -> None:
+        """Close platform HTTP sessions"""
+        for integration in self.integrations.values():
+            await integration.session.close()
 
 # Production-ready test suite
 class TestEmailIntegration:
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+SOVREN AI Integration Sync - non-blocking HTTP and sync scheduling
+Shared by the CRM, email, calendar, social media, accounting and analytics
+integrations: an aiohttp session with retries and a per-platform
+concurrency cap, a scheduler that runs syncs concurrently under deadlines
+while recording timing histograms, and a local store of synced records
+with per-platform high-water marks for incremental (delta) sync
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+SYNC_STATE_PATH = os.environ.get('SOVREN_SYNC_STATE_PATH',
+                                 '/mnt/yellow-mackerel-volume/sovren/integrations/sync_state.db')
+
+class IntegrationHTTPError(Exception):
+    """HTTP error status returned by a platform API"""
+
+    def __init__(self, status_code: int, url: str, body: str = ''):
+        super().__init__(f"{status_code} error for {url}: {body[:200]}")
+        self.status_code = status_code
+        self.url = url
+
+class IntegrationResponse:
+    """Fully read HTTP response with the parts of requests.Response the connectors use"""
+
+    def __init__(self, status_code: int, content: bytes, headers: Dict[str, str], url: str):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.url = url
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self) -> Any:
+        return json.loads(self.content) if self.content else None
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise IntegrationHTTPError(self.status_code, self.url, self.text)
+
+class AsyncIntegrationSession:
+    """aiohttp session for one platform connector
+
+    Mirrors the retry policy the connectors had on requests.Session (3
+    retries, exponential backoff, retry on 429/5xx, honouring Retry-After)
+    and caps concurrent requests to the platform at ``max_concurrency``.
+    Calls are awaited: ``response = await session.get(url, params=...)``.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_retries: int = 3, backoff_factor: float = 1.0,
+                 timeout: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[Any] = None
+
+        self.requests = 0
+        self.retries = 0
+        self.bytes_received = 0
+
+    def _get_session(self) -> Any:
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for platform integrations")
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency)
+            )
+        return self._session
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    @staticmethod
+    def _query_params(params: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """Encode params for aiohttp: drop None, lower-case booleans, repeat keys for lists"""
+        encoded = []
+        for key, value in params.items():
+            for item in (value if isinstance(value, (list, tuple)) else [value]):
+                if isinstance(item, bool):
+                    encoded.append((key, 'true' if item else 'false'))
+                elif item is not None:
+                    encoded.append((key, item if isinstance(item, str) else str(item)))
+        return encoded
+
+    async def request(self, method: str, url: str, **kwargs: Any) -> IntegrationResponse:
+        session = self._get_session()
+        if isinstance(kwargs.get('params'), dict):
+            kwargs['params'] = self._query_params(kwargs['params'])
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                async with self.semaphore:
+                    async with session.request(method, url, **kwargs) as resp:
+                        content = await resp.read()
+                self.requests += 1
+                self.bytes_received += len(content)
+                response = IntegrationResponse(resp.status, content, dict(resp.headers), str(resp.url))
+                if resp.status not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                retry_after = resp.headers.get('Retry-After')
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"{method} {url} failed ({e}), retrying")
+
+            self.retries += 1
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+        raise RuntimeError("unreachable")
+
+    async def get(self, url: str, **kwargs: Any) -> IntegrationResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> IntegrationResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> IntegrationResponse:
+        return await self.request('PUT', url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> IntegrationResponse:
+        return await self.request('PATCH', url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> IntegrationResponse:
+        return await self.request('DELETE', url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'bytes_received': self.bytes_received,
+            'max_concurrency': self.max_concurrency
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+class TimingHistogram:
+    """Fixed-bucket histogram of durations in seconds"""
+
+    BOUNDS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.BOUNDS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {str(bound): count for bound, count in zip(self.BOUNDS, self.counts)}
+        buckets['+Inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'sum': round(self.total, 4),
+            'max': round(self.max, 4),
+            'p50': round(self.quantile(0.5), 4),
+            'p99': round(self.quantile(0.99), 4),
+            'buckets': buckets
+        }
+
+SyncFactory = Callable[[], Awaitable[Dict[str, Any]]]
+
+class SyncScheduler:
+    """Runs named sync coroutines concurrently, each under its own deadline
+
+    A run takes as long as its slowest sync (or that sync's deadline).
+    Each result gets ``status`` and ``sync_duration``; a sync that overruns
+    is cancelled and reported with status ``timeout``.
+    """
+
+    def __init__(self, default_deadline: float = 120.0, deadlines: Optional[Dict[str, float]] = None):
+        self.default_deadline = default_deadline
+        self.deadlines = dict(deadlines or {})
+        self.histograms: Dict[str, TimingHistogram] = {}
+        self.last_run: Dict[str, Any] = {}
+
+    async def _run_one(self, name: str, factory: SyncFactory) -> Tuple[str, Dict[str, Any]]:
+        deadline = self.deadlines.get(name, self.default_deadline)
+        start = time.perf_counter()
+        try:
+            result = dict(await asyncio.wait_for(factory(), deadline) or {})
+            result.setdefault('status', 'success')
+        except asyncio.TimeoutError:
+            logger.error(f"Sync for {name} exceeded its {deadline}s deadline")
+            result = {'status': 'timeout', 'error': f"Deadline of {deadline}s exceeded"}
+        except Exception as e:
+            logger.error(f"Sync failed for {name}: {e}")
+            result = {'status': 'error', 'error': str(e)}
+
+        elapsed = time.perf_counter() - start
+        result['sync_duration'] = round(elapsed, 4)
+        self.histograms.setdefault(name, TimingHistogram()).observe(elapsed)
+        return name, result
+
+    async def run(self, syncs: Dict[str, SyncFactory]) -> Dict[str, Dict[str, Any]]:
+        start = time.perf_counter()
+        results = dict(await asyncio.gather(*(self._run_one(name, factory) for name, factory in syncs.items())))
+        self.last_run = {
+            'duration': round(time.perf_counter() - start, 4),
+            'slowest': max(results, key=lambda name: results[name]['sync_duration']) if results else None
+        }
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'last_run': self.last_run,
+            'timings': {name: histogram.snapshot() for name, histogram in self.histograms.items()}
+        }
+
+class SyncStateStore:
+    """Synced records and sync cursors, persisted in SQLite (WAL)
+
+    A cursor is the platform's high-water mark for one entity (a
+    LastModifiedDate, an updated-since timestamp, a sync token or delta
+    link). Records are merged by (platform, entity, id), so replaying a
+    page is harmless: timestamp cursors are inclusive, and the records at
+    the boundary come back on every sync without counting as changed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or ':memory:'
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.lock = threading.Lock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_cursors (
+                    platform TEXT NOT NULL,
+                    entity TEXT NOT NULL,
+                    cursor TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (platform, entity)
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS sync_records (
+                    platform TEXT NOT NULL,
+                    entity TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    synced_at REAL NOT NULL,
+                    PRIMARY KEY (platform, entity, record_id)
+                )
+            """)
+
+    def get_cursor(self, platform: str, entity: str) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT cursor FROM sync_cursors WHERE platform = ? AND entity = ?", (platform, entity)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_cursor(self, platform: str, entity: str, cursor: Optional[str]) -> None:
+        with self.lock:
+            if cursor is None:
+                self.conn.execute("DELETE FROM sync_cursors WHERE platform = ? AND entity = ?", (platform, entity))
+            else:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO sync_cursors (platform, entity, cursor, updated_at) VALUES (?, ?, ?, ?)",
+                    (platform, entity, cursor, time.time())
+                )
+
+    def merge(self, platform: str, entity: str, records: Iterable[Tuple[str, Dict[str, Any]]],
+              deleted: Iterable[str] = ()) -> Tuple[int, int]:
+        """Upsert (id, payload) records and drop deleted ids; returns (changed, deleted)
+        
+        Records whose payload is unchanged are left alone and not counted.
+        """
+        now = time.time()
+        rows = [(platform, entity, record_id, json.dumps(payload, default=str), now)
+                for record_id, payload in records]
+        deleted_rows = [(platform, entity, record_id) for record_id in deleted]
+        with self.lock:
+            self.conn.execute("BEGIN")
+            changed = self.conn.executemany(
+                "INSERT INTO sync_records (platform, entity, record_id, payload, synced_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (platform, entity, record_id) DO UPDATE "
+                "SET payload = excluded.payload, synced_at = excluded.synced_at "
+                "WHERE payload IS NOT excluded.payload", rows
+            ).rowcount if rows else 0
+            self.conn.executemany(
+                "DELETE FROM sync_records WHERE platform = ? AND entity = ? AND record_id = ?", deleted_rows
+            )
+            self.conn.execute("COMMIT")
+        return changed, len(deleted_rows)
+
+    def clear(self, platform: str, entity: str) -> None:
+        """Forget an entity's records and cursor (before a forced full resync)"""
+        with self.lock:
+            self.conn.execute("DELETE FROM sync_records WHERE platform = ? AND entity = ?", (platform, entity))
+            self.conn.execute("DELETE FROM sync_cursors WHERE platform = ? AND entity = ?", (platform, entity))
+
+    def get(self, platform: str, entity: str, record_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload FROM sync_records WHERE platform = ? AND entity = ? AND record_id = ?",
+                (platform, entity, record_id)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def records(self, platform: str, entity: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT payload FROM sync_records WHERE platform = ? AND entity = ? ORDER BY record_id",
+                (platform, entity)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, platform: str, entity: str) -> int:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM sync_records WHERE platform = ? AND entity = ?", (platform, entity)
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.close()
+
+_sync_state_store: Optional[SyncStateStore] = None
+
+def get_sync_state_store() -> SyncStateStore:
+    """Process-wide store at SOVREN_SYNC_STATE_PATH (in memory if that can't be opened)"""
+    global _sync_state_store
+    if _sync_state_store is None:
+        try:
+            _sync_state_store = SyncStateStore(SYNC_STATE_PATH)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Sync state store unavailable at {SYNC_STATE_PATH} ({e}), keeping it in memory")
+            _sync_state_store = SyncStateStore()
+    return _sync_state_store
+
+@dataclass
+class SyncPage:
+    """One page of changed records from a platform
+
+    ``cursor`` is the high-water mark reached once this page is merged, if
+    the platform reports one (sync tokens usually arrive on the last page).
+    """
+    records: List[Tuple[str, Dict[str, Any]]] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    cursor: Optional[str] = None
+
+class CursorExpiredError(Exception):
+    """The platform rejected a stored cursor; the entity needs a full resync"""
+
+async def run_delta_sync(store: SyncStateStore, session: AsyncIntegrationSession, platform: str, entity: str,
+                         fetch_changes: Callable[[Optional[str]], AsyncIterator[SyncPage]]) -> Dict[str, Any]:
+    """Merge the pages ``fetch_changes(cursor)`` yields and advance the cursor
+
+    The cursor is saved only after every page is merged, so an interrupted
+    sync resumes from the previous high-water mark. An expired cursor
+    triggers one full resync.
+    """
+    start = time.perf_counter()
+    bytes_before = session.bytes_received
+    requests_before = session.requests
+    cursor = store.get_cursor(platform, entity)
+    full_sync = cursor is None
+    upserted = deleted = pages = 0
+
+    try:
+        new_cursor = cursor
+        async for page in fetch_changes(cursor):
+            page_upserted, page_deleted = store.merge(platform, entity, page.records, page.deleted)
+            upserted += page_upserted
+            deleted += page_deleted
+            pages += 1
+            if page.cursor is not None:
+                new_cursor = page.cursor
+    except CursorExpiredError:
+        if full_sync:
+            raise
+        logger.warning(f"{platform} {entity} cursor expired, running a full resync")
+        store.clear(platform, entity)
+        return await run_delta_sync(store, session, platform, entity, fetch_changes)
+
+    store.set_cursor(platform, entity, new_cursor)
+    elapsed = time.perf_counter() - start
+    return {
+        'entity': entity,
+        'full_sync': full_sync,
+        'records_changed': upserted,
+        'records_deleted': deleted,
+        'records_stored': store.count(platform, entity),
+        'pages': pages,
+        'requests': session.requests - requests_before,
+        'bytes_transferred': session.bytes_received - bytes_before,
+        'records_per_second': round(upserted / elapsed, 1) if elapsed > 0 else 0.0,
+        'cursor': new_cursor
+    }
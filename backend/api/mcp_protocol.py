@@ -0,0 +1,627 @@
+#!/usr/bin/env python3
+"""
+SOVREN AI MCP Protocol - framed, multiplexed messaging for the MCP servers
+Length-prefixed frames tagged with request ids, so one connection carries
+many outstanding requests answered in any order, with msgpack or JSON
+bodies negotiated per connection and the unframed JSON protocol kept as a
+fallback for peers that predate framing
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import signal
+import struct
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import msgpack  # type: ignore
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger('sovren-mcp-protocol')
+
+# Framed clients open with PREAMBLE and a hello frame; unframed clients open with '{'
+PREAMBLE = b'\x00MCP\x01'
+# Frame header: body length, frame kind, request id
+FRAME_HEADER = struct.Struct('!IBI')
+FRAME_HELLO = 0
+FRAME_REQUEST = 1
+FRAME_RESPONSE = 2
+
+MAX_MESSAGE_BYTES = int(os.getenv('SOVREN_MCP_MAX_MESSAGE_BYTES', str(16 * 1024 * 1024)))
+MAX_INFLIGHT = int(os.getenv('SOVREN_MCP_MAX_INFLIGHT', '256'))  # Requests handled at once per connection
+MAX_CONNECTIONS = int(os.getenv('SOVREN_MCP_MAX_CONNECTIONS', '50000'))
+IDLE_TIMEOUT = float(os.getenv('SOVREN_MCP_IDLE_TIMEOUT', '300'))  # Seconds with nothing outstanding; 0 disables
+DRAIN_TIMEOUT = float(os.getenv('SOVREN_MCP_DRAIN_TIMEOUT', '30'))
+WRITE_BUFFER_BYTES = int(os.getenv('SOVREN_MCP_WRITE_BUFFER_BYTES', str(256 * 1024)))  # Unsent bytes per connection
+READ_CHUNK = 65536
+
+JSON_STRUCTURE = re.compile(rb'[{}"\\]')
+JSON_WHITESPACE = b' \t\r\n'
+
+class ProtocolError(Exception):
+    """Malformed or oversized MCP message"""
+
+def available_encodings() -> List[str]:
+    """Body encodings this side speaks, most compact first"""
+    return ['msgpack', 'json'] if MSGPACK_AVAILABLE else ['json']
+
+def encode_body(encoding: str, message: Any) -> bytes:
+    if encoding == 'msgpack':
+        return msgpack.packb(message, use_bin_type=True)
+    return json.dumps(message).encode('utf-8')
+
+def decode_body(encoding: str, body: bytes) -> Any:
+    if encoding == 'msgpack':
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    return json.loads(body)
+
+def encode_frame(kind: int, request_id: int, body: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(body), kind, request_id) + body
+
+class FrameDecoder:
+    """Reassembles frames from arbitrarily split or coalesced reads"""
+
+    def __init__(self, max_message_bytes: int = MAX_MESSAGE_BYTES):
+        self.buffer = bytearray()
+        self.max_message_bytes = max_message_bytes
+
+    def feed(self, data: bytes) -> List[Tuple[int, int, bytes]]:
+        """Add received bytes; returns the (kind, request_id, body) frames now complete"""
+        buffer = self.buffer
+        buffer += data
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            length, kind, request_id = FRAME_HEADER.unpack_from(buffer, offset)
+            if length > self.max_message_bytes:
+                raise ProtocolError(f"Frame of {length} bytes exceeds {self.max_message_bytes}")
+            end = offset + FRAME_HEADER.size + length
+            if len(buffer) < end:
+                break
+            frames.append((kind, request_id, bytes(buffer[offset + FRAME_HEADER.size:end])))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return frames
+
+class JSONStreamSplitter:
+    """
+    Splits the unframed protocol's stream of concatenated JSON objects
+
+    Tracks brace depth outside strings, so a message may arrive across many
+    reads and several messages in one. Bytes between messages that do not
+    start an object are returned as one (undecodable) message.
+    """
+
+    def __init__(self, max_message_bytes: int = MAX_MESSAGE_BYTES):
+        self.buffer = bytearray()
+        self.max_message_bytes = max_message_bytes
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Add received bytes; returns the raw messages now complete"""
+        buffer = self.buffer
+        buffer += data
+        messages = []
+        start = 0
+        pos = self._pos
+        while pos < len(buffer):
+            if not self._depth:
+                byte = buffer[pos]
+                if byte in JSON_WHITESPACE:
+                    pos = start = pos + 1
+                elif byte == 0x7B:  # '{'
+                    start = pos
+                    pos += 1
+                    self._depth = 1
+                else:
+                    end = buffer.find(b'{', pos)
+                    end = len(buffer) if end < 0 else end
+                    messages.append(bytes(buffer[pos:end]))
+                    pos = start = end
+                continue
+
+            match = JSON_STRUCTURE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+            char = match.group()
+            pos = match.end()
+            if self._in_string:
+                if char == b'\\':
+                    pos += 1
+                elif char == b'"':
+                    self._in_string = False
+            elif char == b'"':
+                self._in_string = True
+            elif char == b'{':
+                self._depth += 1
+            elif char == b'}':
+                self._depth -= 1
+                if not self._depth:
+                    messages.append(bytes(buffer[start:pos]))
+                    start = pos
+
+        del buffer[:start]
+        self._pos = pos - start
+        if len(buffer) > self.max_message_bytes:
+            raise ProtocolError(f"JSON message exceeds {self.max_message_bytes} bytes")
+        return messages
+
+class ConnectionState:
+    """Activity of one connection, kept up to date by serve_connection"""
+
+    __slots__ = ('in_flight', 'reading', 'last_active')
+
+    def __init__(self):
+        self.in_flight = 0
+        self.reading = False
+        self.last_active = time.monotonic()
+
+    @property
+    def idle(self) -> bool:
+        """Waiting for the next request with no response outstanding"""
+        return self.reading and not self.in_flight
+
+MessageHandler = Callable[[Any], Awaitable[Dict[str, Any]]]
+ErrorResponse = Callable[[Exception], Dict[str, Any]]
+
+async def serve_connection(read: Callable[[], Awaitable[bytes]], write: Callable[[bytes], Awaitable[None]],
+                           handle: MessageHandler, error_response: ErrorResponse,
+                           max_inflight: int = MAX_INFLIGHT, state: Optional[ConnectionState] = None) -> None:
+    """
+    Serve one MCP connection until the peer closes it
+
+    read returns the next chunk (b'' at end of stream) and write sends
+    bytes. Framed peers get up to max_inflight requests handled
+    concurrently, each answered under its request id as soon as it
+    completes; reading pauses while that many are outstanding. Unframed
+    peers are answered one message at a time, in order. Messages that
+    cannot be decoded, and handler exceptions, are answered with
+    error_response(exception). state, when given, tracks the connection's
+    activity for the caller.
+    """
+    state = state or ConnectionState()
+
+    async def receive() -> bytes:
+        state.reading = True
+        try:
+            data = await read()
+        finally:
+            state.reading = False
+        state.last_active = time.monotonic()
+        return data
+
+    data = b''
+    while not data.lstrip(JSON_WHITESPACE):
+        chunk = await receive()
+        if not chunk:
+            return
+        data += chunk
+    if data.lstrip(JSON_WHITESPACE)[:1] != PREAMBLE[:1]:
+        await _serve_unframed(receive, write, handle, error_response, data, state)
+        return
+    while len(data) < len(PREAMBLE):
+        chunk = await receive()
+        if not chunk:
+            return
+        data += chunk
+    if not data.startswith(PREAMBLE):
+        raise ProtocolError("Unknown MCP protocol preamble")
+
+    decoder = FrameDecoder()
+    write_lock = asyncio.Lock()
+    slots = asyncio.Semaphore(max_inflight)
+    tasks: Set[asyncio.Task] = set()
+    encoding = 'json'
+
+    async def respond(request_id: int, body: bytes, body_encoding: str):
+        try:
+            try:
+                response = await handle(decode_body(body_encoding, body))
+                frame = encode_frame(FRAME_RESPONSE, request_id, encode_body(body_encoding, response))
+            except Exception as e:
+                frame = encode_frame(FRAME_RESPONSE, request_id, encode_body(body_encoding, error_response(e)))
+            async with write_lock:
+                await write(frame)
+            state.last_active = time.monotonic()
+        except (ConnectionError, OSError) as e:
+            logger.debug(f"MCP response {request_id} not delivered: {e}")
+        finally:
+            state.in_flight -= 1
+            slots.release()
+
+    try:
+        data = data[len(PREAMBLE):]
+        while True:
+            for kind, request_id, body in decoder.feed(data):
+                if kind == FRAME_REQUEST:
+                    await slots.acquire()
+                    state.in_flight += 1
+                    task = asyncio.create_task(respond(request_id, body, encoding))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif kind == FRAME_HELLO:
+                    offered = json.loads(body).get('encodings', ['json'])
+                    encoding = next((e for e in offered if e in available_encodings()), 'json')
+                    reply = {'encoding': encoding, 'max_inflight': max_inflight,
+                             'max_message_bytes': decoder.max_message_bytes}
+                    async with write_lock:
+                        await write(encode_frame(FRAME_HELLO, request_id, encode_body('json', reply)))
+                else:
+                    raise ProtocolError(f"Unexpected frame kind {kind}")
+            data = await receive()
+            if not data:
+                break
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+    finally:
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _serve_unframed(read: Callable[[], Awaitable[bytes]], write: Callable[[bytes], Awaitable[None]],
+                          handle: MessageHandler, error_response: ErrorResponse, data: bytes,
+                          state: ConnectionState) -> None:
+    splitter = JSONStreamSplitter()
+    while data:
+        for raw in splitter.feed(data):
+            state.in_flight += 1
+            try:
+                try:
+                    response = await handle(json.loads(raw))
+                except Exception as e:
+                    response = error_response(e)
+                await write(json.dumps(response).encode('utf-8'))
+            finally:
+                state.in_flight -= 1
+        data = await read()
+
+def raise_file_limit(descriptors: int) -> None:
+    """Raise the soft descriptor limit (up to the hard limit) to fit this many connections"""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = descriptors + 256
+    if soft == resource.RLIM_INFINITY or soft >= wanted:
+        return
+    limit = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+    except (ValueError, OSError) as e:
+        logger.warning(f"Could not raise descriptor limit to {limit}: {e}")
+        return
+    if limit < wanted:
+        logger.warning(f"Descriptor limit {limit} is below the {descriptors} connections allowed")
+
+class MCPConnection(ConnectionState):
+    """One client connection of an MCPStreamServer"""
+
+    __slots__ = ('peer', 'writer', 'task')
+
+    def __init__(self, peer: Any, writer: asyncio.StreamWriter, task: Optional[asyncio.Task]):
+        super().__init__()
+        self.peer = peer
+        self.writer = writer
+        self.task = task
+
+Session = Callable[[MCPConnection], Tuple[MessageHandler, ErrorResponse]]
+
+class MCPStreamServer:
+    """MCP server on asyncio streams
+
+    Every connection is a coroutine on the serving loop, so tens of
+    thousands of mostly idle clients cost memory, not threads.
+    ``session(connection)`` returns the (handle, error_response) pair that
+    serves a new connection. Connections past ``max_connections`` are
+    closed on accept, connections with nothing outstanding for
+    ``idle_timeout`` seconds are closed, each connection runs at most
+    ``max_inflight`` requests and stops reading past that, and responses
+    wait while ``write_buffer_bytes`` are unsent. ``shutdown`` stops
+    accepting, closes each connection once it is idle and closes the rest
+    after ``drain_timeout`` seconds.
+    """
+
+    def __init__(self, session: Session, host: str, port: int, max_connections: int = MAX_CONNECTIONS,
+                 max_inflight: int = MAX_INFLIGHT, idle_timeout: float = IDLE_TIMEOUT,
+                 drain_timeout: float = DRAIN_TIMEOUT, write_buffer_bytes: int = WRITE_BUFFER_BYTES,
+                 ssl: Any = None):
+        self.session = session
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.max_inflight = max_inflight
+        self.idle_timeout = idle_timeout
+        self.drain_timeout = drain_timeout
+        self.write_buffer_bytes = write_buffer_bytes
+        self.ssl = ssl
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.connections: Set[MCPConnection] = set()
+        self.draining = False
+        self._stopped = asyncio.Event()
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self.accepted = 0
+        self.rejected = 0
+        self.idle_closed = 0
+
+    async def start(self) -> None:
+        raise_file_limit(self.max_connections)
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port, backlog=4096,
+                                                 ssl=self.ssl, limit=READ_CHUNK)
+        sockets = self.server.sockets or []
+        if sockets:
+            self.port = sockets[0].getsockname()[1]
+        if self.idle_timeout > 0:
+            self._sweeper = asyncio.create_task(self._close_idle_connections())
+
+    async def serve_forever(self) -> None:
+        """Serve until shutdown() completes"""
+        if self.server is None:
+            await self.start()
+        await self._stopped.wait()
+
+    def install_signal_handlers(self) -> None:
+        """Drain on SIGTERM/SIGINT (call from the serving loop)"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.shutdown()))
+
+    async def shutdown(self) -> None:
+        """Stop accepting, let outstanding requests finish and close every connection"""
+        if self.draining:
+            await self._stopped.wait()
+            return
+        self.draining = True
+        logger.info(f"Draining {len(self.connections)} MCP connections with "
+                    f"{sum(c.in_flight for c in self.connections)} requests in flight")
+
+        if self.server is not None:
+            self.server.close()
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+
+        deadline = time.monotonic() + self.drain_timeout
+        while self.connections and time.monotonic() < deadline:
+            for connection in list(self.connections):
+                if connection.idle:
+                    connection.writer.close()
+            await asyncio.sleep(0.05)
+
+        if self.connections:
+            logger.warning(f"Drain timeout with {len(self.connections)} MCP connections still busy")
+            busy = list(self.connections)
+            for connection in busy:
+                connection.writer.close()
+                if connection.task is not None:
+                    connection.task.cancel()
+            await asyncio.gather(*(c.task for c in busy if c.task is not None), return_exceptions=True)
+        if self.server is not None:
+            await self.server.wait_closed()
+        self._stopped.set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'connections': len(self.connections),
+            'in_flight': sum(c.in_flight for c in self.connections),
+            'accepted': self.accepted,
+            'rejected': self.rejected,
+            'idle_closed': self.idle_closed,
+            'max_connections': self.max_connections,
+            'draining': self.draining
+        }
+
+    async def _close_idle_connections(self) -> None:
+        interval = min(max(self.idle_timeout / 4, 0.05), 5.0)
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - self.idle_timeout
+            for connection in list(self.connections):
+                if connection.idle and connection.last_active < cutoff:
+                    connection.writer.close()
+                    self.idle_closed += 1
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.draining or len(self.connections) >= self.max_connections:
+            self.rejected += 1
+            writer.close()
+            return
+
+        connection = MCPConnection(writer.get_extra_info('peername'), writer, asyncio.current_task())
+        writer.transport.set_write_buffer_limits(high=self.write_buffer_bytes)
+        self.connections.add(connection)
+        self.accepted += 1
+
+        async def write(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        try:
+            handle, error_response = self.session(connection)
+            await serve_connection(lambda: reader.read(READ_CHUNK), write, handle, error_response,
+                                   self.max_inflight, connection)
+        except (ConnectionError, ProtocolError, asyncio.CancelledError) as e:
+            logger.debug(f"MCP connection {connection.peer} ended: {e!r}")
+        except Exception as e:
+            logger.error(f"MCP connection {connection.peer} failed: {e}")
+        finally:
+            self.connections.discard(connection)
+            writer.close()
+
+class MCPChannel:
+    """
+    Client end of one MCP connection
+
+    request() may be called concurrently; against a framed server every
+    call is sent at once and matched to its response by request id.
+    Against a server without framing, or with framed=False, the channel
+    uses plain JSON with one request in flight; an unframed request that
+    times out or is cancelled drops the connection, so its late reply can
+    not answer the next request. When the server closes an established
+    connection (idle timeout, restart) the next request reconnects.
+    """
+
+    def __init__(self, host: str = 'localhost', port: int = 9999, encodings: Optional[List[str]] = None,
+                 timeout: float = 30.0, framed: bool = True):
+        self.host = host
+        self.port = port
+        self.encodings = [e for e in (encodings or available_encodings()) if e in available_encodings()]
+        self.timeout = timeout
+        self.framed = framed
+        self.encoding: Optional[str] = None  # None until connected; 'unframed' for the JSON fallback
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._reader_task: Optional[asyncio.Task] = None
+        self._unframed_lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+        self._splitter: Optional[JSONStreamSplitter] = None
+        self._unframed_messages: deque = deque()  # parsed replies not yet taken by a request
+        self._closed = False
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+    async def connect(self) -> str:
+        """Open the connection and negotiate framing; returns the encoding in use"""
+        self._closed = False
+        self.reader, self.writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout)
+        # A fresh map, so the previous connection's reader only fails its own requests
+        self.pending = {}
+        self._unframed_messages = deque()
+        if not self.framed:
+            self._splitter = JSONStreamSplitter()
+            self.encoding = 'unframed'
+            return self.encoding
+        hello = json.dumps({'encodings': self.encodings}).encode('utf-8')
+        self.writer.write(PREAMBLE + encode_frame(FRAME_HELLO, 0, hello))
+        await self.writer.drain()
+
+        first = await asyncio.wait_for(self.reader.readexactly(1), self.timeout)
+        if first == b'{':
+            # Server without framing: it answered the hello with a JSON error, skip it
+            self._splitter = JSONStreamSplitter()
+            data = first
+            while not self._splitter.feed(data):
+                data = await asyncio.wait_for(self.reader.read(READ_CHUNK), self.timeout)
+                if not data:
+                    raise ConnectionError("MCP server closed the connection")
+            self.encoding = 'unframed'
+            logger.info(f"MCP server {self.host}:{self.port} does not support framing, using unframed JSON")
+            return self.encoding
+
+        header = first + await asyncio.wait_for(self.reader.readexactly(FRAME_HEADER.size - 1), self.timeout)
+        length, kind, _ = FRAME_HEADER.unpack(header)
+        if kind != FRAME_HELLO:
+            raise ProtocolError(f"Expected hello frame, got kind {kind}")
+        reply = json.loads(await asyncio.wait_for(self.reader.readexactly(length), self.timeout))
+        self.encoding = reply.get('encoding', 'json')
+        self._reader_task = asyncio.create_task(self._read_responses())
+        return self.encoding
+
+    async def _ensure_connected(self):
+        """Reconnect a connection the server (or a timed-out request) closed"""
+        if not self.connected:
+            if self.encoding is None or self._closed:
+                raise ConnectionError("MCP channel is not connected")
+            async with self._connect_lock:
+                if not self.connected:
+                    await self.connect()
+
+    async def request(self, message: Dict[str, Any]) -> Any:
+        """Send one request and wait for its response"""
+        await self._ensure_connected()
+        if self.encoding == 'unframed':
+            return await self._request_unframed(message)
+
+        self._next_id = self._next_id % 0xFFFFFFFF + 1
+        request_id = self._next_id
+        future = asyncio.get_running_loop().create_future()
+        pending = self.pending
+        pending[request_id] = future
+        try:
+            self.writer.write(encode_frame(FRAME_REQUEST, request_id, encode_body(self.encoding, message)))
+            await self.writer.drain()
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            pending.pop(request_id, None)
+
+    async def _request_unframed(self, message: Dict[str, Any]) -> Any:
+        async with self._unframed_lock:
+            # The previous request may have dropped the connection while this one waited
+            await self._ensure_connected()
+            messages = self._unframed_messages
+            try:
+                self.writer.write(json.dumps(message).encode('utf-8'))
+                await self.writer.drain()
+                while not messages:
+                    data = await asyncio.wait_for(self.reader.read(READ_CHUNK), self.timeout)
+                    if not data:
+                        raise ConnectionError("MCP server closed the connection")
+                    messages.extend(self._splitter.feed(data))
+            except BaseException:
+                # Timed out, cancelled or disconnected: the reply may still arrive, so
+                # drop the connection rather than hand it to the next request
+                self.writer.close()
+                messages.clear()
+                raise
+            return json.loads(messages.popleft())
+
+    async def _read_responses(self):
+        reader, writer, pending = self.reader, self.writer, self.pending
+        decoder = FrameDecoder()
+        error: Exception = ConnectionError("MCP server closed the connection")
+        try:
+            while True:
+                data = await reader.read(READ_CHUNK)
+                if not data:
+                    break
+                for kind, request_id, body in decoder.feed(data):
+                    future = pending.get(request_id)
+                    if kind != FRAME_RESPONSE or future is None or future.done():
+                        continue
+                    try:
+                        future.set_result(decode_body(self.encoding, body))
+                    except Exception as e:
+                        future.set_exception(ProtocolError(f"Undecodable response: {e}"))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+        finally:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            writer.close()
+
+    def close(self):
+        """Close the connection, failing any outstanding requests"""
+        self._closed = True
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self.writer is not None:
+            self.writer.close()
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("MCP channel closed"))
@@ -14,13 +14,15 @@ import sys
 import time
 import pickle
 import hashlib
+from collections import OrderedDict
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import threading
 from datetime import datetime
-import socket
 import struct
 from typing import Optional, Dict, Any, List, Union, Tuple
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
 # System packages with fallbacks
 try:
     import asyncpg
@@ -41,6 +43,9 @@ except ImportError:
     cosine_similarity = None
     logging.warning("sklearn not available - using numpy for similarity")
 
+from service_client import get_service_client
+from async_http import AsyncHTTPServer, HTTPRequest, Router
+
 # Configure production logging
 logging.basicConfig(
     level=logging.INFO,
@@ -67,18 +72,41 @@ SERVICE_HOST = '0.0.0.0'
 SERVICE_PORT = 8006
 REDIS_HOST = config.get('REDIS_HOST', 'localhost')
 REDIS_PORT = int(config.get('REDIS_PORT', '6379'))
+# Cache reads/writes give up after this long rather than hold up a search
+REDIS_SOCKET_TIMEOUT = float(config.get('REDIS_SOCKET_TIMEOUT', '0.25'))
 DB_HOST = config.get('DB_HOST', 'localhost')
 DB_PORT = int(config.get('DB_PORT', '5432'))
 DB_NAME = 'sovren_main'
 DB_USER = config.get('DB_USER', 'sovren')
 DB_PASS = config.get('DB_PASS', 'Renegades1!')
 
+# HTTP serving ('asyncio' or the legacy 'threaded' server)
+HTTP_SERVER_MODE = config.get('HTTP_SERVER_MODE', 'asyncio')
+HTTP_MAX_CONCURRENCY = int(config.get('HTTP_MAX_CONCURRENCY', '256'))  # requests running handlers at once
+HTTP_DRAIN_TIMEOUT = float(config.get('HTTP_DRAIN_TIMEOUT', '30'))  # seconds to finish in-flight requests on shutdown
+HTTP_MAX_BODY_SIZE = 64 * 1024 * 1024
+
 # Vector configuration
 EMBEDDING_DIM = 768
 INDEX_PATH = '/mnt/yellow-mackerel-volume/sovren/indexes/'
 CHUNK_SIZE = 512  # tokens per chunk
 OVERLAP_SIZE = 50  # token overlap between chunks
 
+# Vector storage: buffers start small and double up to the hard cap
+INITIAL_INDEX_CAPACITY = 1024
+MAX_INDEX_VECTORS = 10_000_000
+INDEX_SUFFIX = '.vidx'  # per-user index directory (legacy pickles use '.idx')
+
+# Approximate nearest-neighbour configuration ('exact' or 'ivf')
+VECTOR_INDEX_MODE = config.get('VECTOR_INDEX_MODE', 'exact')
+IVF_NLIST = int(config.get('IVF_NLIST', '1024'))  # number of coarse centroids
+IVF_NPROBE = int(config.get('IVF_NPROBE', '16'))  # lists scanned per query (recall/latency knob)
+IVF_MIN_TRAIN_SIZE = int(config.get('IVF_MIN_TRAIN_SIZE', '50000'))  # vectors before centroids are trained
+
+# Query cache configuration (process-local LRU, shared through Redis when available)
+QUERY_CACHE_SIZE = int(config.get('RAG_QUERY_CACHE_SIZE', '10000'))
+QUERY_CACHE_TTL = int(config.get('RAG_QUERY_CACHE_TTL', '300'))  # seconds
+
 # Service endpoints
 INTELLIGENCE_SERVICE = {'host': 'localhost', 'port': 8001}
 MEMORY_SERVICE = {'host': 'localhost', 'port': 8002}
@@ -87,22 +115,344 @@ MEMORY_SERVICE = {'host': 'localhost', 'port': 8002}
 redis_client: Optional[Any] = None
 db_pool: Optional[Any] = None
 
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, leaving zero rows untouched"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+def top_k_positions(similarities: np.ndarray, top_k: int) -> np.ndarray:
+    """Per-row top-k column positions of a (Q, N) score matrix, best first"""
+    top_k = min(top_k, similarities.shape[1])
+    if top_k <= 0:
+        return np.empty((similarities.shape[0], 0), dtype=np.int64)
+    
+    partitioned = np.argpartition(similarities, -top_k, axis=1)[:, -top_k:]
+    partitioned_scores = np.take_along_axis(similarities, partitioned, axis=1)
+    order = np.argsort(-partitioned_scores, axis=1, kind='stable')
+    return np.take_along_axis(partitioned, order, axis=1)
+
+class IVFFlatIndex:
+    """Inverted-file coarse quantizer used by B200VectorIndex in 'ivf' mode
+
+    Vectors are assigned to the nearest of ``nlist`` spherical k-means
+    centroids. A query only scans the ``nprobe`` closest inverted lists, and
+    the candidates are then scored exactly against the full-precision vectors.
+    """
+    
+    def __init__(self, dimension: int, nlist: int = IVF_NLIST, nprobe: int = IVF_NPROBE,
+                 min_train_size: int = IVF_MIN_TRAIN_SIZE, train_iterations: int = 10):
+        self.dimension = dimension
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.train_iterations = train_iterations
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[np.ndarray] = []
+    
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+    
+    def train(self, vectors: np.ndarray, seed: int = 0) -> None:
+        """Train centroids with spherical k-means on a sample of vectors"""
+        if len(vectors) == 0:
+            raise ValueError("Cannot train IVF index without vectors")
+        
+        rng = np.random.default_rng(seed)
+        nlist = min(self.nlist, len(vectors))
+        sample_size = min(len(vectors), nlist * 256)
+        sample = normalize_rows(
+            np.asarray(vectors[rng.choice(len(vectors), sample_size, replace=False)], dtype=np.float32)
+        )
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+        
+        for _ in range(self.train_iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignments, kind='stable')
+            sorted_assignments = assignments[order]
+            clusters, starts = np.unique(sorted_assignments, return_index=True)
+            
+            sums = np.zeros_like(centroids)
+            sums[clusters] = np.add.reduceat(sample[order], starts, axis=0)
+            
+            # Re-seed empty clusters from random sample points
+            empty = np.setdiff1d(np.arange(nlist), clusters)
+            if len(empty):
+                sums[empty] = sample[rng.choice(sample_size, len(empty))]
+            
+            centroids = normalize_rows(sums).astype(np.float32)
+        
+        self.centroids = centroids
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(nlist)]
+        logger.info(f"IVF index trained: {nlist} lists from {sample_size} vectors")
+    
+    def add(self, start_id: int, vectors: np.ndarray) -> None:
+        """Assign vectors with consecutive ids starting at start_id to inverted lists"""
+        if self.centroids is None:
+            raise ValueError("IVF index not trained")
+        
+        assignments = np.argmax(normalize_rows(vectors) @ self.centroids.T, axis=1)
+        ids = np.arange(start_id, start_id + len(vectors), dtype=np.int64)
+        for list_id in np.unique(assignments):
+            self.lists[list_id] = np.concatenate([self.lists[list_id], ids[assignments == list_id]])
+    
+    def candidates(self, query_norm: np.ndarray, nprobe: Optional[int] = None) -> np.ndarray:
+        """Return ids stored in the nprobe lists closest to the query"""
+        if self.centroids is None:
+            raise ValueError("IVF index not trained")
+        
+        nprobe = max(1, min(nprobe or self.nprobe, len(self.lists)))
+        centroid_scores = self.centroids @ query_norm
+        probe = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+        lists = self.lists
+        return np.concatenate([lists[list_id] for list_id in probe])
+    
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Array-only state for index persistence (ragged lists are flattened)"""
+        lengths = [len(ids) for ids in self.lists]
+        return {
+            'params': np.array([self.nlist, self.nprobe, self.min_train_size], dtype=np.int64),
+            'centroids': self.centroids,
+            'list_ids': np.concatenate(self.lists) if self.lists else np.empty(0, dtype=np.int64),
+            'list_offsets': np.cumsum([0] + lengths, dtype=np.int64)
+        }
+    
+    @classmethod
+    def from_state(cls, dimension: int, state: Dict[str, np.ndarray]) -> 'IVFFlatIndex':
+        nlist, nprobe, min_train_size = (int(value) for value in state['params'])
+        ivf = cls(dimension, nlist=nlist, nprobe=nprobe, min_train_size=min_train_size)
+        ivf.centroids = np.asarray(state['centroids'], dtype=np.float32)
+        offsets = state['list_offsets']
+        list_ids = state['list_ids']
+        ivf.lists = [np.array(list_ids[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+        return ivf
+
+class AttributeStore:
+    """Columnar store of filterable chunk attributes for a B200VectorIndex
+    
+    Categorical and multi-valued fields keep posting lists (value -> row ids)
+    so ``eq``/``in`` filters cost O(matches); numeric fields are NumPy
+    columns evaluated as vectorized masks, restricted to the rows that
+    survived the categorical filters.
+    
+    Filter syntax::
+    
+        {'doc_id': 'abc',                               # shorthand for eq
+         'source': {'in': ['crm', 'email']},
+         'tags': {'eq': 'board'},                       # row has the tag
+         'created_at': {'range': ['2024-01-01', None]}} # inclusive, open-ended
+    """
+    
+    CATEGORICAL_FIELDS = ('doc_id', 'source', 'doc_type')
+    MULTI_VALUED_FIELDS = ('tags',)
+    NUMERIC_FIELDS = ('created_at', 'chunk_index')
+    
+    def __init__(self):
+        self.size = 0
+        self.postings: Dict[str, Dict[Any, List[int]]] = {
+            field: {} for field in self.CATEGORICAL_FIELDS + self.MULTI_VALUED_FIELDS
+        }
+        self.columns: Dict[str, np.ndarray] = {
+            field: np.full(INITIAL_INDEX_CAPACITY, np.nan) for field in self.NUMERIC_FIELDS
+        }
+    
+    @staticmethod
+    def _to_number(value: Any) -> float:
+        """Convert numbers and ISO timestamps to float (NaN when missing)"""
+        if value is None:
+            return np.nan
+        if isinstance(value, (int, float)):
+            return float(value)
+        if isinstance(value, datetime):
+            return value.timestamp()
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except ValueError:
+            return np.nan
+    
+    @staticmethod
+    def _extract(meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Pull filterable attributes out of chunk metadata"""
+        inner = meta.get('metadata') or {}
+        return {
+            'doc_id': meta.get('doc_id'),
+            'source': meta.get('source', inner.get('source')),
+            'doc_type': inner.get('doc_type', meta.get('doc_type')),
+            'tags': inner.get('tags', meta.get('tags')) or [],
+            'created_at': inner.get('created_at', meta.get('created_at')),
+            'chunk_index': meta.get('chunk_index')
+        }
+    
+    def add(self, start: int, metadata: List[Dict[str, Any]]) -> None:
+        """Index attributes of rows start .. start + len(metadata)"""
+        end = start + len(metadata)
+        for field, column in self.columns.items():
+            if end > len(column):
+                grown = np.full(max(end, len(column) * 2), np.nan)
+                grown[:len(column)] = column
+                self.columns[field] = grown
+        
+        for row, meta in enumerate(metadata, start):
+            attributes = self._extract(meta)
+            for field in self.CATEGORICAL_FIELDS:
+                value = attributes[field]
+                if value is not None:
+                    self.postings[field].setdefault(value, []).append(row)
+            for field in self.MULTI_VALUED_FIELDS:
+                for value in set(attributes[field]):
+                    self.postings[field].setdefault(value, []).append(row)
+            for field in self.NUMERIC_FIELDS:
+                self.columns[field][row] = self._to_number(attributes[field])
+        
+        self.size = max(self.size, end)
+    
+    @staticmethod
+    def _check_operand(field: str, op: str, operand: Any) -> None:
+        """Reject operands the operator cannot use (ValueError, like unknown operators)"""
+        def scalar(value: Any) -> bool:
+            return value is None or isinstance(value, (str, int, float, bool))
+        
+        if op == 'in':
+            if not isinstance(operand, (list, tuple)) or not all(scalar(v) for v in operand):
+                raise ValueError(f"Filter {field}.in needs a list of scalar values")
+        elif op == 'range':
+            if not isinstance(operand, (list, tuple)) or len(operand) != 2 or not all(scalar(v) for v in operand):
+                raise ValueError(f"Filter {field}.range needs [low, high]")
+        elif not scalar(operand):
+            raise ValueError(f"Filter {field}.{op} needs a scalar value")
+    
+    def _posting(self, field: str, value: Any) -> np.ndarray:
+        return np.array(self.postings[field].get(value, ()), dtype=np.int64)
+    
+    def _numeric_mask(self, values: np.ndarray, op: str, operand: Any) -> np.ndarray:
+        if op == 'eq':
+            return values == self._to_number(operand)
+        if op == 'in':
+            return np.isin(values, [self._to_number(v) for v in operand])
+        if op == 'range':
+            low, high = operand
+            mask = np.ones(len(values), dtype=bool)
+            if low is not None:
+                mask &= values >= self._to_number(low)
+            if high is not None:
+                mask &= values <= self._to_number(high)
+            return mask
+        if op in ('gt', 'gte', 'lt', 'lte'):
+            bound = self._to_number(operand)
+            return {'gt': values > bound, 'gte': values >= bound,
+                    'lt': values < bound, 'lte': values <= bound}[op]
+        raise ValueError(f"Unsupported filter operator for numeric field: {op}")
+    
+    def compile(self, filters: Dict[str, Any], size: int) -> Optional[np.ndarray]:
+        """Compile a declarative filter into sorted candidate row ids below size
+        
+        Returns None when the filter places no restriction on rows.
+        """
+        candidates: Optional[np.ndarray] = None
+        numeric_conditions = []
+        if not isinstance(filters, dict):
+            raise ValueError("Filters must be an object of field conditions")
+        
+        for field, condition in filters.items():
+            if not isinstance(condition, dict):
+                condition = {'eq': condition}
+            for op, operand in condition.items():
+                self._check_operand(field, op, operand)
+                if field in self.postings:
+                    if op == 'eq':
+                        ids = self._posting(field, operand)
+                    elif op == 'in':
+                        postings = [self._posting(field, value) for value in operand]
+                        ids = np.unique(np.concatenate(postings)) if postings else np.empty(0, dtype=np.int64)
+                    else:
+                        raise ValueError(f"Unsupported filter operator for {field}: {op}")
+                    candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+                elif field in self.columns:
+                    numeric_conditions.append((field, op, operand))
+                else:
+                    raise ValueError(f"Unsupported filter field: {field}")
+        
+        if candidates is not None:
+            candidates = candidates[candidates < size]
+        
+        for field, op, operand in numeric_conditions:
+            column = self.columns[field][:size]
+            if candidates is None:
+                candidates = np.flatnonzero(self._numeric_mask(column, op, operand))
+            else:
+                candidates = candidates[self._numeric_mask(column[candidates], op, operand)]
+        
+        return candidates
+
 class B200VectorIndex:
-    """B200-optimized vector index for fast similarity search"""
+    """B200-optimized vector index for fast similarity search
+    
+    In 'exact' mode every stored vector is scored. In 'ivf' mode an
+    IVFFlatIndex is trained once the index holds ``IVF_MIN_TRAIN_SIZE``
+    vectors, after which searches only rerank the probed candidates.
+    
+    Vectors live in a buffer that grows geometrically. Once saved, the
+    buffer is a writable ``np.memmap`` over ``vectors.f32`` in the index
+    directory, so resident memory tracks the vectors actually touched and
+    later saves only append the rows and metadata added since.
+    """
     
-    def __init__(self, dimension: int = EMBEDDING_DIM):
+    def __init__(self, dimension: int = EMBEDDING_DIM, mode: str = VECTOR_INDEX_MODE,
+                 nlist: int = IVF_NLIST, nprobe: int = IVF_NPROBE,
+                 min_train_size: int = IVF_MIN_TRAIN_SIZE):
+        if mode not in ('exact', 'ivf'):
+            raise ValueError(f"Unknown vector index mode: {mode}")
+        
         self.dimension = dimension
+        self.mode = mode
         self.vectors: Optional[np.ndarray] = None
         self.metadata: List[Dict[str, Any]] = []
         self.index_size = 0
         self.index_path: Optional[str] = None
         self.lock = threading.Lock()
+        self.attributes = AttributeStore()
+        self.ann: Optional[IVFFlatIndex] = None
+        if mode == 'ivf':
+            self.ann = IVFFlatIndex(dimension, nlist=nlist, nprobe=nprobe, min_train_size=min_train_size)
+        
+        # On-disk state backing self.vectors (see save/load)
+        self._storage_path: Optional[str] = None
+        self._persisted_size = 0
+        self._metadata_bytes = 0
         
-        # Pre-allocate large numpy array for B200 efficiency
-        self.max_vectors = 10_000_000  # 10M vectors
-        self.vectors = np.zeros((self.max_vectors, dimension), dtype=np.float32)
+        # Grow geometrically up to the hard cap instead of pre-allocating it
+        self.max_vectors = MAX_INDEX_VECTORS
+        self.vectors = np.zeros((min(INITIAL_INDEX_CAPACITY, self.max_vectors), dimension), dtype=np.float32)
         
-        logger.info(f"Vector index initialized: {dimension}D, capacity: {self.max_vectors}")
+        logger.debug(f"Vector index initialized: {dimension}D, mode: {mode}, max vectors: {self.max_vectors}")
+    
+    @property
+    def capacity(self) -> int:
+        """Number of rows currently allocated"""
+        return len(self.vectors) if self.vectors is not None else 0
+    
+    def _ensure_capacity(self, required: int) -> None:
+        """Grow the vector buffer geometrically to hold required rows (lock must be held)"""
+        if required > self.max_vectors:
+            raise ValueError("Index capacity exceeded")
+        if self.vectors is None or required <= len(self.vectors):
+            return
+        
+        new_capacity = min(self.max_vectors, max(required, len(self.vectors) * 2))
+        
+        if self._storage_path is not None:
+            # Extend the (sparse) backing file and remap; readers keep the old map alive
+            vector_file = os.path.join(self._storage_path, 'vectors.f32')
+            self.vectors.flush()
+            with open(vector_file, 'r+b') as f:
+                f.truncate(new_capacity * self.dimension * 4)
+            self.vectors = np.memmap(vector_file, dtype=np.float32, mode='r+',
+                                     shape=(new_capacity, self.dimension))
+        else:
+            grown = np.zeros((new_capacity, self.dimension), dtype=np.float32)
+            grown[:self.index_size] = self.vectors[:self.index_size]
+            self.vectors = grown
     
     def add_vectors(self, vectors: List[List[float]], metadata: List[Dict[str, Any]]) -> bool:
         """Add vectors to index"""
@@ -111,99 +461,401 @@ class B200VectorIndex:
             
         with self.lock:
             n_vectors = len(vectors)
-            if self.index_size + n_vectors > self.max_vectors:
-                raise ValueError("Index capacity exceeded")
+            self._ensure_capacity(self.index_size + n_vectors)
             
             # Convert vectors to numpy array
             vectors_array = np.array(vectors, dtype=np.float32)
+            start = self.index_size
             
             # Add vectors
-            self.vectors[self.index_size:self.index_size + n_vectors] = vectors_array
+            self.vectors[start:start + n_vectors] = vectors_array
             
             # Add metadata
             for meta in metadata:
                 meta['index'] = self.index_size + len(self.metadata)
                 self.metadata.append(meta)
+            self.attributes.add(start, metadata)
             
             self.index_size += n_vectors
             
+            # Maintain the ANN structure
+            if self.ann is not None:
+                if self.ann.is_trained:
+                    self.ann.add(start, vectors_array)
+                elif self.index_size >= self.ann.min_train_size:
+                    self._train_ann_locked()
+            
             logger.debug(f"Added {n_vectors} vectors, total: {self.index_size}")
             return True
     
-    def search(self, query_vector: np.ndarray, top_k: int = 10, filter_func: Optional[Any] = None) -> List[Dict[str, Any]]:
-        """Search for similar vectors using B200 acceleration"""
+    def train_ann(self) -> None:
+        """Train (or retrain) the ANN structure on the vectors currently stored"""
+        if self.ann is None:
+            raise ValueError("ANN training requires 'ivf' mode")
+        
+        with self.lock:
+            self._train_ann_locked()
+    
+    def _train_ann_locked(self) -> None:
+        """Train ANN structure and assign every stored vector (lock must be held)"""
+        if self.ann is None or self.vectors is None or self.index_size == 0:
+            return
+        
+        active_vectors = self.vectors[:self.index_size]
+        self.ann.train(active_vectors)
+        self.ann.add(0, active_vectors)
+    
+    def _snapshot(self) -> Tuple[int, np.ndarray, List[Dict[str, Any]], Optional[IVFFlatIndex]]:
+        """Capture searchable state under the lock
+        
+        Rows below index_size are never rewritten, so searches can run on
+        the snapshot without holding the lock and don't serialize.
+        """
+        with self.lock:
+            size = self.index_size
+            ann = self.ann if self.ann is not None and self.ann.is_trained else None
+            return size, self.vectors[:size], self.metadata, ann
+    
+    def _candidate_rows(self, query_norms: np.ndarray, size: int, ann: Optional[IVFFlatIndex],
+                        filters: Optional[Dict[str, Any]], nprobe: Optional[int]) -> Optional[np.ndarray]:
+        """Rows to score for a batch of normalized queries (None means every row)"""
+        # Pre-filter candidate rows from the attribute columns
+        candidates = self.attributes.compile(filters, size) if filters else None
+        
+        if ann is not None:
+            probed = np.unique(np.concatenate([ann.candidates(q, nprobe) for q in query_norms]))
+            probed = probed[probed < size]
+            if candidates is None:
+                candidates = probed
+            elif len(candidates) > len(probed):
+                # Selective filters are cheaper to score exactly than to intersect
+                candidates = np.intersect1d(probed, candidates)
+        
+        return candidates
+    
+    def score_many(self, query_norms: np.ndarray, filters: Optional[Dict[str, Any]] = None,
+                   nprobe: Optional[int] = None) -> Tuple[Optional[np.ndarray], np.ndarray, List[Dict[str, Any]], np.ndarray]:
+        """Score a (Q, dimension) batch of normalized queries in one matrix product
+        
+        Returns ``(rows, similarities, metadata, vectors)`` where
+        ``similarities`` is (Q, len(rows)) and rows is None when every stored
+        vector was scored.
+        """
+        size, active_vectors, metadata, ann = self._snapshot()
+        rows = self._candidate_rows(query_norms, size, ann, filters, nprobe)
+        scored = active_vectors if rows is None else active_vectors[rows]
+        similarities = np.dot(query_norms, scored.T)
+        return rows, similarities, metadata, active_vectors
+    
+    def search(self, query_vector: np.ndarray, top_k: int = 10, filter_func: Optional[Any] = None,
+               nprobe: Optional[int] = None, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search for similar vectors using B200 acceleration
+        
+        ``filters`` is a declarative filter compiled by AttributeStore, so
+        only matching rows are scored. ``filter_func`` is still accepted for
+        arbitrary predicates but costs one Python call per scored row.
+        ``nprobe`` overrides the number of inverted lists scanned in 'ivf'
+        mode; higher values trade latency for recall.
+        """
         if self.index_size == 0 or self.vectors is None:
             return []
         
-        with self.lock:
-            # Normalize query vector
-            query_norm = query_vector / np.linalg.norm(query_vector)
-            
-            # Compute similarities using vectorized operations
-            # This would use CUDA kernels on B200 in full implementation
-            active_vectors = self.vectors[:self.index_size]
-            
-            # Batch compute for B200 efficiency
+        size, active_vectors, metadata, ann = self._snapshot()
+        
+        # Normalize query vector; float32 so the dot doesn't upcast the whole matrix
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        query_norm = query_vector / np.linalg.norm(query_vector)
+        candidates = self._candidate_rows(query_norm[np.newaxis, :], size, ann, filters, nprobe)
+        
+        # Compute similarities using vectorized operations
+        # This would use CUDA kernels on B200 in full implementation
+        if candidates is not None:
+            # Exact rerank of the candidate rows
+            similarities = np.dot(active_vectors[candidates], query_norm)
+        else:
             similarities = np.dot(active_vectors, query_norm)
-            
-            # Apply filter if provided
-            if filter_func:
-                mask = np.array([filter_func(self.metadata[i]) for i in range(self.index_size)])
-                similarities = similarities * mask
-            
-            # Get top-k indices
-            top_indices = np.argpartition(similarities, -top_k)[-top_k:]
-            top_indices = top_indices[np.argsort(similarities[top_indices])][::-1]
-            
-            # Build results
+        
+        # Apply filter if provided
+        if filter_func:
+            rows = candidates if candidates is not None else range(size)
+            mask = np.array([filter_func(metadata[i]) for i in rows], dtype=bool)
+            similarities = similarities * mask
+        
+        top_k = min(top_k, len(similarities))
+        if top_k <= 0:
+            return []
+        
+        # Get top-k indices
+        top_positions = np.argpartition(similarities, -top_k)[-top_k:]
+        top_positions = top_positions[np.argsort(similarities[top_positions])][::-1]
+        
+        # Build results
+        results = []
+        for pos in top_positions:
+            if similarities[pos] > 0:
+                idx = int(candidates[pos]) if candidates is not None else int(pos)
+                results.append({
+                    'score': float(similarities[pos]),
+                    'metadata': metadata[idx],
+                    'vector': active_vectors[idx].tolist()
+                })
+        
+        return results
+    
+    def search_many(self, query_vectors: np.ndarray, top_k: int = 10, filters: Optional[Dict[str, Any]] = None,
+                    nprobe: Optional[int] = None) -> List[List[Dict[str, Any]]]:
+        """Search a batch of queries with one queries x vectors matrix product"""
+        query_vectors = np.asarray(query_vectors, dtype=np.float32)
+        if self.index_size == 0 or self.vectors is None:
+            return [[] for _ in range(len(query_vectors))]
+        
+        query_norms = normalize_rows(query_vectors)
+        rows, similarities, metadata, active_vectors = self.score_many(query_norms, filters, nprobe)
+        top_positions = top_k_positions(similarities, top_k)
+        
+        batch_results = []
+        for query_idx, positions in enumerate(top_positions):
             results = []
-            for idx in top_indices:
-                if similarities[idx] > 0:
+            for pos in positions:
+                score = similarities[query_idx, pos]
+                if score > 0:
+                    idx = int(rows[pos]) if rows is not None else int(pos)
                     results.append({
-                        'score': float(similarities[idx]),
-                        'metadata': self.metadata[idx],
+                        'score': float(score),
+                        'metadata': metadata[idx],
                         'vector': active_vectors[idx].tolist()
                     })
-            
-            return results
+            batch_results.append(results)
+        
+        return batch_results
     
     def save(self, path: str) -> None:
-        """Save index to disk"""
+        """Save index to an on-disk directory
+        
+        Layout: ``vectors.f32`` (raw float32 rows), ``metadata.jsonl``
+        (append-only sidecar), ``ann.npz`` (IVF state) and ``manifest.json``,
+        which is replaced atomically last and is the source of truth for
+        how many rows are valid.
+        """
         if self.vectors is None:
             raise ValueError("Vector array not initialized")
             
         with self.lock:
-            index_data = {
-                'vectors': self.vectors[:self.index_size],
-                'metadata': self.metadata,
+            os.makedirs(path, exist_ok=True)
+            vector_file = os.path.join(path, 'vectors.f32')
+            metadata_file = os.path.join(path, 'metadata.jsonl')
+            
+            if self._storage_path != path:
+                # First save to this location: write everything, then serve from the file
+                with open(vector_file, 'wb') as f:
+                    f.write(np.ascontiguousarray(self.vectors[:self.index_size]).tobytes())
+                    f.truncate(self.capacity * self.dimension * 4)
+                self.vectors = np.memmap(vector_file, dtype=np.float32, mode='r+',
+                                         shape=(self.capacity, self.dimension))
+                self._storage_path = path
+                self._persisted_size = 0
+                self._metadata_bytes = 0
+            
+            self.vectors.flush()
+            
+            # Append metadata for rows added since the last save, dropping any torn tail
+            with open(metadata_file, 'r+b' if os.path.exists(metadata_file) else 'wb') as f:
+                f.seek(self._metadata_bytes)
+                f.truncate()
+                for meta in self.metadata[self._persisted_size:self.index_size]:
+                    f.write(json.dumps(meta, default=str).encode('utf-8') + b'\n')
+                f.flush()
+                os.fsync(f.fileno())
+                metadata_bytes = f.tell()
+            
+            if self.ann is not None and self.ann.is_trained:
+                with open(os.path.join(path, 'ann.npz'), 'wb') as f:
+                    np.savez(f, **self.ann.get_state())
+            
+            manifest = {
+                'format': 1,
                 'dimension': self.dimension,
-                'size': self.index_size
+                'size': self.index_size,
+                'mode': self.mode,
+                'metadata_bytes': metadata_bytes,
+                'saved_at': datetime.now().isoformat()
             }
+            manifest_tmp = os.path.join(path, 'manifest.json.tmp')
+            with open(manifest_tmp, 'w') as f:
+                json.dump(manifest, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(manifest_tmp, os.path.join(path, 'manifest.json'))
             
-            with open(path, 'wb') as f:
-                pickle.dump(index_data, f, protocol=pickle.HIGHEST_PROTOCOL)
-            
+            appended = self.index_size - self._persisted_size
+            self._persisted_size = self.index_size
+            self._metadata_bytes = metadata_bytes
             self.index_path = path
-            logger.info(f"Index saved: {path} ({self.index_size} vectors)")
+            logger.info(f"Index saved: {path} ({self.index_size} vectors, {appended} appended)")
     
     def load(self, path: str) -> None:
-        """Load index from disk"""
-        if self.vectors is None:
-            raise ValueError("Vector array not initialized")
+        """Load index from disk, memory-mapping the vector file"""
+        if os.path.isfile(path):
+            self._load_legacy(path)
+            return
+        
+        with self.lock:
+            with open(os.path.join(path, 'manifest.json'), 'r') as f:
+                manifest = json.load(f)
+            
+            self.dimension = manifest['dimension']
+            size = manifest['size']
             
+            vector_file = os.path.join(path, 'vectors.f32')
+            capacity = max(os.path.getsize(vector_file) // (self.dimension * 4), size, 1)
+            if os.path.getsize(vector_file) < capacity * self.dimension * 4:
+                with open(vector_file, 'r+b') as f:
+                    f.truncate(capacity * self.dimension * 4)
+            
+            with open(os.path.join(path, 'metadata.jsonl'), 'rb') as f:
+                raw_metadata = f.read(manifest['metadata_bytes'])
+            metadata = [json.loads(line) for line in raw_metadata.splitlines()[:size]]
+            if len(metadata) != size:
+                raise ValueError(f"Index metadata truncated: {len(metadata)} of {size} records")
+            
+            # Zero-copy: pages are faulted in on demand by searches
+            self.vectors = np.memmap(vector_file, dtype=np.float32, mode='r+',
+                                     shape=(capacity, self.dimension))
+            self.metadata = metadata
+            self.attributes = AttributeStore()
+            self.attributes.add(0, metadata)
+            self.index_size = size
+            self._storage_path = path
+            self._persisted_size = size
+            self._metadata_bytes = manifest['metadata_bytes']
+            
+            # Restore ANN structure, or rebuild it if the configured mode changed
+            ann_file = os.path.join(path, 'ann.npz')
+            if self.mode == 'ivf' and os.path.exists(ann_file):
+                with np.load(ann_file) as ann_state:
+                    self.ann = IVFFlatIndex.from_state(self.dimension, dict(ann_state))
+            elif self.ann is not None and self.index_size >= self.ann.min_train_size:
+                self._train_ann_locked()
+            
+            self.index_path = path
+            logger.info(f"Index loaded: {path} ({self.index_size} vectors)")
+    
+    def _load_legacy(self, path: str) -> None:
+        """Load a pickled index written before the directory layout existed"""
         with self.lock:
             with open(path, 'rb') as f:
                 index_data = pickle.load(f)
             
             self.dimension = index_data['dimension']
+            self.index_size = 0
+            self.vectors = np.zeros((min(INITIAL_INDEX_CAPACITY, self.max_vectors), self.dimension), dtype=np.float32)
+            self._storage_path = None
+            self._ensure_capacity(index_data['size'])
+            self.vectors[:index_data['size']] = index_data['vectors']
             self.index_size = index_data['size']
             self.metadata = index_data['metadata']
+            self.attributes = AttributeStore()
+            self.attributes.add(0, self.metadata)
             
-            # Copy vectors to pre-allocated array
-            self.vectors[:self.index_size] = index_data['vectors']
+            if self.ann is not None and self.index_size >= self.ann.min_train_size:
+                self._train_ann_locked()
             
             self.index_path = path
-            logger.info(f"Index loaded: {path} ({self.index_size} vectors)")
+            logger.info(f"Legacy index loaded: {path} ({self.index_size} vectors)")
+
+class QueryCache:
+    """Bounded LRU cache with TTL for query embeddings and search results
+    
+    Entries live in a process-local OrderedDict; when Redis is connected
+    they are also written there so other RAG workers can reuse them.
+    Redis calls are blocking, so they run in a worker thread and a slow
+    Redis only delays the request that is waiting on it.
+    Result keys embed the index versions they were computed against, so
+    adding documents invalidates them without explicit purges.
+    """
+    
+    def __init__(self, namespace: str, max_entries: int = QUERY_CACHE_SIZE, ttl: int = QUERY_CACHE_TTL):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self.lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.evictions = 0
+    
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable key for JSON-serializable parts (dict order doesn't matter)"""
+        canonical = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+    
+    def _redis_key(self, key: str) -> str:
+        return f"sovren:rag:{self.namespace}:{key}"
+    
+    def _store_local(self, key: str, value: Any) -> None:
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+    
+    async def get(self, key: str) -> Optional[Any]:
+        """Return cached value or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.time():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+        
+        if redis_client is not None:
+            try:
+                raw = await asyncio.to_thread(redis_client.get, self._redis_key(key))
+            except Exception as e:
+                logger.debug(f"Redis cache read failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self._store_local(key, value)
+                with self.lock:
+                    self.hits += 1
+                    self.redis_hits += 1
+                return value
+        
+        with self.lock:
+            self.misses += 1
+        return None
+    
+    async def set(self, key: str, value: Any) -> None:
+        """Cache a JSON-serializable value"""
+        self._store_local(key, value)
+        
+        if redis_client is not None:
+            try:
+                await asyncio.to_thread(redis_client.setex, self._redis_key(key), self.ttl, json.dumps(value))
+            except Exception as e:
+                logger.debug(f"Redis cache write failed: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'redis_hits': self.redis_hits,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
 
 class DocumentProcessor:
     """Process documents for RAG pipeline"""
@@ -231,13 +883,16 @@ class DocumentProcessor:
             
             # Prepare chunk data
             chunk_data = []
-            doc_id = hashlib.sha256(
+            # Streamed uploads send one document in parts that share a doc_id
+            doc_id = document.get('doc_id') or hashlib.sha256(
                 f"{user_id}:{document.get('title', 'untitled')}:{time.time()}".encode()
             ).hexdigest()[:16]
+            part = document.get('part')
+            chunk_prefix = doc_id if part is None else f"{doc_id}_part_{part}"
             
             for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
                 chunk_data.append({
-                    'chunk_id': f"{doc_id}_chunk_{i}",
+                    'chunk_id': f"{chunk_prefix}_chunk_{i}",
                     'doc_id': doc_id,
                     'user_id': user_id,
                     'title': document.get('title', 'Untitled'),
@@ -254,6 +909,7 @@ class DocumentProcessor:
             
             return {
                 'doc_id': doc_id,
+                'part': part,
                 'chunks': chunk_data,
                 'total_chunks': len(chunk_data)
             }
@@ -277,25 +933,31 @@ class DocumentProcessor:
     
     async def _generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings using intelligence service"""
+        embeddings = await self._request_embeddings(texts)
+        if embeddings is None:
+            # Fallback to random embeddings
+            return [np.random.randn(EMBEDDING_DIM).tolist() for _ in texts]
+        return embeddings
+    
+    async def _request_embeddings(self, texts: List[str]) -> Optional[List[List[float]]]:
+        """Call the intelligence service /embed endpoint; None if it failed"""
         try:
             # Call intelligence service
             response = await self._call_service(
                 INTELLIGENCE_SERVICE,
                 'POST',
                 '/embed',
-                {'texts': texts}
+                {'texts': texts},
+                idempotent=True
             )
             
             if 'embeddings' in response:
                 return response['embeddings']
-            else:
-                # Fallback to random embeddings
-                return [np.random.randn(EMBEDDING_DIM).tolist() for _ in texts]
+            return None
                 
         except Exception as e:
             logger.error(f"Embedding generation error: {e}")
-            # Return random embeddings as fallback
-            return [np.random.randn(EMBEDDING_DIM).tolist() for _ in texts]
+            return None
     
     async def _fetch_url_content(self, url: str) -> str:
         """Fetch content from URL"""
@@ -303,42 +965,11 @@ class DocumentProcessor:
         # For now, return placeholder
         return f"Content from URL: {url}"
     
-    async def _call_service(self, service: Dict[str, Any], method: str, path: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Call another service"""
+    async def _call_service(self, service: Dict[str, Any], method: str, path: str, data: Optional[Dict[str, Any]] = None,
+                            idempotent: Optional[bool] = None) -> Dict[str, Any]:
+        """Call another service over the shared keep-alive client"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(30)
-            sock.connect((service['host'], service['port']))
-            
-            if data:
-                body = json.dumps(data).encode('utf-8')
-                request = f"{method} {path} HTTP/1.1\r\n"
-                request += f"Host: {service['host']}\r\n"
-                request += "Content-Type: application/json\r\n"
-                request += f"Content-Length: {len(body)}\r\n"
-                request += "Connection: close\r\n\r\n"
-                sock.send(request.encode() + body)
-            else:
-                request = f"{method} {path} HTTP/1.1\r\n"
-                request += f"Host: {service['host']}\r\n"
-                request += "Connection: close\r\n\r\n"
-                sock.send(request.encode())
-            
-            response = b''
-            while True:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    break
-                response += chunk
-            
-            sock.close()
-            
-            if b'\r\n\r\n' in response:
-                _, body = response.split(b'\r\n\r\n', 1)
-                return json.loads(body.decode('utf-8'))
-            
-            return {}
-            
+            return await get_service_client().request(service, method, path, data, idempotent=idempotent)
         except Exception as e:
             logger.error(f"Service call error: {e}")
             return {}
@@ -348,31 +979,43 @@ class RAGEngine:
     
     def __init__(self):
         self.indexes: Dict[str, B200VectorIndex] = {}  # user_id -> vector_index
+        self.index_paths: Dict[str, str] = {}  # user_id -> on-disk index, opened lazily
         self.document_processor = DocumentProcessor()
         self.default_index = B200VectorIndex()
+        self.embedding_cache = QueryCache('embedding')
+        self.result_cache = QueryCache('results')
         
         # Load existing indexes
         self._load_indexes()
     
     def _load_indexes(self) -> None:
-        """Load existing indexes from disk"""
+        """Discover existing indexes on disk; each is opened on first use"""
         os.makedirs(INDEX_PATH, exist_ok=True)
         
         for filename in os.listdir(INDEX_PATH):
-            if filename.endswith('.idx'):
+            if filename.endswith(INDEX_SUFFIX):
+                user_id = filename[:-len(INDEX_SUFFIX)]
+                self.index_paths[user_id] = os.path.join(INDEX_PATH, filename)
+            elif filename.endswith('.idx'):
+                # Legacy pickle; migrated to the directory layout on next save
+                user_id = filename[:-len('.idx')]
+                self.index_paths.setdefault(user_id, os.path.join(INDEX_PATH, filename))
+        
+        logger.info(f"Discovered {len(self.index_paths)} user indexes")
+    
+    async def get_user_index(self, user_id: str) -> B200VectorIndex:
+        """Get or create index for user, loading it from disk off the event loop"""
+        if user_id not in self.indexes:
+            index = B200VectorIndex()
+            path = self.index_paths.get(user_id)
+            if path is not None:
                 try:
-                    user_id = filename.replace('.idx', '')
-                    index = B200VectorIndex()
-                    index.load(os.path.join(INDEX_PATH, filename))
-                    self.indexes[user_id] = index
+                    await asyncio.to_thread(index.load, path)
                     logger.info(f"Loaded index for user {user_id}")
                 except Exception as e:
-                    logger.error(f"Failed to load index {filename}: {e}")
-    
-    def get_user_index(self, user_id: str) -> B200VectorIndex:
-        """Get or create index for user"""
-        if user_id not in self.indexes:
-            self.indexes[user_id] = B200VectorIndex()
+                    logger.error(f"Failed to load index {path}: {e}")
+            # A concurrent request may have loaded the same index meanwhile; keep the first
+            self.indexes.setdefault(user_id, index)
         return self.indexes[user_id]
     
     async def add_document(self, user_id: str, document: Dict[str, Any]) -> Dict[str, Any]:
@@ -384,7 +1027,7 @@ class RAGEngine:
             return result
         
         # Get user index
-        index = self.get_user_index(user_id)
+        index = await self.get_user_index(user_id)
         
         # Add chunks to index
         vectors = [chunk['embedding'] for chunk in result['chunks']]
@@ -392,16 +1035,21 @@ class RAGEngine:
             'chunk_id': chunk['chunk_id'],
             'doc_id': chunk['doc_id'],
             'title': chunk['title'],
+            'source': chunk['source'],
             'text': chunk['text'],
             'chunk_index': chunk['chunk_index'],
             'metadata': chunk['metadata']
         } for chunk in result['chunks']]
         
-        index.add_vectors(vectors, metadata)
+        index_path = os.path.join(INDEX_PATH, f"{user_id}{INDEX_SUFFIX}")
+        
+        def add_and_save():
+            index.add_vectors(vectors, metadata)
+            index.save(index_path)
         
-        # Save index
-        index_path = os.path.join(INDEX_PATH, f"{user_id}.idx")
-        index.save(index_path)
+        # Add and persist off the event loop
+        await asyncio.to_thread(add_and_save)
+        self.index_paths[user_id] = index_path
         
         # Store document metadata in database
         await self._store_document_metadata(result)
@@ -412,30 +1060,77 @@ class RAGEngine:
             'status': 'indexed'
         }
     
+    async def embed_queries(self, queries: List[str]) -> Tuple[List[List[float]], List[bool]]:
+        """Embed queries, only calling the intelligence service for cache misses
+        
+        Returns the embeddings and, per query, whether it is a random
+        fallback (the service was unavailable); results computed from a
+        fallback must not be cached.
+        """
+        keys = [QueryCache.make_key(query) for query in queries]
+        embeddings: List[Optional[List[float]]] = list(
+            await asyncio.gather(*(self.embedding_cache.get(key) for key in keys)))
+        fallback = [False] * len(queries)
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing:
+            generated = await self.document_processor._request_embeddings([queries[i] for i in missing])
+            if generated is None:
+                # Random fallback vectors are never cached
+                for i in missing:
+                    embeddings[i] = np.random.randn(EMBEDDING_DIM).tolist()
+                    fallback[i] = True
+            else:
+                if len(generated) != len(missing):
+                    raise RuntimeError(f"Intelligence service returned {len(generated)} embeddings "
+                                       f"for {len(missing)} queries")
+                for i, embedding in zip(missing, generated):
+                    embeddings[i] = embedding
+                await asyncio.gather(*(self.embedding_cache.set(keys[i], embeddings[i]) for i in missing))
+        
+        return embeddings, fallback  # type: ignore[return-value]
+    
+    def _result_cache_key(self, kind: str, user_id: str, index: B200VectorIndex, query: str, top_k: int,
+                          filters: Optional[Dict[str, Any]]) -> str:
+        """Result cache key, scoped to the current user and shared index contents
+        
+        Indexes are append-only, so their sizes identify their contents in
+        every worker sharing Redis (a per-process counter would not).
+        """
+        return QueryCache.make_key(kind, user_id, index.index_size, self.default_index.index_size, query, top_k,
+                                   filters)
+    
     async def search(self, user_id: str, query: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Search user's knowledge base"""
         # Get user index
-        index = self.get_user_index(user_id)
+        index = await self.get_user_index(user_id)
         
         if index.index_size == 0:
             # Also check default/shared index
             if self.default_index.index_size == 0:
                 return {'results': [], 'message': 'No documents indexed'}
         
+        cache_key = self._result_cache_key('search', user_id, index, query, top_k, filters)
+        cached = await self.result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Generate query embedding
-        embeddings = await self.document_processor._generate_embeddings([query])
+        embeddings, fallback = await self.embed_queries([query])
         query_embedding = np.array(embeddings[0])
         
-        # Search user index
-        user_results = index.search(query_embedding, top_k, filters)
+        # Search user index; filters are declarative (see AttributeStore)
+        # Scoring runs off the event loop; NumPy releases the GIL
+        user_results = await asyncio.to_thread(index.search, query_embedding, top_k, filters=filters)
         
         # Also search default index if needed
         default_results = []
         if len(user_results) < top_k:
-            default_results = self.default_index.search(
+            default_results = await asyncio.to_thread(
+                self.default_index.search,
                 query_embedding, 
                 top_k - len(user_results),
-                filters
+                filters=filters
             )
         
         # Combine and sort results
@@ -443,22 +1138,87 @@ class RAGEngine:
         all_results.sort(key=lambda x: x['score'], reverse=True)
         
         # Format results
-        formatted_results = []
-        for result in all_results[:top_k]:
-            formatted_results.append({
-                'chunk_id': result['metadata']['chunk_id'],
-                'doc_id': result['metadata']['doc_id'],
-                'title': result['metadata']['title'],
-                'text': result['metadata']['text'],
-                'score': result['score'],
-                'metadata': result['metadata']['metadata']
-            })
+        formatted_results = [
+            self._format_result(result['score'], result['metadata'])
+            for result in all_results[:top_k]
+        ]
         
-        return {
+        response = {
             'query': query,
             'results': formatted_results,
             'total_results': len(formatted_results)
         }
+        if not fallback[0]:
+            await self.result_cache.set(cache_key, response)
+        return response
+    
+    async def search_many(self, user_id: str, queries: List[str], top_k: int = 10,
+                          filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Search user's knowledge base for a batch of queries
+        
+        All uncached queries are embedded in one /embed call and scored
+        against the user index and the shared index with one matrix product
+        each; the per-query top-k is then taken over both indexes in a
+        single pass.
+        """
+        if not queries:
+            return []
+        
+        index = await self.get_user_index(user_id)
+        indexes = [i for i in (index, self.default_index) if i.index_size > 0]
+        if not indexes:
+            return [{'query': query, 'results': [], 'message': 'No documents indexed'} for query in queries]
+        
+        cache_keys = [self._result_cache_key('search_many', user_id, index, query, top_k, filters) for query in queries]
+        cached_results = list(await asyncio.gather(*(self.result_cache.get(key) for key in cache_keys)))
+        pending = [i for i, cached in enumerate(cached_results) if cached is None]
+        if not pending:
+            return cached_results
+        
+        # Generate all missing query embeddings in one call
+        embeddings, fallback = await self.embed_queries([queries[i] for i in pending])
+        query_norms = normalize_rows(np.array(embeddings, dtype=np.float32))
+        
+        scored = await asyncio.to_thread(lambda: [i.score_many(query_norms, filters=filters) for i in indexes])
+        similarities = np.hstack([part[1] for part in scored])
+        # Column offset of each index inside the merged score matrix
+        offsets = np.cumsum([0] + [part[1].shape[1] for part in scored])
+        top_positions = top_k_positions(similarities, top_k)
+        
+        for query_idx, pending_idx in enumerate(pending):
+            formatted_results = []
+            for pos in top_positions[query_idx]:
+                score = similarities[query_idx, pos]
+                if score <= 0:
+                    continue
+                part = int(np.searchsorted(offsets, pos, side='right')) - 1
+                rows, _, metadata, _ = scored[part]
+                local = int(pos - offsets[part])
+                idx = int(rows[local]) if rows is not None else local
+                formatted_results.append(self._format_result(float(score), metadata[idx]))
+            
+            response = {
+                'query': queries[pending_idx],
+                'results': formatted_results,
+                'total_results': len(formatted_results)
+            }
+            cached_results[pending_idx] = response
+        
+        await asyncio.gather(*(self.result_cache.set(cache_keys[i], cached_results[i])
+                               for i, random_vector in zip(pending, fallback) if not random_vector))
+        return cached_results
+    
+    @staticmethod
+    def _format_result(score: float, meta: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape an index hit for API responses"""
+        return {
+            'chunk_id': meta['chunk_id'],
+            'doc_id': meta['doc_id'],
+            'title': meta['title'],
+            'text': meta['text'],
+            'score': score,
+            'metadata': meta['metadata']
+        }
     
     async def generate_answer(self, user_id: str, query: str, context_results: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """Generate answer using retrieval-augmented generation"""
@@ -529,14 +1289,16 @@ Answer:"""
                         chunk_count, created_at
                     ) VALUES ($1, $2, $3, $4, $5, $6)
                     ON CONFLICT (doc_id) DO UPDATE
-                    SET chunk_count = $5, updated_at = CURRENT_TIMESTAMP
+                    SET chunk_count = CASE WHEN $7 THEN documents.chunk_count + $5 ELSE $5 END,
+                        updated_at = CURRENT_TIMESTAMP
                 """, 
                 doc_data['doc_id'],
                 doc_data['chunks'][0]['user_id'],
                 doc_data['chunks'][0]['title'],
                 doc_data['chunks'][0]['source'],
                 doc_data['total_chunks'],
-                datetime.now()
+                datetime.now(),
+                doc_data.get('part') is not None  # parts of a streamed upload add up
                 )
                 
                 logger.debug(f"Stored metadata for document {doc_data['doc_id']}")
@@ -547,238 +1309,266 @@ Answer:"""
 # Global RAG engine
 rag_engine: Optional[RAGEngine] = None
 
-class RAGHandler(BaseHTTPRequestHandler):
-    """Production RAG service handler"""
+def _require_engine() -> Optional[Tuple[int, Dict[str, Any]]]:
+    if rag_engine is None:
+        return 500, {'error': 'RAG engine not initialized'}
+    return None
+
+async def handle_health_check(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Service health check"""
+    health = {
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'service': 'rag-service',
+        'indexes_loaded': len(rag_engine.indexes) if rag_engine else 0,
+        'default_index_size': rag_engine.default_index.index_size if rag_engine else 0
+    }
+    if http_server is not None:
+        health['server'] = http_server.get_stats()
     
-    def do_GET(self):
-        """Handle GET requests"""
-        try:
-            if self.path == '/health':
-                self._handle_health_check()
-            elif self.path == '/stats':
-                self._handle_stats()
-            elif self.path.startswith('/documents/'):
-                self._handle_list_documents()
-            else:
-                self.send_error(404, "Not Found")
-        except Exception as e:
-            logger.error(f"GET error: {e}")
-            self.send_error(500, str(e))
+    return 200, health
+
+async def handle_stats(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Get RAG statistics"""
+    stats = {
+        'total_users': len(set(rag_engine.indexes) | set(rag_engine.index_paths)) if rag_engine else 0,
+        'indexes': {}
+    }
     
-    def do_POST(self):
-        """Handle POST requests"""
-        try:
-            if self.path == '/index':
-                self._handle_index_document()
-            elif self.path == '/search':
-                self._handle_search()
-            elif self.path == '/answer':
-                self._handle_answer()
-            elif self.path == '/delete':
-                self._handle_delete_document()
-            else:
-                self.send_error(404, "Not Found")
-        except Exception as e:
-            logger.error(f"POST error: {e}")
-            self.send_error(500, str(e))
-    
-    def _handle_health_check(self):
-        """Service health check"""
-        health = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'service': 'rag-service',
-            'indexes_loaded': len(rag_engine.indexes) if rag_engine else 0,
-            'default_index_size': rag_engine.default_index.index_size if rag_engine else 0
+    if rag_engine:
+        stats['cache'] = {
+            'embeddings': rag_engine.embedding_cache.get_stats(),
+            'results': rag_engine.result_cache.get_stats()
         }
-        
-        self._send_json_response(200, health)
+        stats['service_calls'] = get_service_client().get_stats()
+        for user_id, index in rag_engine.indexes.items():
+            stats['indexes'][user_id] = {
+                'vectors': index.index_size,
+                'version': index.version,
+                'mode': index.mode,
+                'ann_trained': index.ann.is_trained if index.ann is not None else False,
+                'capacity': index.max_vectors,
+                'allocated': index.capacity,
+                'utilization': f"{(index.index_size / index.max_vectors * 100):.1f}%"
+            }
     
-    def _handle_stats(self):
-        """Get RAG statistics"""
-        stats = {
-            'total_users': len(rag_engine.indexes) if rag_engine else 0,
-            'indexes': {}
-        }
+    return 200, stats
+
+async def handle_index_document(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Index a new document"""
+    try:
+        data = request.json()
+        if not data:
+            return 400, {'error': 'No data'}
+        
+        # Validate required fields
+        if 'user_id' not in data or 'document' not in data:
+            return 400, {'error': 'user_id and document required'}
+        
+        # Index document
+        error = _require_engine()
+        if error:
+            return error
+        
+        result = await rag_engine.add_document(data['user_id'], data['document'])
+        return 200, result
+        
+    except Exception as e:
+        logger.error(f"Index error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_search(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Search knowledge base"""
+    try:
+        data = request.json()
+        if not data:
+            return 400, {'error': 'No data'}
+        
+        if 'user_id' not in data or 'query' not in data:
+            return 400, {'error': 'user_id and query required'}
+        
+        # Search
+        error = _require_engine()
+        if error:
+            return error
+        
+        result = await rag_engine.search(
+            data['user_id'],
+            data['query'],
+            top_k=data.get('limit', 10),
+            filters=data.get('filters')
+        )
+        return 200, result
+        
+    except ValueError as e:
+        # Malformed filter specification
+        return 400, {'error': str(e)}
+    except Exception as e:
+        logger.error(f"Search error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_search_batch(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Search knowledge base for several queries at once"""
+    try:
+        data = request.json()
+        if not data:
+            return 400, {'error': 'No data'}
+        
+        if 'user_id' not in data or not isinstance(data.get('queries'), list):
+            return 400, {'error': 'user_id and queries list required'}
+        
+        error = _require_engine()
+        if error:
+            return error
         
-        if rag_engine:
-            for user_id, index in rag_engine.indexes.items():
-                stats['indexes'][user_id] = {
-                    'vectors': index.index_size,
-                    'capacity': index.max_vectors,
-                    'utilization': f"{(index.index_size / index.max_vectors * 100):.1f}%"
-                }
+        results = await rag_engine.search_many(
+            data['user_id'],
+            data['queries'],
+            top_k=data.get('limit', 10),
+            filters=data.get('filters')
+        )
+        return 200, {'results': results, 'total_queries': len(results)}
+        
+    except ValueError as e:
+        # Malformed filter specification
+        return 400, {'error': str(e)}
+    except Exception as e:
+        logger.error(f"Batch search error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_answer(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Generate answer using RAG"""
+    try:
+        data = request.json()
+        if not data:
+            return 400, {'error': 'No data'}
         
-        self._send_json_response(200, stats)
+        if 'user_id' not in data or 'query' not in data:
+            return 400, {'error': 'user_id and query required'}
+        
+        # Generate answer
+        error = _require_engine()
+        if error:
+            return error
+        
+        result = await rag_engine.generate_answer(
+            data['user_id'],
+            data['query'],
+            context_results=data.get('context')
+        )
+        return 200, result
+        
+    except Exception as e:
+        logger.error(f"Answer generation error: {e}")
+        return 500, {'error': str(e)}
+
+async def handle_list_documents(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """List user's documents"""
+    path_parts = request.path.split('/')
+    if len(path_parts) < 3:
+        return 400, {'error': 'Invalid path'}
     
-    def _handle_index_document(self):
-        """Index a new document"""
-        try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self.send_error(400, "No data")
-                return
-            
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode('utf-8'))
-            
-            # Validate required fields
-            if 'user_id' not in data or 'document' not in data:
-                self._send_json_response(400, {
-                    'error': 'user_id and document required'
-                })
-                return
-            
-            # Index document
-            if rag_engine is None:
-                self._send_json_response(500, {'error': 'RAG engine not initialized'})
-                return
-                
-            loop = asyncio.new_event_loop()
-            result = loop.run_until_complete(
-                rag_engine.add_document(data['user_id'], data['document'])
-            )
-            loop.close()
-            
-            self._send_json_response(200, result)
-            
-        except Exception as e:
-            logger.error(f"Index error: {e}")
-            self._send_json_response(500, {'error': str(e)})
+    user_id = path_parts[2]
     
-    def _handle_search(self):
-        """Search knowledge base"""
-        try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self.send_error(400, "No data")
-                return
-            
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode('utf-8'))
-            
-            if 'user_id' not in data or 'query' not in data:
-                self._send_json_response(400, {
-                    'error': 'user_id and query required'
-                })
-                return
-            
-            # Search
-            if rag_engine is None:
-                self._send_json_response(500, {'error': 'RAG engine not initialized'})
-                return
-                
-            loop = asyncio.new_event_loop()
-            result = loop.run_until_complete(
-                rag_engine.search(
-                    data['user_id'],
-                    data['query'],
-                    top_k=data.get('limit', 10),
-                    filters=data.get('filters')
-                )
+    # Get documents from database
+    documents = await _get_user_documents(user_id)
+    return 200, {'documents': documents}
+
+async def _get_user_documents(user_id: str) -> List[Dict[str, Any]]:
+    """Get user's documents from database"""
+    if db_pool is None:
+        logger.warning("Database not available - returning empty document list")
+        return []
+        
+    try:
+        async with db_pool.acquire() as conn:
+            rows = await conn.fetch(
+                """SELECT doc_id, title, source, chunk_count, created_at
+                   FROM documents WHERE user_id = $1
+                   ORDER BY created_at DESC""",
+                user_id
             )
-            loop.close()
             
-            self._send_json_response(200, result)
+            documents = []
+            for row in rows:
+                doc = dict(row)
+                if doc.get('created_at'):
+                    doc['created_at'] = doc['created_at'].isoformat()
+                documents.append(doc)
             
-        except Exception as e:
-            logger.error(f"Search error: {e}")
-            self._send_json_response(500, {'error': str(e)})
-    
-    def _handle_answer(self):
-        """Generate answer using RAG"""
-        try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length == 0:
-                self.send_error(400, "No data")
-                return
+            return documents
             
-            body = self.rfile.read(content_length)
-            data = json.loads(body.decode('utf-8'))
-            
-            if 'user_id' not in data or 'query' not in data:
-                self._send_json_response(400, {
-                    'error': 'user_id and query required'
-                })
-                return
-            
-            # Generate answer
-            if rag_engine is None:
-                self._send_json_response(500, {'error': 'RAG engine not initialized'})
-                return
-                
-            loop = asyncio.new_event_loop()
-            result = loop.run_until_complete(
-                rag_engine.generate_answer(
-                    data['user_id'],
-                    data['query'],
-                    context_results=data.get('context')
-                )
-            )
-            loop.close()
-            
-            self._send_json_response(200, result)
-            
-        except Exception as e:
-            logger.error(f"Answer generation error: {e}")
-            self._send_json_response(500, {'error': str(e)})
-    
-    def _handle_list_documents(self):
-        """List user's documents"""
-        path_parts = self.path.split('/')
-        if len(path_parts) < 3:
-            self.send_error(400, "Invalid path")
-            return
-        
-        user_id = path_parts[2]
-        
-        # Get documents from database
-        loop = asyncio.new_event_loop()
-        documents = loop.run_until_complete(self._get_user_documents(user_id))
-        loop.close()
-        
-        self._send_json_response(200, {'documents': documents})
+    except Exception as e:
+        logger.error(f"Database query error: {e}")
+        return []
+
+async def handle_delete_document(request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+    """Delete document from index"""
+    # Implementation would remove document chunks from vector index
+    return 501, {'error': 'Not implemented yet'}
+
+def build_router() -> Router:
+    """Routes served by both the asyncio server and the threaded fallback"""
+    router = Router()
+    router.add('GET', '/health', handle_health_check)
+    router.add('GET', '/stats', handle_stats)
+    router.add('GET', '/documents/', handle_list_documents, prefix=True)
+    router.add('POST', '/index', handle_index_document)
+    router.add('POST', '/search', handle_search)
+    router.add('POST', '/search/batch', handle_search_batch)
+    router.add('POST', '/answer', handle_answer)
+    router.add('POST', '/delete', handle_delete_document)
+    return router
+
+# Asyncio server (HTTP_SERVER_MODE=asyncio) and the loop every request runs on
+http_server: Optional[AsyncHTTPServer] = None
+service_loop: Optional[asyncio.AbstractEventLoop] = None
+
+class RAGHandler(BaseHTTPRequestHandler):
+    """Threaded fallback handler (HTTP_SERVER_MODE=threaded)
     
-    async def _get_user_documents(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get user's documents from database"""
-        if db_pool is None:
-            logger.warning("Database not available - returning empty document list")
-            return []
-            
-        try:
-            async with db_pool.acquire() as conn:
-                rows = await conn.fetch(
-                    """SELECT doc_id, title, source, chunk_count, created_at
-                       FROM documents WHERE user_id = $1
-                       ORDER BY created_at DESC""",
-                    user_id
-                )
-                
-                documents = []
-                for row in rows:
-                    doc = dict(row)
-                    if doc.get('created_at'):
-                        doc['created_at'] = doc['created_at'].isoformat()
-                    documents.append(doc)
-                
-                return documents
-                
-        except Exception as e:
-            logger.error(f"Database query error: {e}")
-            return []
+    Parses the request and runs the shared route on the service loop.
+    """
+    
+    # Keep connections open for the pooled service client; headers and body
+    # are written separately, so Nagle would stall every keep-alive response
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    router = build_router()
+    
+    def do_GET(self):
+        """Handle GET requests"""
+        self._dispatch('GET')
     
-    def _handle_delete_document(self):
-        """Delete document from index"""
-        # Implementation would remove document chunks from vector index
-        self._send_json_response(501, {'error': 'Not implemented yet'})
+    def do_POST(self):
+        """Handle POST requests"""
+        self._dispatch('POST')
     
-    def _send_json_response(self, status_code: int, data: Dict[str, Any]) -> None:
+    def _dispatch(self, method: str) -> None:
+        content_length = int(self.headers.get('Content-Length', 0))
+        request = HTTPRequest(
+            method=method,
+            path=self.path,
+            headers={name.lower(): value for name, value in self.headers.items()},
+            body=self.rfile.read(content_length) if content_length else b'',
+            client=self.client_address[0]
+        )
+        future = asyncio.run_coroutine_threadsafe(self.router.dispatch(request), service_loop)
+        status, payload, headers = future.result()
+        self._send_json_response(status, payload, headers)
+    
+    def _send_json_response(self, status_code: int, data: Dict[str, Any],
+                            headers: Optional[Dict[str, str]] = None) -> None:
         """Send JSON response"""
+        body = json.dumps(data).encode('utf-8')
         self.send_response(status_code)
         self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
         self.send_header('Access-Control-Allow-Origin', '*')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode('utf-8'))
+        self.wfile.write(body)
     
     def log_message(self, format: str, *args) -> None:
         """Override to use our logger"""
@@ -844,7 +1634,8 @@ async def initialize_connections():
                     host=REDIS_HOST,
                     port=REDIS_PORT,
                     decode_responses=True,
-                    socket_connect_timeout=5
+                    socket_connect_timeout=5,
+                    socket_timeout=REDIS_SOCKET_TIMEOUT
                 )
                 # Test connection
                 redis_client.ping()
@@ -880,6 +1671,33 @@ async def initialize_connections():
         logger.error(f"PostgreSQL connection failed: {e}")
         raise
 
+async def serve_async() -> None:
+    """Serve on the running loop until SIGTERM/SIGINT drains the server"""
+    global http_server
+    http_server = AsyncHTTPServer(
+        build_router(),
+        SERVICE_HOST,
+        SERVICE_PORT,
+        max_concurrency=HTTP_MAX_CONCURRENCY,
+        max_body_size=HTTP_MAX_BODY_SIZE,
+        drain_timeout=HTTP_DRAIN_TIMEOUT
+    )
+    await http_server.start()
+    http_server.install_signal_handlers()
+    logger.info(f"RAG Service listening on http://{SERVICE_HOST}:{SERVICE_PORT} (asyncio)")
+    logger.info("Knowledge retrieval system: ONLINE")
+    await http_server.serve_forever()
+    await get_service_client().close()
+    logger.info("RAG Service stopped")
+
+def serve_threaded(loop: asyncio.AbstractEventLoop) -> None:
+    """Legacy threaded server; routes still run on the shared service loop"""
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    server = ThreadedHTTPServer((SERVICE_HOST, SERVICE_PORT), RAGHandler)
+    logger.info(f"RAG Service listening on http://{SERVICE_HOST}:{SERVICE_PORT} (threaded)")
+    logger.info("Knowledge retrieval system: ONLINE")
+    server.serve_forever()
+
 def main():
     """Main entry point"""
     logger.info("SOVREN AI RAG Service starting...")
@@ -888,9 +1706,11 @@ def main():
     # Create required directories
     os.makedirs(INDEX_PATH, exist_ok=True)
     
-    # Initialize connections
+    # Initialize connections on the loop that will serve every request
+    global service_loop
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
+    service_loop = loop
     
     try:
         loop.run_until_complete(initialize_connections())
@@ -905,10 +1725,10 @@ def main():
     
     # Start HTTP server
     try:
-        server = ThreadedHTTPServer((SERVICE_HOST, SERVICE_PORT), RAGHandler)
-        logger.info(f"RAG Service listening on http://{SERVICE_HOST}:{SERVICE_PORT}")
-        logger.info("Knowledge retrieval system: ONLINE")
-        server.serve_forever()
+        if HTTP_SERVER_MODE == 'threaded':
+            serve_threaded(loop)
+        else:
+            loop.run_until_complete(serve_async())
     except Exception as e:
         logger.error(f"Server error: {e}")
         sys.exit(1)
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+SOVREN AI Service Client - Inter-service HTTP transport
+Keep-alive connection pools with bounded concurrency, timeouts, jittered
+retries and circuit breaking for calls between the bare metal services
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from circuit_breaker import CircuitBreakerConfig, CircuitBreakerManager
+
+logger = logging.getLogger('sovren-service-client')
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+@dataclass
+class ServiceClientConfig:
+    """Service client configuration"""
+    max_connections: int = 32        # Concurrent requests per service
+    max_idle_connections: int = 16   # Keep-alive connections retained per service
+    connect_timeout: float = 5.0     # Seconds to establish a connection
+    request_timeout: float = 30.0    # Seconds for a full request/response exchange
+    idle_timeout: float = 30.0       # Seconds before an idle connection is discarded
+    max_retries: int = 2             # Retries after the first attempt
+    retry_backoff: float = 0.05      # Base delay for exponential backoff with full jitter
+    failure_threshold: int = 5       # Failures before the service circuit opens
+    recovery_timeout: float = 30.0   # Seconds before a half-open probe
+
+class ServiceCallError(Exception):
+    """Inter-service call failed"""
+
+class CircuitOpenError(ServiceCallError):
+    """Call rejected because the service circuit is open"""
+
+class PooledConnection:
+    """One keep-alive HTTP/1.1 connection"""
+
+    __slots__ = ('reader', 'writer', 'last_used')
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+
+    def is_usable(self, idle_timeout: float) -> bool:
+        return (
+            time.monotonic() - self.last_used < idle_timeout
+            and not self.writer.is_closing()
+            and not self.reader.at_eof()
+        )
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+class ConnectionPool:
+    """Keep-alive connections to one service, bound to one event loop"""
+
+    def __init__(self, host: str, port: int, config: ServiceClientConfig):
+        self.host = host
+        self.port = port
+        self.config = config
+        self.idle: Deque[PooledConnection] = deque()
+        self.semaphore = asyncio.Semaphore(config.max_connections)
+        self.opened = 0
+        self.reused = 0
+
+    async def acquire(self) -> Tuple[PooledConnection, bool]:
+        """Return (connection, reused), preferring the most recently used idle one"""
+        while self.idle:
+            conn = self.idle.pop()
+            if conn.is_usable(self.config.idle_timeout):
+                self.reused += 1
+                return conn, True
+            conn.close()
+
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            self.config.connect_timeout
+        )
+        self.opened += 1
+        return PooledConnection(reader, writer), False
+
+    def release(self, conn: PooledConnection, reusable: bool) -> None:
+        if reusable and len(self.idle) < self.config.max_idle_connections:
+            conn.last_used = time.monotonic()
+            self.idle.append(conn)
+        else:
+            conn.close()
+
+    def close(self) -> None:
+        while self.idle:
+            self.idle.pop().close()
+
+class ServiceClient:
+    """Shared async HTTP client for inter-service JSON calls"""
+
+    def __init__(self, config: Optional[ServiceClientConfig] = None):
+        self.config = config or ServiceClientConfig()
+        self.breakers = CircuitBreakerManager()
+        # Streams belong to the loop that opened them, so pools are kept per loop
+        self._pools: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int], ConnectionPool]]' = \
+            weakref.WeakKeyDictionary()
+
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def _get_pool(self, host: str, port: int) -> ConnectionPool:
+        pools = self._pools.setdefault(asyncio.get_running_loop(), {})
+        key = (host, port)
+        if key not in pools:
+            pools[key] = ConnectionPool(host, port, self.config)
+        return pools[key]
+
+    async def request(self, service: Dict[str, Any], method: str, path: str,
+                      data: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+                      idempotent: Optional[bool] = None) -> Dict[str, Any]:
+        """Send a JSON request and return the decoded JSON response
+
+        Failures to connect and stale keep-alive connections are always
+        retried; other failures only when the request is idempotent.
+        """
+        host, port = service['host'], service['port']
+        breaker = self.breakers.get_circuit_breaker(
+            f"{host}:{port}",
+            CircuitBreakerConfig(
+                failure_threshold=self.config.failure_threshold,
+                recovery_timeout=self.config.recovery_timeout
+            )
+        )
+        if not breaker.allow_request():
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {host}:{port}")
+
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        body = json.dumps(data).encode('utf-8') if data is not None else b''
+        pool = self._get_pool(host, port)
+        self.requests += 1
+
+        attempt = 0
+        async with pool.semaphore:
+            while True:
+                conn: Optional[PooledConnection] = None
+                reused = False
+                try:
+                    conn, reused = await pool.acquire()
+                    status, raw, keep_alive = await asyncio.wait_for(
+                        self._exchange(conn, host, method, path, body),
+                        timeout or self.config.request_timeout
+                    )
+                    pool.release(conn, keep_alive)
+                    break
+                except (OSError, EOFError, ValueError, asyncio.TimeoutError) as e:
+                    if conn is not None:
+                        conn.close()
+                    # The server may have closed a reused connection while it sat idle
+                    safe_to_retry = idempotent or conn is None or (reused and isinstance(e, (ConnectionError, EOFError)))
+                    if attempt >= self.config.max_retries or not safe_to_retry:
+                        self.failures += 1
+                        await breaker.record_failure()
+                        raise ServiceCallError(f"{method} {host}:{port}{path} failed: {e!r}") from e
+                    attempt += 1
+                    self.retries += 1
+                    await asyncio.sleep(random.uniform(0, self.config.retry_backoff * (2 ** attempt)))
+
+        if status >= 500:
+            await breaker.record_failure()
+        else:
+            await breaker.record_success()
+
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw.decode('utf-8'))
+        except ValueError as e:
+            raise ServiceCallError(f"{method} {host}:{port}{path} returned invalid JSON (status {status})") from e
+
+    async def _exchange(self, conn: PooledConnection, host: str, method: str, path: str,
+                        body: bytes) -> Tuple[int, bytes, bool]:
+        """Write one request and read its response; returns (status, body, keep_alive)"""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            "Connection: keep-alive\r\n"
+            f"Content-Length: {len(body)}\r\n"
+        )
+        if body:
+            head += "Content-Type: application/json\r\n"
+        conn.writer.write(head.encode('latin-1') + b"\r\n" + body)
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed before response")
+        version, status, _ = status_line.decode('latin-1').split(' ', 2)
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await conn.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            raw = await self._read_chunked(conn.reader)
+        elif 'content-length' in headers:
+            raw = await conn.reader.readexactly(int(headers['content-length']))
+        else:
+            # Body delimited by connection close
+            raw = await conn.reader.read()
+            keep_alive = False
+
+        return int(status), raw, keep_alive
+
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+        parts = []
+        while True:
+            size_line = await reader.readline()
+            size = int(size_line.split(b';', 1)[0].strip(), 16)
+            if size == 0:
+                # Skip trailers
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(parts)
+            parts.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def close(self) -> None:
+        """Close idle connections owned by the running loop"""
+        for pool in self._pools.pop(asyncio.get_running_loop(), {}).values():
+            pool.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        pools: Dict[str, Dict[str, int]] = {}
+        for loop_pools in list(self._pools.values()):
+            for (host, port), pool in loop_pools.items():
+                entry = pools.setdefault(f"{host}:{port}", {'opened': 0, 'reused': 0, 'idle': 0})
+                entry['opened'] += pool.opened
+                entry['reused'] += pool.reused
+                entry['idle'] += len(pool.idle)
+
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'retries': self.retries,
+            'rejected': self.rejected,
+            'pools': pools,
+            'circuits': self.breakers.get_all_stats()
+        }
+
+# Process-wide client shared by every service caller
+_service_client: Optional[ServiceClient] = None
+
+def get_service_client() -> ServiceClient:
+    """Get the shared service client"""
+    global _service_client
+    if _service_client is None:
+        _service_client = ServiceClient()
+    return _service_client
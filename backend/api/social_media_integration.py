@@ -13,13 +13,12 @@ from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import hashlib
 import base64
 
+from api.business_data_cache import CachedEntity, get_business_data_cache
+from api.integration_sync import AsyncIntegrationSession, SyncScheduler
+
 logger = logging.getLogger(__name__)
 
 class SocialMediaPlatform(Enum):
@@ -97,6 +96,9 @@ class SocialMediaAnalytics:
     audience_growth: float = 0.0
     created_at: datetime = field(default_factory=datetime.utcnow)
 
+# Local cache layout of the unified records
+POST_CACHE = CachedEntity('social_posts', SocialMediaPost)
+
 class SocialMediaIntegrationBase:
     """Base class for social media integrations"""
     
@@ -107,18 +109,9 @@ class SocialMediaIntegrationBase:
         self.last_sync = None
         self.sync_interval = config.get('sync_interval', 300)  # 5 minutes default
         
-    def _create_session(self) -> requests.Session:
-        """Create HTTP session with retry logic"""
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        return session
+    def _create_session(self) -> AsyncIntegrationSession:
+        """Create non-blocking HTTP session with retry logic and a concurrency cap"""
+        return AsyncIntegrationSession(max_concurrency=self.config.get('max_concurrency', 4))
     
     async def authenticate(self) -> bool:
         """Authenticate with social media platform"""
@@ -165,7 +158,7 @@ class LinkedInIntegration(SocialMediaIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.access_token}'}
-            response = self.session.get(f"{self.api_url}/me", headers=headers)
+            response = await self.session.get(f"{self.api_url}/me", headers=headers)
             response.raise_for_status()
             
             logger.info("LinkedIn authentication successful")
@@ -221,7 +214,7 @@ class LinkedInIntegration(SocialMediaIntegrationBase):
                     }
                 ]
             
-            response = self.session.post(url, headers=headers, json=post_data)
+            response = await self.session.post(url, headers=headers, json=post_data)
             response.raise_for_status()
             
             created_post = response.json()
@@ -251,7 +244,7 @@ class LinkedInIntegration(SocialMediaIntegrationBase):
                 'start': offset
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -277,7 +270,7 @@ class LinkedInIntegration(SocialMediaIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get LinkedIn posts: {e}")
-            return []
+            raise
     
     async def get_analytics(self, start_date: datetime, end_date: datetime) -> SocialMediaAnalytics:
         """Get LinkedIn analytics"""
@@ -359,7 +352,7 @@ class TwitterIntegration(SocialMediaIntegrationBase):
             
             # Test the token
             headers = {'Authorization': f'Bearer {self.bearer_token}'}
-            response = self.session.get(f"{self.api_url}/users/me", headers=headers)
+            response = await self.session.get(f"{self.api_url}/users/me", headers=headers)
             response.raise_for_status()
             
             logger.info("Twitter authentication successful")
@@ -391,7 +384,7 @@ class TwitterIntegration(SocialMediaIntegrationBase):
                 # In production, implement media upload
                 logger.info("Media upload not implemented for Twitter")
             
-            response = self.session.post(url, headers=headers, json=tweet_data)
+            response = await self.session.post(url, headers=headers, json=tweet_data)
             response.raise_for_status()
             
             created_tweet = response.json()
@@ -421,7 +414,7 @@ class TwitterIntegration(SocialMediaIntegrationBase):
                 'tweet.fields': 'created_at,public_metrics'
             }
             
-            response = self.session.get(url, headers=headers, params=params)
+            response = await self.session.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -444,7 +437,7 @@ class TwitterIntegration(SocialMediaIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Twitter tweets: {e}")
-            return []
+            raise
     
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with Twitter"""
@@ -489,7 +482,7 @@ class FacebookIntegration(SocialMediaIntegrationBase):
             # Test the token
             url = f"{self.api_url}/me"
             params = {'access_token': self.access_token}
-            response = self.session.get(url, params=params)
+            response = await self.session.get(url, params=params)
             response.raise_for_status()
             
             logger.info("Facebook authentication successful")
@@ -511,7 +504,7 @@ class FacebookIntegration(SocialMediaIntegrationBase):
                 'message': post.content
             }
             
-            response = self.session.post(url, params=params)
+            response = await self.session.post(url, params=params)
             response.raise_for_status()
             
             created_post = response.json()
@@ -541,7 +534,7 @@ class FacebookIntegration(SocialMediaIntegrationBase):
                 'fields': 'id,message,created_time,updated_time'
             }
             
-            response = self.session.get(url, params=params)
+            response = await self.session.get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -564,7 +557,7 @@ class FacebookIntegration(SocialMediaIntegrationBase):
             
         except Exception as e:
             logger.error(f"Failed to get Facebook posts: {e}")
-            return []
+            raise
     
     async def sync_data(self) -> Dict[str, Any]:
         """Sync data with Facebook"""
@@ -598,6 +591,8 @@ class UnifiedSocialMediaIntegration:
         self.integrations: Dict[SocialMediaPlatform, SocialMediaIntegrationBase] = {}
         self.sync_status: Dict[str, Any] = {}
         self.last_full_sync = None
+        self.scheduler = SyncScheduler()
+        self.cache = get_business_data_cache()
     
     def add_integration(self, platform: SocialMediaPlatform, config: Dict[str, Any]):
         """Add social media integration"""
@@ -611,6 +606,8 @@ class UnifiedSocialMediaIntegration:
             raise ValueError(f"Unsupported social media platform: {platform}")
         
         self.integrations[platform] = integration
+        if 'sync_deadline' in config:
+            self.scheduler.deadlines[platform.value] = config['sync_deadline']
         logger.info(f"Added {platform.value} integration")
     
     async def authenticate_all(self) -> Dict[str, bool]:
@@ -642,33 +639,17 @@ class UnifiedSocialMediaIntegration:
         
         return results
     
-    async def get_all_posts(self) -> List[SocialMediaPost]:
-        """Get posts from all social media platforms"""
-        all_posts = []
-        
-        for platform, integration in self.integrations.items():
-            try:
-                posts = await integration.get_posts()
-                all_posts.extend(posts)
-            except Exception as e:
-                logger.error(f"Failed to get posts from {platform.value}: {e}")
-        
-        return all_posts
+    async def get_all_posts(self, **filters: Any) -> List[SocialMediaPost]:
+        """Get posts from all social media platforms, served from the local cache"""
+        return await self.cache.read(POST_CACHE, {
+            platform.value: integration.get_posts for platform, integration in self.integrations.items()
+        }, **filters)
     
     async def sync_all_platforms(self) -> Dict[str, Any]:
-        """Sync all social media platforms"""
-        sync_results = {}
-        
-        for platform, integration in self.integrations.items():
-            try:
-                result = await integration.sync_data()
-                sync_results[platform.value] = result
-            except Exception as e:
-                logger.error(f"Sync failed for {platform.value}: {e}")
-                sync_results[platform.value] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        """Sync all social media platforms concurrently, each under its platform deadline"""
+        sync_results = await self.scheduler.run({
+            platform.value: integration.sync_data for platform, integration in self.integrations.items()
+        })
         
         self.last_full_sync = datetime.utcnow()
         self.sync_status = sync_results
@@ -677,6 +658,7 @@ class UnifiedSocialMediaIntegration:
             'sync_results': sync_results,
             'total_platforms': len(self.integrations),
             'successful_syncs': len([r for r in sync_results.values() if r.get('status') == 'success']),
+            'sync_duration': self.scheduler.last_run['duration'],
             'sync_timestamp': self.last_full_sync.isoformat()
         }
     
@@ -685,8 +667,17 @@ class UnifiedSocialMediaIntegration:
         return {
             'last_full_sync': self.last_full_sync.isoformat() if self.last_full_sync else None,
             'active_integrations': list(self.integrations.keys()),
-            'sync_status': self.sync_status
+            'sync_status': self.sync_status,
+            'sync_timings': self.scheduler.get_stats(),
+            'http': {platform.value: integration.session.get_stats()
+                     for platform, integration in self.integrations.items()},
+            'cache': self.cache.staleness([POST_CACHE])
         }
+    
+    async def close(self) -> None:
+        """Close platform HTTP sessions"""
+        for integration in self.integrations.values():
+            await integration.session.close()
 
 # Production-ready test suite
 class TestSocialMediaIntegration:
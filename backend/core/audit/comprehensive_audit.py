@@ -7,16 +7,19 @@ Production-ready audit trail with immutable logging and compliance reporting
 import os
 import sys
 import time
+import atexit
 import threading
 import logging
 import json
 import hashlib
 import hmac
+import itertools
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field, asdict
 from enum import Enum
 from datetime import datetime, timedelta
 from pathlib import Path
+from collections import deque, defaultdict
 import sqlite3
 import uuid
 import base64
@@ -26,6 +29,21 @@ from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
 logger = logging.getLogger('ComprehensiveAudit')
 
+AUDIT_EVENT_INSERT = '''
+    INSERT INTO audit_events (
+        event_id, timestamp, user_id, session_id, ip_address, user_agent,
+        category, level, action, resource, details, outcome, risk_score,
+        compliance_tags, encrypted, hash_signature
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+COMPLIANCE_VIOLATION_INSERT = '''
+    INSERT INTO compliance_violations (
+        violation_id, event_id, rule_id, violation_type,
+        severity, description, timestamp
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
 class AuditLevel(Enum):
     """Audit log levels"""
     INFO = "info"
@@ -76,6 +94,23 @@ class AuditConfig:
     real_time_monitoring: bool = True
     compliance_mode: bool = True
     data_classification_enabled: bool = True
+    # Events are handed to a background writer and inserted in batches, one
+    # transaction (group commit) per batch
+    async_writes: bool = True
+    queue_size: int = 100000
+    batch_size: int = 5000
+    flush_interval: float = 0.05  # seconds an event may wait for its batch
+    block_timeout: float = 1.0  # seconds a blocking level waits for room before writing inline
+    write_retries: int = 5  # attempts at a batch transaction that hits a locked database
+    retry_backoff: float = 0.05  # seconds before the first retry, doubled after each
+    # What happens to an event that finds the queue full: 'drop' it or 'block' the caller
+    overflow_policy: Dict[AuditLevel, str] = field(default_factory=lambda: {
+        AuditLevel.INFO: 'drop',
+        AuditLevel.WARNING: 'drop',
+        AuditLevel.ERROR: 'block',
+        AuditLevel.CRITICAL: 'block',
+        AuditLevel.SECURITY: 'block',
+    })
 
 class ComprehensiveAudit:
     """Production-ready comprehensive audit logging system"""
@@ -92,9 +127,27 @@ class ComprehensiveAudit:
         # Initialize file logging
         self._init_file_logging()
         
-        # Event processing
-        self.event_queue = []
-        self.event_lock = threading.RLock()
+        # Event processing; event_queue is the bounded handoff to the writer thread
+        # (deque append/popleft are atomic, so producers take no lock)
+        self.event_queue = deque()
+        self.event_lock = threading.RLock()  # guards db_connection
+        self._writer_wake = threading.Event()
+        self._writer_room = threading.Event()
+        self._writer_done = threading.Condition()
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_stopping = False
+        self._stats_lock = threading.Lock()  # guards writer_stats and dropped_by_level only
+        self._enqueued = itertools.count()  # next() is atomic, so producers count without the lock
+        self.writer_stats = {
+            'written': 0,
+            'failed': 0,
+            'batches': 0,
+            'blocked': 0,
+            'inline_writes': 0,
+            'retries': 0,
+            'max_queue_depth': 0,
+        }
+        self.dropped_by_level: Dict[str, int] = defaultdict(int)
         
         # Compliance tracking
         self.compliance_rules = self._load_compliance_rules()
@@ -110,6 +163,8 @@ class ComprehensiveAudit:
         
         # Start background processing
         self._start_background_processing()
+        if self.config.async_writes:
+            self._start_audit_writer()
         
         logger.info("Comprehensive audit system initialized")
     
@@ -132,8 +187,10 @@ class ComprehensiveAudit:
             db_path = Path(self.config.database_path)
             db_path.parent.mkdir(parents=True, exist_ok=True)
             
-            # Create database connection
-            conn = sqlite3.connect(self.config.database_path)
+            # Create database connection; WAL lets reports read while the writer commits
+            conn = sqlite3.connect(self.config.database_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
             
             # Create audit events table
             conn.execute('''
@@ -318,15 +375,18 @@ class ComprehensiveAudit:
                 encrypted=should_encrypt,
             )
             
-            # Process event
-            self._process_audit_event(event)
+            # Process event: encoding, encryption, storage and compliance
+            # checks happen on the writer thread unless writes are synchronous
+            if self._writer_thread is not None:
+                self._enqueue_event(event)
+            else:
+                self._process_audit_event(event)
+                logger.info(f"Audit event logged: {event_id}")
             
             # Real-time monitoring
             if self.config.real_time_monitoring:
                 self._check_real_time_alerts(event)
             
-            logger.info(f"Audit event logged: {event_id}")
-            
         except Exception as e:
             logger.error(f"Failed to log audit event: {e}")
     
@@ -349,43 +409,10 @@ class ComprehensiveAudit:
         """Process audit event"""
         
         try:
-            # Encrypt sensitive details if needed
-            details_json = json.dumps(event.details)
-            if event.encrypted:
-                encrypted_details = self.crypto_manager.encrypt(details_json.encode())
-                details_json = base64.b64encode(encrypted_details).decode()
-            
-            # Generate hash signature for integrity
-            event_data = f"{event.event_id}{event.timestamp.isoformat()}{event.action}{event.resource}"
-            hash_signature = hashlib.sha256(event_data.encode()).hexdigest()
-            
             # Store in database
-            self.db_connection.execute('''
-                INSERT INTO audit_events (
-                    event_id, timestamp, user_id, session_id, ip_address, user_agent,
-                    category, level, action, resource, details, outcome, risk_score,
-                    compliance_tags, encrypted, hash_signature
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                event.event_id,
-                event.timestamp.isoformat(),
-                event.user_id,
-                event.session_id,
-                event.ip_address,
-                event.user_agent,
-                event.category.value,
-                event.level.value,
-                event.action,
-                event.resource,
-                details_json,
-                event.outcome,
-                event.risk_score,
-                json.dumps(event.compliance_tags),
-                1 if event.encrypted else 0,
-                hash_signature,
-            ))
-            
-            self.db_connection.commit()
+            with self.event_lock:
+                self.db_connection.execute(AUDIT_EVENT_INSERT, self._event_row(event))
+                self.db_connection.commit()
             
             # Check compliance rules
             if self.config.compliance_mode:
@@ -394,45 +421,261 @@ class ComprehensiveAudit:
         except Exception as e:
             logger.error(f"Failed to process audit event: {e}")
     
+    def _event_row(self, event: AuditEvent) -> tuple:
+        """audit_events row for an event, with details encrypted if needed and a hash signature"""
+        
+        # Encrypt sensitive details if needed
+        details_json = json.dumps(event.details)
+        if event.encrypted:
+            encrypted_details = self.crypto_manager.encrypt(details_json.encode())
+            details_json = base64.b64encode(encrypted_details).decode()
+        
+        # Generate hash signature for integrity
+        timestamp = event.timestamp.isoformat()
+        event_data = f"{event.event_id}{timestamp}{event.action}{event.resource}"
+        hash_signature = hashlib.sha256(event_data.encode()).hexdigest()
+        
+        return (
+            event.event_id,
+            timestamp,
+            event.user_id,
+            event.session_id,
+            event.ip_address,
+            event.user_agent,
+            event.category.value,
+            event.level.value,
+            event.action,
+            event.resource,
+            details_json,
+            event.outcome,
+            event.risk_score,
+            json.dumps(event.compliance_tags),
+            1 if event.encrypted else 0,
+            hash_signature,
+        )
+    
+    def _count(self, stat: str, amount: int = 1):
+        """Add to a writer stat; producers and the writer update them concurrently"""
+        
+        with self._stats_lock:
+            self.writer_stats[stat] += amount
+    
+    def _enqueued_count(self) -> int:
+        """Events handed to the writer so far"""
+        
+        # repr(count(n)) is 'count(n)'; reading it does not advance the counter
+        return int(repr(self._enqueued)[len('count('):-1])
+    
+    def _enqueue_event(self, event: AuditEvent):
+        """Hand an event to the writer, applying the level's overflow policy when the queue is full
+
+        queue_size is a soft bound: the length check and the append are not
+        atomic, so concurrent producers can overshoot it by one event each.
+        """
+        
+        queue = self.event_queue
+        if len(queue) >= self.config.queue_size:
+            if self.config.overflow_policy.get(event.level, 'block') == 'drop':
+                with self._stats_lock:
+                    self.dropped_by_level[event.level.value] += 1
+                return
+            
+            # Wait for the writer to make room; past the timeout, write on this thread
+            self._count('blocked')
+            self._writer_wake.set()
+            deadline = time.monotonic() + self.config.block_timeout
+            while len(queue) >= self.config.queue_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._count('inline_writes')
+                    self._process_audit_event(event)
+                    return
+                self._writer_room.clear()
+                self._writer_room.wait(min(remaining, 0.01))
+        
+        queue.append(event)
+        next(self._enqueued)
+        if len(queue) >= self.config.batch_size:
+            self._writer_wake.set()
+    
+    def _start_audit_writer(self):
+        """Start the thread that drains event_queue into the database"""
+        
+        self._writer_connection = sqlite3.connect(self.config.database_path, check_same_thread=False)
+        self._writer_connection.execute('PRAGMA synchronous=NORMAL')
+        self._writer_thread = threading.Thread(target=self._writer_loop, name='audit-writer', daemon=True)
+        self._writer_thread.start()
+        atexit.register(self.close)
+    
+    def _writer_loop(self):
+        """Drain the queue in batches every flush_interval, or as soon as a batch is full"""
+        
+        queue = self.event_queue
+        while True:
+            self._writer_wake.wait(self.config.flush_interval)
+            self._writer_wake.clear()
+            # Depth is sampled here rather than by producers, so it is the peak seen at wake-ups
+            depth = len(queue)
+            if depth > self.writer_stats['max_queue_depth']:
+                with self._stats_lock:
+                    self.writer_stats['max_queue_depth'] = depth
+            while queue:
+                batch = []
+                while queue and len(batch) < self.config.batch_size:
+                    batch.append(queue.popleft())
+                self._writer_room.set()
+                self._write_batch(batch)
+            with self._writer_done:
+                self._writer_done.notify_all()
+            if self._writer_stopping and not queue:
+                return
+    
+    def _write_batch(self, events: List[AuditEvent]):
+        """Insert a batch of events and their compliance violations in one transaction
+
+        An event that cannot be encoded is counted as failed on its own; a
+        transaction that finds the database locked is retried with backoff.
+        """
+        
+        rows, violations, bad = [], [], 0
+        checked_at = datetime.now().isoformat()
+        for event in events:
+            try:
+                row = self._event_row(event)
+                if self.config.compliance_mode:
+                    violations.extend(self._compliance_violations(event, checked_at))
+            except Exception as e:
+                bad += 1
+                logger.error(f"Failed to encode audit event {event.event_id}: {e}")
+                continue
+            rows.append(row)
+        if bad:
+            self._count('failed', bad)
+        if not rows:
+            return
+        
+        conn = self._writer_connection
+        delay = self.config.retry_backoff
+        for attempt in range(1, self.config.write_retries + 1):
+            try:
+                conn.execute('BEGIN')
+                try:
+                    conn.executemany(AUDIT_EVENT_INSERT, rows)
+                    if violations:
+                        conn.executemany(COMPLIANCE_VIOLATION_INSERT, violations)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                break
+            except sqlite3.OperationalError as e:
+                # SQLITE_BUSY/LOCKED from another connection; anything else will not clear on retry
+                if attempt < self.config.write_retries and 'locked' in str(e):
+                    self._count('retries')
+                    logger.warning(f"Audit batch of {len(rows)} events hit '{e}', retrying in {delay:.2f}s")
+                    time.sleep(delay)
+                    delay *= 2
+                    continue
+                self._count('failed', len(rows))
+                logger.error(f"Failed to write {len(rows)} audit events: {e}")
+                return
+            except Exception as e:
+                self._count('failed', len(rows))
+                logger.error(f"Failed to write {len(rows)} audit events: {e}")
+                return
+        
+        with self._stats_lock:
+            self.writer_stats['written'] += len(rows)
+            self.writer_stats['batches'] += 1
+        if violations:
+            by_rule = defaultdict(int)
+            for violation in violations:
+                by_rule[violation[2]] += 1
+            logger.warning(f"Compliance violations (missing required fields): {dict(by_rule)}")
+        logger.info(f"Audit events logged: {len(rows)}")
+    
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every event queued so far is written; False on timeout"""
+        
+        if self._writer_thread is None:
+            return True
+        target = self._enqueued_count()
+        deadline = time.monotonic() + timeout
+        with self._writer_done:
+            while self.writer_stats['written'] + self.writer_stats['failed'] < target:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._writer_thread.is_alive():
+                    return False
+                self._writer_wake.set()
+                self._writer_done.wait(min(remaining, self.config.flush_interval))
+        return True
+    
+    def close(self):
+        """Write out queued events and stop the writer"""
+        
+        if self._writer_thread is None:
+            return
+        self._writer_stopping = True
+        self._writer_wake.set()
+        self._writer_thread.join(timeout=30)
+        self._writer_thread = None
+        self._writer_connection.close()
+        atexit.unregister(self.close)
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Audit writer throughput, queue depth and dropped events by level"""
+        
+        with self._stats_lock:
+            stats = dict(self.writer_stats)
+            dropped = dict(self.dropped_by_level)
+        batches = stats['batches']
+        return {
+            'enqueued': self._enqueued_count(),
+            **stats,
+            'async': self._writer_thread is not None,
+            'queue_depth': len(self.event_queue),
+            'mean_batch_size': round(stats['written'] / batches, 1) if batches else 0.0,
+            'dropped': dropped,
+        }
+    
     def _check_compliance_rules(self, event: AuditEvent):
         """Check event against compliance rules"""
         
         try:
-            for compliance_standard, rules in self.compliance_rules.items():
-                for rule in rules['rules']:
-                    if rule['category'] == event.category:
-                        # Check if required fields are present
-                        missing_fields = []
-                        for field in rule['required_fields']:
-                            if field not in event.details:
-                                missing_fields.append(field)
-                        
-                        if missing_fields:
-                            # Log compliance violation
-                            violation_id = str(uuid.uuid4())
-                            
-                            self.db_connection.execute('''
-                                INSERT INTO compliance_violations (
-                                    violation_id, event_id, rule_id, violation_type,
-                                    severity, description, timestamp
-                                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                            ''', (
-                                violation_id,
-                                event.event_id,
-                                rule['id'],
-                                'missing_required_fields',
-                                'medium',
-                                f"Missing required fields: {', '.join(missing_fields)}",
-                                datetime.now().isoformat(),
-                            ))
-                            
-                            self.db_connection.commit()
-                            
-                            logger.warning(f"Compliance violation: {rule['id']} - missing fields: {missing_fields}")
+            for violation in self._compliance_violations(event):
+                # Log compliance violation
+                with self.event_lock:
+                    self.db_connection.execute(COMPLIANCE_VIOLATION_INSERT, violation)
+                    self.db_connection.commit()
+                
+                logger.warning(f"Compliance violation: {violation[2]} - {violation[5]}")
             
         except Exception as e:
             logger.error(f"Failed to check compliance rules: {e}")
     
+    def _compliance_violations(self, event: AuditEvent, checked_at: Optional[str] = None) -> List[tuple]:
+        """compliance_violations rows for rules whose required fields the event lacks"""
+        
+        checked_at = checked_at or datetime.now().isoformat()
+        violations = []
+        for compliance_standard, rules in self.compliance_rules.items():
+            for rule in rules['rules']:
+                if rule['category'] == event.category:
+                    # Check if required fields are present
+                    missing_fields = [f for f in rule['required_fields'] if f not in event.details]
+                    
+                    if missing_fields:
+                        violations.append((
+                            str(uuid.uuid4()),
+                            event.event_id,
+                            rule['id'],
+                            'missing_required_fields',
+                            'medium',
+                            f"Missing required fields: {', '.join(missing_fields)}",
+                            checked_at,
+                        ))
+        return violations
+    
     def _check_real_time_alerts(self, event: AuditEvent):
         """Check for real-time alert conditions"""
         
@@ -549,6 +792,7 @@ class ComprehensiveAudit:
                         filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate comprehensive audit report"""
         
+        self.flush()
         try:
             query = '''
                 SELECT * FROM audit_events 
@@ -646,6 +890,7 @@ class ComprehensiveAudit:
                             start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """Generate compliance-specific report"""
         
+        self.flush()
         try:
             if compliance_standard not in self.compliance_rules:
                 raise ValueError(f"Unknown compliance standard: {compliance_standard}")
@@ -733,6 +978,7 @@ class ComprehensiveAudit:
                 'error_events': error_events,
                 'database_size_mb': self._get_database_size(),
                 'log_file_size_mb': self._get_log_file_size(),
+                'writer': self.get_writer_stats(),
             }
             
         except Exception as e:
@@ -10,12 +10,12 @@ import logging
 import signal
 import sys
 import time
-import socket
-import json
 from typing import Optional, Dict, Any
 import torch
 import torch.nn as nn
 
+from api.mcp_protocol import MCPChannel
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,81 +24,68 @@ logging.basicConfig(
 logger = logging.getLogger('ConsciousnessEngine')
 
 class MCPClient:
-    """MCP Server client for GPU management and optimization"""
+    """MCP Server client for GPU management and optimization
+    
+    Requests share one framed connection (see api.mcp_protocol), so
+    concurrent callers are pipelined rather than serialized. Once
+    connected, a connection closed by the server (idle timeout, restart)
+    is reopened by the next request.
+    """
     
     def __init__(self, host: str = 'localhost', port: int = 9999):
         self.host = host
         self.port = port
-        self.connected = False
+        self.channel = MCPChannel(host, port)
+        
+    @property
+    def connected(self) -> bool:
+        return self.channel.connected
         
     async def connect(self) -> bool:
         """Connect to MCP Server"""
         try:
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.connect((self.host, self.port))
-            self.connected = True
-            logger.info(f"✅ Connected to MCP Server at {self.host}:{self.port}")
+            encoding = await self.channel.connect()
+            logger.info(f"✅ Connected to MCP Server at {self.host}:{self.port} ({encoding})")
             return True
         except Exception as e:
             logger.error(f"Failed to connect to MCP Server: {e}")
-            self.connected = False
+            self.channel.close()
             return False
     
-    async def request_gpu_allocation(self, component: str, memory_gb: float) -> Dict[str, Any]:
-        """Request GPU allocation from Transcendent MCP Server"""
-        if not self.connected:
+    async def request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request to the Transcendent MCP Server and wait for its response"""
+        if self.channel.encoding is None:
             return {'success': False, 'error': 'Not connected to Transcendent MCP Server'}
         
         try:
-            request = {
-                'type': 'gpu_allocation',
-                'component': component,
-                'memory_gb': memory_gb
-            }
-            self.socket.send(json.dumps(request).encode())
-            response = self.socket.recv(8192).decode()  # Increased buffer for transcendent responses
-            return json.loads(response)
+            return await self.channel.request(request)
         except Exception as e:
-            logger.error(f"Transcendent GPU allocation request failed: {e}")
+            logger.error(f"Transcendent {request.get('type')} request failed: {e}")
             return {'success': False, 'error': str(e)}
     
+    async def request_gpu_allocation(self, component: str, memory_gb: float) -> Dict[str, Any]:
+        """Request GPU allocation from Transcendent MCP Server"""
+        return await self.request({
+            'type': 'gpu_allocation',
+            'component': component,
+            'memory_gb': memory_gb
+        })
+    
     async def get_gpu_stats(self) -> Dict[str, Any]:
         """Get GPU statistics from Transcendent MCP Server"""
-        if not self.connected:
-            return {'success': False, 'error': 'Not connected to Transcendent MCP Server'}
-        
-        try:
-            request = {
-                'type': 'gpu_stats'
-            }
-            self.socket.send(json.dumps(request).encode())
-            response = self.socket.recv(8192).decode()  # Increased buffer for transcendent responses
-            return json.loads(response)
-        except Exception as e:
-            logger.error(f"Transcendent GPU stats request failed: {e}")
-            return {'success': False, 'error': str(e)}
+        return await self.request({
+            'type': 'gpu_stats'
+        })
     
     async def request_transcendence_metrics(self) -> Dict[str, Any]:
         """Request transcendence metrics from MCP Server"""
-        if not self.connected:
-            return {'success': False, 'error': 'Not connected to Transcendent MCP Server'}
-        
-        try:
-            request = {
-                'type': 'transcendence_metrics'
-            }
-            self.socket.send(json.dumps(request).encode())
-            response = self.socket.recv(8192).decode()
-            return json.loads(response)
-        except Exception as e:
-            logger.error(f"Transcendence metrics request failed: {e}")
-            return {'success': False, 'error': str(e)}
+        return await self.request({
+            'type': 'transcendence_metrics'
+        })
     
     def close(self):
         """Close MCP connection"""
-        if self.connected:
-            self.socket.close()
-            self.connected = False
+        self.channel.close()
 
 class ConsciousnessEngine:
     """
@@ -273,9 +260,7 @@ class ConsciousnessEngine:
                 'user_id': 'consciousness_engine'
             }
             
-            self.mcp_client.socket.send(json.dumps(connection_request).encode())
-            response = self.mcp_client.socket.recv(4096).decode()
-            connection_result = json.loads(response)
+            connection_result = await self.mcp_client.request(connection_request)
             
             if connection_result.get('success'):
                 logger.info("✅ Consciousness integration established")
@@ -31,6 +31,7 @@ from api.calendar_integration import UnifiedCalendarIntegration, CalendarPlatfor
 from api.social_media_integration import UnifiedSocialMediaIntegration, SocialMediaPlatform
 from api.accounting_integration import UnifiedAccountingIntegration, AccountingPlatform
 from api.analytics_integration import UnifiedAnalyticsIntegration, AnalyticsPlatform
+from api.integration_sync import SyncScheduler
 
 # Database
 from database.connection import get_database_manager
@@ -53,6 +54,8 @@ class MainIntegrationSystem:
     Orchestrates all business systems and AI components
     """
     
+    BUSINESS_SYNC_DEADLINE = 240.0  # seconds one integration's sync may take
+    
     def __init__(self):
         # Initialize database manager
         self.db_manager = get_database_manager()
@@ -78,6 +81,7 @@ class MainIntegrationSystem:
         self.social_media_integration = UnifiedSocialMediaIntegration()
         self.accounting_integration = UnifiedAccountingIntegration()
         self.analytics_integration = UnifiedAnalyticsIntegration()
+        self.business_sync_scheduler = SyncScheduler(default_deadline=self.BUSINESS_SYNC_DEADLINE)
         
         # System status tracking
         self.system_status: Dict[str, SystemStatus] = {}
@@ -495,43 +499,50 @@ class MainIntegrationSystem:
             logger.error(f"Full system sync failed: {e}")
     
     async def _sync_business_systems(self):
-        """Sync all business system integrations"""
+        """Sync all business system integrations concurrently
+        
+        The sync takes as long as the slowest integration; one that overruns
+        its deadline is cancelled and marked as errored without holding up
+        the rest.
+        """
         try:
-            # Sync CRM
-            crm_sync_result = await self.crm_integration.sync_all_platforms()
-            self.system_status['crm_integration'].last_sync = datetime.utcnow()
-            self.system_status['crm_integration'].sync_duration = crm_sync_result.get('sync_duration', 0)
-            
-            # Sync Email
-            email_sync_result = await self.email_integration.sync_all_platforms()
-            self.system_status['email_integration'].last_sync = datetime.utcnow()
-            self.system_status['email_integration'].sync_duration = email_sync_result.get('sync_duration', 0)
-            
-            # Sync Calendar
-            calendar_sync_result = await self.calendar_integration.sync_all_platforms()
-            self.system_status['calendar_integration'].last_sync = datetime.utcnow()
-            self.system_status['calendar_integration'].sync_duration = calendar_sync_result.get('sync_duration', 0)
-            
-            # Sync Social Media
-            social_sync_result = await self.social_media_integration.sync_all_platforms()
-            self.system_status['social_media_integration'].last_sync = datetime.utcnow()
-            self.system_status['social_media_integration'].sync_duration = social_sync_result.get('sync_duration', 0)
-            
-            # Sync Accounting
-            accounting_sync_result = await self.accounting_integration.sync_all_platforms()
-            self.system_status['accounting_integration'].last_sync = datetime.utcnow()
-            self.system_status['accounting_integration'].sync_duration = accounting_sync_result.get('sync_duration', 0)
-            
-            # Sync Analytics
-            analytics_sync_result = await self.analytics_integration.sync_all_platforms()
-            self.system_status['analytics_integration'].last_sync = datetime.utcnow()
-            self.system_status['analytics_integration'].sync_duration = analytics_sync_result.get('sync_duration', 0)
-            
-            logger.info("Business systems sync completed")
+            results = await self.business_sync_scheduler.run({
+                name: integration.sync_all_platforms
+                for name, integration in self._business_integrations().items()
+            })
+            
+            for name, result in results.items():
+                status = self.system_status.get(name)
+                if status is None:
+                    continue
+                status.last_sync = datetime.utcnow()
+                status.sync_duration = result.get('sync_duration', 0)
+                if result.get('status') in ('error', 'timeout'):
+                    status.status = 'error'
+                    status.error_message = result.get('error')
+                else:
+                    status.status = 'online'
+                    status.error_message = None
+                    status.metrics['successful_syncs'] = result.get('successful_syncs', 0)
+                status.metrics['sync_timings'] = self.business_sync_scheduler.histograms[name].snapshot()
+            
+            logger.info(f"Business systems sync completed in "
+                        f"{self.business_sync_scheduler.last_run['duration']:.2f}s "
+                        f"(slowest: {self.business_sync_scheduler.last_run['slowest']})")
             
         except Exception as e:
             logger.error(f"Business systems sync failed: {e}")
     
+    def _business_integrations(self) -> Dict[str, Any]:
+        return {
+            'crm_integration': self.crm_integration,
+            'email_integration': self.email_integration,
+            'calendar_integration': self.calendar_integration,
+            'social_media_integration': self.social_media_integration,
+            'accounting_integration': self.accounting_integration,
+            'analytics_integration': self.analytics_integration
+        }
+    
     async def _sync_core_systems(self):
         """Sync core AI systems"""
         try:
@@ -612,8 +623,9 @@ class MainIntegrationSystem:
         try:
             logger.info("Shutting down Main Integration System...")
             
-            # Shutdown business integrations
-            # Note: These don't have explicit shutdown methods, but we can clean up connections
+            # Shutdown business integrations (close their HTTP sessions)
+            for integration in self._business_integrations().values():
+                await integration.close()
             
             # Shutdown core systems
             await self.bayesian_engine.shutdown()
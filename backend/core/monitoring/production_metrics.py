@@ -9,7 +9,7 @@ import threading
 import logging
 import json
 import uuid
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
@@ -37,6 +37,12 @@ except ImportError:
 
 logger = logging.getLogger('ProductionMetrics')
 
+# Request latency histograms: 2 ** HISTOGRAM_SUB_BUCKET_BITS linear buckets per
+# power of two of microseconds (about 3% wide), up to HISTOGRAM_MAX_US (19 hours)
+HISTOGRAM_SUB_BUCKET_BITS = 5
+HISTOGRAM_SUB_BUCKETS = 1 << HISTOGRAM_SUB_BUCKET_BITS
+HISTOGRAM_MAX_US = (1 << 36) - 1
+
 class MetricType(Enum):
     """Metric types"""
     COUNTER = "counter"
@@ -85,6 +91,166 @@ class TraceSpan:
     attributes: Dict[str, Any]
     events: List[Dict[str, Any]]
 
+class LatencyHistogram:
+    """
+    Fixed-bucket log-linear latency histogram (HDR style)
+
+    Durations are counted in microseconds: exactly below 2 * HISTOGRAM_SUB_BUCKETS,
+    then in HISTOGRAM_SUB_BUCKETS linear buckets per power of two, so every
+    bucket is within 1 / HISTOGRAM_SUB_BUCKETS of its values. Memory is fixed
+    regardless of how many requests are recorded.
+    """
+
+    __slots__ = ('counts', 'total_ms', 'max_ms')
+
+    BUCKETS = (HISTOGRAM_MAX_US.bit_length() - HISTOGRAM_SUB_BUCKET_BITS - 1) * HISTOGRAM_SUB_BUCKETS \
+        + 2 * HISTOGRAM_SUB_BUCKETS
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    @staticmethod
+    def bucket(duration_ms: float) -> int:
+        micros = int(duration_ms * 1000.0)
+        if micros < 2 * HISTOGRAM_SUB_BUCKETS:
+            return micros if micros > 0 else 0
+        if micros > HISTOGRAM_MAX_US:
+            micros = HISTOGRAM_MAX_US
+        shift = micros.bit_length() - HISTOGRAM_SUB_BUCKET_BITS - 1
+        return shift * HISTOGRAM_SUB_BUCKETS + (micros >> shift)
+
+    @staticmethod
+    def bucket_value_ms(index: int) -> float:
+        """Midpoint of a bucket, in milliseconds"""
+        if index < 2 * HISTOGRAM_SUB_BUCKETS:
+            return index / 1000.0
+        shift = index // HISTOGRAM_SUB_BUCKETS - 1
+        lower = (index - shift * HISTOGRAM_SUB_BUCKETS) << shift
+        return (lower + (1 << shift) / 2) / 1000.0
+
+    def record(self, duration_ms: float):
+        self.counts[self.bucket(duration_ms)] += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def merge(self, other: 'LatencyHistogram'):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def subtract(self, earlier: 'LatencyHistogram') -> 'LatencyHistogram':
+        """Histogram of the values recorded since an earlier copy of this one"""
+        delta = LatencyHistogram()
+        delta.counts = [a - b for a, b in zip(self.counts, earlier.counts)]
+        delta.total_ms = self.total_ms - earlier.total_ms
+        delta.max_ms = self.max_ms
+        return delta
+
+    def percentiles(self, quantiles: List[float]) -> List[float]:
+        """Latency in milliseconds at each quantile, in one pass over the buckets"""
+        count = self.count
+        if not count:
+            return [0.0] * len(quantiles)
+        targets = sorted((int(count * q), i) for i, q in enumerate(quantiles))
+        results = [self.max_ms] * len(quantiles)
+        cumulative = 0
+        t = 0
+        for index, bucket_count in enumerate(self.counts):
+            if not bucket_count:
+                continue
+            cumulative += bucket_count
+            while t < len(targets) and cumulative > targets[t][0]:
+                results[targets[t][1]] = min(self.bucket_value_ms(index), self.max_ms)
+                t += 1
+            if t == len(targets):
+                break
+        return results
+
+class RequestSeries(LatencyHistogram):
+    """
+    Latency histogram and windowed request counts of one (endpoint, method, status)
+
+    Requests are counted for the current second; when the second changes the
+    count moves into one-second slots covering the last minute and
+    one-minute slots covering the last hour.
+    """
+
+    __slots__ = ('second', 'current', 'second_marks', 'second_counts', 'minute_marks', 'minute_counts')
+
+    def __init__(self):
+        super().__init__()
+        self.second = -1
+        self.current = 0
+        self.second_marks = [-1] * 60
+        self.second_counts = [0] * 60
+        self.minute_marks = [-1] * 60
+        self.minute_counts = [0] * 60
+
+    def record(self, duration_ms: float, now: float):
+        # Hot path: LatencyHistogram.bucket and the second check, inlined
+        micros = int(duration_ms * 1000.0)
+        if micros < 2 * HISTOGRAM_SUB_BUCKETS:
+            index = micros if micros > 0 else 0
+        else:
+            if micros > HISTOGRAM_MAX_US:
+                micros = HISTOGRAM_MAX_US
+            shift = micros.bit_length() - HISTOGRAM_SUB_BUCKET_BITS - 1
+            index = shift * HISTOGRAM_SUB_BUCKETS + (micros >> shift)
+        self.counts[index] += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        second = int(now)
+        if second != self.second:
+            self._roll(second)
+        self.current += 1
+
+    def _roll(self, second: int):
+        if self.current:
+            self._add_window(self.second, self.current)
+        self.second = second
+        self.current = 0
+
+    def _add_window(self, second: int, count: int):
+        self._add_window_slot(self.second_marks, self.second_counts, second, count)
+        self._add_window_slot(self.minute_marks, self.minute_counts, second // 60, count)
+
+    def last_minute(self, now: float) -> int:
+        oldest = int(now) - 59
+        count = self.current if self.second >= oldest else 0
+        return count + sum(c for mark, c in zip(self.second_marks, self.second_counts) if mark >= oldest)
+
+    def last_hour(self, now: float) -> int:
+        oldest = int(now) // 60 - 59
+        count = self.current if self.second // 60 >= oldest else 0
+        return count + sum(c for mark, c in zip(self.minute_marks, self.minute_counts) if mark >= oldest)
+
+    def merge(self, other: 'RequestSeries'):
+        super().merge(other)
+        if other.current:
+            self._add_window(other.second, other.current)
+        for mark, count in zip(other.second_marks, other.second_counts):
+            if mark >= 0:
+                self._add_window_slot(self.second_marks, self.second_counts, mark, count)
+        for mark, count in zip(other.minute_marks, other.minute_counts):
+            if mark >= 0:
+                self._add_window_slot(self.minute_marks, self.minute_counts, mark, count)
+
+    @staticmethod
+    def _add_window_slot(marks: List[int], counts: List[int], mark: int, count: int):
+        slot = mark % 60
+        if marks[slot] == mark:
+            counts[slot] += count
+        elif marks[slot] < mark:
+            marks[slot], counts[slot] = mark, count
+
 class ProductionMetrics:
     """Production-ready metrics collection system"""
     
@@ -103,6 +269,15 @@ class ProductionMetrics:
         self.error_metrics = defaultdict(lambda: deque(maxlen=1000))
         self.business_metrics = defaultdict(lambda: deque(maxlen=1000))
         
+        # Request metrics: each thread records into its own shard of
+        # (endpoint, method, status) -> RequestSeries, so recording takes no
+        # lock; readers merge the shards
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[Tuple[str, str, int], RequestSeries]]] = []
+        self._retired: Dict[Tuple[str, str, int], RequestSeries] = {}
+        self._last_latency: Optional[LatencyHistogram] = None
+        self._slow_request_ms = self.config['performance_thresholds'].get('response_time_ms') or float('inf')
+        
         # Thread safety
         self._lock = threading.RLock()
         
@@ -245,30 +420,12 @@ class ProductionMetrics:
         """Record HTTP request metrics"""
         
         try:
-            timestamp = time.time()
-            labels = labels or {}
-            
-            # Add standard labels
-            labels.update({
-                'service': self.service_name,
-                'endpoint': endpoint,
-                'method': method,
-                'status': str(status_code),
-                'environment': self.environment,
-            })
-            
             # Record internal metrics
-            metric_point = MetricPoint(
-                timestamp=timestamp,
-                value=duration_ms / 1000.0,  # Convert to seconds
-                labels=labels,
-                metric_name='request_duration',
-                metric_type=MetricType.HISTOGRAM
-            )
-            
-            with self._lock:
-                self.metrics['request_duration'].append(metric_point)
-                self.performance_metrics['request_duration'].append(duration_ms)
+            try:
+                series = self._local.shard[(endpoint, method, status_code)]
+            except (AttributeError, KeyError):
+                series = self._series(endpoint, method, status_code)
+            series.record(duration_ms, time.time())
             
             # Record Prometheus metrics
             if PROMETHEUS_AVAILABLE:
@@ -287,15 +444,86 @@ class ProductionMetrics:
             
             # Record OpenTelemetry metrics
             if OPENTELEMETRY_AVAILABLE:
+                labels = dict(labels or {})
+                labels.update({
+                    'service': self.service_name,
+                    'endpoint': endpoint,
+                    'method': method,
+                    'status': str(status_code),
+                    'environment': self.environment,
+                })
                 self.request_counter_otel.add(1, labels)
                 self.request_duration_otel.record(duration_ms / 1000.0, labels)
             
             # Check performance thresholds
-            self._check_performance_thresholds('response_time_ms', duration_ms)
+            if duration_ms > self._slow_request_ms:
+                self._check_performance_thresholds('response_time_ms', duration_ms)
             
         except Exception as e:
             logger.error(f"Failed to record request metrics: {e}")
     
+    def _series(self, endpoint: str, method: str, status_code: int) -> RequestSeries:
+        """This thread's series for a request key, creating the shard or series on first use"""
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._shards.append((threading.current_thread(), shard))
+        series = shard.get((endpoint, method, status_code))
+        if series is None:
+            series = shard[(endpoint, method, status_code)] = RequestSeries()
+        return series
+    
+    def _request_series(self) -> Dict[Tuple[str, str, int], List[RequestSeries]]:
+        """Every thread's series for each request key; shards of finished threads are folded into one"""
+        with self._lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                    continue
+                for key, series in shard.items():
+                    self._retired.setdefault(key, RequestSeries()).merge(series)
+            self._shards = live
+            
+            merged = defaultdict(list)
+            for key, series in self._retired.items():
+                merged[key].append(series)
+            for _, shard in live:
+                for key, series in list(shard.items()):
+                    merged[key].append(series)
+            return merged
+    
+    def get_request_stats(self, endpoint: Optional[str] = None, method: Optional[str] = None,
+                          status_code: Optional[int] = None) -> Dict[str, Any]:
+        """Latency percentiles and request rates, optionally for one endpoint, method or status"""
+        
+        now = time.time()
+        latency = LatencyHistogram()
+        last_minute = last_hour = 0
+        for (key_endpoint, key_method, key_status), series_list in self._request_series().items():
+            if ((endpoint is not None and key_endpoint != endpoint) or
+                    (method is not None and key_method != method) or
+                    (status_code is not None and key_status != status_code)):
+                continue
+            for series in series_list:
+                latency.merge(series)
+                last_minute += series.last_minute(now)
+                last_hour += series.last_hour(now)
+        
+        p50, p95, p99 = latency.percentiles([0.5, 0.95, 0.99])
+        count = latency.count
+        return {
+            'total_requests': count,
+            'requests_last_hour': last_hour,
+            'requests_per_second': last_minute / 60.0,
+            'avg_latency_ms': latency.total_ms / count if count else 0.0,
+            'p50_latency_ms': p50,
+            'p95_latency_ms': p95,
+            'p99_latency_ms': p99,
+            'max_latency_ms': latency.max_ms,
+        }
+    
     def record_error(self, error_type: str, error_message: str, severity: str = "error",
                     labels: Optional[Dict[str, str]] = None):
         """Record error metrics"""
@@ -561,9 +789,7 @@ class ProductionMetrics:
                 total_errors = sum(len([e for e in errors if e > cutoff_time]) 
                                  for errors in self.error_metrics.values())
                 
-                # Estimate total requests (this would be more accurate with actual request count)
-                total_requests = len([m for m in self.metrics['request_duration'] 
-                                   if m.timestamp > cutoff_time])
+                total_requests = self.get_request_stats()['requests_last_hour']
                 
                 if total_requests > 0:
                     error_rate = (total_errors / total_requests) * 100
@@ -611,43 +837,43 @@ class ProductionMetrics:
         """Calculate performance metrics from collected data"""
         
         try:
-            with self._lock:
-                # Calculate latency percentiles
-                if self.performance_metrics['request_duration']:
-                    latencies = list(self.performance_metrics['request_duration'])
-                    latencies.sort()
-                    
-                    p50 = latencies[int(len(latencies) * 0.5)]
-                    p95 = latencies[int(len(latencies) * 0.95)]
-                    p99 = latencies[int(len(latencies) * 0.99)]
-                    
-                    # Record percentile metrics
-                    self._record_performance_metric('latency_p50', p50)
-                    self._record_performance_metric('latency_p95', p95)
-                    self._record_performance_metric('latency_p99', p99)
-                    
-                    # Update Prometheus metrics
-                    if PROMETHEUS_AVAILABLE:
-                        self.latency_p95.labels(
-                            service=self.service_name,
-                            endpoint='all'
-                        ).set(p95 / 1000.0)  # Convert to seconds
+            now = time.time()
+            latency = LatencyHistogram()
+            last_minute = 0
+            for series_list in self._request_series().values():
+                for series in series_list:
+                    latency.merge(series)
+                    last_minute += series.last_minute(now)
+            
+            # Latency percentiles of the requests since the previous collection
+            interval = latency.subtract(self._last_latency) if self._last_latency is not None else latency
+            self._last_latency = latency
+            
+            if interval.count > 0:
+                p50, p95, p99 = interval.percentiles([0.5, 0.95, 0.99])
                 
-                # Calculate throughput
-                if self.performance_metrics['request_duration']:
-                    # Calculate requests per second (simplified)
-                    recent_requests = len([r for r in self.performance_metrics['request_duration'] 
-                                        if r > time.time() - 60])  # Last minute
-                    throughput = recent_requests / 60.0
-                    
-                    self._record_performance_metric('throughput_rps', throughput)
-                    
-                    # Update Prometheus metrics
-                    if PROMETHEUS_AVAILABLE:
-                        self.throughput.labels(
-                            service=self.service_name,
-                            endpoint='all'
-                        ).set(throughput)
+                # Record percentile metrics
+                self._record_performance_metric('latency_p50', p50)
+                self._record_performance_metric('latency_p95', p95)
+                self._record_performance_metric('latency_p99', p99)
+                
+                # Update Prometheus metrics
+                if PROMETHEUS_AVAILABLE:
+                    self.latency_p95.labels(
+                        service=self.service_name,
+                        endpoint='all'
+                    ).set(p95 / 1000.0)  # Convert to seconds
+            
+            # Requests per second over the last minute
+            throughput = last_minute / 60.0
+            self._record_performance_metric('throughput_rps', throughput)
+            
+            # Update Prometheus metrics
+            if PROMETHEUS_AVAILABLE:
+                self.throughput.labels(
+                    service=self.service_name,
+                    endpoint='all'
+                ).set(throughput)
         
         except Exception as e:
             logger.error(f"Failed to calculate performance metrics: {e}")
@@ -774,14 +1000,9 @@ class ProductionMetrics:
                 }
             
             # Performance summary
-            if self.performance_metrics['request_duration']:
-                latencies = list(self.performance_metrics['request_duration'])
-                summary['performance'] = {
-                    'avg_latency_ms': sum(latencies) / len(latencies),
-                    'p95_latency_ms': sorted(latencies)[int(len(latencies) * 0.95)],
-                    'p99_latency_ms': sorted(latencies)[int(len(latencies) * 0.99)],
-                    'total_requests': len(latencies),
-                }
+            stats = self.get_request_stats()
+            if stats['total_requests']:
+                summary['performance'] = stats
             
             # Error summary
             total_errors = sum(len(errors) for errors in self.error_metrics.values())
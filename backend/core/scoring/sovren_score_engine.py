@@ -25,6 +25,19 @@ from collections import defaultdict
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('SOVRENScore')
 
+# Scores kept per business; trajectory looks at the last five
+SCORE_HISTORY_LIMIT = int(os.environ.get('SOVREN_SCORE_HISTORY_LIMIT', '5'))
+
+# Benchmark distributions: t-digest compression, rolling window in days (0
+# keeps every score), scores needed before percentiles come from the
+# distribution instead of fixed cut-offs, and how often the percentile
+# snapshot is rebuilt and the sketches checkpointed
+BENCHMARK_COMPRESSION = float(os.environ.get('SOVREN_BENCHMARK_COMPRESSION', '200'))
+BENCHMARK_WINDOW_DAYS = int(os.environ.get('SOVREN_BENCHMARK_WINDOW_DAYS', '30'))
+BENCHMARK_MIN_SAMPLES = int(os.environ.get('SOVREN_BENCHMARK_MIN_SAMPLES', '100'))
+BENCHMARK_REFRESH_SECONDS = float(os.environ.get('SOVREN_BENCHMARK_REFRESH_SECONDS', '3600'))
+PERCENTILE_TABLE_SIZE = 1024
+
 class ScoreDimension(Enum):
     """SOVREN Score dimensions"""
     OPERATIONAL_EFFICIENCY = "operational_efficiency"
@@ -70,6 +83,238 @@ class ScoreRequest:
     time_period: str  # "daily", "weekly", "monthly"
     include_recommendations: bool = True
 
+# Metric, factor format and weight of each dimension's factors, in the order
+# the dimension calculators accumulate them
+DIMENSION_FACTORS = {
+    ScoreDimension.OPERATIONAL_EFFICIENCY: (
+        ('automation_rate', '.1%', 0.3),
+        ('error_reduction', '.1%', 0.25),
+        ('decision_velocity', '.1f', 0.25),
+        ('resource_optimization', '.1%', 0.2),
+    ),
+    ScoreDimension.STRATEGIC_ALIGNMENT: (
+        ('goal_achievement', '.1%', 0.3),
+        ('initiative_success', '.1%', 0.25),
+        ('pivot_agility', '.1f', 0.25),
+        ('vision_execution', '.1%', 0.2),
+    ),
+    ScoreDimension.INTELLIGENCE_QUOTIENT: (
+        ('prediction_accuracy', '.1%', 0.3),
+        ('insight_generation', '.1f', 0.25),
+        ('pattern_recognition', '.1f', 0.25),
+        ('opportunity_capture', '.1%', 0.2),
+    ),
+    ScoreDimension.EXECUTION_EXCELLENCE: (
+        ('implementation_speed', '.1f', 0.25),
+        ('quality_consistency', '.1%', 0.25),
+        ('stakeholder_satisfaction', '.1%', 0.25),
+        ('continuous_improvement', '.1%', 0.25),
+    ),
+}
+
+# (minimum total score, value), highest first
+PERCENTILE_THRESHOLDS = ((800, 90.0), (650, 75.0), (500, 50.0), (350, 25.0))
+DEFAULT_PERCENTILE = 10.0
+CATEGORY_THRESHOLDS = (
+    (800, ScoreCategory.EXCELLENT),
+    (600, ScoreCategory.GOOD),
+    (400, ScoreCategory.AVERAGE),
+    (200, ScoreCategory.BELOW_AVERAGE),
+)
+
+DIMENSION_RECOMMENDATIONS = {
+    ScoreDimension.OPERATIONAL_EFFICIENCY: [
+        "Increase automation rate by implementing more automated workflows",
+        "Focus on error reduction through better quality control processes",
+        "Improve decision velocity by streamlining approval processes",
+        "Optimize resource allocation using data-driven insights"
+    ],
+    ScoreDimension.STRATEGIC_ALIGNMENT: [
+        "Align team goals with overall business strategy",
+        "Improve initiative success rate through better planning",
+        "Increase pivot agility by reducing bureaucratic processes",
+        "Ensure vision execution through regular progress reviews"
+    ],
+    ScoreDimension.INTELLIGENCE_QUOTIENT: [
+        "Improve prediction accuracy through better data analysis",
+        "Generate more actionable insights from business data",
+        "Enhance pattern recognition capabilities",
+        "Increase opportunity capture rate through proactive monitoring"
+    ],
+    ScoreDimension.EXECUTION_EXCELLENCE: [
+        "Speed up implementation through better project management",
+        "Maintain quality consistency across all operations",
+        "Improve stakeholder satisfaction through better communication",
+        "Implement continuous improvement processes"
+    ],
+}
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest)
+
+    Values are buffered and periodically compressed into at most about
+    compression / 2 weighted centroids. Centroids near the tails hold few
+    values, so extreme percentiles stay accurate.
+    """
+
+    def __init__(self, compression: float = BENCHMARK_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self._buffer: List[np.ndarray] = []
+        self._buffered = 0
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum()) + self._buffered
+
+    def add(self, values: Union[float, np.ndarray]):
+        values = np.atleast_1d(np.asarray(values, dtype=np.float64))
+        if not len(values):
+            return
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._buffer.append(values)
+        self._buffered += len(values)
+        if self._buffered >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other: 'TDigest'):
+        other._compress()
+        if not len(other.weights):
+            return
+        self._compress(other.means, other.weights)
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def _compress(self, extra_means: Optional[np.ndarray] = None, extra_weights: Optional[np.ndarray] = None):
+        if not self._buffered and extra_means is None:
+            return
+        means = [self.means, *self._buffer]
+        weights = [self.weights, *(np.ones(len(b)) for b in self._buffer)]
+        if extra_means is not None:
+            means.append(extra_means)
+            weights.append(extra_weights)
+        means, weights = np.concatenate(means), np.concatenate(weights)
+        self._buffer, self._buffered = [], 0
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Group consecutive centroids that fall within one unit of the k1
+        # scale k(q) = compression / (2 pi) * asin(2q - 1)
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1.0, 1.0)))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _knots(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(values, cumulative weights) to interpolate between"""
+        self._compress()
+        ranks = np.cumsum(self.weights) - self.weights / 2
+        return (np.r_[self.minimum, self.means, self.maximum],
+                np.r_[0.0, ranks, self.weights.sum()])
+
+    def quantile(self, q: float) -> float:
+        """Value below which a fraction q of the values fall"""
+        values, ranks = self._knots()
+        if not len(self.weights):
+            return float('nan')
+        return float(np.interp(q * ranks[-1], ranks, values))
+
+    def cdf(self, values: Union[float, np.ndarray]) -> np.ndarray:
+        """Fraction of the values at or below each of values"""
+        knots, ranks = self._knots()
+        if not len(self.weights):
+            return np.full(np.shape(values), np.nan)
+        return np.interp(values, knots, ranks / ranks[-1])
+
+    def to_bytes(self) -> bytes:
+        self._compress()
+        return np.r_[self.compression, self.minimum, self.maximum, self.means, self.weights].tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'TDigest':
+        values = np.frombuffer(data, dtype=np.float64)
+        digest = cls(float(values[0]))
+        digest.minimum, digest.maximum = float(values[1]), float(values[2])
+        digest.means, digest.weights = np.split(values[3:].copy(), 2)
+        return digest
+
+class ScoreDistribution:
+    """
+    Rolling-window distribution of one score
+
+    Scores go into one TDigest per day (a single all-time digest when
+    window_days is 0). refresh() merges the days inside the window and
+    builds an evenly spaced table of percentile ranks, from which
+    percentiles() reads each score's percentile with one index computation.
+    """
+
+    def __init__(self, window_days: int = BENCHMARK_WINDOW_DAYS, compression: float = BENCHMARK_COMPRESSION):
+        self.window_days = window_days
+        self.compression = compression
+        self.buckets: Dict[int, TDigest] = {}
+        self.dirty: set = set()
+        self.snapshot: Optional[TDigest] = None
+        self.table: Optional[np.ndarray] = None
+        self.low = self.high = self.scale = 0.0
+
+    def bucket(self, timestamp: float) -> int:
+        return int(timestamp // 86400) if self.window_days else 0
+
+    def add(self, values: np.ndarray, timestamp: float):
+        key = self.bucket(timestamp)
+        if key not in self.buckets:
+            self.buckets[key] = TDigest(self.compression)
+        self.buckets[key].add(values)
+        self.dirty.add(key)
+
+    def expired(self, now: float) -> List[int]:
+        if not self.window_days:
+            return []
+        oldest = self.bucket(now) - self.window_days + 1
+        return [key for key in self.buckets if key < oldest]
+
+    def refresh(self, now: float) -> List[int]:
+        """Drop days outside the window and rebuild the snapshot; returns the dropped days"""
+        expired = self.expired(now)
+        for key in expired:
+            del self.buckets[key]
+            self.dirty.discard(key)
+
+        merged = TDigest(self.compression)
+        for digest in self.buckets.values():
+            merged.merge(digest)
+        self.snapshot = merged
+        if merged.count:
+            self.low, self.high = merged.minimum, merged.maximum
+            grid = np.linspace(self.low, self.high, PERCENTILE_TABLE_SIZE)
+            self.table = merged.cdf(grid) * 100.0
+            self.scale = (PERCENTILE_TABLE_SIZE - 1) / (self.high - self.low) if self.high > self.low else 0.0
+        else:
+            self.table = None
+        return expired
+
+    @property
+    def samples(self) -> float:
+        return self.snapshot.count if self.snapshot is not None else 0.0
+
+    def percentiles(self, values: np.ndarray) -> np.ndarray:
+        """Percentile rank (0-100) of each value in the snapshot"""
+        if self.scale == 0.0:
+            # Every snapshot value is the same
+            return np.where(values < self.low, 0.0, np.where(values > self.high, 100.0, 50.0))
+        position = np.clip(np.nan_to_num((values - self.low) * self.scale), 0, PERCENTILE_TABLE_SIZE - 1)
+        index = np.minimum(position.astype(np.int64), PERCENTILE_TABLE_SIZE - 2)
+        fraction = position - index
+        ranks = self.table[index] + (self.table[index + 1] - self.table[index]) * fraction
+        return np.where(np.isnan(values), np.nan, ranks)
+
 class ScoreError(Exception):
     """Base exception for SOVREN Score system"""
     pass
@@ -90,6 +335,12 @@ class SOVRENScoreEngine:
         self.benchmark_data: Dict[str, float] = {}
         self.running = False
         
+        # Score distributions behind percentiles and benchmarks: the total
+        # score and each dimension
+        self.distributions: Dict[str, ScoreDistribution] = {
+            key: ScoreDistribution() for key in ['total'] + [d.value for d in ScoreDimension]
+        }
+        
         # Database initialization
         if db_path:
             self.db_path = db_path
@@ -100,6 +351,7 @@ class SOVRENScoreEngine:
             
         self._init_database()
         self._load_benchmarks()
+        self._load_distributions()
         
         # Score weights
         self.dimension_weights = {
@@ -157,6 +409,17 @@ class SOVRENScoreEngine:
                 )
             ''')
             
+            # Benchmark distribution sketches, one row per distribution and day
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS score_sketches (
+                    distribution TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    digest BLOB NOT NULL,
+                    covered_until REAL NOT NULL,
+                    PRIMARY KEY (distribution, bucket)
+                )
+            ''')
+            
             # Indexes for performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_scores_business ON scores (business_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_scores_timestamp ON scores (timestamp)')
@@ -213,6 +476,95 @@ class SOVRENScoreEngine:
         
         self.benchmark_data.update(default_benchmarks)
     
+    def _load_distributions(self):
+        """Restore distribution sketches and replay scores stored after their checkpoint"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            rows = conn.execute(
+                'SELECT distribution, bucket, digest, covered_until FROM score_sketches'
+            ).fetchall()
+            for key, bucket, digest, _ in rows:
+                if key in self.distributions:
+                    self.distributions[key].buckets[bucket] = TDigest.from_bytes(digest)
+            
+            if rows:
+                covered_until = min(row[3] for row in rows)
+            elif BENCHMARK_WINDOW_DAYS:
+                covered_until = time.time() - BENCHMARK_WINDOW_DAYS * 86400
+            else:
+                covered_until = 0.0
+            
+            cursor = conn.execute(
+                'SELECT timestamp, total_score, components FROM scores WHERE timestamp > ? ORDER BY timestamp',
+                (covered_until,)
+            )
+            replayed = 0
+            while True:
+                chunk = cursor.fetchmany(10000)
+                if not chunk:
+                    break
+                self._observe_rows([(timestamp, total, json.loads(components))
+                                    for timestamp, total, components in chunk])
+                replayed += len(chunk)
+            conn.close()
+            
+            self._refresh_distributions()
+            if replayed:
+                logger.info(f"Replayed {replayed} scores into benchmark distributions")
+            
+        except Exception as e:
+            logger.error(f"Failed to load benchmark distributions: {e}")
+    
+    def _observe_rows(self, rows: List[Tuple[float, float, Dict[str, Any]]]):
+        """Add (timestamp, total score, components) rows to the distributions, grouped by day"""
+        by_bucket = defaultdict(list)
+        total = self.distributions['total']
+        for row in rows:
+            by_bucket[total.bucket(row[0])].append(row)
+        for group in by_bucket.values():
+            timestamp = group[0][0]
+            total.add(np.array([row[1] for row in group]), timestamp)
+            for dimension in ScoreDimension:
+                self.distributions[dimension.value].add(
+                    np.array([row[2][dimension.value]['score'] for row in group]), timestamp
+                )
+    
+    def _observe_scores(self, scores: List[SOVRENScore]):
+        """Add scores to the benchmark distributions"""
+        self._observe_rows([
+            (score.timestamp, score.total_score,
+             {dim.value: {'score': comp.score} for dim, comp in score.components.items()})
+            for score in scores if not np.isnan(score.total_score)
+        ])
+    
+    def _refresh_distributions(self):
+        """Rebuild the percentile snapshots from the days inside the window"""
+        now = time.time()
+        for distribution in self.distributions.values():
+            distribution.refresh(now)
+    
+    def _checkpoint_distributions(self):
+        """Persist every distribution's day sketches, replacing the previous checkpoint"""
+        try:
+            covered_until = time.time()
+            rows = [(key, bucket, digest.to_bytes(), covered_until)
+                    for key, distribution in self.distributions.items()
+                    for bucket, digest in distribution.buckets.items()]
+            
+            conn = sqlite3.connect(self.db_path)
+            with conn:
+                conn.execute('DELETE FROM score_sketches')
+                conn.executemany(
+                    'INSERT INTO score_sketches (distribution, bucket, digest, covered_until) VALUES (?, ?, ?, ?)',
+                    rows
+                )
+            conn.close()
+            for distribution in self.distributions.values():
+                distribution.dirty.clear()
+            
+        except Exception as e:
+            logger.error(f"Failed to checkpoint benchmark distributions: {e}")
+    
     async def start(self):
         """Start the SOVREN Score Engine"""
         logger.info("Starting SOVREN Score Engine...")
@@ -229,6 +581,7 @@ class SOVRENScoreEngine:
         logger.info("Shutting down SOVREN Score Engine...")
         
         self.running = False
+        self._checkpoint_distributions()
         
         logger.info("SOVREN Score Engine shutdown complete")
     
@@ -286,9 +639,7 @@ class SOVRENScoreEngine:
             await self._store_score(score)
             
             # Update history
-            if request.business_id not in self.score_history:
-                self.score_history[request.business_id] = []
-            self.score_history[request.business_id].append(score)
+            self._remember_score(score)
             
             logger.info(f"Calculated SOVREN Score for {request.business_id}: {total_score:.0f}")
             return score
@@ -297,6 +648,129 @@ class SOVRENScoreEngine:
             logger.error(f"Failed to calculate score: {e}")
             raise CalculationError(f"Score calculation failed: {e}")
     
+    async def calculate_scores_bulk(self, requests: List[ScoreRequest]) -> List[SOVRENScore]:
+        """
+        Calculate SOVREN Scores for many businesses at once
+        
+        Metrics are packed into a (businesses, metrics) array and dimension
+        scores, totals, percentiles and categories are computed column-wise
+        with the same floating point operations, in the same order, as
+        calculate_score, so both paths give identical scores. All scores
+        are stored in one transaction.
+        
+        Args:
+            requests: Score calculation requests
+            
+        Returns:
+            SOVREN Scores, in request order
+        """
+        if not requests:
+            return []
+        
+        try:
+            dimensions = list(ScoreDimension)
+            values, irregular = self._pack_metrics(requests)
+            
+            # Dimension scores, one column per dimension
+            component_scores = np.empty((len(requests), len(dimensions)))
+            column = 0
+            for d, dimension in enumerate(dimensions):
+                score = np.zeros(len(requests))
+                for _, _, weight in DIMENSION_FACTORS[dimension]:
+                    score = score + np.minimum(values[:, column] * 10, 100.0) * weight
+                    column += 1
+                component_scores[:, d] = score
+            
+            # Businesses with non-numeric metrics take the per-dimension path,
+            # which records the error in the component
+            fallback = {}
+            for i in irregular:
+                request = requests[i]
+                fallback[i] = {
+                    dimension: await self._calculate_component_score(dimension, request.metrics, request.business_id)
+                    for dimension in dimensions
+                }
+                component_scores[i] = [fallback[i][dimension].score for dimension in dimensions]
+            
+            total = np.zeros(len(requests))
+            for d, dimension in enumerate(dimensions):
+                total = total + component_scores[:, d] * self.dimension_weights[dimension]
+            total = np.minimum(total, 1000.0)
+            percentiles = self._percentiles(total)
+            categories = np.select([total >= threshold for threshold, _ in CATEGORY_THRESHOLDS],
+                                   list(range(len(CATEGORY_THRESHOLDS))), len(CATEGORY_THRESHOLDS))
+            category_values = [category for _, category in CATEGORY_THRESHOLDS] + [ScoreCategory.POOR]
+            
+            # (dimension, weight, [(metric, factor template)]) for building components
+            layout = [(dimension, self.dimension_weights[dimension],
+                       [(metric, f"{metric}: {{:{spec}}}") for metric, spec, _ in DIMENSION_FACTORS[dimension]])
+                      for dimension in dimensions]
+            timestamp = time.time()
+            scores = []
+            for i, (request, row, total_score, percentile, category) in enumerate(zip(
+                    requests, component_scores.tolist(), total.tolist(), percentiles.tolist(), categories.tolist())):
+                components = fallback.get(i) or self._bulk_components(request.metrics, row, layout)
+                recommendations = []
+                if request.include_recommendations:
+                    lowest = min(range(len(dimensions)), key=row.__getitem__)
+                    recommendations = self._recommendations(dimensions[lowest], total_score)
+                score = SOVRENScore(
+                    business_id=request.business_id,
+                    timestamp=timestamp,
+                    total_score=total_score,
+                    percentile=percentile,
+                    category=category_values[category],
+                    components=components,
+                    trajectory=self._trajectory(request.business_id),
+                    recommendations=recommendations,
+                    next_review=timestamp + 86400  # 24 hours
+                )
+                self._remember_score(score)
+                scores.append(score)
+            
+            self._observe_scores(scores)
+            await asyncio.to_thread(self._store_scores, scores)
+            
+            logger.info(f"Calculated {len(scores)} SOVREN Scores in bulk")
+            return scores
+            
+        except Exception as e:
+            logger.error(f"Failed to calculate bulk scores: {e}")
+            raise CalculationError(f"Bulk score calculation failed: {e}")
+    
+    def _pack_metrics(self, requests: List[ScoreRequest]) -> Tuple[np.ndarray, List[int]]:
+        """(businesses, metrics) array of factor metrics, and the rows with non-numeric metrics"""
+        names = [metric for factors in DIMENSION_FACTORS.values() for metric, _, _ in factors]
+        values = np.zeros((len(requests), len(names)))
+        irregular = []
+        for i, request in enumerate(requests):
+            row = [request.metrics.get(name, 0.0) for name in names]
+            # Other types (strings, NumPy scalars) would not take the same float64 arithmetic
+            if all(type(value) in (int, float, bool) for value in row):
+                values[i] = row
+            else:
+                irregular.append(i)
+        return values, irregular
+    
+    def _bulk_components(self, metrics: Dict[str, Any], scores: List[float],
+                         layout: List[Tuple[ScoreDimension, float, List[Tuple[str, str]]]]
+                         ) -> Dict[ScoreDimension, ScoreComponent]:
+        """Score components with the factors and details the dimension calculators report"""
+        components = {}
+        for (dimension, weight, factor_templates), score in zip(layout, scores):
+            factors, details = [], {}
+            for metric, template in factor_templates:
+                value = metrics.get(metric, 0.0)
+                factors.append(template.format(value))
+                details[metric] = value
+            components[dimension] = ScoreComponent(dimension, weight, score, factors, details)
+        return components
+    
+    def _remember_score(self, score: SOVRENScore):
+        history = self.score_history.setdefault(score.business_id, [])
+        history.append(score)
+        del history[:-SCORE_HISTORY_LIMIT]
+    
     async def _calculate_component_score(self, dimension: ScoreDimension, 
                                        metrics: Dict[str, Any], 
                                        business_id: str) -> ScoreComponent:
@@ -519,33 +993,28 @@ class SOVRENScoreEngine:
     
     async def _calculate_percentile(self, total_score: float) -> float:
         """Calculate percentile based on benchmark data"""
-        # Simple percentile calculation based on score ranges
-        if total_score >= 800:
-            return 90.0
-        elif total_score >= 650:
-            return 75.0
-        elif total_score >= 500:
-            return 50.0
-        elif total_score >= 350:
-            return 25.0
-        else:
-            return 10.0
+        return float(self._percentiles(np.array([total_score]))[0])
+    
+    def _percentiles(self, total_scores: np.ndarray) -> np.ndarray:
+        """Percentile of each total score in the benchmark snapshot, or by fixed cut-offs until it has enough scores"""
+        distribution = self.distributions['total']
+        if distribution.samples >= BENCHMARK_MIN_SAMPLES:
+            return np.round(distribution.percentiles(total_scores), 1)
+        return np.select([total_scores >= threshold for threshold, _ in PERCENTILE_THRESHOLDS],
+                         [value for _, value in PERCENTILE_THRESHOLDS], DEFAULT_PERCENTILE)
     
     async def _determine_category(self, total_score: float) -> ScoreCategory:
         """Determine score category"""
-        if total_score >= 800:
-            return ScoreCategory.EXCELLENT
-        elif total_score >= 600:
-            return ScoreCategory.GOOD
-        elif total_score >= 400:
-            return ScoreCategory.AVERAGE
-        elif total_score >= 200:
-            return ScoreCategory.BELOW_AVERAGE
-        else:
-            return ScoreCategory.POOR
+        for threshold, category in CATEGORY_THRESHOLDS:
+            if total_score >= threshold:
+                return category
+        return ScoreCategory.POOR
     
     async def _calculate_trajectory(self, business_id: str, current_score: float) -> str:
         """Calculate score trajectory"""
+        return self._trajectory(business_id)
+    
+    def _trajectory(self, business_id: str) -> str:
         if business_id not in self.score_history or len(self.score_history[business_id]) < 2:
             return "stable"
         
@@ -567,39 +1036,12 @@ class SOVRENScoreEngine:
     async def _generate_recommendations(self, components: Dict[ScoreDimension, ScoreComponent], 
                                       total_score: float) -> List[str]:
         """Generate improvement recommendations"""
-        recommendations = []
-        
         # Find lowest scoring component
         lowest_component = min(components.values(), key=lambda c: c.score)
-        
-        if lowest_component.dimension == ScoreDimension.OPERATIONAL_EFFICIENCY:
-            recommendations.extend([
-                "Increase automation rate by implementing more automated workflows",
-                "Focus on error reduction through better quality control processes",
-                "Improve decision velocity by streamlining approval processes",
-                "Optimize resource allocation using data-driven insights"
-            ])
-        elif lowest_component.dimension == ScoreDimension.STRATEGIC_ALIGNMENT:
-            recommendations.extend([
-                "Align team goals with overall business strategy",
-                "Improve initiative success rate through better planning",
-                "Increase pivot agility by reducing bureaucratic processes",
-                "Ensure vision execution through regular progress reviews"
-            ])
-        elif lowest_component.dimension == ScoreDimension.INTELLIGENCE_QUOTIENT:
-            recommendations.extend([
-                "Improve prediction accuracy through better data analysis",
-                "Generate more actionable insights from business data",
-                "Enhance pattern recognition capabilities",
-                "Increase opportunity capture rate through proactive monitoring"
-            ])
-        elif lowest_component.dimension == ScoreDimension.EXECUTION_EXCELLENCE:
-            recommendations.extend([
-                "Speed up implementation through better project management",
-                "Maintain quality consistency across all operations",
-                "Improve stakeholder satisfaction through better communication",
-                "Implement continuous improvement processes"
-            ])
+        return self._recommendations(lowest_component.dimension, total_score)
+    
+    def _recommendations(self, lowest_dimension: ScoreDimension, total_score: float) -> List[str]:
+        recommendations = list(DIMENSION_RECOMMENDATIONS.get(lowest_dimension, []))
         
         # Add general recommendations based on score
         if total_score < 400:
@@ -615,18 +1057,36 @@ class SOVRENScoreEngine:
     
     async def _store_score(self, score: SOVRENScore):
         """Store score in database"""
+        self._observe_scores([score])
+        self._store_scores([score])
+    
+    def _store_scores(self, scores: List[SOVRENScore]):
+        """Store scores in one transaction"""
+        # A NaN total (from NaN metrics) violates NOT NULL and would fail the whole batch
+        storable = [score for score in scores if not np.isnan(score.total_score)]
+        if len(storable) < len(scores):
+            logger.error(f"Failed to store {len(scores) - len(storable)} scores: total score is NaN")
+        
+        # Bulk scores share a timestamp; repeats of a business get a suffixed id
+        score_ids = []
+        repeats = defaultdict(int)
+        for score in storable:
+            key = f"{score.business_id}_{score.timestamp}"
+            repeats[key] += 1
+            if repeats[key] > 1:
+                key = f"{key}_{repeats[key] - 1}"
+            score_ids.append(str(hashlib.md5(key.encode()).hexdigest()[:16]))
+        
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            score_id = str(hashlib.md5(f"{score.business_id}_{score.timestamp}".encode()).hexdigest()[:16])
-            
-            cursor.execute('''
+            cursor.executemany('''
                 INSERT OR REPLACE INTO scores 
                 (id, business_id, timestamp, total_score, percentile, category, 
                  trajectory, components, recommendations, next_review, metadata)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            ''', [(
                 score_id,
                 score.business_id,
                 score.timestamp,
@@ -643,19 +1103,19 @@ class SOVRENScoreEngine:
                 json.dumps(score.recommendations),
                 score.next_review,
                 json.dumps({})
-            ))
+            ) for score_id, score in zip(score_ids, storable)])
             
             conn.commit()
             conn.close()
             
         except Exception as e:
-            logger.error(f"Failed to store score: {e}")
+            logger.error(f"Failed to store scores: {e}")
     
     async def _benchmark_update_task(self):
         """Background task for updating benchmarks"""
         while self.running:
             try:
-                await asyncio.sleep(86400)  # 24 hours
+                await asyncio.sleep(BENCHMARK_REFRESH_SECONDS)
                 
                 # Update benchmarks based on recent scores
                 await self._update_benchmarks()
@@ -666,38 +1126,29 @@ class SOVRENScoreEngine:
     async def _update_benchmarks(self):
         """Update benchmark data"""
         try:
+            self._refresh_distributions()
+            self._checkpoint_distributions()
+            
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # Get recent scores for each dimension
+            # 50th, 75th and 90th percentile score of each dimension
             for dimension in ScoreDimension:
-                cursor.execute('''
-                    SELECT total_score FROM scores 
-                    WHERE timestamp > ? 
-                    ORDER BY total_score
-                ''', (time.time() - 86400 * 30,))  # Last 30 days
-                
-                scores = [row[0] for row in cursor.fetchall()]
-                if scores:
-                    # Calculate percentiles
-                    percentiles = [50, 75, 90]
-                    for p in percentiles:
-                        index = int(len(scores) * p / 100)
-                        if index < len(scores):
-                            benchmark_score = scores[index]
-                            
-                            # Update benchmark
-                            cursor.execute('''
-                                INSERT OR REPLACE INTO benchmarks 
-                                (id, dimension, percentile, score, timestamp)
-                                VALUES (?, ?, ?, ?, ?)
-                            ''', (
-                                f"{dimension.value}_{p}",
-                                dimension.value,
-                                p,
-                                benchmark_score,
-                                time.time()
-                            ))
+                snapshot = self.distributions[dimension.value].snapshot
+                if snapshot is None or not snapshot.count:
+                    continue
+                for p in [50, 75, 90]:
+                    cursor.execute('''
+                        INSERT OR REPLACE INTO benchmarks 
+                        (id, dimension, percentile, score, timestamp)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', (
+                        f"{dimension.value}_{p}",
+                        dimension.value,
+                        p,
+                        snapshot.quantile(p / 100),
+                        time.time()
+                    ))
             
             conn.commit()
             conn.close()
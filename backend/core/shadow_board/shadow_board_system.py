@@ -5,16 +5,21 @@ Virtual C-Suite Executives with PhD-level expertise
 """
 
 import asyncio
+import contextlib
+import copy
+import hashlib
 import json
 import time
 import uuid
 import logging
 import os
 import sys
-from typing import Dict, List, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import re
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -58,6 +63,11 @@ except ImportError:
     AutoTokenizer = None
     AutoModelForCausalLM = None
 
+try:
+    from transformers import DynamicCache  # type: ignore
+except ImportError:
+    DynamicCache = None
+
 # Type aliases for optional imports
 if TORCH_AVAILABLE and torch is not None:
     DeviceType = torch.device
@@ -71,6 +81,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger('ShadowBoard')
 
+# Checkpoints are loaded once per process and shared by every executive that
+# uses them; executives differ only by prompt and optional LoRA adapter
+DEFAULT_CHECKPOINT = os.environ.get('SHADOW_BOARD_MODEL', 'microsoft/phi-2')
+ADAPTER_DIR = os.environ.get('SHADOW_BOARD_ADAPTER_DIR')  # <dir>/<role name>/ holds a PEFT adapter
+
+# Executives' prompts are generated together as padded batches on one worker thread
+GENERATION_MAX_BATCH = int(os.environ.get('SHADOW_BOARD_MAX_BATCH', 16))
+GENERATION_BATCH_WINDOW = float(os.environ.get('SHADOW_BOARD_BATCH_WINDOW', 0.005))  # seconds
+GENERATION_PARAMS = {'max_new_tokens': 500, 'temperature': 0.7, 'do_sample': True, 'top_p': 0.9}
+
+# KV caches of executives' static persona/expertise prompt prefixes, per scheduler
+PREFIX_CACHE_SIZE = int(os.environ.get('SHADOW_BOARD_PREFIX_CACHE_SIZE', 64))
+
+# Board responses are reused for repeated decision contexts within a company
+BOARD_CACHE_TTL = float(os.environ.get('SHADOW_BOARD_CACHE_TTL', 300))  # seconds
+BOARD_CACHE_SIZE = int(os.environ.get('SHADOW_BOARD_CACHE_SIZE', 1024))
+VOLATILE_CONTEXT_KEYS = frozenset({
+    'timestamp', 'requested_at', 'request_id', 'session_id', 'trace_id', 'user_id', 'company_id'
+})
+
 class ShadowBoardError(Exception):
     """Base exception for Shadow Board System"""
     pass
@@ -110,6 +140,402 @@ class Executive:
     phone_number: Optional[str] = None
     model: Optional[Any] = None
     
+class SharedModel:
+    """A loaded checkpoint and the executives holding a reference to it"""
+    
+    def __init__(self, checkpoint: str):
+        self.checkpoint = checkpoint
+        self.model = None
+        self.tokenizer = None
+        self.refs = 0
+        self.adapters: Dict[str, str] = {}  # adapter name -> path
+        self.load_seconds = 0.0
+        self.lock = asyncio.Lock()
+        self.scheduler: Optional['GenerationScheduler'] = None
+    
+    @property
+    def loaded(self) -> bool:
+        return self.model is not None
+
+def _load_checkpoint(checkpoint: str) -> Tuple[Any, Any]:
+    """Load tokenizer and model weights with transformers"""
+    if not (TORCH_AVAILABLE and TRANSFORMERS_AVAILABLE and AutoTokenizer and AutoModelForCausalLM):
+        raise ModelInitializationError("Required AI libraries not available")
+    tokenizer = AutoTokenizer.from_pretrained(checkpoint)
+    model = AutoModelForCausalLM.from_pretrained(
+        checkpoint,
+        torch_dtype="auto",
+        device_map="auto",
+        low_cpu_mem_usage=True
+    )
+    model.eval()
+    return model, tokenizer
+
+class GenerationScheduler:
+    """Runs a shared model's generate calls as padded batches on a dedicated thread
+    
+    Prompts submitted while a batch is running (or within ``batch_window``
+    of the first one) join the next batch, up to ``max_batch``. Prompts for
+    different adapters or generation parameters go in separate batches.
+    The event loop only waits on futures, so other coroutines keep running.
+    
+    A prompt may be split into a static ``prefix`` and a variable suffix.
+    The prefix's key/value cache is computed once and kept, so later
+    batches only run prefill over the suffixes.
+    """
+    
+    def __init__(self, shared: SharedModel, max_batch: int = GENERATION_MAX_BATCH,
+                 batch_window: float = GENERATION_BATCH_WINDOW, prefix_cache_size: int = PREFIX_CACHE_SIZE):
+        self.shared = shared
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-board-generate')
+        self.batches = 0
+        self.prompts = 0
+        self.tokens_generated = 0
+        self.generate_seconds = 0.0
+        self.max_batch_seen = 0
+        # (adapter, prefix) -> (prefix ids, per-layer (key, value) tensors); worker thread only
+        self.prefix_cache_size = prefix_cache_size
+        self.prefix_caches: 'OrderedDict[Tuple[Optional[str], str], Tuple[Any, Any]]' = OrderedDict()
+        self.reuse_prefixes = prefix_cache_size > 0
+        self.prefix_hits = 0
+        self.prefix_misses = 0
+        self.prefill_tokens_saved = 0
+    
+    async def generate(self, prompt: str, adapter: Optional[str] = None,
+                       params: Optional[Dict[str, Any]] = None, prefix: str = '') -> Tuple[str, int]:
+        """Generated text (``prefix + prompt`` included) and the number of new tokens"""
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        key = (adapter, tuple(sorted((params or GENERATION_PARAMS).items())))
+        await self.queue.put((key, (prefix, prompt), future))
+        return await future
+    
+    async def _collect(self) -> List[Tuple[Any, Tuple[str, str], asyncio.Future]]:
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch:
+            if self.queue.empty():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self.queue.get_nowait())
+        return batch
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            groups: Dict[Any, List[Tuple[Tuple[str, str], asyncio.Future]]] = {}
+            for key, prompt, future in batch:
+                groups.setdefault(key, []).append((prompt, future))
+            
+            try:
+                for (adapter, params), items in groups.items():
+                    prompts = [prompt for prompt, _ in items]
+                    try:
+                        results = await loop.run_in_executor(
+                            self.executor, self._generate_batch, prompts, adapter, dict(params)
+                        )
+                    except Exception as e:
+                        for _, future in items:
+                            if not future.done():
+                                future.set_exception(e)
+                        continue
+                    for (_, future), result in zip(items, results):
+                        if not future.done():
+                            future.set_result(result)
+            except asyncio.CancelledError:
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+    
+    def _generate_batch(self, prompts: List[Tuple[str, str]], adapter: Optional[str],
+                        params: Dict[str, Any]) -> List[Tuple[str, int]]:
+        """One padded generate call (worker thread)"""
+        model, tokenizer = self.shared.model, self.shared.tokenizer
+        if model is None or tokenizer is None:
+            raise ModelInitializationError(f"{self.shared.checkpoint} is not loaded")
+        start = time.perf_counter()
+        
+        # Decoder-only models continue from the right edge, so pad on the left
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        tokenizer.padding_side = 'left'
+        
+        # Only this thread generates, so adapter selection cannot interleave
+        if adapter:
+            model.enable_adapters()
+            model.set_adapter(adapter)
+        elif self.shared.adapters:
+            model.disable_adapters()
+        
+        outputs = None
+        if self.reuse_prefixes and torch is not None and DynamicCache is not None and all(p for p, _ in prompts):
+            try:
+                input_ids, attention_mask, cache = self._prefix_inputs(model, tokenizer, prompts, adapter)
+                with torch.no_grad():
+                    outputs = model.generate(input_ids=input_ids, attention_mask=attention_mask,
+                                             past_key_values=cache, pad_token_id=tokenizer.pad_token_id, **params)
+            except Exception as e:
+                logger.warning(f"Prefix KV reuse failed for {self.shared.checkpoint}, disabling it: {e}")
+                self.reuse_prefixes = False
+                self.prefix_caches.clear()
+                outputs = None
+        if outputs is None:
+            inputs = tokenizer([prefix + suffix for prefix, suffix in prompts],
+                               return_tensors="pt", padding=True).to(model.device)
+            input_ids = inputs['input_ids']
+            with torch.no_grad() if torch is not None else contextlib.nullcontext():
+                outputs = model.generate(**inputs, pad_token_id=tokenizer.pad_token_id, **params)
+        
+        prompt_length = input_ids.shape[1]
+        new_tokens = [int(n) for n in (outputs[:, prompt_length:] != tokenizer.pad_token_id).sum(1)]
+        self.tokens_generated += sum(new_tokens)
+        self.generate_seconds += time.perf_counter() - start
+        self.batches += 1
+        self.prompts += len(prompts)
+        self.max_batch_seen = max(self.max_batch_seen, len(prompts))
+        return list(zip(tokenizer.batch_decode(outputs, skip_special_tokens=True), new_tokens))
+    
+    def _prefix_cache(self, model, tokenizer, prefix: str, adapter: Optional[str]) -> Tuple[Any, Any]:
+        """Token ids and legacy-format KV cache of one prefix, computed on first use"""
+        key = (adapter, prefix)
+        entry = self.prefix_caches.get(key)
+        if entry is not None:
+            self.prefix_caches.move_to_end(key)
+            self.prefix_hits += 1
+            self.prefill_tokens_saved += len(entry[0])
+            return entry
+        self.prefix_misses += 1
+        ids = tokenizer(prefix, return_tensors="pt")['input_ids'].to(model.device)
+        with torch.no_grad():
+            past = model(input_ids=ids, use_cache=True).past_key_values
+        if hasattr(past, 'to_legacy_cache'):
+            past = past.to_legacy_cache()
+        entry = (ids[0], past)
+        self.prefix_caches[key] = entry
+        while len(self.prefix_caches) > self.prefix_cache_size:
+            self.prefix_caches.popitem(last=False)
+        return entry
+    
+    def _prefix_inputs(self, model, tokenizer, prompts: List[Tuple[str, str]], adapter: Optional[str]):
+        """Batch inputs whose prefix columns are already covered by a stacked KV cache
+        
+        Row layout is [pad, prefix | pad, suffix]: prefixes are left-padded to
+        the longest cached prefix and their caches padded to match, then the
+        suffixes are left-padded after them. Padding is masked out.
+        """
+        pad_id = tokenizer.pad_token_id
+        entries = [self._prefix_cache(model, tokenizer, prefix, adapter) for prefix, _ in prompts]
+        suffixes = [tokenizer(suffix, add_special_tokens=False)['input_ids'] for _, suffix in prompts]
+        cached_length = max(len(ids) for ids, _ in entries)
+        suffix_length = max(len(ids) for ids in suffixes)
+        
+        rows, masks, layers = [], [], []
+        for (ids, _), suffix in zip(entries, suffixes):
+            left, gap = cached_length - len(ids), suffix_length - len(suffix)
+            rows.append(torch.cat([ids.new_full((left,), pad_id), ids,
+                                   ids.new_full((gap,), pad_id), ids.new_tensor(suffix)]))
+            masks.append(torch.cat([ids.new_zeros(left), ids.new_ones(len(ids)),
+                                    ids.new_zeros(gap), ids.new_ones(len(suffix))]))
+        for layer in range(len(entries[0][1])):
+            layers.append(tuple(
+                torch.cat([torch.nn.functional.pad(past[layer][i], (0, 0, cached_length - len(ids), 0))
+                           for ids, past in entries])
+                for i in (0, 1)
+            ))
+        return torch.stack(rows), torch.stack(masks), DynamicCache.from_legacy_cache(tuple(layers))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.prefix_hits + self.prefix_misses
+        return {
+            'batches': self.batches,
+            'prompts': self.prompts,
+            'mean_batch_size': round(self.prompts / self.batches, 2) if self.batches else 0.0,
+            'max_batch_size': self.max_batch_seen,
+            'tokens_generated': self.tokens_generated,
+            'tokens_per_second': round(self.tokens_generated / self.generate_seconds, 1)
+            if self.generate_seconds else 0.0,
+            'prefix_reuse': self.reuse_prefixes,
+            'cached_prefixes': len(self.prefix_caches),
+            'prefix_hits': self.prefix_hits,
+            'prefix_misses': self.prefix_misses,
+            'prefix_hit_rate': round(self.prefix_hits / lookups, 3) if lookups else 0.0,
+            'prefill_tokens_saved': self.prefill_tokens_saved
+        }
+    
+    def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+        while self.queue is not None and not self.queue.empty():
+            self.queue.get_nowait()[2].cancel()
+        self.executor.shutdown(wait=False)
+        self.prefix_caches.clear()
+
+class ModelRegistry:
+    """Process-wide registry handing out shared references to loaded checkpoints
+    
+    A checkpoint is loaded lazily by the first executive that acquires it;
+    concurrent acquires wait for that one load. It is unloaded when the
+    last reference is released.
+    """
+    
+    def __init__(self, loader: Optional[Callable[[str], Tuple[Any, Any]]] = None):
+        self.loader = loader or _load_checkpoint
+        self.entries: Dict[str, SharedModel] = {}
+        self.loads = 0
+    
+    async def acquire(self, checkpoint: str, adapter: Optional[Tuple[str, str]] = None) -> SharedModel:
+        """Reference to ``checkpoint``, loading it if needed; ``adapter`` is (name, path)"""
+        entry = self.entries.setdefault(checkpoint, SharedModel(checkpoint))
+        entry.refs += 1
+        try:
+            async with entry.lock:
+                if not entry.loaded:
+                    start = time.perf_counter()
+                    entry.model, entry.tokenizer = await asyncio.to_thread(self.loader, checkpoint)
+                    entry.load_seconds = time.perf_counter() - start
+                    entry.scheduler = GenerationScheduler(entry)
+                    self.loads += 1
+                    logger.info(f"Loaded {checkpoint} in {entry.load_seconds:.1f}s")
+                if adapter and adapter[0] not in entry.adapters:
+                    await asyncio.to_thread(entry.model.load_adapter, adapter[1], adapter_name=adapter[0])
+                    entry.adapters[adapter[0]] = adapter[1]
+        except Exception:
+            self.release(entry)
+            raise
+        return entry
+    
+    def release(self, entry: SharedModel) -> None:
+        """Drop one reference; the weights are freed with the last one"""
+        entry.refs -= 1
+        if entry.refs > 0:
+            return
+        if self.entries.get(entry.checkpoint) is entry:
+            del self.entries[entry.checkpoint]
+        if entry.scheduler is not None:
+            entry.scheduler.close()
+            entry.scheduler = None
+        entry.model = None
+        entry.tokenizer = None
+        entry.adapters.clear()
+        logger.info(f"Unloaded {entry.checkpoint}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'loads': self.loads,
+            'checkpoints': {
+                name: {
+                    'references': entry.refs,
+                    'loaded': entry.loaded,
+                    'load_seconds': round(entry.load_seconds, 3),
+                    'adapters': sorted(entry.adapters),
+                    'generation': entry.scheduler.get_stats() if entry.scheduler else None
+                }
+                for name, entry in self.entries.items()
+            }
+        }
+
+_model_registry: Optional[ModelRegistry] = None
+
+def get_model_registry() -> ModelRegistry:
+    """Registry shared by every Shadow Board in the process"""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
+
+class BoardResponseCache:
+    """LRU of board responses keyed on company and canonicalized decision context
+    
+    Contexts that differ only in key order, whitespace, letter case,
+    ``2.0`` vs ``2`` or volatile keys (timestamps, request and user ids)
+    share an entry. Entries expire after ``ttl`` seconds. Concurrent
+    requests for the same key wait on the board session already running.
+    """
+    
+    def __init__(self, max_size: int = BOARD_CACHE_SIZE, ttl: float = BOARD_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: 'OrderedDict[str, Tuple[str, float, Dict[str, Any]]]' = OrderedDict()
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+    
+    @classmethod
+    def canonicalize(cls, value: Any) -> Any:
+        """Normalized form of a decision context for hashing"""
+        if isinstance(value, dict):
+            return {str(k).strip(): cls.canonicalize(v) for k, v in value.items()
+                    if str(k).strip() not in VOLATILE_CONTEXT_KEYS}
+        if isinstance(value, (list, tuple)):
+            return [cls.canonicalize(v) for v in value]
+        if isinstance(value, str):
+            return ' '.join(value.split()).casefold()
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+    
+    def make_key(self, company_id: str, context: Dict[str, Any]) -> str:
+        canonical = json.dumps(self.canonicalize(context), sort_keys=True, default=str)
+        return hashlib.sha256(f"{company_id}\x00{canonical}".encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Cached response and its age in seconds"""
+        entry = self.entries.get(key)
+        if entry is not None and time.time() - entry[1] > self.ttl:
+            del self.entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        self.tokens_saved += entry[2].get('tokens_generated', 0)
+        return copy.deepcopy(entry[2]), time.time() - entry[1]
+    
+    def put(self, key: str, company_id: str, response: Dict[str, Any]) -> None:
+        self.entries[key] = (company_id, time.time(), copy.deepcopy(response))
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+    
+    def invalidate(self, company_id: Optional[str] = None) -> int:
+        """Drop a company's entries, or all of them"""
+        keys = [key for key, entry in self.entries.items() if company_id is None or entry[0] == company_id]
+        for key in keys:
+            del self.entries[key]
+        return len(keys)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'max_size': self.max_size,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'tokens_saved': self.tokens_saved
+        }
+
 class ExecutivePersonalityEngine:
     """Creates psychologically accurate executive personalities"""
     
@@ -299,9 +725,17 @@ class ExecutivePersonalityEngine:
 
 class ExecutiveModel:
     """Executive model with mandatory PhD-level expertise and advanced model usage"""
-    def __init__(self, executive: Executive, device: Optional[Any] = None):
+    
+    # Specialized checkpoints by role; others use DEFAULT_CHECKPOINT
+    CHECKPOINTS: Dict[ExecutiveRole, str] = {}
+    
+    def __init__(self, executive: Executive, device: Optional[Any] = None,
+                 registry: Optional[ModelRegistry] = None):
         self.executive = executive
         self.device = device
+        self.registry = registry or get_model_registry()
+        self.shared: Optional[SharedModel] = None
+        self.adapter: Optional[str] = None
         self.model = None
         self.tokenizer = None
         self._initialized = False
@@ -319,30 +753,16 @@ class ExecutiveModel:
             return
             
         try:
-            # Load specialized model based on role
-            model_mapping = {
-                ExecutiveRole.CFO: "microsoft/phi-2",  # Financial expertise
-                ExecutiveRole.CTO: "microsoft/phi-2",  # Technical expertise
-                ExecutiveRole.CMO: "microsoft/phi-2",  # Marketing expertise
-                ExecutiveRole.CLO: "microsoft/phi-2",  # Legal expertise
-                # Default to smaller model for others
-            }
+            model_name = self.CHECKPOINTS.get(self.executive.role, DEFAULT_CHECKPOINT)
+            adapter = self._adapter_path()
             
-            model_name = model_mapping.get(self.executive.role, "microsoft/phi-2")
+            logger.info(f"Attaching {self.executive.role.value} to shared model {model_name}")
             
-            logger.info(f"Loading model for {self.executive.role.value}: {model_name}")
-            
-            # Load tokenizer and model
-            if AutoTokenizer and AutoModelForCausalLM and torch:
-                self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-                self.model = AutoModelForCausalLM.from_pretrained(
-                    model_name,
-                    torch_dtype="auto",
-                    device_map="auto",
-                    low_cpu_mem_usage=True
-                )
-            else:
-                raise ModelInitializationError("Required AI libraries not available")
+            # Shared weights; the executive keeps references only
+            self.shared = await self.registry.acquire(model_name, adapter)
+            self.model = self.shared.model
+            self.tokenizer = self.shared.tokenizer
+            self.adapter = adapter[0] if adapter else None
             
             # Create expertise embeddings
             self._create_expertise_embeddings()
@@ -352,6 +772,22 @@ class ExecutiveModel:
             logger.error(f"Failed to initialize model for {self.executive.name}: {e}")
             raise ModelInitializationError(f"Failed to initialize model for {self.executive.name}: {e}")
         
+    def _adapter_path(self) -> Optional[Tuple[str, str]]:
+        """(adapter name, path) when ADAPTER_DIR has an adapter for this role"""
+        if not ADAPTER_DIR:
+            return None
+        path = os.path.join(ADAPTER_DIR, self.executive.role.name.lower())
+        return (self.executive.role.name.lower(), path) if os.path.isdir(path) else None
+    
+    def release(self):
+        """Give up this executive's reference to the shared model"""
+        if self.shared is not None:
+            self.registry.release(self.shared)
+            self.shared = None
+        self.model = None
+        self.tokenizer = None
+        self._initialized = False
+    
     def _create_expertise_embeddings(self):
         """Create embeddings for executive's expertise areas"""
         
@@ -426,23 +862,15 @@ class ExecutiveModel:
         if not self.model or not self.tokenizer:
             raise ModelInitializationError("Advanced model and tokenizer are required for executive recommendations.")
         try:
-            # Build prompt with personality and expertise
-            prompt = self._build_executive_prompt(context)
-            inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
-            if torch is not None:
-                with torch.no_grad():
-                    outputs = self.model.generate(
-                        **inputs,
-                        max_new_tokens=500,
-                        temperature=0.7,
-                        do_sample=True,
-                        top_p=0.9,
-                        pad_token_id=self.tokenizer.eos_token_id
-                    )
-            else:
-                raise ModelInitializationError("Torch not available for model generation")
-            response = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
+            # Build prompt with personality and expertise; the static prefix's KV cache is reused
+            prefix = self._build_prompt_prefix()
+            suffix = self._build_prompt_suffix(context)
+            if self.shared is None or self.shared.scheduler is None:
+                raise ModelInitializationError(f"No generation scheduler for {self.executive.name}")
+            # Batched with the other executives' prompts off the event loop
+            response, new_tokens = await self.shared.scheduler.generate(suffix, self.adapter, prefix=prefix)
             recommendation = self._parse_executive_response(response, context)
+            recommendation['tokens_generated'] = new_tokens
             # Attach expertise and reasoning
             recommendation['phd_expertise'] = self.executive.phd_expertise
             recommendation['reasoning'] = f"Recommendation generated using expertise in: {', '.join(self.executive.phd_expertise)}."
@@ -494,6 +922,11 @@ class ExecutiveModel:
     def _build_executive_prompt(self, context: Dict[str, Any]) -> str:
         """Build prompt incorporating executive personality and expertise"""
         
+        return self._build_prompt_prefix() + self._build_prompt_suffix(context)
+        
+    def _build_prompt_prefix(self) -> str:
+        """Persona and expertise lines, identical for every decision"""
+        
         personality = self.executive.personality_profile
         
         prompt_parts = [
@@ -509,7 +942,12 @@ class ExecutiveModel:
         for area in self.executive.expertise_areas:
             prompt_parts.append(f"- {area}")
             
-        prompt_parts.extend([
+        return "\n".join(prompt_parts) + "\n"
+        
+    def _build_prompt_suffix(self, context: Dict[str, Any]) -> str:
+        """Decision context and instructions following the prefix"""
+        
+        return "\n".join([
             "",
             "Context for decision:",
             json.dumps(context, indent=2),
@@ -519,8 +957,6 @@ class ExecutiveModel:
             "Be specific and actionable in your recommendation."
         ])
         
-        return "\n".join(prompt_parts)
-        
     def _parse_executive_response(self, response: str, context: Dict[str, Any]) -> Dict[str, Any]:
         """Parse executive response into structured recommendation"""
         
@@ -584,6 +1020,7 @@ class ShadowBoardSystem:
         self.personality_engine = ExecutivePersonalityEngine()
         self.executive_models: Dict[str, ExecutiveModel] = {}
         self.running = False
+        self.response_cache = BoardResponseCache()
         
         # Database
         if db_path:
@@ -825,12 +1262,74 @@ class ShadowBoardSystem:
         else:
             logger.warning("No executive models to initialize")
             
-    async def get_board_recommendation(self, decision_context: Dict[str, Any]) -> Dict[str, Any]:
-        """Get recommendations from all board members"""
+    async def get_board_recommendation(self, decision_context: Dict[str, Any],
+                                       company_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get recommendations from all board members
+        
+        Repeated decision contexts within a company are answered from the
+        response cache; ``company_id`` defaults to the context's own.
+        """
         
         if not self.running:
             raise ShadowBoardError("Shadow Board system is not running")
-            
+        
+        start_time = time.time()
+        company_id = str(company_id or decision_context.get('company_id') or 'default')
+        cache = self.response_cache
+        key = cache.make_key(company_id, decision_context)
+        
+        pending = cache.inflight.get(key)
+        if pending is not None:
+            # Same context already in front of the board; share its answer
+            cache.coalesced += 1
+            response = copy.deepcopy(await asyncio.shield(pending))
+            cache.tokens_saved += response.get('tokens_generated', 0)
+            return self._cached_response(response, 0.0, start_time)
+        
+        cached = cache.get(key)
+        if cached is not None:
+            response, age = cached
+            return self._cached_response(response, age, start_time)
+        
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        cache.inflight[key] = future
+        try:
+            response = await self._convene_board(decision_context)
+            # Sessions where an executive abstained on error are not reused
+            if not response.pop('had_errors'):
+                cache.put(key, company_id, response)
+            response['cache'] = {'hit': False}
+            future.set_result(response)
+            return response
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else ShadowBoardError("Board session cancelled"))
+            raise
+        finally:
+            cache.inflight.pop(key, None)
+    
+    def _cached_response(self, response: Dict[str, Any], age: float, start_time: float) -> Dict[str, Any]:
+        logger.info(f"Board session {response['board_session_id']} reused ({age:.0f}s old)")
+        response['cache'] = {'hit': True, 'age_seconds': round(age, 3)}
+        response['processing_time'] = time.time() - start_time
+        return response
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Response cache and per-checkpoint prompt prefix reuse statistics"""
+        schedulers = {model.shared.checkpoint: model.shared.scheduler for model in self.executive_models.values()
+                      if model.shared is not None and model.shared.scheduler is not None}
+        return {
+            'responses': self.response_cache.get_stats(),
+            'prefixes': {
+                checkpoint: {name: value for name, value in scheduler.get_stats().items()
+                             if name.startswith('prefix') or name in ('cached_prefixes', 'prefill_tokens_saved')}
+                for checkpoint, scheduler in schedulers.items()
+            }
+        }
+        
+    async def _convene_board(self, decision_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one board session over all executives"""
+        
         board_session_id = str(uuid.uuid4())
         start_time = time.time()
         
@@ -883,7 +1382,9 @@ class ShadowBoardSystem:
                 'executives_consulted': len(recommendations),
                 'individual_recommendations': self._format_recommendations(recommendations),
                 'consensus': consensus,
-                'next_steps': self._determine_next_steps(consensus, recommendations)
+                'next_steps': self._determine_next_steps(consensus, recommendations),
+                'tokens_generated': sum(rec.get('tokens_generated', 0) for rec in recommendations.values()),
+                'had_errors': any('error' in rec for rec in recommendations.values())
             }
             
             logger.info(f"Board session {board_session_id} completed in {response['processing_time']:.2f}s")
@@ -1262,14 +1763,12 @@ Remember to:
         
         self.running = False
         
-        # Cleanup models
+        # Release shared model references; the last one frees the weights
         for model in self.executive_models.values():
-            # Clear GPU memory
-            if model.model and TORCH_AVAILABLE and torch is not None:
-                try:
-                    del model.model
-                except Exception as e:
-                    logger.error(f"Error cleaning up model: {e}")
+            try:
+                model.release()
+            except Exception as e:
+                logger.error(f"Error cleaning up model: {e}")
                     
         if TORCH_AVAILABLE and torch is not None:
             try:
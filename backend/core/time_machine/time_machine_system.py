@@ -12,21 +12,35 @@ import json
 import sqlite3
 import threading
 import asyncio
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, Iterable, Iterator, List, Tuple, Optional, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
 import hashlib
+import uuid
 import pickle
+import heapq
+from bisect import bisect_left, bisect_right
 import numpy as np
-from collections import deque, defaultdict
+from collections import deque, defaultdict, OrderedDict
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('TimeMachine')
 
+# Timelines are stored as time partitions; partitions beyond the resident
+# budget are dropped from memory (they are already in SQLite) and reloaded on demand
+EVENT_PARTITION_SECONDS = float(os.environ.get('TIME_MACHINE_PARTITION_SECONDS', 86400))
+MAX_RESIDENT_EVENTS = int(os.environ.get('TIME_MACHINE_MAX_RESIDENT_EVENTS', 1_000_000))
+
+# Streaming pattern detection; state is checkpointed to SQLite by the analysis task
+PATTERN_NGRAM_MAX = int(os.environ.get('TIME_MACHINE_PATTERN_NGRAM_MAX', 3))
+PATTERN_MIN_SUPPORT = 5  # occurrences before a sequence or interval is reported
+PATTERN_MAX_INTERVAL_VARIATION = 0.25  # std/mean of inter-arrival gaps for a periodic type
+PATTERN_CHECKPOINT_INTERVAL = float(os.environ.get('TIME_MACHINE_PATTERN_CHECKPOINT_INTERVAL', 300))
+
 class TemporalState(Enum):
     """Temporal memory states"""
     STABLE = "stable"
@@ -59,7 +73,7 @@ class BusinessTimeline:
     timeline_id: str
     start_time: float
     end_time: Optional[float]
-    events: List[TemporalEvent] = field(default_factory=list)
+    event_count: int = 0  # events live in the TemporalEventStore
     causality_graph: Dict[str, List[str]] = field(default_factory=dict)
     branching_points: List[str] = field(default_factory=list)
     state: TemporalState = TemporalState.STABLE
@@ -85,6 +99,309 @@ class TemporalMemoryError(TimeMachineError):
     """Exception for temporal memory errors"""
     pass
 
+class _EventPartition:
+    """Time-sorted events of one timeline within one partition interval"""
+
+    __slots__ = ('key', 'count', 'resident', 'timestamps', 'events', 'by_type')
+
+    def __init__(self, key: int):
+        self.key = key
+        self.count = 0
+        self.resident = True
+        self.timestamps: List[float] = []
+        self.events: List[TemporalEvent] = []
+        self.by_type: Dict[str, Tuple[List[float], List[TemporalEvent]]] = {}
+
+    @staticmethod
+    def _insert(timestamps: List[float], events: List[TemporalEvent], event: TemporalEvent):
+        # Events almost always arrive in time order
+        if not timestamps or event.timestamp >= timestamps[-1]:
+            timestamps.append(event.timestamp)
+            events.append(event)
+        else:
+            i = bisect_right(timestamps, event.timestamp)
+            timestamps.insert(i, event.timestamp)
+            events.insert(i, event)
+
+    def add(self, event: TemporalEvent):
+        self._insert(self.timestamps, self.events, event)
+        typed = self.by_type.get(event.event_type)
+        if typed is None:
+            typed = self.by_type[event.event_type] = ([], [])
+        self._insert(typed[0], typed[1], event)
+
+    def unload(self):
+        self.timestamps, self.events, self.by_type = [], [], {}
+        self.resident = False
+
+    def range(self, start: Optional[float], end: Optional[float],
+              event_types: Optional[List[str]] = None) -> List[TemporalEvent]:
+        """Events with start <= timestamp <= end, optionally of the given types"""
+        if event_types:
+            typed = [self.by_type[t] for t in set(event_types) if t in self.by_type]
+            slices = [self._slice(timestamps, events, start, end) for timestamps, events in typed]
+            if len(slices) == 1:
+                return slices[0]
+            return list(heapq.merge(*slices, key=lambda e: e.timestamp))
+        return self._slice(self.timestamps, self.events, start, end)
+
+    @staticmethod
+    def _slice(timestamps: List[float], events: List[TemporalEvent],
+               start: Optional[float], end: Optional[float]) -> List[TemporalEvent]:
+        lo = bisect_left(timestamps, start) if start is not None else 0
+        hi = bisect_right(timestamps, end) if end is not None else len(timestamps)
+        return events[lo:hi]
+
+class TemporalEventStore:
+    """Time-partitioned event storage backed by the events table
+
+    Each timeline's events are split into partitions of ``partition_seconds``.
+    Resident partitions keep events sorted by timestamp, overall and per
+    event type, so range and type queries bisect instead of scanning. Every
+    event is written through to SQLite, indexed on (timeline_id, timestamp)
+    and (timeline_id, event_type, timestamp); when more than
+    ``max_resident_events`` are in memory the least recently used
+    partitions are dropped and reloaded from disk when next queried.
+    """
+
+    EVENT_COLUMNS = 'id, timestamp, event_type, data, causality_chain, impact_score, confidence, metadata'
+
+    def __init__(self, db_path: str, partition_seconds: float = EVENT_PARTITION_SECONDS,
+                 max_resident_events: int = MAX_RESIDENT_EVENTS):
+        self.partition_seconds = partition_seconds
+        self.max_resident_events = max_resident_events
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None, timeout=30)
+        self.lock = threading.RLock()
+        with self.lock:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.partitions: Dict[str, Dict[int, _EventPartition]] = {}
+        self.partition_keys: Dict[str, List[int]] = {}  # sorted
+        self.lru: 'OrderedDict[Tuple[str, int], None]' = OrderedDict()  # resident partitions
+        self.resident_events = 0
+        self.spills = 0
+        self.reloads = 0
+
+    def _key(self, timestamp: float) -> int:
+        return int(timestamp // self.partition_seconds)
+
+    def _timeline(self, timeline_id: str) -> Dict[int, _EventPartition]:
+        """Partition index of a timeline, read from SQLite the first time it is seen"""
+        partitions = self.partitions.get(timeline_id)
+        if partitions is None:
+            partitions = self.partitions[timeline_id] = {}
+            rows = self.conn.execute(
+                "SELECT CAST(timestamp / ? AS INTEGER), COUNT(*) FROM events WHERE timeline_id = ? GROUP BY 1",
+                (self.partition_seconds, timeline_id)
+            ).fetchall()
+            for key, count in rows:
+                partition = partitions[key] = _EventPartition(key)
+                partition.count = count
+                partition.resident = False
+            self.partition_keys[timeline_id] = sorted(partitions)
+        return partitions
+
+    def _partition(self, timeline_id: str, key: int) -> _EventPartition:
+        partitions = self._timeline(timeline_id)
+        partition = partitions.get(key)
+        if partition is None:
+            partition = partitions[key] = _EventPartition(key)
+            keys = self.partition_keys[timeline_id]
+            if not keys or key > keys[-1]:
+                keys.append(key)
+            else:
+                keys.insert(bisect_left(keys, key), key)
+            self.lru[(timeline_id, key)] = None
+        return partition
+
+    @staticmethod
+    def _row(timeline_id: str, event: TemporalEvent) -> Tuple:
+        return (event.event_id, timeline_id, event.timestamp, event.event_type, json.dumps(event.data),
+                json.dumps(event.causality_chain), event.impact_score, event.confidence,
+                json.dumps(event.metadata))
+
+    @staticmethod
+    def _event(row: Tuple) -> TemporalEvent:
+        return TemporalEvent(
+            event_id=row[0], timestamp=row[1], event_type=row[2], data=json.loads(row[3]),
+            causality_chain=json.loads(row[4]) if row[4] else [], impact_score=row[5] or 0.0,
+            confidence=row[6] or 0.0, metadata=json.loads(row[7]) if row[7] else {}
+        )
+
+    def add(self, timeline_id: str, event: TemporalEvent):
+        self.add_many(timeline_id, [event])
+
+    def add_many(self, timeline_id: str, events: Iterable[TemporalEvent]):
+        """Store events of one timeline in a single transaction"""
+        events = list(events)
+        with self.lock:
+            self._timeline(timeline_id)  # index existing partitions before adding rows
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO events (id, timeline_id, timestamp, event_type, data, "
+                    "causality_chain, impact_score, confidence, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self._row(timeline_id, event) for event in events]
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            for event in events:
+                partition = self._partition(timeline_id, self._key(event.timestamp))
+                partition.count += 1
+                if partition.resident:
+                    # Late events for a spilled partition are picked up on reload
+                    partition.add(event)
+                    self.resident_events += 1
+            self._enforce_budget()
+
+    def _select_partition(self, timeline_id: str, key: int) -> List[Tuple]:
+        start = key * self.partition_seconds
+        return self.conn.execute(
+            f"SELECT {self.EVENT_COLUMNS} FROM events "
+            "WHERE timeline_id = ? AND timestamp >= ? AND timestamp < ? ORDER BY timestamp",
+            (timeline_id, start, start + self.partition_seconds)
+        ).fetchall()
+
+    def _load(self, timeline_id: str, partition: _EventPartition):
+        rows = self._select_partition(timeline_id, partition.key)
+        partition.resident = True
+        partition.count = len(rows)
+        for row in rows:
+            partition.add(self._event(row))
+        self.resident_events += len(rows)
+        self.reloads += 1
+
+    def _enforce_budget(self):
+        while self.resident_events > self.max_resident_events and len(self.lru) > 1:
+            (timeline_id, key), _ = self.lru.popitem(last=False)
+            partition = self.partitions[timeline_id][key]
+            self.resident_events -= len(partition.events)
+            partition.unload()
+            self.spills += 1
+
+    def _keys_between(self, timeline_id: str, start: Optional[float], end: Optional[float]) -> List[int]:
+        keys = self.partition_keys.get(timeline_id, [])
+        lo = bisect_left(keys, self._key(start)) if start is not None else 0
+        hi = bisect_right(keys, self._key(end)) if end is not None else len(keys)
+        return keys[lo:hi]
+
+    def query(self, timeline_id: str, start: Optional[float] = None, end: Optional[float] = None,
+              event_types: Optional[List[str]] = None) -> List[TemporalEvent]:
+        """Events with start <= timestamp <= end in time order, optionally of the given types"""
+        with self.lock:
+            partitions = self._timeline(timeline_id)
+            results: List[TemporalEvent] = []
+            for key in self._keys_between(timeline_id, start, end):
+                partition = partitions[key]
+                if not partition.resident:
+                    self._load(timeline_id, partition)
+                self.lru[(timeline_id, key)] = None
+                self.lru.move_to_end((timeline_id, key))
+                results.extend(partition.range(start, end, event_types))
+            self._enforce_budget()
+            return results
+
+    def scan(self, timeline_id: str) -> Iterator[TemporalEvent]:
+        """All events of a timeline in time order, without making spilled partitions resident"""
+        with self.lock:
+            partitions = self._timeline(timeline_id)
+            keys = list(self.partition_keys.get(timeline_id, []))
+        for key in keys:
+            with self.lock:
+                partition = partitions[key]
+                events = list(partition.events) if partition.resident else None
+                rows = None if partition.resident else self._select_partition(timeline_id, key)
+            if events is not None:
+                yield from events
+            else:
+                yield from (self._event(row) for row in rows)
+
+    def add_causality(self, rows: List[Tuple]):
+        """Insert causality rows (id, source, target, type, strength, direction, metadata) in one transaction"""
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO causality (id, source_event, target_event, causality_type, "
+                    "strength, direction, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def save_pattern_states(self, states: Dict[str, Dict[str, Any]]):
+        """Upsert serialized pattern state per timeline in one transaction
+
+        Each checkpoint records the timeline's highest events rowid, so a
+        restart replays exactly the rows inserted after it.
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                rows = []
+                for timeline_id, state in states.items():
+                    last_rowid = self.conn.execute(
+                        "SELECT MAX(rowid) FROM events WHERE timeline_id = ?", (timeline_id,)
+                    ).fetchone()[0]
+                    rows.append((timeline_id, json.dumps({**state, 'last_rowid': last_rowid or 0}), now))
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO pattern_state (timeline_id, state, updated_at) VALUES (?, ?, ?)",
+                    rows
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def load_pattern_state(self, timeline_id: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT state FROM pattern_state WHERE timeline_id = ?", (timeline_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def inserted_after(self, timeline_id: str, rowid: int) -> List[TemporalEvent]:
+        """Events of a timeline inserted after the given rowid, in insertion order"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {self.EVENT_COLUMNS} FROM events WHERE timeline_id = ? AND rowid > ? ORDER BY rowid",
+                (timeline_id, rowid)
+            ).fetchall()
+        return [self._event(row) for row in rows]
+
+    def count(self, timeline_id: str) -> int:
+        with self.lock:
+            return sum(partition.count for partition in self._timeline(timeline_id).values())
+
+    def evict(self, timeline_id: str):
+        """Drop a timeline from memory; its events stay in SQLite"""
+        with self.lock:
+            for key, partition in self.partitions.pop(timeline_id, {}).items():
+                self.resident_events -= len(partition.events)
+                self.lru.pop((timeline_id, key), None)
+            self.partition_keys.pop(timeline_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'timelines': len(self.partitions),
+                'partitions': sum(len(p) for p in self.partitions.values()),
+                'resident_partitions': len(self.lru),
+                'resident_events': self.resident_events,
+                'max_resident_events': self.max_resident_events,
+                'spills': self.spills,
+                'reloads': self.reloads
+            }
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
 class TimeMachineSystem:
     """
     Production-ready Time Machine Memory System
@@ -108,10 +425,10 @@ class TimeMachineSystem:
             self.db_path = str(data_dir / "time_machine.db")
             
         self._init_database()
+        self.store = TemporalEventStore(self.db_path)
         
-        # Memory management
+        # Memory management; event memory is bounded by the store's resident budget
         self.max_timelines = 1000
-        self.max_events_per_timeline = 10000
         self.cleanup_interval = 3600  # 1 hour
         
         logger.info(f"Time Machine System {self.system_id} initialized")
@@ -164,9 +481,20 @@ class TimeMachineSystem:
                 )
             ''')
             
+            # Streaming pattern state checkpoints
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS pattern_state (
+                    timeline_id TEXT PRIMARY KEY,
+                    state TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            ''')
+            
             # Indexes for performance
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_timeline ON events (timeline_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events (timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_timeline_timestamp ON events (timeline_id, timestamp)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_events_type ON events (timeline_id, event_type, timestamp)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_causality_source ON causality (source_event)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_causality_target ON causality (target_event)')
             
@@ -197,6 +525,8 @@ class TimeMachineSystem:
         
         # Save all timelines to database
         await self._persist_all_timelines()
+        self._checkpoint_patterns()
+        self.store.close()
         
         logger.info("Time Machine Memory System shutdown complete")
     
@@ -216,7 +546,9 @@ class TimeMachineSystem:
         """
         try:
             # Generate event ID
-            event_id = str(hashlib.md5(f"{timeline_id}_{time.time()}_{event_type}".encode()).hexdigest()[:16])
+            event_id = str(hashlib.md5(
+                f"{timeline_id}_{time.time()}_{event_type}_{uuid.uuid4().hex}".encode()
+            ).hexdigest()[:16])
             
             # Create temporal event
             event = TemporalEvent(
@@ -232,18 +564,19 @@ class TimeMachineSystem:
                 self.timelines[timeline_id] = BusinessTimeline(
                     timeline_id=timeline_id,
                     start_time=event.timestamp,
-                    end_time=None,
-                    events=[]
+                    end_time=None
                 )
             
             timeline = self.timelines[timeline_id]
-            timeline.events.append(event)
+            timeline.event_count += 1
             
             # Analyze causality
             await self._analyze_causality(timeline, event)
             
             # Store in database
+            self._ensure_patterns(timeline_id)
             await self._store_event(event, timeline_id)
+            self.pattern_detector.observe(timeline_id, [event])
             
             logger.info(f"Recorded event {event_id} in timeline {timeline_id}")
             return event_id
@@ -252,6 +585,79 @@ class TimeMachineSystem:
             logger.error(f"Failed to record event: {e}")
             raise TemporalMemoryError(f"Event recording failed: {e}")
     
+    async def record_events(self, timeline_id: str, events: List[Dict[str, Any]]) -> List[str]:
+        """
+        Record a batch of events in one timeline
+        
+        Causality links for the whole batch are computed with array
+        operations and written, with the events, in bulk.
+        
+        Args:
+            timeline_id: Timeline identifier
+            events: Dicts with event_type, data and optional metadata and
+                timestamp (defaults to now)
+            
+        Returns:
+            Event IDs, in the order given
+        """
+        try:
+            now = time.time()
+            nonce = uuid.uuid4().hex  # batches with the same timestamps and types still get distinct ids
+            batch = []
+            for i, spec in enumerate(events):
+                timestamp = float(spec.get('timestamp', now))
+                batch.append(TemporalEvent(
+                    event_id=str(hashlib.md5(
+                        f"{timeline_id}_{timestamp}_{spec['event_type']}_{i}_{nonce}".encode()
+                    ).hexdigest()[:16]),
+                    timestamp=timestamp,
+                    event_type=spec['event_type'],
+                    data=spec.get('data', {}),
+                    metadata=spec.get('metadata') or {}
+                ))
+            if not batch:
+                return []
+            ordered = sorted(batch, key=lambda e: e.timestamp)
+            
+            if timeline_id not in self.timelines:
+                self.timelines[timeline_id] = BusinessTimeline(
+                    timeline_id=timeline_id,
+                    start_time=ordered[0].timestamp,
+                    end_time=None
+                )
+            timeline = self.timelines[timeline_id]
+            timeline.event_count += len(batch)
+            
+            engine = self.causality_engine
+            prior = self.store.query(timeline_id, ordered[0].timestamp - engine.window_seconds, ordered[-1].timestamp)
+            sources, targets, time_diffs = engine.batch_links(ordered, prior)
+            links = []
+            for source, target, time_diff in zip(sources.tolist(), targets, time_diffs.tolist()):
+                event_id = ordered[source].event_id
+                timeline.causality_graph.setdefault(event_id, []).append(target)
+                links.append((event_id, target, CausalityNode(
+                    event_id=target,
+                    causality_type=CausalityType.CORRELATION,
+                    strength=1.0 / (1.0 + time_diff),
+                    direction='forward',
+                    metadata={'basis': 'temporal_proximity', 'time_diff': time_diff}
+                )))
+            
+            self._ensure_patterns(timeline_id)
+            self.store.add_many(timeline_id, ordered)
+            await self._store_causality(links)
+            self.pattern_detector.observe(timeline_id, ordered)
+            if timeline_id not in engine.windows:
+                engine.remember(timeline_id, prior)
+            engine.remember(timeline_id, ordered)
+            
+            logger.info(f"Recorded {len(batch)} events and {len(links)} causal links in timeline {timeline_id}")
+            return [event.event_id for event in batch]
+            
+        except Exception as e:
+            logger.error(f"Failed to record events: {e}")
+            raise TemporalMemoryError(f"Event recording failed: {e}")
+    
     async def query_timeline(self, timeline_id: str, 
                            start_time: Optional[float] = None,
                            end_time: Optional[float] = None,
@@ -269,21 +675,8 @@ class TimeMachineSystem:
             List of matching events
         """
         try:
-            if timeline_id not in self.timelines:
-                return []
-            
-            timeline = self.timelines[timeline_id]
-            events = timeline.events
-            
-            # Apply filters
-            if start_time:
-                events = [e for e in events if e.timestamp >= start_time]
-            if end_time:
-                events = [e for e in events if e.timestamp <= end_time]
-            if event_types:
-                events = [e for e in events if e.event_type in event_types]
-            
-            return events
+            # Bisects the timeline's partitions; spilled ones are reloaded from SQLite
+            return self.store.query(timeline_id, start_time, end_time, event_types)
             
         except Exception as e:
             logger.error(f"Failed to query timeline: {e}")
@@ -338,23 +731,59 @@ class TimeMachineSystem:
             List of detected patterns
         """
         try:
-            if timeline_id not in self.timelines:
-                return []
-            
-            timeline = self.timelines[timeline_id]
-            return await self.pattern_detector.detect_patterns(timeline, pattern_type)
+            self._ensure_patterns(timeline_id)
+            return await self.pattern_detector.detect_patterns(timeline_id, pattern_type)
             
         except Exception as e:
             logger.error(f"Failed to detect patterns: {e}")
             raise TemporalMemoryError(f"Pattern detection failed: {e}")
     
+    def _ensure_patterns(self, timeline_id: str):
+        """Load a timeline's pattern state from its checkpoint, replaying events recorded after it"""
+        if timeline_id in self.pattern_detector.states:
+            return
+        checkpoint = self.store.load_pattern_state(timeline_id)
+        if checkpoint is None:
+            # Never checkpointed: build the state from the stored history once
+            self.pattern_detector.observe(timeline_id, self.store.scan(timeline_id))
+            return
+        state = self.pattern_detector.restore(timeline_id, checkpoint)
+        if 'last_rowid' in checkpoint:
+            # Replay by insertion order: backfilled events can be older than the checkpointed state
+            tail = self.store.inserted_after(timeline_id, checkpoint['last_rowid'])
+        else:
+            seen = set(state.last_event_ids)
+            tail = [e for e in self.store.query(timeline_id, state.last_timestamp) if e.event_id not in seen]
+        if tail:
+            self.pattern_detector.observe(timeline_id, tail)
+    
+    def _checkpoint_patterns(self):
+        """Write the pattern state of timelines changed since the last checkpoint"""
+        try:
+            states = self.pattern_detector.take_dirty()
+            if states:
+                self.store.save_pattern_states(states)
+                logger.info(f"Checkpointed pattern state of {len(states)} timelines")
+        except Exception as e:
+            logger.error(f"Failed to checkpoint pattern state: {e}")
+    
     async def _analyze_causality(self, timeline: BusinessTimeline, event: TemporalEvent):
         """Analyze causality for a new event"""
         try:
-            # Find potential causal relationships
-            causal_events = await self.causality_engine.find_causal_events(event, timeline)
+            # Find potential causal relationships among the events of the preceding hour
+            engine = self.causality_engine
+            causal_events = engine.proximate_events(timeline.timeline_id, event)
+            if causal_events is None:
+                # No window yet (or a late event): read the preceding hour from the store
+                recent = self.store.query(timeline.timeline_id, event.timestamp - engine.window_seconds,
+                                          event.timestamp)
+                causal_events = await engine.find_causal_events(event, recent)
+                if timeline.timeline_id not in engine.windows:
+                    engine.remember(timeline.timeline_id, recent)
+            engine.remember(timeline.timeline_id, [event])
             
             # Update causality graph
+            links = []
             for causal_event in causal_events:
                 causality_node = CausalityNode(
                     event_id=causal_event['event_id'],
@@ -366,67 +795,39 @@ class TimeMachineSystem:
                 
                 timeline.causality_graph[event.event_id] = timeline.causality_graph.get(event.event_id, [])
                 timeline.causality_graph[event.event_id].append(causal_event['event_id'])
-                
-                # Store causality relationship
-                await self._store_causality(event.event_id, causal_event['event_id'], causality_node)
+                links.append((event.event_id, causal_event['event_id'], causality_node))
+            
+            # Store causality relationships
+            await self._store_causality(links)
                 
         except Exception as e:
             logger.error(f"Failed to analyze causality: {e}")
     
     async def _store_event(self, event: TemporalEvent, timeline_id: str):
-        """Store event in database"""
+        """Store event in database and the timeline's in-memory partition"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO events 
-                (id, timeline_id, timestamp, event_type, data, causality_chain, 
-                 impact_score, confidence, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                event.event_id,
-                timeline_id,
-                event.timestamp,
-                event.event_type,
-                json.dumps(event.data),
-                json.dumps(event.causality_chain),
-                event.impact_score,
-                event.confidence,
-                json.dumps(event.metadata)
-            ))
-            
-            conn.commit()
-            conn.close()
+            self.store.add(timeline_id, event)
             
         except Exception as e:
             logger.error(f"Failed to store event: {e}")
     
-    async def _store_causality(self, source_event: str, target_event: str, 
-                              causality_node: CausalityNode):
-        """Store causality relationship in database"""
+    async def _store_causality(self, links: List[Tuple[str, str, CausalityNode]]):
+        """Store (source event, target event, node) causality relationships in one transaction"""
+        if not links:
+            return
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            causality_id = str(hashlib.md5(f"{source_event}_{target_event}".encode()).hexdigest()[:16])
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO causality 
-                (id, source_event, target_event, causality_type, strength, direction, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                causality_id,
-                source_event,
-                target_event,
-                causality_node.causality_type.value,
-                causality_node.strength,
-                causality_node.direction,
-                json.dumps(causality_node.metadata)
-            ))
-            
-            conn.commit()
-            conn.close()
+            self.store.add_causality([
+                (
+                    str(hashlib.md5(f"{source_event}_{target_event}".encode()).hexdigest()[:16]),
+                    source_event,
+                    target_event,
+                    causality_node.causality_type.value,
+                    causality_node.strength,
+                    causality_node.direction,
+                    json.dumps(causality_node.metadata)
+                )
+                for source_event, target_event, causality_node in links
+            ])
             
         except Exception as e:
             logger.error(f"Failed to store causality: {e}")
@@ -447,15 +848,11 @@ class TimeMachineSystem:
                 
                 for timeline_id in timelines_to_remove:
                     del self.timelines[timeline_id]
+                    self.store.evict(timeline_id)
+                    self.causality_engine.forget(timeline_id)
+                    self.pattern_detector.forget(timeline_id)
                     logger.info(f"Removed old timeline: {timeline_id}")
                 
-                # Limit events per timeline
-                for timeline_id, timeline in self.timelines.items():
-                    if len(timeline.events) > self.max_events_per_timeline:
-                        # Keep most recent events
-                        timeline.events = timeline.events[-self.max_events_per_timeline:]
-                        logger.info(f"Trimmed timeline {timeline_id} to {len(timeline.events)} events")
-                
             except Exception as e:
                 logger.error(f"Cleanup task error: {e}")
     
@@ -463,12 +860,14 @@ class TimeMachineSystem:
         """Background task for pattern analysis"""
         while self.running:
             try:
-                await asyncio.sleep(300)  # 5 minutes
+                await asyncio.sleep(PATTERN_CHECKPOINT_INTERVAL)
                 
-                for timeline_id, timeline in self.timelines.items():
-                    patterns = await self.pattern_detector.detect_patterns(timeline)
+                # Patterns are read from maintained state; only changed timelines are checkpointed
+                for timeline_id in list(self.pattern_detector.dirty):
+                    patterns = await self.pattern_detector.detect_patterns(timeline_id)
                     if patterns:
                         logger.info(f"Detected {len(patterns)} patterns in timeline {timeline_id}")
+                self._checkpoint_patterns()
                 
             except Exception as e:
                 logger.error(f"Pattern analysis task error: {e}")
@@ -500,7 +899,18 @@ class TimeMachineSystem:
             logger.error(f"Failed to persist timelines: {e}")
 
 class CausalityEngine:
-    """Engine for analyzing causal relationships"""
+    """Engine for analyzing causal relationships
+    
+    Keeps, per timeline, a sliding window of the (timestamp, event id)
+    pairs recorded within the last ``window_seconds``, so proximity
+    candidates for a new event cost O(window) instead of a timeline scan.
+    """
+    
+    WINDOW_SECONDS = 3600  # temporal proximity window
+    
+    def __init__(self, window_seconds: float = WINDOW_SECONDS):
+        self.window_seconds = window_seconds
+        self.windows: Dict[str, deque] = {}
     
     async def analyze_event(self, event_id: str, timelines: Dict[str, BusinessTimeline]) -> Dict[str, Any]:
         """Analyze causality for a specific event"""
@@ -512,49 +922,246 @@ class CausalityEngine:
             'confidence': 0.0
         }
     
-    async def find_causal_events(self, event: TemporalEvent, timeline: BusinessTimeline) -> List[Dict[str, Any]]:
-        """Find events that may have caused this event"""
+    @staticmethod
+    def _proximity_link(past_event_id: str, time_diff: float) -> Dict[str, Any]:
+        return {
+            'event_id': past_event_id,
+            'type': CausalityType.CORRELATION.value,
+            'strength': 1.0 / (1.0 + time_diff),
+            'direction': 'forward',
+            'metadata': {'basis': 'temporal_proximity', 'time_diff': time_diff}
+        }
+    
+    async def find_causal_events(self, event: TemporalEvent,
+                                 recent_events: Iterable[TemporalEvent]) -> List[Dict[str, Any]]:
+        """Find events that may have caused this event among those recorded shortly before it"""
         causal_events = []
         
         # Simple temporal proximity analysis
-        for past_event in timeline.events:
+        for past_event in recent_events:
             if past_event.timestamp < event.timestamp:
                 time_diff = event.timestamp - past_event.timestamp
-                if time_diff < 3600:  # Within 1 hour
-                    causal_events.append({
-                        'event_id': past_event.event_id,
-                        'type': 'temporal_proximity',
-                        'strength': 1.0 / (1.0 + time_diff),
-                        'direction': 'forward',
-                        'metadata': {'time_diff': time_diff}
-                    })
+                if time_diff < self.window_seconds:  # Within 1 hour
+                    causal_events.append(self._proximity_link(past_event.event_id, time_diff))
         
         return causal_events
+    
+    def proximate_events(self, timeline_id: str, event: TemporalEvent) -> Optional[List[Dict[str, Any]]]:
+        """Proximity candidates from the sliding window
+        
+        None when the window can't answer: the timeline has no window yet
+        or the event is older than the newest one in it.
+        """
+        window = self.windows.get(timeline_id)
+        if window is None or (window and event.timestamp < window[-1][0]):
+            return None
+        cutoff = event.timestamp - self.window_seconds
+        while window and window[0][0] <= cutoff:
+            window.popleft()
+        return [self._proximity_link(event_id, event.timestamp - timestamp)
+                for timestamp, event_id in window if timestamp < event.timestamp]
+    
+    def remember(self, timeline_id: str, events: Iterable[TemporalEvent]):
+        """Add recorded events to the timeline's window"""
+        window = self.windows.setdefault(timeline_id, deque())
+        late = []
+        for event in events:
+            if not window or event.timestamp >= window[-1][0]:
+                window.append((event.timestamp, event.event_id))
+            else:
+                late.append((event.timestamp, event.event_id))
+        if late:
+            window = self.windows[timeline_id] = deque(sorted(list(window) + late))
+        if window:
+            cutoff = window[-1][0] - self.window_seconds
+            while window[0][0] <= cutoff:
+                window.popleft()
+    
+    def forget(self, timeline_id: str):
+        self.windows.pop(timeline_id, None)
+    
+    def batch_links(self, events: List[TemporalEvent], prior: List[TemporalEvent]
+                    ) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Proximity links for a time-sorted batch, computed with array operations
+        
+        ``prior`` holds the already recorded events from the window before
+        the batch through its last event, in time order. Returns the batch
+        index of each link's source event, the target event ids and the
+        time differences.
+        """
+        merged = list(heapq.merge(prior, events, key=lambda e: e.timestamp))
+        timestamps = np.fromiter((e.timestamp for e in merged), dtype=np.float64, count=len(merged))
+        batch_timestamps = np.fromiter((e.timestamp for e in events), dtype=np.float64, count=len(events))
+        
+        # Candidates of event i are merged[lo[i]:hi[i]]: earlier than it, by less than the window
+        hi = np.searchsorted(timestamps, batch_timestamps, side='left')
+        lo = np.searchsorted(timestamps, batch_timestamps - self.window_seconds, side='right')
+        counts = np.maximum(hi - lo, 0)
+        total = int(counts.sum())
+        sources = np.repeat(np.arange(len(events)), counts)
+        offsets = np.cumsum(counts) - counts
+        targets = np.arange(total) - np.repeat(offsets, counts) + np.repeat(lo, counts)
+        time_diffs = batch_timestamps[sources] - timestamps[targets]
+        return sources, [merged[i].event_id for i in targets.tolist()], time_diffs
+
+class TimelinePatternState:
+    """Running pattern statistics of one timeline
+    
+    Event type counts, counts of the last ``ngram_max`` types seen in
+    sequence (n-grams, n >= 2) and per-type inter-arrival mean/variance
+    (Welford), updated in O(ngram_max) per event.
+    """
+    
+    def __init__(self, ngram_max: int = PATTERN_NGRAM_MAX):
+        self.ngram_max = ngram_max
+        self.events_seen = 0
+        self.type_counts: Dict[str, int] = defaultdict(int)
+        self.ngram_counts: Dict[Tuple[str, ...], int] = defaultdict(int)
+        self.recent_types: deque = deque(maxlen=max(ngram_max - 1, 1))
+        # event type -> [last timestamp, gaps, mean gap, M2]
+        self.arrivals: Dict[str, List[float]] = {}
+        self.last_timestamp: Optional[float] = None
+        self.last_event_ids: List[str] = []  # events at last_timestamp, for replay after a checkpoint
+    
+    def observe(self, event: TemporalEvent):
+        event_type = event.event_type
+        self.events_seen += 1
+        self.type_counts[event_type] += 1
+        
+        history = list(self.recent_types)
+        for n in range(2, min(self.ngram_max, len(history) + 1) + 1):
+            self.ngram_counts[tuple(history[-(n - 1):]) + (event_type,)] += 1
+        if self.ngram_max > 1:
+            self.recent_types.append(event_type)
+        
+        arrival = self.arrivals.get(event_type)
+        if arrival is None:
+            self.arrivals[event_type] = [event.timestamp, 0, 0.0, 0.0]
+        elif event.timestamp >= arrival[0]:
+            gap = event.timestamp - arrival[0]
+            arrival[0] = event.timestamp
+            arrival[1] += 1
+            delta = gap - arrival[2]
+            arrival[2] += delta / arrival[1]
+            arrival[3] += delta * (gap - arrival[2])
+        
+        if self.last_timestamp is None or event.timestamp > self.last_timestamp:
+            self.last_timestamp = event.timestamp
+            self.last_event_ids = [event.event_id]
+        elif event.timestamp == self.last_timestamp:
+            self.last_event_ids.append(event.event_id)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ngram_max': self.ngram_max,
+            'events_seen': self.events_seen,
+            'type_counts': dict(self.type_counts),
+            'ngram_counts': [[list(ngram), count] for ngram, count in self.ngram_counts.items()],
+            'recent_types': list(self.recent_types),
+            'arrivals': self.arrivals,
+            'last_timestamp': self.last_timestamp,
+            'last_event_ids': self.last_event_ids
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TimelinePatternState':
+        state = cls(data.get('ngram_max', PATTERN_NGRAM_MAX))
+        state.events_seen = data['events_seen']
+        state.type_counts.update(data['type_counts'])
+        state.ngram_counts.update({tuple(ngram): count for ngram, count in data['ngram_counts']})
+        state.recent_types.extend(data['recent_types'])
+        state.arrivals = {event_type: list(arrival) for event_type, arrival in data['arrivals'].items()}
+        state.last_timestamp = data['last_timestamp']
+        state.last_event_ids = list(data['last_event_ids'])
+        return state
 
 class PatternDetector:
-    """Engine for detecting patterns in timelines"""
+    """Engine for detecting patterns in timelines
+    
+    Pattern state is maintained per timeline as events are recorded, so a
+    query reads counters instead of recounting the timeline's history.
+    """
+    
+    def __init__(self, ngram_max: int = PATTERN_NGRAM_MAX):
+        self.ngram_max = ngram_max
+        self.states: Dict[str, TimelinePatternState] = {}
+        self.dirty: set = set()  # timelines changed since the last checkpoint
+    
+    def state(self, timeline_id: str) -> TimelinePatternState:
+        state = self.states.get(timeline_id)
+        if state is None:
+            state = self.states[timeline_id] = TimelinePatternState(self.ngram_max)
+        return state
+    
+    def observe(self, timeline_id: str, events: Iterable[TemporalEvent]):
+        """Fold recorded events into the timeline's state"""
+        state = self.state(timeline_id)
+        for event in events:
+            state.observe(event)
+        self.dirty.add(timeline_id)
     
-    async def detect_patterns(self, timeline: BusinessTimeline, 
+    def restore(self, timeline_id: str, data: Dict[str, Any]) -> TimelinePatternState:
+        state = self.states[timeline_id] = TimelinePatternState.from_dict(data)
+        return state
+    
+    def forget(self, timeline_id: str):
+        self.states.pop(timeline_id, None)
+        self.dirty.discard(timeline_id)
+    
+    def take_dirty(self) -> Dict[str, Dict[str, Any]]:
+        """Serialized state of timelines changed since the last call"""
+        dirty = {timeline_id: self.states[timeline_id].to_dict()
+                 for timeline_id in self.dirty if timeline_id in self.states}
+        self.dirty.clear()
+        return dirty
+    
+    async def detect_patterns(self, timeline_id: str, 
                             pattern_type: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Detect patterns in timeline"""
+        """Detect patterns in a timeline from its maintained state"""
         patterns = []
+        state = self.states.get(timeline_id)
+        if state is None:
+            return patterns
         
-        # Simple pattern detection
-        event_types = [event.event_type for event in timeline.events]
-        type_counts = defaultdict(int)
+        # Find frequent patterns
+        if pattern_type in (None, 'frequency'):
+            for event_type, count in state.type_counts.items():
+                if count > 5:  # More than 5 occurrences
+                    patterns.append({
+                        'pattern_type': 'frequency',
+                        'event_type': event_type,
+                        'count': count,
+                        'confidence': min(count / 10.0, 1.0)
+                    })
         
-        for event_type in event_types:
-            type_counts[event_type] += 1
+        # Recurring sequences of event types
+        if pattern_type in (None, 'sequence'):
+            for ngram, count in state.ngram_counts.items():
+                if count >= PATTERN_MIN_SUPPORT:
+                    patterns.append({
+                        'pattern_type': 'sequence',
+                        'sequence': list(ngram),
+                        'count': count,
+                        'support': count / max(state.events_seen - len(ngram) + 1, 1),
+                        'confidence': min(count / 10.0, 1.0)
+                    })
         
-        # Find frequent patterns
-        for event_type, count in type_counts.items():
-            if count > 5:  # More than 5 occurrences
-                patterns.append({
-                    'pattern_type': 'frequency',
-                    'event_type': event_type,
-                    'count': count,
-                    'confidence': min(count / 10.0, 1.0)
-                })
+        # Event types arriving at regular intervals
+        if pattern_type in (None, 'periodicity'):
+            for event_type, (_, gaps, mean, m2) in state.arrivals.items():
+                if gaps < PATTERN_MIN_SUPPORT or mean <= 0:
+                    continue
+                std = (m2 / gaps) ** 0.5
+                variation = std / mean
+                if variation <= PATTERN_MAX_INTERVAL_VARIATION:
+                    patterns.append({
+                        'pattern_type': 'periodicity',
+                        'event_type': event_type,
+                        'mean_interval': mean,
+                        'std_interval': std,
+                        'count': int(gaps),
+                        'confidence': 1.0 - variation
+                    })
         
         return patterns
 
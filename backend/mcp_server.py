@@ -115,6 +115,8 @@ import cProfile
 import pstats
 import timeit
 
+from api.mcp_protocol import MCPStreamServer
+
 # Optional libraries with graceful fallbacks
 # Using importlib to avoid pyright import errors
 
@@ -793,10 +795,9 @@ class TranscendentMCPServer:
     def __init__(self, host: str = "0.0.0.0", port: int = 9999):
         self.host = host
         self.port = port
-        self.server_socket = None
+        self.stream_server: Optional[MCPStreamServer] = None
         self.is_running = False
-        self.clients = []
-        self.lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Initialize transcendence engines
         self.reality_distortion_engine = RealityDistortionEngine()
@@ -810,16 +811,23 @@ class TranscendentMCPServer:
         self.transcendence_index = 0.0
         
     def start(self):
-        """Start the transcendent MCP server"""
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(1000)
-        self.server_socket.setblocking(False)
+        """Start the transcendent MCP server (blocks until SIGINT/SIGTERM or stop())"""
+        asyncio.run(self.serve())
+    
+    async def serve(self):
+        """Serve MCP clients on asyncio streams until shutdown"""
+        # One coroutine per connection (see api.mcp_protocol.MCPStreamServer)
+        self.stream_server = MCPStreamServer(
+            lambda connection: (self._process_transcendent_request, self._transcendent_error_response),
+            self.host, self.port
+        )
+        await self.stream_server.start()
+        self._loop = asyncio.get_running_loop()
+        self.stream_server.install_signal_handlers()
         self.is_running = True
         
         print(f"🚀 TRANSCENDENT MCP SERVER STARTED")
-        print(f"📍 Host: {self.host}:{self.port}")
+        print(f"📍 Host: {self.host}:{self.stream_server.port}")
         print(f"⚡ Reality Distortion Index: {self.reality_distortion_engine.reality_distortion_index}")
         print(f"🎯 Singularity Coefficient: {self.reality_distortion_engine.singularity_coefficient}")
         print(f"🌌 Dimensional Space: {self.reality_distortion_engine.dimensional_space}")
@@ -827,65 +835,22 @@ class TranscendentMCPServer:
         print(f"🔥 Metamorphic Cycles: {self.metamorphic_phoenix_biology.self_immolation_cycles}")
         
         try:
-            while self.is_running:
-                try:
-                    client_socket, addr = self.server_socket.accept()
-                    print(f"🔗 Transcendent connection from {addr}")
-                    with self.lock:
-                        self.clients.append(client_socket)
-                    asyncio.create_task(self._handle_transcendent_client(client_socket))
-                except BlockingIOError:
-                    pass
-                except Exception as e:
-                    print(f"❌ Connection error: {e}")
-                time.sleep(0.001)  # Ultra-low latency
-        except KeyboardInterrupt:
-            print("\n🛑 Shutting down transcendent MCP server...")
+            await self.stream_server.serve_forever()
         finally:
-            self.stop()
+            self.is_running = False
+            print("\n🛑 Transcendent MCP server stopped")
     
     def stop(self):
-        """Stop the transcendent MCP server"""
-        self.is_running = False
-        if self.server_socket:
-            self.server_socket.close()
-        for client in self.clients:
-            try:
-                client.close()
-            except Exception:
-                pass
+        """Stop the transcendent MCP server, draining in-flight requests (safe from any thread)"""
+        if self.stream_server is not None and self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.stream_server.shutdown(), self._loop)
     
-    async def _handle_transcendent_client(self, client_socket: socket.socket):
-        """Handle transcendent client connections"""
-        try:
-            while self.is_running:
-                try:
-                    data = client_socket.recv(8192)
-                    if not data:
-                        break
-                    
-                    request = json.loads(data.decode('utf-8'))
-                    response = await self._process_transcendent_request(request)
-                    
-                    client_socket.send(json.dumps(response).encode('utf-8'))
-                    
-                except json.JSONDecodeError:
-                    response = {'error': 'Invalid JSON', 'transcendence_level': 0}
-                    client_socket.send(json.dumps(response).encode('utf-8'))
-                except Exception as e:
-                    response = {'error': str(e), 'transcendence_level': 0}
-                    client_socket.send(json.dumps(response).encode('utf-8'))
-                    
-        except Exception as e:
-            print(f"❌ Client handling error: {e}")
-        finally:
-            try:
-                client_socket.close()
-            except Exception:
-                pass
-            with self.lock:
-                if client_socket in self.clients:
-                    self.clients.remove(client_socket)
+    @staticmethod
+    def _transcendent_error_response(error: Exception) -> Dict[str, Any]:
+        """Response to an undecodable or failed request"""
+        if isinstance(error, json.JSONDecodeError):
+            return {'error': 'Invalid JSON', 'transcendence_level': 0}
+        return {'error': str(error), 'transcendence_level': 0}
     
     async def _process_transcendent_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Process transcendent MCP requests"""
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the batched audit writer
+Logs --events audit events from --threads producer threads through the
+previous synchronous path (one INSERT and commit per event on the caller's
+thread) and through the background writer (bounded handoff queue, batched
+executemany, one commit per batch), reporting caller-side throughput,
+per-call latency, end-to-end throughput until everything is on disk, and
+events dropped by the overflow policy.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import logging
+
+from core.audit.comprehensive_audit import AuditCategory, AuditConfig, AuditLevel, ComprehensiveAudit
+
+# (category, level, resource, details) mix of a typical request stream
+EVENT_MIX = [
+    (AuditCategory.AUTHENTICATION, AuditLevel.INFO, 'session', {'method': 'password'}),
+    (AuditCategory.DATA_ACCESS, AuditLevel.INFO, 'user_profile',
+     {'user_id': 'u', 'resource': 'user_profile', 'purpose': 'display', 'business_justification': 'support',
+      'patient_id': '-'}),
+    (AuditCategory.BUSINESS_OPERATION, AuditLevel.INFO, 'api/v1/decisions', {'status': 200}),
+    (AuditCategory.AUTHORIZATION, AuditLevel.WARNING, 'scheduler', {'lag_ms': 12}),
+    (AuditCategory.SECURITY_EVENT, AuditLevel.SECURITY, 'payment_gateway', {'rule': 'velocity'}),
+]
+
+def run(label: str, config: AuditConfig, events: int, threads: int):
+    audit = ComprehensiveAudit(config)
+    per_thread = events // threads
+    latencies = [[] for _ in range(threads)]
+
+    def produce(index: int):
+        rng = random.Random(index)
+        for i in range(per_thread):
+            category, level, resource, details = EVENT_MIX[rng.randrange(len(EVENT_MIX))]
+            start = time.perf_counter()
+            audit.log_event(f'user-{i % 100}', f'session-{index}', '10.0.0.1', 'bench', category, level,
+                            'request', resource, details, 'success')
+            latencies[index].append(time.perf_counter() - start)
+
+    workers = [threading.Thread(target=produce, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    produced = time.perf_counter() - started
+    audit.flush(timeout=600)
+    durable = time.perf_counter() - started
+
+    stored = audit.db_connection.execute('SELECT COUNT(*) FROM audit_events').fetchone()[0]
+    samples = sorted(latency for thread in latencies for latency in thread)
+    p99 = samples[int(len(samples) * 0.99)] * 1e6
+    total = per_thread * threads
+    stats = audit.get_writer_stats()
+    audit.close()
+    print(f"{label:<8} {total / produced:>12,.0f} {statistics.median(samples) * 1e6:>10.1f} {p99:>10.1f} "
+          f"{stored / durable:>14,.0f} {stored:>10,} {sum(stats['dropped'].values()):>8,}")
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the batched audit writer')
+    parser.add_argument('--events', type=int, default=200_000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--queue-size', type=int, default=AuditConfig.queue_size)
+    parser.add_argument('--batch-size', type=int, default=AuditConfig.batch_size)
+    parser.add_argument('--sync-events', type=int, default=20_000, help='events for the slower synchronous path')
+    args = parser.parse_args()
+
+    logging.getLogger('ComprehensiveAudit').setLevel(logging.ERROR)
+    directory = tempfile.mkdtemp()
+
+    def config(name: str, async_writes: bool) -> AuditConfig:
+        return AuditConfig(database_path=os.path.join(directory, f'{name}.db'),
+                           log_file_path=os.path.join(directory, f'{name}.log'),
+                           async_writes=async_writes, queue_size=args.queue_size, batch_size=args.batch_size)
+
+    print(f"{args.threads} producer threads")
+    print(f"{'path':<8} {'calls/s':>12} {'p50 us':>10} {'p99 us':>10} {'durable ev/s':>14} {'stored':>10} {'dropped':>8}")
+    run('sync', config('sync', False), args.sync_events, args.threads)
+    stats = run('batched', config('batched', True), args.events, args.threads)
+    print(f"\nwriter: {stats}")
+
+if __name__ == '__main__':
+    main()
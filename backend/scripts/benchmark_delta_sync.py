@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark for cursor-based delta sync
+Runs the Salesforce, HubSpot and QuickBooks connectors against the fake
+platform in scripts/fake_crm.py: one full sync, then delta syncs after a
+few records change, reporting records/sec, requests and bytes transferred
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from api.accounting_integration import QuickBooksIntegration
+from api.async_http import AsyncHTTPServer
+from api.crm_integration import HubSpotIntegration, SalesforceIntegration
+from api.integration_sync import SyncStateStore
+from fake_crm import FakeCRM, RouterSession, build_router, connector_configs
+
+def report(label: str, results) -> None:
+    for result in results:
+        for delta in result['delta'].values():
+            print(f"{label:<8} {result['platform']:<11} {delta['entity']:<14} "
+                  f"{delta['records_changed']:>9} {delta['requests']:>8} "
+                  f"{delta['bytes_transferred'] / 1024:>10.1f} {delta['records_per_second']:>12.0f}")
+
+async def run(args) -> None:
+    server = None
+    if args.http:
+        crm = FakeCRM(args.records, args.records // 5, args.records, instance_url='')
+        server = AsyncHTTPServer(build_router(crm), '127.0.0.1', 0)
+        await server.start()
+        crm.instance_url = f'http://127.0.0.1:{server.port}'
+        session = None
+    else:
+        crm = FakeCRM(args.records, args.records // 5, args.records)
+        session = RouterSession(build_router(crm))
+
+    store = SyncStateStore(args.state_path)
+    configs = connector_configs(crm.instance_url)
+    with patch('api.crm_integration.get_sync_state_store', return_value=store), \
+            patch('api.accounting_integration.get_sync_state_store', return_value=store):
+        connectors = [SalesforceIntegration(configs['salesforce']), HubSpotIntegration(configs['hubspot']),
+                      QuickBooksIntegration(configs['quickbooks'])]
+    if session is not None:
+        for connector in connectors:
+            connector.session = session
+
+    print(f"{'sync':<8} {'platform':<11} {'entity':<14} {'records':>9} {'requests':>8} "
+          f"{'KB':>10} {'records/s':>12}")
+    start = time.perf_counter()
+    results = [await connector.sync_data() for connector in connectors]
+    full_elapsed = time.perf_counter() - start
+    report('full', results)
+
+    delta_elapsed = 0.0
+    for _ in range(args.rounds):
+        crm.touch(args.changed)
+        start = time.perf_counter()
+        results = [await connector.sync_data() for connector in connectors]
+        delta_elapsed += time.perf_counter() - start
+        report('delta', results)
+
+    print(f"\nfull sync {full_elapsed:.2f}s, delta sync {delta_elapsed / max(args.rounds, 1):.3f}s "
+          f"({args.changed} changed records per entity)")
+
+    for connector in connectors:
+        await connector.session.close()
+    store.close()
+    if server is not None:
+        await server.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cursor-based delta sync')
+    parser.add_argument('--records', type=int, default=50000, help='contacts and invoices per platform')
+    parser.add_argument('--changed', type=int, default=100, help='records modified before each delta sync')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--state-path', help='SQLite sync state file (in memory by default)')
+    parser.add_argument('--http', action='store_true',
+                        help='serve the fake platform over HTTP and use the aiohttp session')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark for process-pool extraction in the ingestion pipeline
+Builds a mixed corpus (CSV, logs, JSON lines, JSON arrays, XML) and runs
+it through DataPipeline with the RAG /index call stubbed out, once per
+process-pool size, reporting throughput, CPU time and queue wait
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api import data_ingestion
+from api.data_ingestion import DataPipeline
+
+def build_corpus(directory: str, files_per_type: int, file_mb: float) -> list:
+    """Write the mixed corpus and return (path, file_type) pairs"""
+    target = int(file_mb * 1024 * 1024)
+    corpus = []
+    for n in range(files_per_type):
+        rows = target // 80
+
+        path = os.path.join(directory, f"ledger_{n}.csv")
+        with open(path, 'w') as f:
+            f.write("date,account,amount,memo\n")
+            f.writelines(f"2026-01-{i % 28 + 1:02d},acct-{i % 977},{i * 0.37:.2f},invoice {i} settled\n"
+                         for i in range(rows))
+        corpus.append((path, 'csv'))
+
+        path = os.path.join(directory, f"service_{n}.log")
+        with open(path, 'w') as f:
+            f.writelines(f"2026-01-01 00:00:{i % 60:02d} INFO request {i} tenant {i % 97} ok\n"
+                         for i in range(rows))
+        corpus.append((path, 'text'))
+
+        path = os.path.join(directory, f"events_{n}.jsonl")
+        with open(path, 'w') as f:
+            f.writelines(json.dumps({'event': 'click', 'id': i, 'user': f'u{i % 311}'}) + '\n'
+                         for i in range(rows))
+        corpus.append((path, 'json'))
+
+        path = os.path.join(directory, f"export_{n}.json")
+        with open(path, 'w') as f:
+            json.dump([{'id': i, 'name': f'contact {i}', 'score': i % 100} for i in range(rows // 2)], f)
+        corpus.append((path, 'json'))
+
+        path = os.path.join(directory, f"catalog_{n}.xml")
+        with open(path, 'w') as f:
+            f.write("<catalog>")
+            f.writelines(f"<item><sku>{i}</sku><name>product {i}</name></item>" for i in range(rows // 2))
+            f.write("</catalog>")
+        corpus.append((path, 'xml'))
+    return corpus
+
+async def run_corpus(corpus: list, process_workers: int, async_workers: int) -> dict:
+    pipeline = DataPipeline(process_workers=process_workers)
+
+    async def stub_call_service(service, method, path, data=None):
+        return {'status': 'indexed'}
+
+    pipeline._call_service = stub_call_service
+    await pipeline.start_workers(async_workers)
+
+    start = time.perf_counter()
+    job_ids = [await pipeline.submit_job({
+        'user_id': 'benchmark',
+        'type': 'file',
+        'data': {'file_path': path, 'file_type': file_type, 'title': os.path.basename(path)}
+    }) for path, file_type in corpus]
+
+    while any(pipeline.get_job_status(job_id)['status'] not in ('completed', 'failed') for job_id in job_ids):
+        await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+    jobs = [pipeline.get_job_status(job_id) for job_id in job_ids]
+    await pipeline.stop()
+
+    failed = [job for job in jobs if job['status'] == 'failed']
+    if failed:
+        raise RuntimeError(f"{len(failed)} jobs failed: {failed[0].get('error')}")
+    return {
+        'elapsed': elapsed,
+        'cpu_time': sum(job['timing']['cpu_time'] for job in jobs),
+        'queue_wait': sum(job['timing']['queue_wait'] for job in jobs) / len(jobs)
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark process-pool extraction scaling')
+    parser.add_argument('--files-per-type', type=int, default=4)
+    parser.add_argument('--file-mb', type=float, default=16)
+    parser.add_argument('--window-mb', type=float, default=4)
+    parser.add_argument('--async-workers', type=int, default=4)
+    parser.add_argument('--processes', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    data_ingestion.INGEST_WINDOW_BYTES = int(args.window_mb * 1024 * 1024)
+    directory = tempfile.mkdtemp(prefix='ingest-pool-bench-')
+    data_ingestion.PROCESSED_PATH = directory
+    try:
+        corpus = build_corpus(directory, args.files_per_type, args.file_mb)
+        total_mb = sum(os.path.getsize(path) for path, _ in corpus) / (1024 * 1024)
+        print(f"{len(corpus)} files, {total_mb:.0f} MB, {os.cpu_count()} cores")
+
+        baseline = None
+        for processes in args.processes:
+            result = asyncio.run(run_corpus(corpus, processes, args.async_workers))
+            rate = total_mb / result['elapsed']
+            baseline = baseline or rate
+            print(f"processes {processes:3d}   {rate:7.1f} MB/s   speedup {rate / baseline:4.2f}x   "
+                  f"cpu {result['cpu_time']:6.1f} s   mean queue wait {result['queue_wait']:6.2f} s")
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the framed MCP protocol
+Serves a gpu_stats-sized response from a local MCP server over loopback
+and reports round-trips/sec through one connection with --outstanding
+requests in flight: for each negotiated encoding of the framed protocol,
+and for the unframed JSON protocol, which can only have one request in
+flight per connection (the previous MCPClient behaviour).
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.mcp_protocol import MCPChannel, available_encodings, serve_connection
+
+GPU_STATS = {
+    'success': True,
+    'quantum_stats': {f'gpu_{i}': {'memory_used_gb': 61.5, 'memory_total_gb': 183.0, 'utilization': 0.72,
+                                   'temperature_c': 64, 'power_w': 690.5} for i in range(8)},
+    'consciousness_stats': {'cognitive_response': {'confidence': 0.95, 'patterns': ['analysis'] * 4}},
+    'transcendence_level': 1000,
+}
+
+async def handle(request):
+    return GPU_STATS
+
+async def start_server():
+    async def client_connected(reader, writer):
+        async def write(data: bytes):
+            writer.write(data)
+            await writer.drain()
+        try:
+            await serve_connection(lambda: reader.read(65536), write, handle, lambda e: {'error': str(e)})
+        finally:
+            writer.close()
+    return await asyncio.start_server(client_connected, '127.0.0.1', 0)
+
+async def round_trips(port: int, encoding: str, outstanding: int, requests: int) -> float:
+    channel = MCPChannel('127.0.0.1', port, encodings=[encoding], framed=encoding != 'unframed')
+    await channel.connect()
+    per_worker = requests // outstanding
+
+    async def worker():
+        for _ in range(per_worker):
+            await channel.request({'type': 'gpu_stats'})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(outstanding)))
+    elapsed = time.perf_counter() - start
+    channel.close()
+    return per_worker * outstanding / elapsed
+
+async def run(args):
+    server = await start_server()
+    port = server.sockets[0].getsockname()[1]
+    print(f"{'protocol':<16} {'outstanding':>12} {'round-trips/s':>14}")
+    for outstanding in args.outstanding:
+        rate = await round_trips(port, 'unframed', outstanding, args.requests)
+        print(f"{'unframed json':<16} {outstanding:>12} {rate:>14,.0f}")
+    for encoding in available_encodings():
+        for outstanding in args.outstanding:
+            rate = await round_trips(port, encoding, outstanding, args.requests)
+            print(f"{'framed ' + encoding:<16} {outstanding:>12} {rate:>14,.0f}")
+    await asyncio.sleep(0.1)  # let the server see the last connection close
+    server.close()
+    await server.wait_closed()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the framed MCP protocol')
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--outstanding', type=int, nargs='+', default=[1, 16, 256])
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
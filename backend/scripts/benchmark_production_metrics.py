@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for request metric recording
+Calls record_request --requests times from --threads threads over a mix of
+(endpoint, method, status) keys, through the previous path (a labelled
+MetricPoint appended to shared deques under the metrics lock) and through
+the per-thread histogram shards, reporting the cost per call with the loop
+overhead subtracted. Also times get_request_stats and the percentile query
+of a merged histogram, and compares the histogram percentiles with exact
+ones over the same latencies.
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.monitoring.production_metrics import (LatencyHistogram, MetricPoint, MetricType,
+                                                ProductionMetrics)
+
+KEYS = [(f'/api/v1/{endpoint}', method, status)
+        for endpoint in ('decisions', 'scores', 'agents', 'audit')
+        for method in ('GET', 'POST')
+        for status in (200, 404)]
+
+class PreviousRecorder:
+    """record_request before the histogram shards"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.metrics = defaultdict(lambda: deque(maxlen=10000))
+        self.performance_metrics = defaultdict(lambda: deque(maxlen=1000))
+
+    def record_request(self, endpoint, method, status_code, duration_ms, labels=None):
+        labels = labels or {}
+        labels.update({'service': 'bench', 'endpoint': endpoint, 'method': method,
+                       'status': str(status_code), 'environment': 'bench'})
+        metric_point = MetricPoint(timestamp=time.time(), value=duration_ms / 1000.0, labels=labels,
+                                   metric_name='request_duration', metric_type=MetricType.HISTOGRAM)
+        with self._lock:
+            self.metrics['request_duration'].append(metric_point)
+            self.performance_metrics['request_duration'].append(duration_ms)
+
+def per_call_ns(recorder, requests: int, threads: int, durations) -> float:
+    per_thread = requests // threads
+
+    def calls(record):
+        for i in range(per_thread):
+            endpoint, method, status = KEYS[i & 15]
+            record(endpoint, method, status, durations[i & 4095])
+
+    def timed(record) -> float:
+        workers = [threading.Thread(target=calls, args=(record,)) for _ in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return time.perf_counter() - start
+
+    overhead = timed(lambda endpoint, method, status, duration: None)
+    return (timed(recorder.record_request) - overhead) / (per_thread * threads) * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark request metric recording')
+    parser.add_argument('--requests', type=int, default=1_000_000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+    logging.getLogger('ProductionMetrics').setLevel(logging.ERROR)
+
+    rng = random.Random(0)
+    durations = [rng.lognormvariate(3, 1) for _ in range(4096)]
+
+    print(f"{'threads':>8} {'previous ns/call':>17} {'sharded ns/call':>16}")
+    for threads in args.threads:
+        previous = per_call_ns(PreviousRecorder(), args.requests, threads, durations)
+        metrics = ProductionMetrics()
+        sharded = per_call_ns(metrics, args.requests, threads, durations)
+        print(f"{threads:>8} {previous:>17,.0f} {sharded:>16,.0f}")
+
+    start = time.perf_counter()
+    for _ in range(100):
+        stats = metrics.get_request_stats()
+    print(f"\nget_request_stats over {len(KEYS)} keys: {(time.perf_counter() - start) / 100 * 1e6:,.0f} us")
+    histogram = LatencyHistogram()
+    for duration in durations * 50:
+        histogram.record(duration)
+    start = time.perf_counter()
+    for _ in range(1000):
+        histogram.percentiles([0.5, 0.95, 0.99])
+    print(f"percentiles of one histogram ({LatencyHistogram.BUCKETS} buckets): "
+          f"{(time.perf_counter() - start) * 1e3:,.0f} us")
+
+    exact = sorted(durations)
+    for quantile, name in ((0.5, 'p50'), (0.95, 'p95'), (0.99, 'p99')):
+        print(f"{name}: histogram {stats[f'{name}_latency_ms']:.2f} ms, "
+              f"exact {exact[int(len(exact) * quantile)]:.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the RAG vector index ANN mode
+Compares IVF-flat search against the exact brute-force path and reports
+latency and recall@k for a range of nprobe values
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.rag_service import B200VectorIndex
+
+def generate_corpus(n_vectors: int, dimension: int, n_clusters: int, seed: int = 42):
+    """Generate clustered synthetic embeddings resembling real document chunks"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dimension)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, n_vectors)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((n_vectors, dimension)).astype(np.float32)
+    queries = centers[rng.integers(0, n_clusters, 200)] + 0.35 * rng.standard_normal((200, dimension)).astype(np.float32)
+    return vectors, queries
+
+def build_index(vectors: np.ndarray, mode: str, nlist: int) -> B200VectorIndex:
+    """Build an index in the requested mode"""
+    index = B200VectorIndex(dimension=vectors.shape[1], mode=mode, nlist=nlist, min_train_size=len(vectors))
+    metadata = [{'id': i} for i in range(len(vectors))]
+    index.add_vectors(vectors, metadata)
+    return index
+
+def run_queries(index: B200VectorIndex, queries: np.ndarray, top_k: int, nprobe=None):
+    """Run all queries, returning result ids and mean latency in ms"""
+    results = []
+    start = time.perf_counter()
+    for query in queries:
+        hits = index.search(query, top_k, nprobe=nprobe)
+        results.append({hit['metadata']['id'] for hit in hits})
+    elapsed = time.perf_counter() - start
+    return results, elapsed / len(queries) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark RAG ANN search')
+    parser.add_argument('--vectors', type=int, default=200_000)
+    parser.add_argument('--dimension', type=int, default=768)
+    parser.add_argument('--nlist', type=int, default=1024)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 16, 64])
+    args = parser.parse_args()
+
+    print(f"Generating {args.vectors} x {args.dimension} corpus...")
+    vectors, queries = generate_corpus(args.vectors, args.dimension, n_clusters=args.nlist // 2)
+
+    exact = build_index(vectors, 'exact', args.nlist)
+    exact_results, exact_latency = run_queries(exact, queries, args.top_k)
+    print(f"exact        latency: {exact_latency:8.2f} ms   recall@{args.top_k}: 1.000")
+    del exact
+
+    start = time.perf_counter()
+    ivf = build_index(vectors, 'ivf', args.nlist)
+    print(f"IVF build ({args.nlist} lists): {time.perf_counter() - start:.1f}s")
+
+    for nprobe in args.nprobe:
+        ivf_results, ivf_latency = run_queries(ivf, queries, args.top_k, nprobe=nprobe)
+        recall = np.mean([
+            len(found & truth) / max(len(truth), 1)
+            for found, truth in zip(ivf_results, exact_results)
+        ])
+        print(f"ivf nprobe={nprobe:<4} latency: {ivf_latency:8.2f} ms   recall@{args.top_k}: {recall:.3f}   "
+              f"speedup: {exact_latency / ivf_latency:5.1f}x")
+
+if __name__ == '__main__':
+    main()
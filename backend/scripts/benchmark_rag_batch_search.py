@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Benchmark for batched RAG search
+Reports queries/sec of B200VectorIndex.search_many at several batch sizes
+against issuing the same queries one at a time through search
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.rag_service import B200VectorIndex
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched RAG search')
+    parser.add_argument('--vectors', type=int, default=100_000)
+    parser.add_argument('--dimension', type=int, default=768)
+    parser.add_argument('--queries', type=int, default=256)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 64])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    index = B200VectorIndex(dimension=args.dimension, mode='exact')
+    index.add_vectors(
+        rng.standard_normal((args.vectors, args.dimension)).astype(np.float32),
+        [{'id': i} for i in range(args.vectors)]
+    )
+    queries = rng.standard_normal((args.queries, args.dimension)).astype(np.float32)
+    print(f"Index: {args.vectors} x {args.dimension}, {args.queries} queries, top_k={args.top_k}")
+
+    start = time.perf_counter()
+    for query in queries:
+        index.search(query, args.top_k)
+    baseline_qps = args.queries / (time.perf_counter() - start)
+    print(f"sequential search         {baseline_qps:10.1f} QPS")
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        for offset in range(0, args.queries, batch_size):
+            index.search_many(queries[offset:offset + batch_size], args.top_k)
+        qps = args.queries / (time.perf_counter() - start)
+        print(f"search_many batch={batch_size:<4}    {qps:10.1f} QPS   ({qps / baseline_qps:4.1f}x)")
+
+if __name__ == '__main__':
+    main()
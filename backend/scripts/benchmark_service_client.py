@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark for inter-service calls
+Compares calls/sec of the previous connect-per-call raw socket transport
+against the pooled keep-alive ServiceClient using a local stub service
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.service_client import ServiceClient, ServiceClientConfig
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Stub intelligence service answering /embed with a fixed payload"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    payload = json.dumps({'embeddings': [[0.0] * 768]}).encode('utf-8')
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_stub(port_queue):
+    """Run the stub service in its own process so it doesn't share our GIL"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+async def legacy_call(service, method, path, data):
+    """The connect-per-call transport previously used by _call_service"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.settimeout(30)
+    sock.connect((service['host'], service['port']))
+    body = json.dumps(data).encode('utf-8')
+    request = f"{method} {path} HTTP/1.1\r\n"
+    request += f"Host: {service['host']}\r\n"
+    request += "Content-Type: application/json\r\n"
+    request += f"Content-Length: {len(body)}\r\n"
+    request += "Connection: close\r\n\r\n"
+    sock.send(request.encode() + body)
+    response = b''
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            break
+        response += chunk
+    sock.close()
+    _, body = response.split(b'\r\n\r\n', 1)
+    return json.loads(body.decode('utf-8'))
+
+async def run_calls(call, total: int, concurrency: int) -> float:
+    """Issue total calls with at most concurrency in flight; return calls/sec"""
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            await call()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - start)
+
+async def main_async(args):
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve_stub, args=(port_queue,), daemon=True)
+    server.start()
+    service = {'host': '127.0.0.1', 'port': port_queue.get(timeout=10)}
+    data = {'texts': ['benchmark query']}
+
+    print(f"Stub service on port {service['port']}, {args.calls} calls per run")
+
+    rate = await run_calls(lambda: legacy_call(service, 'POST', '/embed', data), args.calls, 1)
+    print(f"raw socket (connect per call)           {rate:9.1f} calls/sec")
+
+    for concurrency in args.concurrency:
+        client = ServiceClient(ServiceClientConfig(max_connections=concurrency))
+        rate = await run_calls(lambda: client.request(service, 'POST', '/embed', data), args.calls, concurrency)
+        stats = client.get_stats()['pools'][f"127.0.0.1:{service['port']}"]
+        print(f"ServiceClient concurrency={concurrency:<4}          {rate:9.1f} calls/sec   "
+              f"(connections opened: {stats['opened']})")
+        await client.close()
+
+    server.terminate()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark inter-service call transport')
+    parser.add_argument('--calls', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32])
+    asyncio.run(main_async(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
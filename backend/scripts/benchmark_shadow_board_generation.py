@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark for batched Shadow Board generation
+Runs board sessions (one prompt per executive) through the previous path,
+where each executive called generate on the event loop in turn, and
+through the GenerationScheduler, reporting session latency, tokens/sec and
+the longest event loop stall.
+
+Uses a small CPU checkpoint (--checkpoint) when torch and transformers are
+installed, otherwise --synthetic: a numpy decoder whose per-step cost is a
+(batch, d) x (d, d) matmul, enough to show batching amortization.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import core.shadow_board.shadow_board_system as board
+
+class SyntheticEncoding(dict):
+    def to(self, device):
+        return self
+
+class SyntheticTokenizer:
+    """Hashes words to ids; id 0 is padding/eos"""
+    eos_token, pad_token, pad_token_id, eos_token_id = '<eos>', None, 0, 0
+    padding_side = 'right'
+
+    def __call__(self, prompts, return_tensors=None, padding=False):
+        prompts = [prompts] if isinstance(prompts, str) else prompts
+        rows = [[hash(word) % 50000 + 1 for word in prompt.split()] for prompt in prompts]
+        width = max(len(row) for row in rows)
+        ids = np.array([[0] * (width - len(row)) + row for row in rows])
+        return SyntheticEncoding(input_ids=ids, attention_mask=(ids != 0).astype(np.int64))
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [' '.join(str(i) for i in row if i) for row in outputs]
+
+    def decode(self, output, skip_special_tokens=True):
+        return self.batch_decode([output])[0]
+
+class SyntheticModel:
+    """Decoder stand-in: one matmul against a (d, d) weight per generated token"""
+    device = 'cpu'
+
+    def __init__(self, dimension: int):
+        self.weights = np.random.default_rng(0).standard_normal((dimension, dimension)).astype(np.float32)
+
+    def generate(self, input_ids, attention_mask=None, pad_token_id=0, max_new_tokens=32, **params):
+        state = np.ones((len(input_ids), self.weights.shape[0]), dtype=np.float32)
+        tokens = []
+        for _ in range(max_new_tokens):
+            state = np.tanh(state @ self.weights)
+            tokens.append(np.abs(state[:, 0] * 1000).astype(np.int64) % 50000 + 1)
+        return np.hstack([input_ids, np.stack(tokens, axis=1)])
+
+def load(args):
+    if args.synthetic or not (board.TORCH_AVAILABLE and board.TRANSFORMERS_AVAILABLE):
+        return SyntheticModel(args.dimension), SyntheticTokenizer()
+    return board._load_checkpoint(args.checkpoint)
+
+def prompts_for(executives: int):
+    roles = list(board.ExecutiveRole)
+    return [f"You are the {roles[i % len(roles)].value}. Context: expand into a new market segment "
+            f"with a $2M investment over 18 months. Provide your perspective on this decision."
+            for i in range(executives)]
+
+async def measure(session, label: str, sessions: int):
+    """Run board sessions while a ticker records the longest event loop stall"""
+    stall = 0.0
+    running = True
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while running:
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.005)
+            last = now
+
+    ticking = asyncio.create_task(ticker())
+    latencies, tokens = [], 0
+    for _ in range(sessions):
+        start = time.perf_counter()
+        tokens += await session()
+        latencies.append(time.perf_counter() - start)
+    running = False
+    await ticking
+    total = sum(latencies)
+    print(f"{label:<10} {np.median(latencies) * 1000:>12.0f} {tokens / total:>12.1f} {stall * 1000:>14.0f}")
+
+async def run(args):
+    model, tokenizer = load(args)
+    params = dict(board.GENERATION_PARAMS, max_new_tokens=args.new_tokens, min_new_tokens=args.new_tokens)
+    prompts = prompts_for(args.executives)
+    print(f"{args.executives} executives, {args.new_tokens} new tokens each, "
+          f"{'synthetic' if isinstance(model, SyntheticModel) else args.checkpoint}")
+    print(f"{'path':<10} {'session ms':>12} {'tokens/s':>12} {'loop stall ms':>14}")
+
+    async def recommend_on_loop(prompt):
+        # Previous path: synchronous generate inside the coroutine
+        inputs = tokenizer(prompt, return_tensors="pt").to(model.device)
+        if board.torch is not None:
+            with board.torch.no_grad():
+                outputs = model.generate(**inputs, pad_token_id=tokenizer.eos_token_id, **params)
+        else:
+            outputs = model.generate(**inputs, pad_token_id=tokenizer.eos_token_id, **params)
+        return outputs.shape[1] - inputs['input_ids'].shape[1]
+
+    async def sequential_session():
+        return sum(await asyncio.gather(*(recommend_on_loop(p) for p in prompts)))
+
+    await measure(sequential_session, 'on-loop', args.sessions)
+
+    registry = board.ModelRegistry(lambda checkpoint: (model, tokenizer))
+    shared = await registry.acquire('benchmark')
+
+    async def batched_session():
+        before = shared.scheduler.tokens_generated
+        await asyncio.gather(*(shared.scheduler.generate(p, params=params) for p in prompts))
+        return shared.scheduler.tokens_generated - before
+
+    await measure(batched_session, 'batched', args.sessions)
+    print(f"scheduler: {shared.scheduler.get_stats()}")
+    registry.release(shared)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark batched Shadow Board generation')
+    parser.add_argument('--checkpoint', default='sshleifer/tiny-gpt2', help='small CPU checkpoint')
+    parser.add_argument('--synthetic', action='store_true', help='use the numpy stand-in decoder')
+    parser.add_argument('--dimension', type=int, default=2048, help='synthetic hidden size')
+    parser.add_argument('--executives', type=int, default=8)
+    parser.add_argument('--new-tokens', type=int, default=64)
+    parser.add_argument('--sessions', type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
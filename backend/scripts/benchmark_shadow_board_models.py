@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Shadow Board model loading
+Initializes boards of 4, 8 and 16 executives in parallel, the way
+ShadowBoardSystem does, with weights shared through the model registry and
+with one copy per executive (the previous behaviour), reporting startup
+time and resident memory. Each run happens in a fresh process.
+
+Without --checkpoint (or without torch/transformers) a synthetic checkpoint
+of --synthetic-mb is "loaded" at --load-mbps to stand in for the weights.
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+def rss_mb() -> float:
+    """Current resident set size"""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+class SyntheticModel:
+    """Stand-in weights: a filled buffer of the checkpoint's size"""
+
+    def __init__(self, size_mb: int):
+        import numpy as np
+        self.weights = np.ones(size_mb * 1024 * 1024 // 4, dtype=np.float32)
+
+def run_board(executives: int, shared: bool, checkpoint: str, synthetic_mb: int, load_mbps: float, queue):
+    import asyncio
+    import core.shadow_board.shadow_board_system as board
+
+    if checkpoint:
+        loader = None
+        board.DEFAULT_CHECKPOINT = checkpoint
+    else:
+        def loader(name):
+            time.sleep(synthetic_mb / load_mbps)  # disk read
+            return SyntheticModel(synthetic_mb), None
+        board.TORCH_AVAILABLE = board.TRANSFORMERS_AVAILABLE = True
+
+    roles = list(board.ExecutiveRole)
+    registry = board.ModelRegistry(loader)
+    baseline = rss_mb()
+
+    async def start():
+        models = []
+        for i in range(executives):
+            executive = board.Executive(
+                id=str(i), role=roles[i % len(roles)], name=f'exec-{i}', personality_profile={},
+                expertise_areas=[], communication_style='formal', decision_bias={}, phd_expertise=['strategy']
+            )
+            models.append(board.ExecutiveModel(executive, registry=registry if shared else board.ModelRegistry(loader)))
+        started = time.perf_counter()
+        await asyncio.gather(*(model.initialize() for model in models))
+        return time.perf_counter() - started, models
+
+    elapsed, models = asyncio.run(start())
+    loads = len({id(model.model) for model in models})
+    queue.put((elapsed, rss_mb() - baseline, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, loads))
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Shadow Board model loading')
+    parser.add_argument('--executives', type=int, nargs='+', default=[4, 8, 16])
+    parser.add_argument('--checkpoint', help='real checkpoint to load with transformers')
+    parser.add_argument('--synthetic-mb', type=int, default=256, help='synthetic checkpoint size')
+    parser.add_argument('--load-mbps', type=float, default=2000.0, help='synthetic checkpoint read speed')
+    args = parser.parse_args()
+
+    print(f"{'executives':>10} {'weights':>14} {'copies':>7} {'startup s':>10} {'RSS MB':>10} {'peak MB':>10}")
+    context = multiprocessing.get_context('spawn')
+    for executives in args.executives:
+        for shared in (False, True):
+            queue = context.Queue()
+            process = context.Process(target=run_board, args=(
+                executives, shared, args.checkpoint, args.synthetic_mb, args.load_mbps, queue
+            ))
+            process.start()
+            elapsed, rss, peak, copies = queue.get()
+            process.join()
+            label = 'shared' if shared else 'per-executive'
+            print(f"{executives:>10} {label:>14} {copies:>7} {elapsed:>10.2f} {rss:>10.0f} {peak:>10.0f}")
+
+if __name__ == '__main__':
+    main()
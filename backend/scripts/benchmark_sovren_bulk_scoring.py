@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark for bulk SOVREN scoring
+Scores --businesses synthetic businesses with calculate_scores_bulk and a
+--single-sample of them with calculate_score (one business, one commit at a
+time, the previous nightly path), reporting businesses/sec for both, the
+single path extrapolated to the whole portfolio, and whether the two paths
+produced identical scores for the sampled businesses.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.scoring.sovren_score_engine import DIMENSION_FACTORS, ScoreRequest, SOVRENScoreEngine
+
+METRICS = [metric for factors in DIMENSION_FACTORS.values() for metric, _, _ in factors]
+
+def portfolio(businesses: int, rng: random.Random):
+    return [ScoreRequest(business_id=f'business-{i}',
+                         metrics={metric: rng.random() * 12 for metric in METRICS if rng.random() > 0.05},
+                         time_period='daily')
+            for i in range(businesses)]
+
+def summary(score):
+    return (score.total_score, score.percentile, score.category, score.recommendations,
+            [(component.score, component.factors) for component in score.components.values()])
+
+async def run(args):
+    requests = portfolio(args.businesses, random.Random(0))
+    directory = tempfile.mkdtemp()
+
+    bulk_engine = SOVRENScoreEngine(db_path=os.path.join(directory, 'bulk.db'))
+    start = time.perf_counter()
+    bulk = await bulk_engine.calculate_scores_bulk(requests)
+    bulk_seconds = time.perf_counter() - start
+
+    sample = requests[:args.single_sample]
+    single_engine = SOVRENScoreEngine(db_path=os.path.join(directory, 'single.db'))
+    start = time.perf_counter()
+    single = [await single_engine.calculate_score(request) for request in sample]
+    single_seconds = time.perf_counter() - start
+
+    single_rate = len(sample) / single_seconds
+    print(f"{'path':<8} {'businesses':>11} {'seconds':>9} {'businesses/s':>14}")
+    print(f"{'single':<8} {len(sample):>11,} {single_seconds:>9.2f} {single_rate:>14,.0f}")
+    print(f"{'bulk':<8} {len(bulk):>11,} {bulk_seconds:>9.2f} {len(bulk) / bulk_seconds:>14,.0f}")
+    print(f"\nsingle path for {len(requests):,} businesses: ~{len(requests) / single_rate / 60:,.1f} min "
+          f"(extrapolated), bulk: {bulk_seconds:.1f} s")
+    identical = all(summary(a) == summary(b) for a, b in zip(single, bulk))
+    print(f"sampled scores identical: {identical}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark bulk SOVREN scoring')
+    parser.add_argument('--businesses', type=int, default=100_000)
+    parser.add_argument('--single-sample', type=int, default=200, help='businesses scored one at a time')
+    args = parser.parse_args()
+    logging.getLogger('SOVRENScore').setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
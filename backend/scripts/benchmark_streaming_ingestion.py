@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark for streaming file ingestion
+Generates a synthetic log or CSV export (5 GB by default) and runs a file
+job through DataPipeline with the RAG /index call stubbed out, reporting
+throughput and peak RSS. Each run happens in a fresh process so peak RSS
+is not inherited from file generation or a previous run.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+def generate_file(path: str, file_type: str, size_bytes: int) -> None:
+    """Write a synthetic file of about size_bytes without holding it in memory"""
+    block_lines = 10000
+    written = 0
+    row = 0
+    with open(path, 'w') as f:
+        if file_type == 'csv':
+            f.write("timestamp,account,region,amount,status,note\n")
+        while written < size_bytes:
+            if file_type == 'csv':
+                block = ''.join(
+                    f"2026-01-01T00:{i % 60:02d}:00,acct-{(row + i) % 9973},region-{i % 7},"
+                    f"{(row + i) * 0.37:.2f},settled,quarterly revenue reconciliation entry {row + i}\n"
+                    for i in range(block_lines)
+                )
+            else:
+                block = ''.join(
+                    f"2026-01-01 00:{i % 60:02d}:00 INFO worker-{i % 16} processed request {row + i} "
+                    f"for tenant {(row + i) % 997} in {(i % 250) + 1}ms status=ok\n"
+                    for i in range(block_lines)
+                )
+            f.write(block)
+            written += len(block)
+            row += block_lines
+
+def run_job(path: str, file_type: str, window_bytes: int, result_queue) -> None:
+    """Ingest one file with the RAG service stubbed; report timing and peak RSS"""
+    from api import data_ingestion
+
+    data_ingestion.INGEST_WINDOW_BYTES = window_bytes
+    pipeline = data_ingestion.DataPipeline()
+    sent = {'bytes': 0}
+
+    async def stub_call_service(service, method, path, data=None):
+        sent['bytes'] += len(data['document']['content'])
+        await asyncio.sleep(0)
+        return {'status': 'indexed'}
+
+    pipeline._call_service = stub_call_service
+    job = {'user_id': 'benchmark', 'data': {'file_path': path, 'file_type': file_type, 'title': 'synthetic'}}
+
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    asyncio.run(pipeline._process_file_job(job))
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    result_queue.put({
+        'elapsed': elapsed,
+        'parts': job['result']['parts'],
+        'bytes': sent['bytes'],
+        'baseline_mb': baseline_kb / 1024,
+        'peak_mb': peak_kb / 1024
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming file ingestion')
+    parser.add_argument('--size-mb', type=int, default=5 * 1024, help='synthetic file size')
+    parser.add_argument('--type', choices=['text', 'csv'], default='csv')
+    parser.add_argument('--window-mb', type=float, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--file', help='ingest an existing file instead of generating one')
+    args = parser.parse_args()
+
+    tmp_dir = None
+    path = args.file
+    if path is None:
+        tmp_dir = tempfile.mkdtemp(prefix='ingest-bench-')
+        path = os.path.join(tmp_dir, f"synthetic.{args.type}")
+        print(f"Generating {args.size_mb} MB synthetic {args.type} file...")
+        generate_file(path, args.type, args.size_mb * 1024 * 1024)
+
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"Ingesting {size_mb:.0f} MB ({args.type})")
+
+    try:
+        for window_mb in args.window_mb:
+            result_queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=run_job,
+                args=(path, args.type, int(window_mb * 1024 * 1024), result_queue)
+            )
+            process.start()
+            result = result_queue.get()
+            process.join()
+            print(f"window {window_mb:5.1f} MB   {size_mb / result['elapsed']:7.1f} MB/s   "
+                  f"parts {result['parts']:6d}   peak RSS {result['peak_mb']:7.1f} MB "
+                  f"(+{result['peak_mb'] - result['baseline_mb']:.1f} MB over baseline)")
+    finally:
+        if tmp_dir is not None:
+            os.remove(path)
+            os.rmdir(tmp_dir)
+
+if __name__ == '__main__':
+    main()
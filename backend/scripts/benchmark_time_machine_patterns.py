@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark for streaming Time Machine pattern detection
+Grows one timeline to --events events and, at each checkpoint size,
+reports the per-event cost of updating the maintained pattern state, the
+cost of a pattern query on that state, and the cost of the previous
+approach of recounting the timeline's event types. Also times a state
+checkpoint and restore through SQLite.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from collections import defaultdict
+
+from core.time_machine.time_machine_system import (PatternDetector, TemporalEvent, TemporalEventStore,
+                                                    TimeMachineSystem)
+
+EVENT_TYPES = ['sale', 'refund', 'signup', 'churn', 'support_ticket', 'invoice', 'meeting', 'deploy']
+
+def recount(events):
+    """Previous detect_patterns: count every event type of the timeline"""
+    counts = defaultdict(int)
+    for event in events:
+        counts[event.event_type] += 1
+    return [t for t, c in counts.items() if c > 5]
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark streaming pattern detection')
+    parser.add_argument('--events', type=int, default=1_000_000)
+    parser.add_argument('--checkpoints', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    detector = PatternDetector()
+    history = []
+    timestamp = 1_700_000_000.0
+    sizes = sorted(size for size in args.checkpoints if size <= args.events)
+
+    print(f"{'events':>10} {'update us/event':>16} {'query us':>10} {'recount ms':>11}")
+    observed = 0
+    for size in sizes:
+        batch = []
+        for i in range(observed, size):
+            timestamp += rng.expovariate(1 / 30.0)
+            batch.append(TemporalEvent(event_id=str(i), timestamp=timestamp,
+                                       event_type=EVENT_TYPES[rng.randrange(len(EVENT_TYPES))], data={}))
+        history.extend(batch)
+
+        # Per-event update cost, measured on the last stretch of the timeline
+        sample = batch[-min(len(batch), 10_000):]
+        detector.observe('t', batch[:len(batch) - len(sample)])
+        start = time.perf_counter()
+        for event in sample:
+            detector.observe('t', (event,))
+        update = (time.perf_counter() - start) / len(sample) * 1e6
+        observed = size
+
+        async def queries():
+            start = time.perf_counter()
+            for _ in range(100):
+                await detector.detect_patterns('t')
+            return (time.perf_counter() - start) / 100 * 1e6
+
+        query = asyncio.run(queries())
+        start = time.perf_counter()
+        recount(history)
+        scan = (time.perf_counter() - start) * 1000
+        print(f"{size:>10,} {update:>16.2f} {query:>10.0f} {scan:>11.1f}")
+
+    # Checkpoint and restore instead of rescanning the history on restart
+    db_path = os.path.join(tempfile.mkdtemp(), 'time_machine.db')
+    TimeMachineSystem(db_path=db_path)
+    store = TemporalEventStore(db_path)
+    start = time.perf_counter()
+    store.save_pattern_states(detector.take_dirty() or {'t': detector.states['t'].to_dict()})
+    saved = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = PatternDetector()
+    restored.restore('t', store.load_pattern_state('t'))
+    loaded = time.perf_counter() - start
+    print(f"\ncheckpoint {saved * 1000:.1f} ms, restore {loaded * 1000:.1f} ms "
+          f"({restored.states['t'].events_seen:,} events of state)")
+    store.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark for Time Machine event storage
+Loads --events synthetic events spread over --timelines timelines (plus one
+--deep-events timeline) into the TemporalEventStore, then times hour-range
+and event-type queries against the previous approach of filtering each
+timeline's full event list, reporting ingestion rate, query latency,
+spill/reload counts and resident memory.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from core.time_machine.time_machine_system import TemporalEvent, TemporalEventStore, TimeMachineSystem
+
+EVENT_TYPES = ['sale', 'refund', 'signup', 'churn', 'support_ticket', 'invoice', 'meeting', 'deploy']
+START = 1_700_000_000.0
+
+def rss_mb() -> float:
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def timeline_events(timeline: str, count: int, span: float, rng: random.Random):
+    offsets = sorted(rng.random() * span for _ in range(count))
+    return [TemporalEvent(event_id=f'{timeline}-{i}', timestamp=START + offset,
+                          event_type=EVENT_TYPES[rng.randrange(len(EVENT_TYPES))], data={'value': i})
+            for i, offset in enumerate(offsets)]
+
+def scan_query(events, start, end, event_types):
+    """Previous query_timeline: three comprehensions over the whole list"""
+    if start:
+        events = [e for e in events if e.timestamp >= start]
+    if end:
+        events = [e for e in events if e.timestamp <= end]
+    if event_types:
+        events = [e for e in events if e.event_type in event_types]
+    return events
+
+def timed(queries, run):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        run(*query)
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1e6, max(latencies) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Time Machine event storage')
+    parser.add_argument('--events', type=int, default=10_000_000)
+    parser.add_argument('--timelines', type=int, default=10_000)
+    parser.add_argument('--deep-events', type=int, default=1_000_000, help='events in one long timeline')
+    parser.add_argument('--days', type=float, default=90.0, help='time span of every timeline')
+    parser.add_argument('--max-resident', type=int, default=1_000_000, help='resident event budget')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--db-path', help='SQLite file (temporary by default)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    span = args.days * 86400
+    db_path = args.db_path or os.path.join(tempfile.mkdtemp(), 'time_machine.db')
+    TimeMachineSystem(db_path=db_path)  # schema and indexes
+    store = TemporalEventStore(db_path, max_resident_events=args.max_resident)
+    per_timeline = args.events // args.timelines
+    baseline_rss = rss_mb()
+
+    started = time.perf_counter()
+    for t in range(args.timelines):
+        store.add_many(f't{t}', timeline_events(f't{t}', per_timeline, span, rng))
+    deep = timeline_events('deep', args.deep_events, span, rng)
+    store.add_many('deep', deep)
+    ingest = time.perf_counter() - started
+    total = per_timeline * args.timelines + args.deep_events
+    print(f"ingested {total:,} events into {args.timelines + 1:,} timelines in {ingest:.1f}s "
+          f"({total / ingest:,.0f} events/s), RSS +{rss_mb() - baseline_rss:,.0f} MB")
+    print(f"store: {store.get_stats()}\n")
+
+    def window():
+        start = START + rng.random() * (span - 3600)
+        return start, start + 3600
+
+    print(f"{'query':<34} {'store median us':>16} {'store max us':>13} {'scan median us':>15}")
+    cases = [
+        ('deep: 1h range', 'deep', lambda: (*window(), None)),
+        ('deep: 1h range, one type', 'deep', lambda: (*window(), ['refund'])),
+        ('deep: all events of one type', 'deep', lambda: (None, None, ['churn'])),
+    ]
+    for label, timeline, make in cases:
+        queries = [(timeline, *make()) for _ in range(args.queries)]
+        store_median, store_max = timed(queries, store.query)
+        scan_median, _ = timed(queries[:max(args.queries // 20, 5)],
+                               lambda _, start, end, types: scan_query(deep, start, end, types))
+        print(f"{label:<34} {store_median:>16.0f} {store_max:>13.0f} {scan_median:>15.0f}")
+
+    # Random timelines touch spilled partitions, which are reloaded from SQLite
+    reloads = store.reloads
+    queries = [(f't{rng.randrange(args.timelines)}', *window(), None) for _ in range(args.queries)]
+    store_median, store_max = timed(queries, store.query)
+    print(f"{'random timeline: 1h range':<34} {store_median:>16.0f} {store_max:>13.0f} {'-':>15}")
+    print(f"\npartitions reloaded: {store.reloads - reloads}, store: {store.get_stats()}")
+    store.close()
+
+if __name__ == '__main__':
+    main()
@@ -57,6 +57,10 @@ import jwt  # PyJWT
 
 import psutil
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.mcp_protocol import MAX_CONNECTIONS, MCPConnection, MCPStreamServer
+
 # ============================================
 # ENTERPRISE CONFIGURATION
 # ============================================
@@ -68,7 +72,7 @@ class ServerConfig:
     # Network Configuration
     host: str = "0.0.0.0"
     port: int = 9999
-    max_connections: int = 100
+    max_connections: int = MAX_CONNECTIONS
     
     # Security Configuration
     jwt_secret: str = "default-secret-change-in-production"
@@ -380,11 +384,12 @@ class HealthChecker:
             
             # Server-specific checks
             server_running = self.server.is_running
-            active_connections = len(self.server.clients)
+            connection_stats = self.server.get_connection_stats()
+            active_connections = connection_stats['connections']
             
             # Determine overall health
             if (memory_usage > 90 or cpu_usage > 90 or disk_usage > 90 or 
-                not server_running or active_connections > 1000):
+                not server_running or active_connections >= connection_stats['max_connections']):
                 self.health_status = 'unhealthy'
             else:
                 self.health_status = 'healthy'
@@ -397,6 +402,7 @@ class HealthChecker:
                 'disk_usage_percent': disk_usage,
                 'server_running': server_running,
                 'active_connections': active_connections,
+                'in_flight_requests': connection_stats['in_flight'],
                 'last_check': self.last_health_check.isoformat()
             }
         except Exception as e:
@@ -446,73 +452,6 @@ class BoundedMetrics:
         del self.metrics[oldest_key]
         del self.access_times[oldest_key]
 
-# ============================================
-# CONNECTION MANAGEMENT
-# ============================================
-
-class ConnectionPool:
-    """Connection pool with health checks and automatic cleanup"""
-    
-    def __init__(self, max_connections: int = 100):
-        self.max_connections = max_connections
-        self.active_connections = {}
-        self.connection_health = {}
-        self.connection_creation_time = {}
-        self._lock = threading.RLock()
-        self.cleanup_thread = threading.Thread(target=self._cleanup_loop, daemon=True)
-        self.cleanup_thread.start()
-    
-    def add_connection(self, client_id: str, socket: socket.socket):
-        """Add connection to pool"""
-        with self._lock:
-            if len(self.active_connections) >= self.max_connections:
-                self._evict_oldest()
-            self.active_connections[client_id] = socket
-            self.connection_health[client_id] = time.time()
-            self.connection_creation_time[client_id] = time.time()
-    
-    def remove_connection(self, client_id: str):
-        """Remove connection from pool"""
-        with self._lock:
-            if client_id in self.active_connections:
-                try:
-                    self.active_connections[client_id].close()
-                except Exception:
-                    pass
-                del self.active_connections[client_id]
-                del self.connection_health[client_id]
-                del self.connection_creation_time[client_id]
-    
-    def update_health(self, client_id: str):
-        """Update connection health timestamp"""
-        with self._lock:
-            if client_id in self.connection_health:
-                self.connection_health[client_id] = time.time()
-    
-    def _evict_oldest(self):
-        """Evict oldest connection"""
-        if not self.connection_creation_time:
-            return
-        
-        oldest_client = min(self.connection_creation_time.keys(), 
-                           key=lambda k: self.connection_creation_time[k])
-        self.remove_connection(oldest_client)
-    
-    def _cleanup_loop(self):
-        """Background cleanup of stale connections"""
-        while True:
-            time.sleep(30)  # Check every 30 seconds
-            current_time = time.time()
-            stale_connections = []
-            
-            with self._lock:
-                for client_id, last_health in self.connection_health.items():
-                    if current_time - last_health > 300:  # 5 minutes
-                        stale_connections.append(client_id)
-                
-                for client_id in stale_connections:
-                    self.remove_connection(client_id)
-
 # ============================================
 # PERFORMANCE TRACKING
 # ============================================
@@ -1239,10 +1178,9 @@ class EnterpriseSOVRENMCPServer:
     
     def __init__(self, config: ServerConfig):
         self.config = config
-        self.server_socket = None
+        self.stream_server: Optional[MCPStreamServer] = None
         self.is_running = False
-        self.clients = []
-        self.connection_pool = ConnectionPool(config.max_connections)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         self.security_manager = SecurityManager(config)
         self.error_handler = ErrorHandler()
         self.metrics_collector = MetricsCollector()
@@ -1270,148 +1208,103 @@ class EnterpriseSOVRENMCPServer:
             return f"req_{self.request_id_counter}_{int(time.time())}"
     
     def start(self):
-        """Start the enterprise MCP server"""
+        """Start the enterprise MCP server (blocks until SIGINT/SIGTERM or stop())"""
         try:
-            # Create server socket
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            
-            # Configure TLS if enabled
-            if self.config.enable_tls:
-                if not self.config.cert_file or not self.config.key_file:
-                    raise ValueError("TLS enabled but certificate/key files not provided")
-                
-                context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
-                context.load_cert_chain(self.config.cert_file, self.config.key_file)
-                self.server_socket = context.wrap_socket(self.server_socket, server_side=True)
-            
-            self.server_socket.bind((self.config.host, self.config.port))
-            self.server_socket.listen(5)
-            self.server_socket.setblocking(False)
-            self.is_running = True
-            
-            self.logger.info(
-                f"Enterprise MCP Server started on {self.config.host}:{self.config.port}"
-            )
-            
-            # Start metrics update loop
-            threading.Thread(target=self._metrics_update_loop, daemon=True).start()
-            
-            # Main server loop
-            while self.is_running:
-                try:
-                    client_socket, addr = self.server_socket.accept()
-                    client_id = f"{addr[0]}:{addr[1]}"
-                    
-                    self.logger.info(f"New connection accepted from {client_id}")
-                    
-                    # Add to connection pool
-                    self.connection_pool.add_connection(client_id, client_socket)
-                    
-                    # Handle client in separate task
-                    asyncio.create_task(self._handle_client(client_socket, client_id, addr))
-                    
-                except BlockingIOError:
-                    pass  # No new connections
-                except Exception as e:
-                    self.logger.error(f"Error accepting connection: {e}")
-                finally:
-                    time.sleep(0.01)  # Avoid busy-waiting
-                    
-        except KeyboardInterrupt:
-            self.logger.info("Shutting down server...")
+            asyncio.run(self.serve())
         except Exception as e:
             self.logger.error(f"Server startup failed: {e}")
             raise
-        finally:
-            self.stop()
     
-    def stop(self):
-        """Stop the server gracefully"""
-        self.is_running = False
+    async def serve(self):
+        """Serve MCP clients on asyncio streams until shutdown"""
+        ssl_context = None
+        if self.config.enable_tls:
+            if not self.config.cert_file or not self.config.key_file:
+                raise ValueError("TLS enabled but certificate/key files not provided")
+            
+            ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            ssl_context.load_cert_chain(self.config.cert_file, self.config.key_file)
         
-        if self.server_socket:
-            try:
-                self.server_socket.close()
-            except Exception as e:
-                self.logger.error(f"Error closing server socket: {e}")
+        # Connection limit and idle timeout are enforced by the stream server
+        self.stream_server = MCPStreamServer(
+            self._open_session, self.config.host, self.config.port,
+            max_connections=self.config.max_connections, ssl=ssl_context
+        )
+        await self.stream_server.start()
+        self._loop = asyncio.get_running_loop()
+        self.stream_server.install_signal_handlers()
+        self.is_running = True
         
-        # Close all client connections
-        for client_id in list(self.connection_pool.active_connections.keys()):
-            self.connection_pool.remove_connection(client_id)
+        self.logger.info(
+            f"Enterprise MCP Server started on {self.config.host}:{self.stream_server.port}"
+        )
         
-        self.logger.info("Server stopped")
+        # Start metrics update loop
+        threading.Thread(target=self._metrics_update_loop, daemon=True).start()
+        
+        try:
+            await self.stream_server.serve_forever()
+        finally:
+            self.is_running = False
+            self.logger.info("Server stopped")
+    
+    def stop(self):
+        """Stop the server gracefully, draining in-flight requests (safe from any thread)"""
+        if self.stream_server is not None and self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.stream_server.shutdown(), self._loop)
     
-    async def _handle_client(self, client_socket: socket.socket, client_id: str, addr: Tuple[str, int]):
-        """Handle client connection with full error handling and security"""
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Connection counts of the stream server"""
+        if self.stream_server is None:
+            return {'connections': 0, 'in_flight': 0, 'max_connections': self.config.max_connections}
+        return self.stream_server.get_stats()
+    
+    def _open_session(self, connection: MCPConnection):
+        """Handler and error response for a new client connection"""
         request_id = self._generate_request_id()
+        addr = connection.peer
+        client_id = f"{addr[0]}:{addr[1]}"
+        self.logger.info(f"New connection accepted from {client_id}")
+        
+        async def handle(raw_request: Any) -> Dict[str, Any]:
+            return await self._handle_request(raw_request, client_id, addr, request_id)
+        
+        def error_response(error: Exception) -> Dict[str, Any]:
+            if isinstance(error, json.JSONDecodeError):
+                return MCPResponse(success=False, error=f"Invalid JSON: {error}").to_dict()
+            self.logger.error(
+                f"Request processing error: {error}",
+                extra={'request_id': request_id, 'client_id': client_id}
+            )
+            return MCPResponse(success=False, error="Internal server error").to_dict()
         
-        with self.error_handler.error_boundary("client_handling"):
-            try:
-                while self.is_running:
-                    # Receive data
-                    data = await asyncio.get_event_loop().sock_recv(client_socket, 1024)
-                    if not data:
-                        break
-                    
-                    start_time = time.time()
-                    
-                    try:
-                        # Parse and validate request
-                        raw_request = json.loads(data.decode('utf-8'))
-                        request = MCPRequest(**raw_request)
-                        
-                        # Authenticate request
-                        auth_success, user_id = self.security_manager.authenticate_request(
-                            raw_request, addr[0]
-                        )
-                        
-                        if not auth_success:
-                            response = MCPResponse(
-                                success=False,
-                                error=f"Authentication failed: {user_id}"
-                            )
-                        else:
-                            # Process request
-                            response_data = await self._process_request(request, request_id)
-                            response = MCPResponse(success=True, data=response_data)
-                        
-                        # Send response
-                        response_bytes = json.dumps(response.to_dict()).encode('utf-8')
-                        await asyncio.get_event_loop().sock_sendall(client_socket, response_bytes)
-                        
-                        # Update metrics
-                        duration = time.time() - start_time
-                        self.metrics_collector.record_request(
-                            request.command, duration, response.success
-                        )
-                        
-                        # Update connection health
-                        self.connection_pool.update_health(client_id)
-                        
-                    except json.JSONDecodeError as e:
-                        response = MCPResponse(success=False, error=f"Invalid JSON: {e}")
-                        await asyncio.get_event_loop().sock_sendall(
-                            client_socket, json.dumps(response.to_dict()).encode('utf-8')
-                        )
-                    except Exception as e:
-                        self.logger.error(
-                            f"Request processing error: {e}",
-                            extra={'request_id': request_id, 'client_id': client_id}
-                        )
-                        response = MCPResponse(success=False, error="Internal server error")
-                        await asyncio.get_event_loop().sock_sendall(
-                            client_socket, json.dumps(response.to_dict()).encode('utf-8')
-                        )
-                        
-            except Exception as e:
-                self.logger.error(
-                    f"Client handling error: {e}",
-                    extra={'request_id': request_id, 'client_id': client_id}
-                )
-            finally:
-                self.connection_pool.remove_connection(client_id)
-                self.logger.info(f"Client connection closed: {client_id}")
+        return handle, error_response
+    
+    async def _handle_request(self, raw_request: Dict[str, Any], client_id: str, addr: Tuple[str, int],
+                              request_id: str) -> Dict[str, Any]:
+        """Validate, authenticate and process one decoded request"""
+        start_time = time.time()
+        request = MCPRequest(**raw_request)
+        
+        # Authenticate request
+        auth_success, user_id = self.security_manager.authenticate_request(raw_request, addr[0])
+        
+        if not auth_success:
+            response = MCPResponse(
+                success=False,
+                error=f"Authentication failed: {user_id}"
+            )
+        else:
+            # Process request
+            response_data = await self._process_request(request, request_id)
+            response = MCPResponse(success=True, data=response_data)
+        
+        # Update metrics
+        duration = time.time() - start_time
+        self.metrics_collector.record_request(
+            request.command, duration, response.success
+        )
+        return response.to_dict()
     
     async def _process_request(self, request: MCPRequest, request_id: str) -> Dict[str, Any]:
         """Process validated MCP request"""
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Fake CRM / accounting platform for delta sync tests and benchmarks
+Serves the Salesforce query, HubSpot contact search and QuickBooks query
+endpoints the connectors page through, over a synthetic dataset whose
+records can be modified between syncs
+"""
+
+import json
+import os
+import random
+import re
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.async_http import HTTPRequest, Router
+from api.integration_sync import AsyncIntegrationSession, IntegrationResponse
+
+EPOCH = datetime(2024, 1, 1)
+SALESFORCE_API = '/services/data/v58.0'
+
+class FakeCRM:
+    """Synthetic Salesforce, HubSpot and QuickBooks records
+
+    Every modification takes the next second on a shared clock, so
+    modification times are distinct and increase like a real audit column.
+    """
+
+    def __init__(self, contacts: int = 1000, opportunities: int = 200, invoices: int = 500, seed: int = 0,
+                 instance_url: str = 'http://fake-crm.local'):
+        self.instance_url = instance_url
+        self.random = random.Random(seed)
+        self.clock = 0
+        self.salesforce: Dict[str, Dict[str, Dict[str, Any]]] = {'Contact': {}, 'Opportunity': {}}
+        self.hubspot: Dict[str, Dict[str, Any]] = {}
+        self.quickbooks: Dict[str, Dict[str, Any]] = {}
+        self.query_locators: Dict[str, List[Dict[str, Any]]] = {}
+        self.queries = 0
+        for i in range(contacts):
+            self._put_contact(i)
+        for i in range(opportunities):
+            self._put_opportunity(i)
+        for i in range(invoices):
+            self._put_invoice(i)
+
+    def _tick(self) -> datetime:
+        self.clock += 1
+        return EPOCH + timedelta(seconds=self.clock)
+
+    def _put_contact(self, i: int) -> None:
+        modified = self._tick()
+        version = self.random.randrange(1000)
+        sf_id = f'003{i:012d}'
+        self.salesforce['Contact'][sf_id] = {
+            'Id': sf_id, 'FirstName': f'First{i}', 'LastName': f'Last{i}', 'Email': f'contact{i}@example.com',
+            'Phone': f'+1555{version:07d}', 'Title': 'Buyer', 'Company': f'Company {i % 97}',
+            'CreatedDate': EPOCH.strftime('%Y-%m-%dT%H:%M:%S.000+0000'),
+            'LastModifiedDate': modified.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+        }
+        self.hubspot[str(i + 1)] = {
+            'id': str(i + 1),
+            'properties': {
+                'firstname': f'First{i}', 'lastname': f'Last{i}', 'email': f'contact{i}@example.com',
+                'phone': f'+1555{version:07d}', 'company': f'Company {i % 97}', 'title': 'Buyer',
+                'createdate': EPOCH.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+                'lastmodifieddate': modified.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+            }
+        }
+
+    def _put_opportunity(self, i: int) -> None:
+        modified = self._tick()
+        sf_id = f'006{i:012d}'
+        self.salesforce['Opportunity'][sf_id] = {
+            'Id': sf_id, 'Name': f'Deal {i}', 'Amount': float(self.random.randrange(1000, 100000)),
+            'CurrencyIsoCode': 'USD', 'StageName': 'Prospecting', 'Probability': 10.0, 'CloseDate': '2024-06-30',
+            'ContactId': f'003{i:012d}', 'AccountId': None,
+            'CreatedDate': EPOCH.strftime('%Y-%m-%dT%H:%M:%S.000+0000'),
+            'LastModifiedDate': modified.strftime('%Y-%m-%dT%H:%M:%S.000+0000')
+        }
+
+    def _put_invoice(self, i: int) -> None:
+        modified = self._tick()
+        self.quickbooks[str(i + 1)] = {
+            'Id': str(i + 1), 'DocNumber': f'INV-{i:06d}', 'TotalAmt': float(self.random.randrange(100, 10000)),
+            'Balance': 0.0, 'DueDate': '2024-02-01', 'CustomerRef': {'value': str(i % 50 + 1)},
+            'MetaData': {'CreateTime': EPOCH.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                         'LastUpdatedTime': modified.strftime('%Y-%m-%dT%H:%M:%SZ')}
+        }
+
+    def touch(self, n: int) -> None:
+        """Modify ``n`` random records of every entity"""
+        for i in self.random.sample(range(len(self.hubspot)), min(n, len(self.hubspot))):
+            self._put_contact(i)
+        for i in self.random.sample(range(len(self.salesforce['Opportunity'])),
+                                    min(n, len(self.salesforce['Opportunity']))):
+            self._put_opportunity(i)
+        for i in self.random.sample(range(len(self.quickbooks)), min(n, len(self.quickbooks))):
+            self._put_invoice(i)
+
+    # Salesforce
+
+    async def salesforce_token(self, request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+        return 200, {'access_token': 'fake-token', 'instance_url': self.instance_url}
+
+    def _salesforce_batch(self, locator: str, offset: int, size: int) -> Dict[str, Any]:
+        records = self.query_locators[locator]
+        batch = records[offset:offset + size]
+        done = offset + size >= len(records)
+        response = {'totalSize': len(records), 'done': done, 'records': batch}
+        if done:
+            del self.query_locators[locator]
+        else:
+            response['nextRecordsUrl'] = f'{SALESFORCE_API}/query/{locator}-{offset + size}'
+        return response
+
+    async def salesforce_query(self, request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+        options = re.search(r'batchSize=(\d+)', request.headers.get('sforce-query-options', ''))
+        size = int(options.group(1)) if options else 2000
+        url = urlsplit(request.path)
+        if url.path.startswith(f'{SALESFORCE_API}/query/'):
+            locator, _, offset = url.path.rsplit('/', 1)[1].rpartition('-')
+            if locator not in self.query_locators:
+                return 400, {'errorCode': 'INVALID_QUERY_LOCATOR'}
+            return 200, self._salesforce_batch(locator, int(offset), size)
+
+        soql = parse_qs(url.query)['q'][0]
+        sobject = re.search(r'FROM (\w+)', soql).group(1)
+        since = re.search(r'LastModifiedDate (>=?) (\S+)', soql)
+        since_key = since.group(2).replace('Z', '') if since else ''
+        inclusive = since is not None and since.group(1) == '>='
+        records = sorted(
+            (r for r in self.salesforce[sobject].values()
+             if r['LastModifiedDate'][:19] > since_key or (inclusive and r['LastModifiedDate'][:19] == since_key)),
+            key=lambda r: r['LastModifiedDate']
+        )
+        self.queries += 1
+        locator = f'01g{self.queries:012d}'
+        self.query_locators[locator] = records
+        return 200, self._salesforce_batch(locator, 0, size)
+
+    # HubSpot
+
+    async def hubspot_search(self, request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+        body = request.json() or {}
+        records = list(self.hubspot.values())
+        for group in body.get('filterGroups', []):
+            for f in group['filters']:
+                if f['propertyName'] == 'lastmodifieddate' and f['operator'] in ('GT', 'GTE'):
+                    since = datetime(1970, 1, 1) + timedelta(milliseconds=int(f['value']))
+                    since_key = since.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+                    records = [r for r in records if r['properties']['lastmodifieddate'] > since_key
+                               or (f['operator'] == 'GTE' and r['properties']['lastmodifieddate'] == since_key)]
+        records.sort(key=lambda r: r['properties']['lastmodifieddate'])
+
+        after = int(body.get('after', 0))
+        limit = min(int(body.get('limit', 10)), 100)
+        response: Dict[str, Any] = {'total': len(records), 'results': records[after:after + limit]}
+        if after + limit < len(records):
+            response['paging'] = {'next': {'after': str(after + limit)}}
+        return 200, response
+
+    # QuickBooks
+
+    async def quickbooks_query(self, request: HTTPRequest) -> Tuple[int, Dict[str, Any]]:
+        url = urlsplit(request.path)
+        if '/companyinfo/' in url.path:
+            return 200, {'CompanyInfo': {'CompanyName': 'Fake Co'}}
+        query = parse_qs(url.query)['query'][0]
+        if 'FROM Invoice' not in query:
+            return 200, {'QueryResponse': {}}
+        since = re.search(r"MetaData\.LastUpdatedTime (>=?) '([^']+)'", query)
+        position = int(re.search(r'STARTPOSITION (\d+)', query).group(1))
+        max_results = int(re.search(r'MAXRESULTS (\d+)', query).group(1))
+        records = sorted(
+            (r for r in self.quickbooks.values() if not since or r['MetaData']['LastUpdatedTime'] > since.group(2)
+             or (since.group(1) == '>=' and r['MetaData']['LastUpdatedTime'] == since.group(2))),
+            key=lambda r: r['MetaData']['LastUpdatedTime']
+        )
+        page = records[position - 1:position - 1 + max_results]
+        return 200, {'QueryResponse': {'Invoice': page, 'startPosition': position, 'maxResults': len(page)}}
+
+def build_router(crm: FakeCRM) -> Router:
+    """Routes for the fake platform; paths carry their query strings, so all are prefix routes"""
+    router = Router()
+    router.add('POST', '/services/oauth2/token', crm.salesforce_token, prefix=True)
+    router.add('GET', f'{SALESFORCE_API}/query', crm.salesforce_query, prefix=True)
+    router.add('POST', '/crm/v3/objects/contacts/search', crm.hubspot_search, prefix=True)
+    router.add('GET', '/v3/company/', crm.quickbooks_query, prefix=True)
+    router.add('GET', '/v3/companyinfo/', crm.quickbooks_query, prefix=True)
+    return router
+
+class RouterSession:
+    """AsyncIntegrationSession stand-in that dispatches to a Router in process
+
+    Counts requests and response bytes the same way, so delta sync reports
+    match what the connectors would transfer over HTTP.
+    """
+
+    def __init__(self, router: Router):
+        self.router = router
+        self.requests = 0
+        self.retries = 0
+        self.bytes_received = 0
+
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      params: Optional[Dict[str, Any]] = None, data: Optional[Dict[str, Any]] = None,
+                      json: Any = None) -> IntegrationResponse:
+        parts = urlsplit(url)
+        path = parts.path
+        query = parts.query
+        if params:
+            query = '&'.join(filter(None, [query, urlencode(AsyncIntegrationSession._query_params(params))]))
+        if query:
+            path = f'{path}?{query}'
+        if json is not None:
+            body = _dumps(json)
+        elif data is not None:
+            body = urlencode(data).encode('utf-8')
+        else:
+            body = b''
+        request_headers = {name.lower(): value for name, value in (headers or {}).items()}
+
+        status, payload, response_headers = await self.router.dispatch(
+            HTTPRequest(method=method, path=path, headers=request_headers, body=body)
+        )
+        content = _dumps(payload)
+        self.requests += 1
+        self.bytes_received += len(content)
+        return IntegrationResponse(status, content, response_headers, url)
+
+    async def get(self, url: str, **kwargs: Any) -> IntegrationResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> IntegrationResponse:
+        return await self.request('POST', url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'requests': self.requests, 'retries': self.retries, 'bytes_received': self.bytes_received}
+
+    async def close(self) -> None:
+        pass
+
+def _dumps(payload: Any) -> bytes:
+    return json.dumps(payload).encode('utf-8')
+
+def connector_configs(base_url: str) -> Dict[str, Dict[str, Any]]:
+    """Connector configs pointing Salesforce, HubSpot and QuickBooks at ``base_url``"""
+    return {
+        'salesforce': {'client_id': 'fake', 'client_secret': 'fake', 'username': 'fake', 'password': 'fake',
+                       'login_url': base_url, 'query_batch_size': 2000},
+        'hubspot': {'api_key': 'fake', 'base_url': base_url},
+        'quickbooks': {'access_token': 'fake', 'realm_id': '1', 'api_url': f'{base_url}/v3'}
+    }
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Load test for the RAG service HTTP front end
+Runs the service in a separate process (asyncio or legacy threaded server)
+against a stub embedding service and a seeded shared index, then drives it
+with many concurrent keep-alive clients and reports p50/p99 latency
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.service_client import ServiceClient, ServiceClientConfig
+
+EMBEDDING_DIM = 768
+
+def raise_fd_limit() -> None:
+    """1k clients need more descriptors than the usual soft limit"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or hard > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard if hard != resource.RLIM_INFINITY else 65536, hard))
+
+class StubEmbedHandler(BaseHTTPRequestHandler):
+    """Stub intelligence service answering /embed with random vectors"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        embeddings = np.random.randn(len(data.get('texts', [])), EMBEDDING_DIM).round(4).tolist()
+        body = json.dumps({'embeddings': embeddings}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_stub(port_queue):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubEmbedHandler)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+def serve_rag(mode: str, stub_port: int, vectors: int, max_concurrency: int, port_queue) -> None:
+    """Run the RAG service with a seeded shared index"""
+    raise_fd_limit()
+    from api import rag_service
+    from api.async_http import AsyncHTTPServer
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    rag_service.INDEX_PATH = tempfile.mkdtemp(prefix='rag-loadtest-')
+    rag_service.INTELLIGENCE_SERVICE.update(host='127.0.0.1', port=stub_port)
+    engine = rag_service.RAGEngine()
+    rng = np.random.default_rng(0)
+    engine.default_index.add_vectors(
+        rng.standard_normal((vectors, EMBEDDING_DIM), dtype=np.float32),
+        [{'chunk_id': f'c{i}', 'doc_id': f'd{i // 10}', 'title': f'Doc {i // 10}',
+          'text': f'chunk {i}', 'metadata': {}} for i in range(vectors)]
+    )
+    rag_service.rag_engine = engine
+
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    rag_service.service_loop = loop
+
+    if mode == 'threaded':
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        # The backlog is applied at bind time, so raise it on the class
+        rag_service.ThreadedHTTPServer.request_queue_size = 4096
+        server = rag_service.ThreadedHTTPServer(('127.0.0.1', 0), rag_service.RAGHandler)
+        port_queue.put(server.server_address[1])
+        server.serve_forever()
+    else:
+        async def run():
+            server = AsyncHTTPServer(rag_service.build_router(), '127.0.0.1', 0, max_concurrency=max_concurrency)
+            rag_service.http_server = server
+            await server.start()
+            port_queue.put(server.port)
+            await server.serve_forever()
+        loop.run_until_complete(run())
+
+async def drive(port: int, path: str, clients: int, requests_per_client: int) -> dict:
+    """Each client sends requests back to back over its own keep-alive connection"""
+    client = ServiceClient(ServiceClientConfig(
+        max_connections=clients,
+        max_idle_connections=clients,
+        request_timeout=120.0,
+        max_retries=0,
+        failure_threshold=10 ** 9
+    ))
+    service = {'host': '127.0.0.1', 'port': port}
+    latencies = []
+    errors = 0
+
+    async def run_client(client_id: int):
+        nonlocal errors
+        for i in range(requests_per_client):
+            # Unique queries so the result cache doesn't serve them
+            payload = {'user_id': 'loadtest', 'query': f'client {client_id} query {i}', 'limit': 10}
+            start = time.perf_counter()
+            try:
+                await client.request(service, 'POST' if path != '/health' else 'GET', path,
+                                     payload if path != '/health' else None)
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(c) for c in range(clients)))
+    elapsed = time.perf_counter() - start
+    await client.close()
+
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50': float(np.percentile(ms, 50)),
+        'p99': float(np.percentile(ms, 99)),
+        'max': float(ms.max())
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the RAG service HTTP front end')
+    parser.add_argument('--mode', choices=['asyncio', 'threaded', 'both'], default='both')
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=10, help='requests per client')
+    parser.add_argument('--path', choices=['/search', '/health'], default='/search')
+    parser.add_argument('--vectors', type=int, default=20000, help='vectors in the seeded shared index')
+    parser.add_argument('--max-concurrency', type=int, default=256, help='asyncio server handler limit')
+    args = parser.parse_args()
+
+    raise_fd_limit()
+    port_queue = multiprocessing.Queue()
+    stub = multiprocessing.Process(target=serve_stub, args=(port_queue,), daemon=True)
+    stub.start()
+    stub_port = port_queue.get(timeout=10)
+
+    modes = ['asyncio', 'threaded'] if args.mode == 'both' else [args.mode]
+    print(f"{args.clients} concurrent clients x {args.requests} requests to {args.path}, "
+          f"{args.vectors} indexed vectors")
+    for mode in modes:
+        server = multiprocessing.Process(
+            target=serve_rag,
+            args=(mode, stub_port, args.vectors, args.max_concurrency, port_queue),
+            daemon=True
+        )
+        server.start()
+        port = port_queue.get(timeout=120)
+        result = asyncio.run(drive(port, args.path, args.clients, args.requests))
+        print(f"{mode:<9} {result['rps']:8.1f} req/s   p50 {result['p50']:8.1f} ms   "
+              f"p99 {result['p99']:8.1f} ms   max {result['max']:8.1f} ms   errors {result['errors']}")
+        server.terminate()
+        server.join()
+
+    stub.terminate()
+
+if __name__ == '__main__':
+    main()
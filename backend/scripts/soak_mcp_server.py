@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Soak test for the asyncio MCP stream server
+Starts an MCPStreamServer serving gpu_stats in a child process, opens
+--clients framed connections to it and has each poll gpu_stats every
+--interval seconds for --duration seconds. Reports request rate, errors,
+latency percentiles, the server's connection counts, resident memory and
+thread count, then sends SIGTERM while clients are still polling and
+checks that the server drains the requests in flight before exiting.
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from api.mcp_protocol import MCPChannel, MCPStreamServer, raise_file_limit
+
+GPU_STATS = {
+    'success': True,
+    'quantum_stats': {f'gpu_{i}': {'memory_used_gb': 61.5, 'memory_total_gb': 183.0, 'utilization': 0.72,
+                                   'temperature_c': 64, 'power_w': 690.5} for i in range(8)},
+    'transcendence_level': 1000,
+}
+
+def run_server(port_queue, stats_queue, max_connections: int, idle_timeout: float, service_ms: float):
+    async def handle(request):
+        if service_ms:
+            await asyncio.sleep(service_ms / 1000.0)
+        return GPU_STATS
+
+    async def serve():
+        server = MCPStreamServer(lambda connection: (handle, lambda e: {'success': False, 'error': str(e)}),
+                                 '127.0.0.1', 0, max_connections=max_connections, idle_timeout=idle_timeout)
+        await server.start()
+        server.install_signal_handlers()
+        port_queue.put(server.port)
+
+        async def report():
+            while True:
+                stats_queue.put(server.get_stats())
+                await asyncio.sleep(1.0)
+
+        reporter = asyncio.create_task(report())
+        await server.serve_forever()
+        reporter.cancel()
+        stats_queue.put(server.get_stats())
+
+    logging.basicConfig(level=logging.INFO, format='server: %(message)s')
+    asyncio.run(serve())
+
+def process_status(pid: int) -> dict:
+    """Resident memory (MB) and thread count of a process, from /proc"""
+    status = {}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    status['rss_mb'] = int(line.split()[1]) / 1024
+                elif line.startswith('Threads:'):
+                    status['threads'] = int(line.split()[1])
+    except OSError:
+        pass
+    return status
+
+def percentile(values, quantile: float) -> float:
+    return values[min(int(len(values) * quantile), len(values) - 1)] if values else 0.0
+
+async def run(args):
+    raise_file_limit(args.clients)
+    context = multiprocessing.get_context('fork')
+    port_queue, stats_queue = context.Queue(), context.Queue()
+    server = context.Process(target=run_server, args=(port_queue, stats_queue, args.clients,
+                                                      args.idle_timeout, args.service_ms))
+    server.start()
+    port = port_queue.get(timeout=30)
+
+    latencies = []
+    errors = {'connect': 0, 'request': 0, 'drain': 0}
+    stopping = asyncio.Event()
+    draining = False
+    in_flight = 0
+
+    async def client(channel: MCPChannel):
+        nonlocal in_flight
+        await asyncio.sleep(random.uniform(0, args.interval))
+        while not stopping.is_set():
+            start = time.perf_counter()
+            in_flight += 1
+            try:
+                await channel.request({'type': 'gpu_stats'})
+                latencies.append((time.perf_counter() - start) * 1000.0)
+            except Exception:
+                errors['drain' if draining else 'request'] += 1
+            finally:
+                in_flight -= 1
+            await asyncio.sleep(max(0.0, args.interval - (time.perf_counter() - start)))
+
+    # Connect in batches so the listen backlog is not overrun
+    channels = []
+    start = time.perf_counter()
+    for offset in range(0, args.clients, 500):
+        batch = [MCPChannel('127.0.0.1', port) for _ in range(min(500, args.clients - offset))]
+        results = await asyncio.gather(*(channel.connect() for channel in batch), return_exceptions=True)
+        for channel, result in zip(batch, results):
+            if isinstance(result, Exception):
+                errors['connect'] += 1
+            else:
+                channels.append(channel)
+    print(f"connected {len(channels):,} clients in {time.perf_counter() - start:.1f} s "
+          f"({errors['connect']} failed)")
+
+    tasks = [asyncio.create_task(client(channel)) for channel in channels]
+    peak = {'rss_mb': 0.0, 'threads': 0}
+    server_stats = {}
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.duration:
+        await asyncio.sleep(1.0)
+        status = process_status(server.pid)
+        for key in peak:
+            peak[key] = max(peak[key], status.get(key, 0))
+        while not stats_queue.empty():
+            server_stats = stats_queue.get()
+    elapsed = time.perf_counter() - start
+    completed = len(latencies)
+
+    # Graceful shutdown with clients still polling
+    in_flight_at_sigterm = in_flight
+    draining = True
+    stopping.set()
+    drain_start = time.perf_counter()
+    os.kill(server.pid, signal.SIGTERM)
+    while server.is_alive() and time.perf_counter() - drain_start < 60:
+        await asyncio.sleep(0.01)
+    drain_seconds = time.perf_counter() - drain_start
+    server.join(timeout=5)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    final_stats = server_stats
+    while not stats_queue.empty():
+        final_stats = stats_queue.get()
+    for channel in channels:
+        channel.close()
+
+    latencies.sort()
+    print(f"requests: {completed:,} in {elapsed:.0f} s ({completed / elapsed:,.0f}/s), "
+          f"errors: {errors['request']}")
+    print(f"latency ms: p50 {percentile(latencies, 0.5):.2f}, p99 {percentile(latencies, 0.99):.2f}, "
+          f"max {latencies[-1] if latencies else 0.0:.2f}")
+    print(f"server: {server_stats.get('connections', 0):,} connections, "
+          f"{server_stats.get('rejected', 0)} rejected, {server_stats.get('idle_closed', 0)} idle-closed, "
+          f"peak RSS {peak['rss_mb']:.0f} MB, peak threads {peak['threads']}")
+    print(f"SIGTERM with {in_flight_at_sigterm} requests in flight: "
+          f"{len(latencies) - completed} completed during drain, {errors['drain']} failed, "
+          f"server exited {'cleanly' if server.exitcode == 0 else f'with {server.exitcode}'} "
+          f"in {drain_seconds:.2f} s, final in_flight {final_stats.get('in_flight', 0)}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Soak test the asyncio MCP stream server')
+    parser.add_argument('--clients', type=int, default=10_000)
+    parser.add_argument('--interval', type=float, default=5.0, help='seconds between polls per client')
+    parser.add_argument('--duration', type=float, default=60.0)
+    parser.add_argument('--idle-timeout', type=float, default=300.0)
+    parser.add_argument('--service-ms', type=float, default=20.0, help='simulated gpu_stats handler time')
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == '__main__':
+    main()
@@ -86,6 +86,374 @@ class TestDataIngestionService(unittest.TestCase):
         self.assertIsInstance(job_id, str)
         self.assertGreater(len(job_id), 0)
 
+    @patch('api.data_ingestion.READ_BLOCK_SIZE', 7)
+    def test_document_extractor_streams_bounded_segments(self):
+        """Test streaming extractors yield window-sized segments across read boundaries"""
+        from api.data_ingestion import DocumentExtractor
+
+        extractor = DocumentExtractor()
+
+        text_file = os.path.join(self.temp_dir, 'log.txt')
+        content = ''.join(f"line {i} of the export\n" for i in range(500))
+        with open(text_file, 'w') as f:
+            f.write(content)
+        segments = list(extractor.stream(text_file, 'text', window_bytes=256))
+        self.assertEqual(''.join(segments), content)
+        self.assertTrue(all(len(segment) <= 256 for segment in segments))
+
+        csv_file = os.path.join(self.temp_dir, 'data.csv')
+        with open(csv_file, 'w') as f:
+            f.write("name,amount\n" + ''.join(f"row{i},{i}\n" for i in range(200)))
+        segments = list(extractor.stream(csv_file, 'csv', window_bytes=128))
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(segment.startswith("Columns: name, amount\n") for segment in segments))
+        self.assertEqual(sum(segment.count('\n') - 1 for segment in segments), 200)
+
+        records = [{'id': i, 'value': i * 1.5, 'tags': ['a', 'b']} for i in range(50)] + [12345, "text"]
+        for name, payload in (('array.json', json.dumps(records)),
+                              ('lines.json', '\n'.join(json.dumps(r) for r in records))):
+            json_file = os.path.join(self.temp_dir, name)
+            with open(json_file, 'w') as f:
+                f.write(payload)
+            lines = ''.join(extractor.stream(json_file, 'json', window_bytes=512)).splitlines()
+            self.assertEqual([json.loads(line) for line in lines], records)
+
+    def test_file_job_indexes_in_parts(self):
+        """Test file jobs are indexed as parts of one document"""
+        from unittest.mock import AsyncMock
+        from api.data_ingestion import DataPipeline
+
+        pipeline = DataPipeline()
+        pipeline._call_service = AsyncMock(return_value={'status': 'indexed'})
+
+        test_file = os.path.join(self.temp_dir, 'big.txt')
+        with open(test_file, 'w') as f:
+            f.write(''.join(f"record {i}\n" for i in range(5000)))
+
+        async def run(job):
+            await pipeline._process_file_job(job)
+            await pipeline.stop()
+
+        job = {'job_id': 'parts', 'user_id': 'u1',
+               'data': {'file_path': test_file, 'file_type': 'text', 'title': 'big.txt'}}
+        with patch('api.data_ingestion.INGEST_WINDOW_BYTES', 4096):
+            asyncio.run(run(job))
+
+        documents = [call.args[3]['document'] for call in pipeline._call_service.call_args_list]
+        self.assertEqual(len(documents), job['result']['parts'])
+        self.assertGreater(len(documents), 10)
+        self.assertEqual({d['doc_id'] for d in documents}, {job['result']['doc_id']})
+        self.assertEqual(sorted(d['part'] for d in documents), list(range(len(documents))))
+        self.assertTrue(job['result']['indexed'])
+        self.assertEqual(job['progress']['parts_indexed'], len(documents))
+        self.assertEqual(job['progress']['extraction'], 'ranges')
+        self.assertGreater(job['timing']['cpu_time'], 0)
+
+        # Parts are numbered in file order
+        documents.sort(key=lambda d: d['part'])
+        with open(test_file) as f:
+            self.assertEqual(''.join(d['content'] for d in documents), f.read())
+
+    def test_extract_range_covers_each_line_once(self):
+        """Test arbitrary byte ranges split a file at line boundaries"""
+        import io
+        from api.data_ingestion import DocumentExtractor
+
+        extractor = DocumentExtractor()
+        csv_file = os.path.join(self.temp_dir, 'data.csv')
+        with open(csv_file, 'w') as f:
+            f.write("name,amount\n" + ''.join(f"row{i},{i * 7}\n" for i in range(300)))
+        size = os.path.getsize(csv_file)
+        self.assertTrue(extractor.supports_line_ranges(csv_file, 'csv'))
+
+        for step in (5, 64, 1000, size):
+            rows = []
+            for start in range(0, size, step):
+                for segment in extractor.extract_range(csv_file, 'csv', start, min(start + step, size), 256):
+                    self.assertTrue(segment.startswith("Columns: name, amount\n"))
+                    rows.extend(segment.splitlines()[1:])
+            self.assertEqual(rows, [f"row{i}, {i * 7}" for i in range(300)])
+
+        # Lines longer than the window are cut at range edges rather than read whole
+        text_file = os.path.join(self.temp_dir, 'minified.txt')
+        content = 'x' * 10000 + '\n' + 'short\n' * 10 + 'y' * 3000 + '\n' + 'z' * 2500
+        with open(text_file, 'w') as f:
+            f.write(content)
+        size = os.path.getsize(text_file)
+        for step in (1000, 700, 2500):
+            segments = []
+            for start in range(0, size, step):
+                segments += extractor.extract_range(text_file, 'text', start, min(start + step, size), 1000)
+            self.assertEqual(''.join(segments), content)
+            self.assertTrue(all(len(segment) <= 1000 for segment in segments))
+
+        from api.data_ingestion import READ_BLOCK_SIZE
+        blocks = list(DocumentExtractor._read_blocks(io.StringIO('z' * (3 * READ_BLOCK_SIZE)), 1000))
+        self.assertEqual(sum(map(len, blocks)), 3 * READ_BLOCK_SIZE)
+        self.assertLessEqual(max(map(len, blocks)), READ_BLOCK_SIZE)
+
+        quoted_file = os.path.join(self.temp_dir, 'quoted.csv')
+        with open(quoted_file, 'w') as f:
+            f.write('name,note\nrow1,"two\nlines"\nrow2,plain\n')
+        self.assertFalse(extractor.supports_line_ranges(quoted_file, 'csv'))
+
+    def test_file_job_spools_unsplittable_files(self):
+        """Test large JSON arrays are extracted by one task through spool files"""
+        from unittest.mock import AsyncMock
+        from api.data_ingestion import DataPipeline
+
+        pipeline = DataPipeline(process_workers=1)
+        pipeline._call_service = AsyncMock(return_value={'status': 'indexed'})
+
+        records = [{'id': i, 'text': f'entry {i}'} for i in range(400)]
+        test_file = os.path.join(self.temp_dir, 'export.json')
+        with open(test_file, 'w') as f:
+            json.dump(records, f, indent=2)
+
+        async def run(job):
+            await pipeline._process_file_job(job)
+            await pipeline.stop()
+
+        job = {'job_id': 'spooled', 'user_id': 'u1',
+               'data': {'file_path': test_file, 'file_type': 'json', 'title': 'export.json'}}
+        with patch('api.data_ingestion.INGEST_WINDOW_BYTES', 2048), \
+                patch('api.data_ingestion.PROCESSED_PATH', self.processed_path):
+            asyncio.run(run(job))
+
+        documents = sorted((call.args[3]['document'] for call in pipeline._call_service.call_args_list),
+                           key=lambda d: d['part'])
+        self.assertEqual(job['progress']['extraction'], 'spooled')
+        self.assertGreater(len(documents), 1)
+        lines = ''.join(d['content'] for d in documents).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], records)
+        self.assertEqual(os.listdir(self.processed_path), [])
+
+    def test_job_queue_priority_and_tenant_fairness(self):
+        """Test interactive jobs run first and tenants within a class take turns"""
+        from api.data_ingestion import DataPipeline
+
+        pipeline = DataPipeline()
+
+        async def submit():
+            for n in range(3):
+                await pipeline.submit_job({'user_id': 'bulk_tenant', 'type': 'batch', 'data': {'n': n}})
+            for n in range(3):
+                await pipeline.submit_job({'user_id': 'heavy', 'type': 'stream', 'data': {'n': n}})
+            await pipeline.submit_job({'user_id': 'light', 'type': 'stream', 'data': {'n': 0}})
+
+        asyncio.run(submit())
+        order = []
+        while True:
+            job = pipeline.queue.claim()
+            if job is None:
+                break
+            order.append((job['user_id'], job['data']['n']))
+
+        self.assertEqual(order, [('heavy', 0), ('light', 0), ('heavy', 1), ('heavy', 2),
+                                 ('bulk_tenant', 0), ('bulk_tenant', 1), ('bulk_tenant', 2)])
+        self.assertEqual(pipeline.queue.get_stats()['running'], 7)
+
+    @patch('api.data_ingestion.redis_client', None)
+    def test_job_queue_rejects_with_retry_after_when_full(self):
+        """Test submissions over the queue or tenant limit get 429 with Retry-After"""
+        from api import data_ingestion
+        from api.async_http import HTTPRequest
+        from api.data_ingestion import DataPipeline, JobQueue
+
+        pipeline = DataPipeline(queue=JobQueue(max_depth=3, max_per_tenant=2))
+        router = data_ingestion.build_router()
+
+        def post(user_id):
+            body = json.dumps({'user_id': user_id, 'stream_data': 'x'}).encode()
+            return asyncio.run(router.dispatch(HTTPRequest('POST', '/stream', body=body)))
+
+        with patch.object(data_ingestion, 'data_pipeline', pipeline):
+            statuses = [post('u1')[0], post('u1')[0]]
+            tenant_full = post('u1')
+            statuses.append(post('u2')[0])
+            queue_full = post('u3')
+            bad_priority = asyncio.run(router.dispatch(HTTPRequest('POST', '/stream', body=json.dumps(
+                {'user_id': 'u2', 'stream_data': 'x', 'priority': 'urgent'}).encode())))
+
+        self.assertEqual(statuses, [202, 202, 202])
+        for status, payload, headers in (tenant_full, queue_full):
+            self.assertEqual(status, 429)
+            self.assertEqual(headers['Retry-After'], str(payload['retry_after']))
+            self.assertGreaterEqual(payload['retry_after'], 1)
+        self.assertIn('u1', tenant_full[1]['error'])
+        self.assertEqual(bad_priority[0], 400)
+        self.assertEqual(pipeline.queue.get_stats()['rejected'], 2)
+
+    @patch('api.data_ingestion.redis_client', None)
+    def test_failed_jobs_retry_then_dead_letter(self):
+        """Test a failing job is retried with backoff and then dead-lettered"""
+        from api.data_ingestion import DataPipeline, JobQueue
+
+        pipeline = DataPipeline(queue=JobQueue(max_attempts=2, retry_backoff=0.01))
+        attempts = []
+
+        async def failing_batch(job):
+            attempts.append(job['attempts'])
+            raise RuntimeError('rag service down')
+
+        pipeline._process_batch_job = failing_batch
+
+        async def run():
+            await pipeline.start_workers(1)
+            job_id = await pipeline.submit_job({'user_id': 'u1', 'type': 'batch', 'data': {'records': []}})
+            for _ in range(200):
+                if pipeline.get_job_status(job_id)['status'] == 'failed':
+                    break
+                await asyncio.sleep(0.01)
+            status = pipeline.get_job_status(job_id)
+            dead = pipeline.queue.dead_letters()
+            stats = pipeline.queue.get_stats()
+            await pipeline.stop()
+            return status, dead, stats
+
+        status, dead, stats = asyncio.run(run())
+
+        self.assertEqual(attempts, [1, 2])
+        self.assertEqual(status['status'], 'failed')
+        self.assertTrue(status['dead_letter'])
+        self.assertEqual(status['error'], 'rag service down')
+        self.assertEqual([d['job_id'] for d in dead], [status['job_id']])
+        self.assertEqual((stats['retried'], stats['dead_lettered']), (1, 1))
+
+    @patch('api.data_ingestion.redis_client', None)
+    def test_file_job_retry_resumes_from_checkpoint(self):
+        """Test a file job with failed parts fails, and its retry reuses the doc_id and skips indexed parts"""
+        from unittest.mock import AsyncMock
+        from api.data_ingestion import DataPipeline, JobQueue
+
+        pipeline = DataPipeline(queue=JobQueue(retry_backoff=0))
+        outage = {'part': 3}
+
+        async def index(service, method, path, data):
+            part = data['document']['part']
+            return {} if part == outage.get('part') else {'status': 'indexed'}
+
+        pipeline._call_service = AsyncMock(side_effect=index)
+        test_file = os.path.join(self.temp_dir, 'resume.txt')
+        with open(test_file, 'w') as f:
+            f.write(''.join(f"record {i}\n" for i in range(3000)))
+
+        async def run():
+            await pipeline.submit_job({'user_id': 'u1', 'type': 'file',
+                                       'data': {'file_path': test_file, 'file_type': 'text', 'title': 'r'}})
+            first = pipeline.queue.claim()
+            with self.assertRaisesRegex(RuntimeError, '1 of .* parts'):
+                await pipeline._process_file_job(first)
+            self.assertTrue(pipeline.queue.fail(first, 'parts failed'))
+            outage.clear()
+            retry = pipeline.queue.claim()
+            await pipeline._process_file_job(retry)
+            await pipeline.stop()
+            return first, retry
+
+        with patch('api.data_ingestion.INGEST_WINDOW_BYTES', 2048):
+            first, retry = asyncio.run(run())
+
+        parts = [call.args[3]['document']['part'] for call in pipeline._call_service.call_args_list]
+        total = retry['result']['parts']
+        self.assertGreater(total, 5)
+        self.assertEqual(sorted(parts), sorted(list(range(total)) + [3]))
+        self.assertEqual(retry['result']['doc_id'], first['resume']['doc_id'])
+        self.assertEqual({call.args[3]['document']['doc_id'] for call in pipeline._call_service.call_args_list},
+                         {first['resume']['doc_id']})
+        self.assertEqual(retry['resume']['next_part'], total)
+        self.assertEqual(retry['progress']['parts_indexed'], total)
+
+    @patch('api.data_ingestion.redis_client', None)
+    def test_permanent_failures_dead_letter_at_once(self):
+        """Test unsupported inputs skip retries, and tenants with nothing queued are forgotten"""
+        from api.data_ingestion import DataPipeline, JobQueue
+
+        pipeline = DataPipeline(queue=JobQueue(max_attempts=3, retry_backoff=0.01))
+
+        async def run():
+            await pipeline.start_workers(1)
+            job_id = await pipeline.submit_job({'user_id': 'u1', 'type': 'file',
+                                                'data': {'file_path': 'http://x', 'file_type': 'url'}})
+            for _ in range(200):
+                if pipeline.get_job_status(job_id)['status'] == 'failed':
+                    break
+                await asyncio.sleep(0.01)
+            status = pipeline.get_job_status(job_id)
+            stats = pipeline.queue.get_stats()
+            await pipeline.stop()
+            return status, stats
+
+        status, stats = asyncio.run(run())
+        self.assertEqual((status['status'], status['attempts']), ('failed', 1))
+        self.assertIn('Unsupported file type', status['error'])
+        self.assertEqual((stats['retried'], stats['dead_lettered']), (0, 1))
+
+        queue = JobQueue()
+        for job_id, tenant in (('a', 'u1'), ('b', 'u2'), ('c', 'u2')):
+            queue.put({'job_id': job_id, 'user_id': tenant, 'type': 'stream', 'data': {}, 'enqueued_at': 1.0}, 1)
+        queue.complete(queue.claim())
+        queue.claim()
+        self.assertEqual(set(queue.tenant_last_served), {'u1', 'u2'})
+        queue.evict()
+        self.assertEqual(set(queue.tenant_last_served), {'u2'})
+
+    def test_job_queue_survives_restart_and_evicts_finished(self):
+        """Test queued and interrupted jobs survive a reopen and old records are evicted"""
+        from api.data_ingestion import JobQueue
+
+        path = os.path.join(self.temp_dir, 'queue', 'ingestion.db')
+
+        def job(job_id):
+            return {'job_id': job_id, 'user_id': 'u1', 'type': 'stream', 'data': {}, 'enqueued_at': 1.0}
+
+        queue = JobQueue(path)
+        for job_id in ('done', 'running', 'waiting'):
+            queue.put(job(job_id), 0)
+        queue.complete(queue.claim())
+        self.assertEqual(queue.claim()['job_id'], 'running')
+        queue.close()
+
+        queue = JobQueue(path, retention=0)
+        self.assertEqual(queue.get('running')['status'], 'queued')
+        self.assertEqual(queue.get('done')['status'], 'completed')
+        self.assertEqual(queue.evict(), 1)
+        self.assertIsNone(queue.get('done'))
+        claimed = [queue.claim()['job_id'], queue.claim()['job_id']]
+        self.assertIsNone(queue.claim())
+        queue.close()
+
+        self.assertEqual(claimed, ['running', 'waiting'])
+
+    def test_job_that_keeps_crashing_its_worker_is_dead_lettered(self):
+        """Test a job interrupted by a restart on every attempt stops coming back"""
+        from api.data_ingestion import JobQueue
+
+        path = os.path.join(self.temp_dir, 'queue', 'crashes.db')
+        queue = JobQueue(path, max_attempts=3)
+        queue.put({'job_id': 'oom', 'user_id': 'u1', 'type': 'file', 'data': {}, 'enqueued_at': 1.0}, 0)
+        queue.close()
+
+        claims = []
+        for _ in range(5):
+            queue = JobQueue(path, max_attempts=3)
+            job = queue.claim()  # the worker dies before completing or failing the job
+            claims.append(job and job['attempts'])
+            queue.close()
+
+        queue = JobQueue(path, max_attempts=3)
+        status = queue.get('oom')
+        self.assertEqual(claims, [1, 2, 3, None, None])
+        self.assertEqual((status['status'], status['attempts']), ('failed', 3))
+        self.assertTrue(status['dead_letter'])
+        self.assertIn('restart', status['error'])
+
+        # A queued job already out of attempts (e.g. reset by hand) is not handed out either
+        queue.conn.execute("UPDATE jobs SET state = 'queued' WHERE job_id = 'oom'")
+        self.assertIsNone(queue.claim())
+        self.assertEqual(queue.get('oom')['status'], 'failed')
+        queue.close()
+
 class TestRAGService(unittest.TestCase):
     """Test RAG service functionality"""
     
@@ -127,7 +495,302 @@ class TestRAGService(unittest.TestCase):
         result = index.add_vectors(vectors, metadata)
         self.assertTrue(result)
         self.assertEqual(index.index_size, 2)
-    
+
+    def test_vector_index_ivf_mode(self):
+        """Test IVF search matches exact search once centroids are trained"""
+        from api.rag_service import B200VectorIndex
+        import numpy as np
+
+        rng = np.random.default_rng(0)
+        centers = rng.standard_normal((8, 16)).astype(np.float32)
+        vectors = centers[rng.integers(0, 8, 400)] + 0.1 * rng.standard_normal((400, 16)).astype(np.float32)
+        metadata = [{'id': i} for i in range(len(vectors))]
+
+        exact = B200VectorIndex(dimension=16, mode='exact')
+        exact.add_vectors(vectors, [dict(m) for m in metadata])
+        ivf = B200VectorIndex(dimension=16, mode='ivf', nlist=8, nprobe=8, min_train_size=200)
+        ivf.add_vectors(vectors[:300], [dict(m) for m in metadata[:300]])
+        ivf.add_vectors(vectors[300:], [dict(m) for m in metadata[300:]])
+
+        self.assertTrue(ivf.ann.is_trained)
+        self.assertEqual(sum(len(ids) for ids in ivf.ann.lists), 400)
+
+        # Probing every list must reproduce the exact results
+        query = vectors[17]
+        exact_ids = [r['metadata']['id'] for r in exact.search(query, 5)]
+        ivf_ids = [r['metadata']['id'] for r in ivf.search(query, 5)]
+        self.assertEqual(exact_ids, ivf_ids)
+
+        # Round-trip through save/load keeps the trained lists
+        path = os.path.join(self.index_path, 'ivf.vidx')
+        ivf.save(path)
+        restored = B200VectorIndex(dimension=16, mode='ivf', nlist=8, min_train_size=200)
+        restored.load(path)
+        self.assertTrue(restored.ann.is_trained)
+        self.assertEqual([r['metadata']['id'] for r in restored.search(query, 5, nprobe=8)], ivf_ids)
+
+    def test_vector_index_incremental_save_and_mmap_load(self):
+        """Test the on-disk layout grows on demand and saves append only new rows"""
+        from api.rag_service import B200VectorIndex, INITIAL_INDEX_CAPACITY
+        import numpy as np
+        import pickle
+
+        index = B200VectorIndex(dimension=4)
+        self.assertEqual(index.capacity, INITIAL_INDEX_CAPACITY)
+
+        first = np.eye(4, dtype=np.float32).tolist() * 300
+        index.add_vectors(first, [{'id': i} for i in range(len(first))])
+        self.assertGreaterEqual(index.capacity, len(first))
+
+        path = os.path.join(self.index_path, 'user.vidx')
+        index.save(path)
+        metadata_size = os.path.getsize(os.path.join(path, 'metadata.jsonl'))
+
+        # Rows added after a save land in the mapped file; the next save only appends metadata
+        index.add_vectors([[0.0, 0.0, 0.0, 2.0]], [{'id': 'new'}])
+        index.save(path)
+        with open(os.path.join(path, 'metadata.jsonl'), 'rb') as f:
+            f.seek(metadata_size)
+            self.assertEqual(json.loads(f.read())['id'], 'new')
+
+        restored = B200VectorIndex(dimension=4)
+        restored.load(path)
+        self.assertIsInstance(restored.vectors, np.memmap)
+        self.assertEqual(restored.index_size, len(first) + 1)
+        self.assertEqual(restored.search(np.array([0.0, 0.0, 0.0, 1.0]), 1)[0]['metadata']['id'], 'new')
+
+        # Pickled indexes from the previous format still load
+        legacy_path = os.path.join(self.index_path, 'legacy.idx')
+        with open(legacy_path, 'wb') as f:
+            pickle.dump({
+                'vectors': np.array(first[:4], dtype=np.float32),
+                'metadata': [{'id': i} for i in range(4)],
+                'dimension': 4,
+                'size': 4
+            }, f)
+        legacy = B200VectorIndex(dimension=4)
+        legacy.load(legacy_path)
+        self.assertEqual(legacy.index_size, 4)
+        self.assertEqual(legacy.search(np.array([0.0, 1.0, 0.0, 0.0]), 1)[0]['metadata']['id'], 1)
+
+    def test_vector_index_declarative_filters(self):
+        """Test attribute filters only score matching rows"""
+        from api.rag_service import B200VectorIndex
+        import numpy as np
+
+        index = B200VectorIndex(dimension=2)
+        vectors = [[1.0, 0.0], [0.9, 0.1], [0.8, 0.2], [0.7, 0.3]]
+        metadata = [
+            {'doc_id': 'a', 'source': 'crm', 'metadata': {'created_at': '2024-01-01T00:00:00', 'tags': ['sales']}},
+            {'doc_id': 'a', 'source': 'crm', 'metadata': {'created_at': '2024-02-01T00:00:00', 'tags': []}},
+            {'doc_id': 'b', 'source': 'email', 'metadata': {'created_at': '2024-03-01T00:00:00', 'tags': ['sales', 'board']}},
+            {'doc_id': 'c', 'source': 'email', 'metadata': {'created_at': '2024-04-01T00:00:00', 'tags': ['board']}}
+        ]
+        index.add_vectors(vectors, metadata)
+        query = np.array([1.0, 0.0])
+
+        def ids(results):
+            return [r['metadata']['index'] for r in results]
+
+        self.assertEqual(ids(index.search(query, 10, filters={'doc_id': 'a'})), [0, 1])
+        self.assertEqual(ids(index.search(query, 10, filters={'source': {'in': ['email']}})), [2, 3])
+        self.assertEqual(ids(index.search(query, 10, filters={'tags': 'board', 'source': 'email'})), [2, 3])
+        self.assertEqual(
+            ids(index.search(query, 10, filters={'created_at': {'range': ['2024-01-15', '2024-03-15']}})),
+            [1, 2]
+        )
+        self.assertEqual(ids(index.search(query, 10, filters={'tags': {'in': ['sales']},
+                                                                'created_at': {'gte': '2024-02-01'}})), [2])
+        self.assertEqual(index.search(query, 10, filters={'doc_id': 'missing'}), [])
+
+        with self.assertRaises(ValueError):
+            index.search(query, 10, filters={'unknown_field': 'x'})
+        for malformed in ({'doc_id': ['a']}, {'source': {'in': 'crm'}}, {'tags': {'in': [['x']]}},
+                          {'created_at': {'range': 5}}, ['doc_id']):
+            with self.assertRaises(ValueError):
+                index.search(query, 10, filters=malformed)
+
+    def test_vector_index_search_many_matches_single_search(self):
+        """Test batched search returns the same hits as per-query search"""
+        from api.rag_service import B200VectorIndex
+        import numpy as np
+
+        rng = np.random.default_rng(1)
+        vectors = rng.standard_normal((200, 8)).astype(np.float32)
+        index = B200VectorIndex(dimension=8)
+        index.add_vectors(vectors, [{'id': i, 'source': 'crm' if i % 2 else 'email'} for i in range(200)])
+
+        queries = rng.standard_normal((5, 8)).astype(np.float32)
+        for filters in (None, {'source': 'crm'}):
+            batch = index.search_many(queries, 7, filters=filters)
+            self.assertEqual(len(batch), 5)
+            for query, results in zip(queries, batch):
+                single = index.search(query, 7, filters=filters)
+                self.assertEqual([r['metadata']['id'] for r in results], [r['metadata']['id'] for r in single])
+
+    def test_user_index_is_loaded_off_the_event_loop(self):
+        """Test a saved index is loaded in a worker thread and concurrent requests share it"""
+        from api.rag_service import RAGEngine, B200VectorIndex
+        import threading
+
+        saved = B200VectorIndex()
+        saved.add_vectors([[1.0] + [0.0] * 767], [{'chunk_id': 'c'}])
+        path = os.path.join(self.index_path, 'loaded_user.vidx')
+        saved.save(path)
+
+        engine = RAGEngine()
+        engine.index_paths['loaded_user'] = path
+        threads = []
+        original_load = B200VectorIndex.load
+
+        def load(index, load_path):
+            threads.append(threading.current_thread())
+            return original_load(index, load_path)
+
+        async def concurrent():
+            return await asyncio.gather(engine.get_user_index('loaded_user'), engine.get_user_index('loaded_user'))
+
+        with patch.object(B200VectorIndex, 'load', load):
+            first, second = asyncio.run(concurrent())
+
+        self.assertIs(first, second)
+        self.assertEqual(first.index_size, 1)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_rag_engine_search_many_merges_indexes(self):
+        """Test batched engine search embeds once and merges user and shared indexes"""
+        from api.rag_service import RAGEngine
+
+        engine = RAGEngine()
+        user_id = f'batch_user_{os.getpid()}'
+
+        def chunk(chunk_id):
+            return {'chunk_id': chunk_id, 'doc_id': chunk_id, 'title': chunk_id, 'text': chunk_id, 'metadata': {}}
+
+        with patch.object(engine.document_processor, '_request_embeddings') as embed:
+            asyncio.run(engine.get_user_index(user_id)).add_vectors([[1.0] + [0.0] * 767], [chunk('user')])
+            engine.default_index.add_vectors([[0.0, 1.0] + [0.0] * 766], [chunk('shared')])
+
+            async def fake_embed(texts):
+                return [[1.0, 0.5] + [0.0] * 766, [0.5, 1.0] + [0.0] * 766][:len(texts)]
+            embed.side_effect = fake_embed
+
+            results = asyncio.run(engine.search_many(user_id, ['q1', 'q2'], top_k=2))
+
+        embed.assert_called_once_with(['q1', 'q2'])
+        self.assertEqual([r['chunk_id'] for r in results[0]['results']], ['user', 'shared'])
+        self.assertEqual([r['chunk_id'] for r in results[1]['results']], ['shared', 'user'])
+
+    def test_rag_engine_query_cache_invalidated_by_index_growth(self):
+        """Test repeated searches hit the cache until the user's index changes"""
+        from api.rag_service import RAGEngine
+
+        engine = RAGEngine()
+        user_id = f'cache_user_{os.getpid()}'
+        index = asyncio.run(engine.get_user_index(user_id))
+
+        def chunk(chunk_id):
+            return {'chunk_id': chunk_id, 'doc_id': chunk_id, 'title': chunk_id, 'text': chunk_id, 'metadata': {}}
+
+        index.add_vectors([[1.0] + [0.0] * 767], [chunk('first')])
+
+        with patch.object(engine.document_processor, '_request_embeddings') as embed:
+            async def fake_embed(texts):
+                return [[1.0] + [0.0] * 767 for _ in texts]
+            embed.side_effect = fake_embed
+
+            first = asyncio.run(engine.search(user_id, 'revenue', top_k=5))
+            second = asyncio.run(engine.search(user_id, 'revenue', top_k=5))
+            self.assertEqual(first, second)
+            self.assertEqual(embed.call_count, 1)
+            self.assertEqual(engine.result_cache.get_stats()['hits'], 1)
+
+            # New vectors change the index size in the key; the cached embedding is still reused
+            index.add_vectors([[2.0] + [0.0] * 767], [chunk('second')])
+            third = asyncio.run(engine.search(user_id, 'revenue', top_k=5))
+            self.assertEqual(third['total_results'], 2)
+            self.assertEqual(embed.call_count, 1)
+            self.assertEqual(engine.embedding_cache.get_stats()['hits'], 1)
+
+    def test_result_cache_keys_follow_index_contents(self):
+        """Test workers sharing Redis agree on result keys only when their indexes hold the same rows"""
+        from api.rag_service import RAGEngine
+
+        def key(batches):
+            engine = RAGEngine()
+            index = asyncio.run(engine.get_user_index('shared_user'))
+            for batch in batches:
+                index.add_vectors([[1.0] + [0.0] * 767] * batch,
+                                  [{'chunk_id': 'c', 'doc_id': 'c', 'title': 'c', 'text': 'c', 'metadata': {}}
+                                   for _ in range(batch)])
+            return engine._result_cache_key('search', 'shared_user', index, 'q', 5, None)
+
+        self.assertEqual(key([2]), key([1, 1]))  # same rows, added in different calls
+        self.assertNotEqual(key([2]), key([1]))  # one add each, different rows
+
+    def test_results_from_fallback_embeddings_are_not_cached(self):
+        """Test searches made while /embed is down are recomputed once it is back"""
+        from api.rag_service import RAGEngine
+
+        engine = RAGEngine()
+        user_id = f'fallback_user_{os.getpid()}'
+        asyncio.run(engine.get_user_index(user_id)).add_vectors(
+            [[1.0] + [0.0] * 767],
+            [{'chunk_id': 'c', 'doc_id': 'c', 'title': 'c', 'text': 'c', 'metadata': {}}]
+        )
+        replies = [None, None, [[1.0] + [0.0] * 767], [[1.0] + [0.0] * 767]]
+
+        with patch.object(engine.document_processor, '_request_embeddings') as embed:
+            async def flaky_embed(texts):
+                return replies.pop(0)
+            embed.side_effect = flaky_embed
+
+            asyncio.run(engine.search(user_id, 'outage', top_k=1))
+            asyncio.run(engine.search_many(user_id, ['outage batch'], top_k=1))
+            recovered = asyncio.run(engine.search(user_id, 'outage', top_k=1))
+            batch = asyncio.run(engine.search_many(user_id, ['outage batch'], top_k=1))
+
+        self.assertEqual(embed.call_count, 4)
+        self.assertEqual(engine.result_cache.get_stats()['hits'], 0)
+        self.assertEqual(recovered['results'][0]['score'], 1.0)
+        self.assertEqual(batch[0]['results'][0]['score'], 1.0)
+
+    def test_query_cache_redis_runs_off_event_loop(self):
+        """Test a slow Redis delays only the lookup waiting on it, and short /embed replies fail clearly"""
+        import time
+        from api.rag_service import QueryCache, RAGEngine
+
+        slow_redis = Mock()
+        slow_redis.get.side_effect = lambda key: time.sleep(0.3)
+
+        async def run():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                for _ in range(10):
+                    await asyncio.sleep(0.02)
+                    ticks += 1
+
+            async def lookup():
+                await QueryCache('test').get('missing')
+                return ticks
+
+            ticks_during_lookup, _ = await asyncio.gather(lookup(), ticker())
+            return ticks_during_lookup
+
+        with patch('api.rag_service.redis_client', slow_redis):
+            self.assertEqual(asyncio.run(run()), 10)
+
+        engine = RAGEngine()
+        with patch.object(engine.document_processor, '_request_embeddings') as embed:
+            async def short_embed(texts):
+                return [[1.0] + [0.0] * 767]
+            embed.side_effect = short_embed
+            with self.assertRaisesRegex(RuntimeError, '1 embeddings for 2 queries'):
+                asyncio.run(engine.embed_queries(['a', 'b']))
+
     def test_document_processor(self):
         """Test document processing"""
         from api.rag_service import DocumentProcessor
@@ -160,6 +823,1722 @@ class TestRAGService(unittest.TestCase):
         self.assertIn('chunks_added', result)
         self.assertEqual(result['status'], 'indexed')
 
+class TestServiceClient(unittest.TestCase):
+    """Test the shared inter-service HTTP client"""
+
+    def setUp(self):
+        """Start a local keep-alive JSON echo server"""
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        class EchoHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                payload = json.dumps({'echo': json.loads(body or b'{}'), 'path': self.path}).encode('utf-8')
+                self.send_response(500 if self.path == '/fail' else 200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        import threading
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), EchoHandler)
+        self.service = {'host': '127.0.0.1', 'port': self.server.server_address[1]}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_reuse_keep_alive_connections(self):
+        """Test sequential calls share one pooled connection"""
+        from api.service_client import ServiceClient
+
+        client = ServiceClient()
+
+        async def run():
+            results = [await client.request(self.service, 'POST', '/embed', {'n': i}) for i in range(5)]
+            stats = client.get_stats()
+            await client.close()
+            return results, stats
+
+        results, stats = asyncio.run(run())
+
+        self.assertEqual([r['echo']['n'] for r in results], list(range(5)))
+        pool_stats = stats['pools'][f"127.0.0.1:{self.service['port']}"]
+        self.assertEqual(pool_stats['opened'], 1)
+        self.assertEqual(pool_stats['reused'], 4)
+
+    def test_circuit_opens_after_repeated_failures(self):
+        """Test server errors trip the per-service circuit breaker"""
+        from api.service_client import ServiceClient, ServiceClientConfig, CircuitOpenError
+
+        client = ServiceClient(ServiceClientConfig(failure_threshold=2, recovery_timeout=60))
+
+        async def run():
+            await client.request(self.service, 'POST', '/fail', {})
+            await client.request(self.service, 'POST', '/fail', {})
+            with self.assertRaises(CircuitOpenError):
+                await client.request(self.service, 'POST', '/embed', {})
+            await client.close()
+
+        asyncio.run(run())
+        self.assertEqual(client.get_stats()['rejected'], 1)
+
+    def test_half_open_circuit_admits_one_probe(self):
+        """Test a half-open breaker lets one trial through and rejects the rest until it is recorded"""
+        from api.circuit_breaker import CircuitBreaker, CircuitBreakerConfig, CircuitState
+
+        breaker = CircuitBreaker('probe', CircuitBreakerConfig(failure_threshold=1, recovery_timeout=60))
+
+        async def run():
+            await breaker.record_failure()
+            breaker.last_failure_time -= 60
+            admitted = [breaker.allow_request() for _ in range(3)]
+            await breaker.record_failure()
+            reopened = (breaker.get_state(), breaker.allow_request())
+            breaker.last_failure_time -= 60
+            breaker.allow_request()
+            await breaker.record_success()
+            return admitted, reopened, breaker.get_state(), [breaker.allow_request() for _ in range(3)]
+
+        admitted, reopened, closed, after = asyncio.run(run())
+        self.assertEqual(admitted, [True, False, False])
+        self.assertEqual(reopened, (CircuitState.OPEN, False))
+        self.assertEqual(closed, CircuitState.CLOSED)
+        self.assertEqual(after, [True, True, True])
+
+    def test_unreachable_service_is_retried_then_fails(self):
+        """Test connection failures are retried with backoff before giving up"""
+        from api.service_client import ServiceClient, ServiceClientConfig, ServiceCallError
+
+        client = ServiceClient(ServiceClientConfig(max_retries=2, retry_backoff=0.001))
+        self.server.shutdown()
+        self.server.server_close()
+
+        with self.assertRaises(ServiceCallError):
+            asyncio.run(client.request(self.service, 'POST', '/index', {}))
+        self.assertEqual(client.get_stats()['retries'], 2)
+
+        # tearDown shuts the server down again
+        self.server = Mock()
+
+class TestAsyncHTTPServer(unittest.TestCase):
+    """Test the asyncio HTTP server shared by the RAG and ingestion services"""
+
+    def test_rag_routes_keep_json_contracts(self):
+        """Test RAG routes answer over one keep-alive connection"""
+        from api.async_http import AsyncHTTPServer
+        from api.service_client import ServiceClient
+        from api import rag_service
+
+        async def run():
+            server = AsyncHTTPServer(rag_service.build_router(), '127.0.0.1', 0)
+            await server.start()
+            service = {'host': '127.0.0.1', 'port': server.port}
+            client = ServiceClient()
+            with patch.object(rag_service, 'rag_engine', None):
+                health = await client.request(service, 'GET', '/health')
+                no_data = await client.request(service, 'POST', '/search')
+                missing = await client.request(service, 'POST', '/search', {'user_id': 'u1'})
+                no_engine = await client.request(service, 'POST', '/search', {'user_id': 'u1', 'query': 'q'})
+                not_found = await client.request(service, 'GET', '/missing')
+            stats = client.get_stats()['pools'][f"127.0.0.1:{server.port}"]
+            await client.close()
+            await server.shutdown()
+            return health, no_data, missing, no_engine, not_found, stats
+
+        health, no_data, missing, no_engine, not_found, stats = asyncio.run(run())
+
+        self.assertEqual(health['service'], 'rag-service')
+        self.assertEqual(health['indexes_loaded'], 0)
+        self.assertEqual(no_data, {'error': 'No data'})
+        self.assertEqual(missing, {'error': 'user_id and query required'})
+        self.assertEqual(no_engine, {'error': 'RAG engine not initialized'})
+        self.assertEqual(not_found, {'error': 'Not Found'})
+        self.assertEqual(stats['opened'], 1)
+
+    def test_concurrency_limit_and_graceful_drain(self):
+        """Test handlers never exceed the limit and shutdown lets them finish"""
+        from api.async_http import AsyncHTTPServer, Router
+        from api.service_client import ServiceClient, ServiceClientConfig
+
+        active = {'now': 0, 'peak': 0}
+
+        async def slow(request):
+            active['now'] += 1
+            active['peak'] = max(active['peak'], active['now'])
+            await asyncio.sleep(0.05)
+            active['now'] -= 1
+            return 200, {'ok': True}
+
+        router = Router()
+        router.add('GET', '/slow', slow)
+
+        async def run():
+            server = AsyncHTTPServer(router, '127.0.0.1', 0, max_concurrency=2)
+            await server.start()
+            service = {'host': '127.0.0.1', 'port': server.port}
+            client = ServiceClient(ServiceClientConfig(max_connections=8))
+            results = await asyncio.gather(*(client.request(service, 'GET', '/slow') for _ in range(6)))
+
+            # Drain while a request is still running
+            in_flight = asyncio.ensure_future(client.request(service, 'GET', '/slow'))
+            await asyncio.sleep(0.01)
+            await server.shutdown()
+            drained = await in_flight
+            with self.assertRaises(OSError):
+                await asyncio.open_connection('127.0.0.1', server.port)
+            await client.close()
+            return results, drained, server.get_stats()
+
+        results, drained, stats = asyncio.run(run())
+
+        self.assertEqual(results, [{'ok': True}] * 6)
+        self.assertEqual(drained, {'ok': True})
+        self.assertEqual(active['peak'], 2)
+        self.assertEqual(stats['requests_served'], 7)
+        self.assertTrue(stats['draining'])
+
+    def test_malformed_content_length_is_rejected(self):
+        """Test a non-numeric or negative Content-Length gets a 400 instead of dropping the connection"""
+        from api.async_http import AsyncHTTPServer, Router
+
+        async def echo(request):
+            return 200, {'ok': True}
+
+        router = Router()
+        router.add('POST', '/echo', echo)
+
+        async def send(server, content_length):
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            writer.write(f'POST /echo HTTP/1.1\r\nHost: x\r\nContent-Length: {content_length}\r\n\r\n'.encode())
+            await writer.drain()
+            status_line = await reader.readline()
+            writer.close()
+            return status_line.split()[1]
+
+        async def run():
+            server = AsyncHTTPServer(router, '127.0.0.1', 0)
+            await server.start()
+            statuses = [await send(server, value) for value in ('abc', '-5')]
+            await server.shutdown()
+            return statuses
+
+        self.assertEqual(asyncio.run(run()), [b'400', b'400'])
+
+    @patch('api.data_ingestion.redis_client', None)
+    def test_ingestion_jobs_run_on_serving_loop(self):
+        """Test jobs submitted over HTTP are processed by the workers"""
+        from api.async_http import AsyncHTTPServer
+        from api.service_client import ServiceClient
+        from api import data_ingestion
+
+        async def run():
+            pipeline = data_ingestion.DataPipeline()
+            await pipeline.start_workers(1)
+            with patch.object(data_ingestion, 'data_pipeline', pipeline):
+                server = AsyncHTTPServer(data_ingestion.build_router(), '127.0.0.1', 0)
+                await server.start()
+                service = {'host': '127.0.0.1', 'port': server.port}
+                client = ServiceClient()
+                accepted = await client.request(service, 'POST', '/stream', {
+                    'user_id': 'u1',
+                    'stream_type': 'json_lines',
+                    'stream_data': '{"a": 1}\n{"a": 2}\n'
+                })
+                status = {}
+                for _ in range(50):
+                    status = await client.request(service, 'GET', f"/job/{accepted['job_id']}")
+                    if status['status'] == 'completed':
+                        break
+                    await asyncio.sleep(0.01)
+                await client.close()
+                await server.shutdown()
+            await pipeline.stop()
+            return accepted, status
+
+        accepted, status = asyncio.run(run())
+
+        self.assertEqual(accepted['status'], 'processing')
+        self.assertEqual(status['status'], 'completed')
+        self.assertEqual(status['result']['records_processed'], 2)
+
+class TestIntegrationSync(unittest.TestCase):
+    """Test concurrent business-system sync scheduling"""
+
+    def test_scheduler_runs_syncs_concurrently_under_deadlines(self):
+        """Test a run takes as long as the slowest sync and overruns are cancelled"""
+        import time
+        from api.integration_sync import SyncScheduler
+
+        scheduler = SyncScheduler(default_deadline=1.0, deadlines={'stuck': 0.2})
+        cancelled = []
+
+        def sync_taking(seconds, result=None):
+            async def sync():
+                await asyncio.sleep(seconds)
+                return result or {'records': 1}
+            return sync
+
+        async def stuck():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def broken():
+            raise RuntimeError('token expired')
+
+        start = time.perf_counter()
+        results = asyncio.run(scheduler.run({
+            'crm': sync_taking(0.3),
+            'email': sync_taking(0.2),
+            'calendar': sync_taking(0.1, {'status': 'error', 'error': 'bad page'}),
+            'stuck': stuck,
+            'broken': broken
+        }))
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.55)
+        self.assertEqual(results['crm']['status'], 'success')
+        self.assertEqual(results['crm']['records'], 1)
+        self.assertGreaterEqual(results['crm']['sync_duration'], 0.3)
+        self.assertEqual(results['calendar']['status'], 'error')
+        self.assertEqual(results['stuck']['status'], 'timeout')
+        self.assertEqual(cancelled, [True])
+        self.assertEqual(results['broken'], {'status': 'error', 'error': 'token expired',
+                                             'sync_duration': results['broken']['sync_duration']})
+
+        stats = scheduler.get_stats()
+        self.assertEqual(stats['last_run']['slowest'], 'crm')
+        self.assertEqual(stats['timings']['crm']['count'], 1)
+        self.assertEqual(stats['timings']['crm']['buckets']['0.5'], 1)
+
+    def test_timing_histogram_quantiles(self):
+        """Test histogram quantiles come from bucket bounds capped at the max"""
+        from api.integration_sync import TimingHistogram
+
+        histogram = TimingHistogram()
+        for seconds in [0.01] * 98 + [3.0, 400.0]:
+            histogram.observe(seconds)
+
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot['count'], 100)
+        self.assertEqual(snapshot['p50'], 0.05)
+        self.assertEqual(snapshot['p99'], 5.0)
+        self.assertEqual(snapshot['buckets']['+Inf'], 1)
+        self.assertEqual(histogram.quantile(1.0), 400.0)
+
+    def test_session_encodes_query_params_like_requests(self):
+        """Test None params are dropped, booleans lower-cased and lists repeat their key"""
+        from api.integration_sync import AsyncIntegrationSession
+
+        encoded = AsyncIntegrationSession._query_params(
+            {'maxResults': 100, 'pageToken': None, 'fields': ['id', 'name'], 'active': True}
+        )
+        self.assertEqual(encoded, [('maxResults', '100'), ('fields', 'id'), ('fields', 'name'),
+                                   ('active', 'true')])
+
+class TestDeltaSync(unittest.TestCase):
+    """Test cursor-based delta sync against the fake CRM platform"""
+
+    def setUp(self):
+        sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+        from api.integration_sync import SyncStateStore
+        from fake_crm import FakeCRM, RouterSession, build_router, connector_configs
+
+        self.crm = FakeCRM(contacts=450, opportunities=30, invoices=2300)
+        self.session = RouterSession(build_router(self.crm))
+        self.configs = connector_configs(self.crm.instance_url)
+        self.store = SyncStateStore()
+
+    def tearDown(self):
+        self.store.close()
+
+    def _connector(self, module, cls, config):
+        with patch(f'api.{module}.get_sync_state_store', return_value=self.store):
+            connector = cls(config)
+        connector.session = self.session
+        return connector
+
+    def test_salesforce_delta_fetches_only_changed_records(self):
+        """Test a second sync pages through modified records only and persists the cursor"""
+        from api.crm_integration import SalesforceIntegration
+
+        config = dict(self.configs['salesforce'], query_batch_size=200)
+        salesforce = self._connector('crm_integration', SalesforceIntegration, config)
+
+        first = asyncio.run(salesforce.sync_data())
+        contacts = first['delta']['contacts']
+        self.assertTrue(contacts['full_sync'])
+        self.assertEqual(first['contacts_synced'], 450)
+        self.assertEqual(contacts['pages'], 3)
+        self.assertEqual(contacts['requests'], 4)  # token + query + 2 x queryMore
+
+        self.crm.touch(5)
+        second = asyncio.run(salesforce.sync_data())
+        contacts = second['delta']['contacts']
+        self.assertFalse(contacts['full_sync'])
+        self.assertEqual(contacts['records_changed'], 5)
+        self.assertEqual(contacts['requests'], 1)
+        self.assertEqual(contacts['records_stored'], 450)
+        self.assertLess(contacts['bytes_transferred'], first['delta']['contacts']['bytes_transferred'] / 50)
+        self.assertEqual(second['opportunities_synced'], 5)
+
+        # A new connector (e.g. after a restart) resumes from the stored cursor
+        restarted = self._connector('crm_integration', SalesforceIntegration, config)
+        third = asyncio.run(restarted.sync_data())
+        self.assertEqual(third['contacts_synced'], 0)
+        self.assertEqual(self.store.get_cursor('salesforce', 'contacts'), contacts['cursor'])
+
+    def test_hubspot_and_quickbooks_delta_sync(self):
+        """Test search-API and query paging merge changed records into the store"""
+        from api.accounting_integration import QuickBooksIntegration
+        from api.crm_integration import HubSpotIntegration
+
+        hubspot = self._connector('crm_integration', HubSpotIntegration, self.configs['hubspot'])
+        quickbooks = self._connector('accounting_integration', QuickBooksIntegration, self.configs['quickbooks'])
+
+        first = asyncio.run(hubspot.sync_data())
+        self.assertEqual(first['delta']['contacts']['pages'], 5)
+        invoices = asyncio.run(quickbooks.sync_data())['delta']['invoices']
+        self.assertEqual((invoices['records_changed'], invoices['pages']), (2300, 3))
+
+        self.crm.touch(3)
+        second = asyncio.run(hubspot.sync_data())
+        invoices = asyncio.run(quickbooks.sync_data())['delta']['invoices']
+        self.assertEqual(second['contacts_synced'], 3)
+        self.assertEqual(second['delta']['contacts']['requests'], 1)
+        self.assertEqual(invoices['records_changed'], 3)
+        self.assertEqual(invoices['records_stored'], 2300)
+        latest = max(self.crm.hubspot.values(), key=lambda r: r['properties']['lastmodifieddate'])
+        self.assertEqual(self.store.get('hubspot', 'contacts', latest['id']), latest)
+
+    def test_records_sharing_the_cursor_timestamp_are_not_lost(self):
+        """Test a record committed after a sync with the cursor's own timestamp is fetched next time"""
+        from api.accounting_integration import QuickBooksIntegration
+        from api.crm_integration import HubSpotIntegration, SalesforceIntegration
+
+        salesforce = self._connector('crm_integration', SalesforceIntegration, self.configs['salesforce'])
+        hubspot = self._connector('crm_integration', HubSpotIntegration, self.configs['hubspot'])
+        quickbooks = self._connector('accounting_integration', QuickBooksIntegration, self.configs['quickbooks'])
+        for connector in (salesforce, hubspot, quickbooks):
+            asyncio.run(connector.sync_data())
+
+        def latest(records, modified):
+            return max(records.values(), key=modified)
+
+        contact = latest(self.crm.salesforce['Contact'], lambda r: r['LastModifiedDate'])
+        # Same second as the cursor, but a later millisecond that whole-second SOQL literals drop
+        self.crm.salesforce['Contact']['003late'] = dict(
+            contact, Id='003late', LastModifiedDate=contact['LastModifiedDate'].replace('.000', '.250'))
+        hub = latest(self.crm.hubspot, lambda r: r['properties']['lastmodifieddate'])
+        self.crm.hubspot['late'] = dict(hub, id='late')
+        invoice = latest(self.crm.quickbooks, lambda r: r['MetaData']['LastUpdatedTime'])
+        self.crm.quickbooks['late'] = dict(invoice, Id='late')
+
+        results = [asyncio.run(connector.sync_data()) for connector in (salesforce, hubspot, quickbooks)]
+        self.assertIsNotNone(self.store.get('salesforce', 'contacts', '003late'))
+        self.assertIsNotNone(self.store.get('hubspot', 'contacts', 'late'))
+        self.assertIsNotNone(self.store.get('quickbooks', 'invoices', 'late'))
+        # Boundary records fetched again but unchanged are not counted
+        self.assertEqual([r['delta'][entity]['records_changed'] for r, entity in
+                          zip(results, ('contacts', 'contacts', 'invoices'))], [1, 1, 1])
+
+    def test_expired_cursor_triggers_one_full_resync(self):
+        """Test an expired cursor clears the entity and resyncs from scratch"""
+        from api.integration_sync import CursorExpiredError, SyncPage, run_delta_sync
+
+        calls = []
+
+        async def changes(cursor):
+            calls.append(cursor)
+            if cursor == 'stale':
+                raise CursorExpiredError()
+            yield SyncPage(records=[('a', {'v': 1})], deleted=['gone'], cursor='fresh')
+
+        self.store.set_cursor('calendar', 'events', 'stale')
+        self.store.merge('calendar', 'events', [('gone', {}), ('old', {})])
+        result = asyncio.run(run_delta_sync(self.store, self.session, 'calendar', 'events', changes))
+
+        self.assertEqual(calls, ['stale', None])
+        self.assertTrue(result['full_sync'])
+        self.assertEqual(result['records_stored'], 1)
+        self.assertEqual(result['cursor'], 'fresh')
+        self.assertEqual(self.store.get_cursor('calendar', 'events'), 'fresh')
+
+    def test_unified_reads_serve_the_delta_synced_records(self):
+        """Test the cache is loaded from the state store, limits the merged result and drops deletions"""
+        from api.business_data_cache import BusinessDataCache
+        from api.crm_integration import CRMPlatform, HubSpotIntegration, SalesforceIntegration, UnifiedCRMIntegration
+
+        cache = BusinessDataCache(max_age=60)
+        with patch('api.crm_integration.get_business_data_cache', return_value=cache):
+            crm = UnifiedCRMIntegration()
+        crm.integrations[CRMPlatform.SALESFORCE] = self._connector(
+            'crm_integration', SalesforceIntegration, dict(self.configs['salesforce'], query_batch_size=200)
+        )
+        crm.integrations[CRMPlatform.HUBSPOT] = self._connector(
+            'crm_integration', HubSpotIntegration, self.configs['hubspot']
+        )
+
+        async def scenario():
+            contacts = await crm.get_all_contacts()
+            latest = await crm.get_all_contacts(limit=3)
+            opportunities = await crm.get_all_opportunities()
+
+            gone = contacts[-1]
+            self.store.merge(gone.platform.value, 'contacts', [], deleted=[gone.id])
+            cache.conn.execute("UPDATE cache_refreshes SET refreshed_at = refreshed_at - 120")
+            await crm.get_all_contacts()
+            await asyncio.gather(*cache.refreshing.values())
+            return contacts, latest, opportunities, gone, await crm.get_all_contacts()
+
+        contacts, latest, opportunities, gone, after = asyncio.run(scenario())
+        self.assertEqual(len(contacts), 900)
+        self.assertEqual(len(latest), 3)
+        self.assertEqual(latest, contacts[:3])
+        self.assertEqual(len(opportunities), 30)
+        self.assertEqual(len(after), 899)
+        self.assertNotIn((gone.platform, gone.id), {(c.platform, c.id) for c in after})
+        cache.close()
+
+class TestBusinessDataCache(unittest.TestCase):
+    """Test the local cache behind the unified integration reads"""
+
+    def _unified(self, module, cls, cache):
+        with patch(f'api.{module}.get_business_data_cache', return_value=cache):
+            return cls()
+
+    def test_contacts_round_trip_and_indexed_queries(self):
+        """Test dataclasses come back typed and filters use the cached columns"""
+        from datetime import datetime
+        from api.business_data_cache import BusinessDataCache
+        from api.crm_integration import CONTACT_CACHE, ContactStatus, CRMContact, CRMPlatform
+
+        cache = BusinessDataCache()
+        cache.upsert(CONTACT_CACHE, [
+            CRMContact(id=str(i), platform=CRMPlatform.HUBSPOT, first_name='A', last_name=str(i),
+                       email=f'{i}@example.com', company='Acme' if i % 2 else 'Globex',
+                       status=ContactStatus.CUSTOMER, updated_at=datetime(2024, 1, 1 + i),
+                       custom_fields={'tier': i}, tags=['vip'])
+            for i in range(6)
+        ])
+
+        acme = cache.query(CONTACT_CACHE, customer='Acme')
+        self.assertEqual([c.id for c in acme], ['5', '3', '1'])
+        self.assertEqual(acme[0].platform, CRMPlatform.HUBSPOT)
+        self.assertEqual(acme[0].status, ContactStatus.CUSTOMER)
+        self.assertEqual(acme[0].updated_at, datetime(2024, 1, 6))
+        self.assertEqual((acme[0].custom_fields, acme[0].tags), ({'tier': 5}, ['vip']))
+        recent = cache.query(CONTACT_CACHE, updated_since=datetime(2024, 1, 4), limit=1)
+        self.assertEqual([c.id for c in recent], ['5'])
+        self.assertEqual(cache.query(CONTACT_CACHE, platform='salesforce'), [])
+
+        plan = cache.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM crm_contacts WHERE customer = 'Acme'"
+        ).fetchall()
+        self.assertIn('crm_contacts_customer', str(plan))
+        cache.close()
+
+    def test_reads_are_local_and_stale_entries_refresh_in_background(self):
+        """Test only cold reads wait on the platform and staleness is reported"""
+        from unittest.mock import AsyncMock
+        from api.business_data_cache import BusinessDataCache
+        from api.crm_integration import CRMContact, CRMPlatform, UnifiedCRMIntegration
+
+        cache = BusinessDataCache(max_age=60)
+        crm = self._unified('crm_integration', UnifiedCRMIntegration, cache)
+        salesforce = Mock(SYNCED_ENTITIES=('contacts',))
+        salesforce.synced_contacts = AsyncMock(return_value=[
+            CRMContact(id='1', platform=CRMPlatform.SALESFORCE, first_name='Ada', last_name='L', email='a@x.io')
+        ])
+        crm.integrations[CRMPlatform.SALESFORCE] = salesforce
+
+        async def settle():
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+
+        def status():
+            return crm.get_sync_status()['cache']['crm_contacts']['salesforce']
+
+        async def scenario():
+            first = await crm.get_all_contacts()
+            second = await crm.get_all_contacts()
+            self.assertEqual(salesforce.synced_contacts.await_count, 1)
+
+            cache.conn.execute("UPDATE cache_refreshes SET refreshed_at = refreshed_at - 120")
+            stale = status()
+            salesforce.synced_contacts.side_effect = RuntimeError('platform unavailable')
+            third = await crm.get_all_contacts()
+            refreshing = status()['refreshing']
+            await settle()
+            failed = status()
+
+            salesforce.synced_contacts.side_effect = None
+            salesforce.synced_contacts.return_value = [
+                CRMContact(id='2', platform=CRMPlatform.SALESFORCE, first_name='Grace', last_name='H', email='g@x.io')
+            ]
+            await crm.get_all_contacts()
+            await settle()
+            fourth = await crm.get_all_contacts()
+            return first, second, stale, third, refreshing, failed, fourth, status()
+
+        first, second, stale, third, refreshing, failed, fourth, fresh = asyncio.run(scenario())
+        self.assertEqual([c.first_name for c in first + second + third], ['Ada'] * 3)
+        self.assertTrue(stale['stale'])
+        self.assertGreaterEqual(stale['age_seconds'], 120)
+        self.assertTrue(refreshing)
+        # A failed refresh keeps the rows and the old refresh time
+        self.assertTrue(failed['stale'])
+        self.assertEqual(failed['refreshed_at'], stale['refreshed_at'])
+        self.assertEqual(failed['rows'], 1)
+        self.assertIn('platform unavailable', failed['last_error'])
+        # A snapshot replaces the platform's rows, so deleted records leave the cache
+        self.assertEqual([c.first_name for c in fourth], ['Grace'])
+        self.assertEqual(salesforce.synced_contacts.await_count, 3)
+        self.assertFalse(fresh['stale'])
+        self.assertEqual(fresh['rows'], 1)
+        cache.close()
+
+    def test_ranged_reads_refetch_uncovered_ranges(self):
+        """Test transactions outside the cached range are fetched before answering"""
+        import decimal
+        from datetime import datetime
+        from unittest.mock import AsyncMock
+        from api.accounting_integration import (AccountingPlatform, FinancialTransaction, TransactionType,
+                                                UnifiedAccountingIntegration)
+        from api.business_data_cache import BusinessDataCache
+
+        def transactions(start, end):
+            return [FinancialTransaction(id=f'{day}', platform=AccountingPlatform.XERO,
+                                         transaction_type=TransactionType.INCOME, amount=decimal.Decimal('10.25'),
+                                         date=datetime(2024, 3, day))
+                    for day in range(start.day, end.day + 1)]
+
+        cache = BusinessDataCache()
+        accounting = self._unified('accounting_integration', UnifiedAccountingIntegration, cache)
+        xero = Mock()
+        xero.get_transactions = AsyncMock(side_effect=transactions)
+        accounting.integrations[AccountingPlatform.XERO] = xero
+
+        async def scenario():
+            march = await accounting.get_all_transactions(datetime(2024, 3, 10), datetime(2024, 3, 20))
+            inner = await accounting.get_all_transactions(datetime(2024, 3, 12), datetime(2024, 3, 14))
+            wider = await accounting.get_all_transactions(datetime(2024, 3, 5), datetime(2024, 3, 12))
+            return march, inner, wider
+
+        march, inner, wider = asyncio.run(scenario())
+        self.assertEqual(len(march), 11)
+        self.assertEqual(sorted(t.id for t in inner), ['12', '13', '14'])
+        self.assertEqual(inner[0].amount, decimal.Decimal('10.25'))
+        self.assertEqual(len(wider), 8)
+        self.assertEqual(xero.get_transactions.await_count, 2)
+        self.assertEqual(xero.get_transactions.await_args.args, (datetime(2024, 3, 5), datetime(2024, 3, 20)))
+        self.assertEqual(accounting.get_sync_status()['cache']['accounting_transactions']['xero']['range'],
+                         ['2024-03-05T00:00:00', '2024-03-20T00:00:00'])
+        cache.close()
+
+class TestShadowBoardModelRegistry(unittest.TestCase):
+    """Test executives share checkpoint weights through the model registry"""
+
+    def _executive_model(self, board, registry, role):
+        executive = board.Executive(id=role.name, role=role, name=role.name, personality_profile={},
+                                    expertise_areas=[], communication_style='formal', decision_bias={},
+                                    phd_expertise=['strategy'])
+        return board.ExecutiveModel(executive, registry=registry)
+
+    @patch('core.shadow_board.shadow_board_system.TRANSFORMERS_AVAILABLE', True)
+    @patch('core.shadow_board.shadow_board_system.TORCH_AVAILABLE', True)
+    def test_checkpoint_loaded_once_and_freed_with_last_reference(self):
+        """Test parallel initialization shares one load and release counts references"""
+        import time
+        import core.shadow_board.shadow_board_system as board
+
+        loads = []
+
+        def loader(checkpoint):
+            loads.append(checkpoint)
+            time.sleep(0.05)
+            return object(), object()
+
+        registry = board.ModelRegistry(loader)
+        models = [self._executive_model(board, registry, role) for role in board.ExecutiveRole]
+
+        async def start():
+            await asyncio.gather(*(model.initialize() for model in models))
+
+        asyncio.run(start())
+        self.assertEqual(loads, [board.DEFAULT_CHECKPOINT])
+        self.assertEqual(len({id(model.model) for model in models}), 1)
+        self.assertEqual(len({id(model.tokenizer) for model in models}), 1)
+        stats = registry.get_stats()['checkpoints'][board.DEFAULT_CHECKPOINT]
+        self.assertEqual((stats['references'], stats['loaded']), (8, True))
+
+        shared = models[0].shared
+        for model in models[:-1]:
+            model.release()
+        self.assertTrue(shared.loaded)
+        models[-1].release()
+        self.assertFalse(shared.loaded)
+        self.assertEqual(registry.get_stats()['checkpoints'], {})
+
+        # The next executive loads it again, lazily
+        asyncio.run(self._executive_model(board, registry, board.ExecutiveRole.CEO).initialize())
+        self.assertEqual(len(loads), 2)
+
+    @patch('core.shadow_board.shadow_board_system.TRANSFORMERS_AVAILABLE', True)
+    @patch('core.shadow_board.shadow_board_system.TORCH_AVAILABLE', True)
+    def test_failed_load_drops_reference(self):
+        """Test a failed load leaves no reference behind"""
+        import core.shadow_board.shadow_board_system as board
+
+        def loader(checkpoint):
+            raise OSError('checkpoint missing')
+
+        registry = board.ModelRegistry(loader)
+        model = self._executive_model(board, registry, board.ExecutiveRole.CFO)
+        with self.assertRaises(board.ModelInitializationError):
+            asyncio.run(model.initialize())
+        self.assertEqual(registry.get_stats(), {'loads': 0, 'checkpoints': {}})
+
+class TestShadowBoardBatchedGeneration(unittest.TestCase):
+    """Test executives' prompts are generated as batches off the event loop"""
+
+    def _fake_checkpoint(self, batch_sizes):
+        """Word-level tokenizer and a model that echoes each prompt's last word twice"""
+        import time
+        import numpy as np
+
+        class Encoding(dict):
+            def to(self, device):
+                return self
+
+        class Tokenizer:
+            eos_token, pad_token, pad_token_id = '<eos>', None, 0
+
+            def __init__(self):
+                self.vocab = ['<eos>']
+
+            def _id(self, word):
+                if word not in self.vocab:
+                    self.vocab.append(word)
+                return self.vocab.index(word)
+
+            def __call__(self, prompts, return_tensors=None, padding=False):
+                rows = [[self._id(w) for w in prompt.split()] for prompt in prompts]
+                width = max(len(row) for row in rows)
+                ids = np.array([[0] * (width - len(row)) + row for row in rows])
+                return Encoding(input_ids=ids, attention_mask=(ids != 0).astype(int))
+
+            def batch_decode(self, outputs, skip_special_tokens=True):
+                return [' '.join(self.vocab[i] for i in row if i != 0) for row in outputs]
+
+        class Model:
+            device = 'cpu'
+
+            def generate(self, input_ids, attention_mask, pad_token_id, max_new_tokens, **params):
+                batch_sizes.append(len(input_ids))
+                time.sleep(0.2)
+                return np.hstack([input_ids, input_ids[:, -1:], input_ids[:, -1:]])
+
+        return Model(), Tokenizer()
+
+    @patch('core.shadow_board.shadow_board_system.TRANSFORMERS_AVAILABLE', True)
+    @patch('core.shadow_board.shadow_board_system.TORCH_AVAILABLE', True)
+    def test_board_prompts_run_as_one_batch_without_blocking_the_loop(self):
+        """Test concurrent recommendations share one generate call and the loop keeps running"""
+        import core.shadow_board.shadow_board_system as board
+
+        batch_sizes = []
+        registry = board.ModelRegistry(lambda checkpoint: self._fake_checkpoint(batch_sizes))
+        models = []
+        for role in board.ExecutiveRole:
+            executive = board.Executive(
+                id=role.name, role=role, name=role.name,
+                personality_profile={'leadership_style': 'Direct', 'decision_making_approach': 'Data-driven',
+                                     'risk_tolerance': 0.5, 'analytical_thinking': 0.9},
+                expertise_areas=[], communication_style='formal', decision_bias={}, phd_expertise=['strategy']
+            )
+            models.append(board.ExecutiveModel(executive, registry=registry))
+
+        async def session():
+            await asyncio.gather(*(model.initialize() for model in models))
+            ticks = 0
+            stop = asyncio.Event()
+
+            async def ticker():
+                nonlocal ticks
+                while not stop.is_set():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            ticking = asyncio.create_task(ticker())
+            results = await asyncio.gather(*(
+                model.provide_recommendation({'decision': f'option-{model.executive.role.name}'})
+                for model in models
+            ))
+            stop.set()
+            await ticking
+            return results, ticks
+
+        results, ticks = asyncio.run(session())
+
+        self.assertEqual(batch_sizes, [8])
+        self.assertGreater(ticks, 10)
+        for model, result in zip(models, results):
+            self.assertEqual(result['executive'], model.executive.name)
+            self.assertIn(f'option-{model.executive.role.name}', result['full_response'])
+            self.assertTrue(result['full_response'].endswith('recommendation. recommendation. recommendation.'))
+        stats = registry.get_stats()['checkpoints'][board.DEFAULT_CHECKPOINT]['generation']
+        self.assertEqual((stats['batches'], stats['prompts'], stats['tokens_generated']), (1, 8, 16))
+
+class TestShadowBoardResponseCache(unittest.TestCase):
+    """Test repeated decision contexts reuse board responses"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def _board(self, calls):
+        import core.shadow_board.shadow_board_system as board
+
+        class FakeExecutiveModel:
+            shared = None
+
+            def __init__(self, executive):
+                self.executive = executive
+
+            async def provide_recommendation(self, context):
+                calls.append(self.executive.id)
+                await asyncio.sleep(0.05)
+                return {'executive': self.executive.name, 'role': self.executive.role.value,
+                        'recommendation': 'approve', 'confidence': 0.8, 'key_points': [], 'risks': [],
+                        'opportunities': [], 'conditions': [], 'tokens_generated': 100}
+
+        system = board.ShadowBoardSystem(db_path=os.path.join(self.temp_dir, 'board.db'))
+        system.executive_models = {exec_id: FakeExecutiveModel(executive)
+                                   for exec_id, executive in system.executives.items()}
+        system.running = True
+        return system
+
+    def test_canonicalized_contexts_share_entries_within_company(self):
+        """Test near-identical contexts hit, other companies and expired entries miss"""
+        calls = []
+        system = self._board(calls)
+        executives = len(system.executives)
+        context = {'decision_type': 'expansion', 'description': 'Enter the EU  market', 'investment': 2000000.0,
+                   'company_id': 'acme', 'user_id': 'u1', 'timestamp': 1}
+        retry = {'investment': 2000000, 'description': ' enter the eu market', 'decision_type': 'Expansion',
+                 'company_id': 'acme', 'user_id': 'u2', 'timestamp': 2}
+
+        async def run():
+            first, coalesced = await asyncio.gather(system.get_board_recommendation(context),
+                                                    system.get_board_recommendation(retry))
+            hit = await system.get_board_recommendation(retry)
+            other_company = await system.get_board_recommendation(context, company_id='globex')
+            return first, coalesced, hit, other_company
+
+        first, coalesced, hit, other_company = asyncio.run(run())
+
+        self.assertEqual(len(calls), 2 * executives)
+        self.assertEqual((first['cache']['hit'], coalesced['cache']['hit'], hit['cache']['hit']),
+                         (False, True, True))
+        self.assertEqual(hit['board_session_id'], first['board_session_id'])
+        self.assertEqual(hit['consensus'], first['consensus'])
+        self.assertNotEqual(other_company['board_session_id'], first['board_session_id'])
+        stats = system.get_cache_stats()['responses']
+        self.assertEqual((stats['hits'], stats['misses'], stats['coalesced']), (1, 2, 1))
+        self.assertEqual(stats['tokens_saved'], 2 * 100 * executives)
+
+        system.response_cache.ttl = 0
+        asyncio.run(system.get_board_recommendation(retry))
+        self.assertEqual(len(calls), 3 * executives)
+        self.assertEqual(system.response_cache.invalidate('acme'), 1)
+
+    def test_failed_sessions_are_not_cached(self):
+        """Test a session with an abstaining executive is regenerated next time"""
+        calls = []
+        system = self._board(calls)
+        broken = next(iter(system.executive_models.values()))
+
+        async def fail(context):
+            raise RuntimeError('generation failed')
+
+        broken.provide_recommendation = fail
+        asyncio.run(system.get_board_recommendation({'decision_type': 'hiring'}))
+        asyncio.run(system.get_board_recommendation({'decision_type': 'hiring'}))
+        self.assertEqual(system.get_cache_stats()['responses']['hits'], 0)
+        self.assertEqual(len(calls), 2 * (len(system.executives) - 1))
+
+    def test_prompt_prefix_is_static(self):
+        """Test the executive prompt is a context-free prefix plus the context suffix"""
+        import core.shadow_board.shadow_board_system as board
+
+        executive = board.Executive(
+            id='cfo', role=board.ExecutiveRole.CFO, name='Morgan',
+            personality_profile={'leadership_style': 'Direct', 'decision_making_approach': 'Data-driven',
+                                 'risk_tolerance': 0.3, 'analytical_thinking': 0.9},
+            expertise_areas=['Capital allocation'], communication_style='formal', decision_bias={},
+            phd_expertise=['finance']
+        )
+        model = board.ExecutiveModel(executive, registry=board.ModelRegistry())
+        prefix = model._build_prompt_prefix()
+        prompt = model._build_executive_prompt({'decision': 'raise prices'})
+
+        self.assertTrue(prompt.startswith(prefix))
+        self.assertNotIn('raise prices', prefix)
+        self.assertTrue(prefix.endswith('- Capital allocation\n'))
+        self.assertIn('"decision": "raise prices"', prompt[len(prefix):])
+
+class TestTimeMachineEventStore(unittest.TestCase):
+    """Test time-partitioned, spillable event storage for the Time Machine"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'time_machine.db')
+
+    def _events(self, count, start=0.0, step=60.0):
+        from core.time_machine.time_machine_system import TemporalEvent
+        types = ['sale', 'refund', 'signup']
+        return [TemporalEvent(event_id=f'e{i}', timestamp=start + i * step, event_type=types[i % 3],
+                              data={'i': i}) for i in range(count)]
+
+    def test_range_and_type_queries_match_a_scan(self):
+        """Test bisected queries return what filtering the full list would, in time order"""
+        from core.time_machine.time_machine_system import TimeMachineSystem
+
+        system = TimeMachineSystem(db_path=self.db_path)
+        events = self._events(500)
+        shuffled = events[::2] + events[1::2]  # out-of-order arrival
+        system.store.add_many('t1', shuffled[:250])
+        for event in shuffled[250:]:
+            system.store.add('t1', event)
+
+        cases = [(None, None, None), (3600.0, 7200.0, None), (1000.0, 20000.0, ['refund']),
+                 (None, 9000.0, ['sale', 'signup']), (40000.0, None, ['missing'])]
+        for start, end, types in cases:
+            expected = [e.event_id for e in events
+                        if (start is None or e.timestamp >= start) and (end is None or e.timestamp <= end)
+                        and (not types or e.event_type in types)]
+            result = asyncio.run(system.query_timeline('t1', start, end, types))
+            self.assertEqual([e.event_id for e in result], expected)
+        self.assertEqual(asyncio.run(system.query_timeline('unknown')), [])
+
+    def test_cold_partitions_spill_and_reload(self):
+        """Test the resident budget holds and spilled partitions come back from SQLite"""
+        from dataclasses import replace
+        from core.time_machine.time_machine_system import TemporalEventStore, TimeMachineSystem
+
+        TimeMachineSystem(db_path=self.db_path)  # creates the schema
+        store = TemporalEventStore(self.db_path, partition_seconds=3600, max_resident_events=120)
+        for timeline in ('a', 'b', 'c'):
+            store.add_many(timeline, [replace(e, event_id=f'{timeline}-{e.event_id}') for e in self._events(300)])
+        stats = store.get_stats()
+        self.assertLessEqual(stats['resident_events'], 120)
+        self.assertGreater(stats['spills'], 0)
+
+        early = store.query('a', 0, 3599)
+        self.assertEqual([e.data['i'] for e in early], list(range(60)))
+        self.assertEqual(store.get_stats()['reloads'], 1)
+        self.assertEqual(sum(1 for _ in store.scan('b')), 300)
+        self.assertEqual(store.count('c'), 300)
+        store.close()
+
+        # A new process finds the partitions on disk
+        reopened = TemporalEventStore(self.db_path, partition_seconds=3600)
+        self.assertEqual(reopened.count('a'), 300)
+        self.assertEqual(len(reopened.query('a', event_types=['signup'])), 100)
+        reopened.close()
+
+class TestTimeMachineCausality(unittest.TestCase):
+    """Test sliding-window and batched causality detection"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def _brute_force(self, events, window):
+        """(source, target) pairs the previous full-timeline scan produced"""
+        return sorted((e.event_id, p.event_id) for e in events for p in events
+                      if p.timestamp < e.timestamp and e.timestamp - p.timestamp < window)
+
+    def _events(self, count, seed=0):
+        import random
+        from core.time_machine.time_machine_system import TemporalEvent
+        rng = random.Random(seed)
+        timestamps = sorted(rng.uniform(0, 20000) for _ in range(count))
+        return [TemporalEvent(event_id=f'e{i}', timestamp=ts, event_type='tick', data={})
+                for i, ts in enumerate(timestamps)]
+
+    def test_window_and_batch_links_match_full_scan(self):
+        """Test incremental and vectorized candidates equal a scan of the whole timeline"""
+        from core.time_machine.time_machine_system import CausalityEngine
+
+        engine = CausalityEngine(window_seconds=1000)
+        events = self._events(300)
+        expected = self._brute_force(events, 1000)
+
+        pairs = []
+        for event in events:
+            links = engine.proximate_events('t', event)
+            if links is None:
+                links = asyncio.run(engine.find_causal_events(event, []))
+            pairs.extend((event.event_id, link['event_id']) for link in links)
+            engine.remember('t', [event])
+        self.assertEqual(sorted(pairs), expected)
+        self.assertLessEqual(max(ts for ts, _ in engine.windows['t']) - min(ts for ts, _ in engine.windows['t']),
+                             1000)
+
+        # Half recorded earlier, half arriving as one batch
+        sources, targets, diffs = engine.batch_links(events[150:], events[:150])
+        pairs = sorted((events[150 + s].event_id, t) for s, t in zip(sources.tolist(), targets))
+        self.assertEqual(pairs, [p for p in expected if int(p[0][1:]) >= 150])
+        self.assertTrue((diffs > 0).all() and (diffs < 1000).all())
+
+    def test_recorded_links_are_stored_in_bulk(self):
+        """Test single and batch recording write proximity links to the causality table"""
+        import sqlite3
+        from core.time_machine.time_machine_system import TimeMachineSystem
+
+        db_path = os.path.join(self.temp_dir, 'time_machine.db')
+        system = TimeMachineSystem(db_path=db_path)
+        ids = asyncio.run(system.record_events('t', [
+            {'event_type': 'tick', 'data': {'i': i}, 'timestamp': 1000.0 + i * 900} for i in range(10)
+        ]))
+        self.assertEqual(len(set(ids)), 10)
+        # Each event links to the (up to three) earlier ones within the hour
+        self.assertEqual(sum(len(v) for v in system.timelines['t'].causality_graph.values()), 1 + 2 + 3 * 7)
+
+        event_id = asyncio.run(system.record_event('t', 'tick', {'i': 'live'}))
+        self.assertEqual(system.timelines['t'].causality_graph.get(event_id), None)  # an hour after the batch
+
+        asyncio.run(system.record_events('t', [{'event_type': 'tick', 'data': {}}]))
+        conn = sqlite3.connect(db_path)
+        rows = conn.execute("SELECT COUNT(*), MIN(causality_type) FROM causality").fetchone()
+        conn.close()
+        self.assertEqual(rows, (24 + 1, 'correlation'))
+        self.assertEqual(asyncio.run(system.query_timeline('t'))[-1].event_type, 'tick')
+
+    def test_identical_batches_get_distinct_ids(self):
+        """Test repeating a batch's timestamps, types and positions keeps every event"""
+        import sqlite3
+        from core.time_machine.time_machine_system import TimeMachineSystem
+
+        db_path = os.path.join(self.temp_dir, 'time_machine.db')
+        system = TimeMachineSystem(db_path=db_path)
+        batch = [{'event_type': 'tick', 'data': {'i': i}, 'timestamp': 5000.0} for i in range(2)]
+        first = asyncio.run(system.record_events('t', batch))
+        second = asyncio.run(system.record_events('t', batch))
+
+        self.assertEqual(len(set(first + second)), 4)
+        self.assertEqual(system.store.count('t'), 4)
+        conn = sqlite3.connect(db_path)
+        stored = conn.execute("SELECT COUNT(*) FROM events WHERE timeline_id = 't'").fetchone()[0]
+        conn.close()
+        self.assertEqual(stored, 4)
+
+class TestTimeMachinePatterns(unittest.TestCase):
+    """Test streaming pattern detection and its checkpoints"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'time_machine.db')
+
+    def _batch(self, start, cycles):
+        # login -> purchase -> logout every 100s, plus an irregular alert
+        events = []
+        for i in range(cycles):
+            base = start + i * 100.0
+            events += [{'event_type': 'login', 'data': {}, 'timestamp': base},
+                       {'event_type': 'purchase', 'data': {}, 'timestamp': base + 10},
+                       {'event_type': 'logout', 'data': {}, 'timestamp': base + 20}]
+            if i % 3 == 0:
+                events.append({'event_type': 'alert', 'data': {}, 'timestamp': base + 30 + (i % 7) * 9})
+        return events
+
+    def test_patterns_are_read_from_maintained_state(self):
+        """Test frequency, sequence and periodicity patterns without rescanning events"""
+        from unittest.mock import patch as mock_patch
+        from core.time_machine.time_machine_system import TimeMachineSystem
+
+        system = TimeMachineSystem(db_path=self.db_path)
+        asyncio.run(system.record_events('t', self._batch(0.0, 12)))
+
+        with mock_patch.object(system.store, 'scan', side_effect=AssertionError('rescanned')), \
+                mock_patch.object(system.store, 'query', side_effect=AssertionError('rescanned')):
+            patterns = asyncio.run(system.detect_patterns('t'))
+            sequences = asyncio.run(system.detect_patterns('t', 'sequence'))
+
+        frequency = {p['event_type']: p['count'] for p in patterns if p['pattern_type'] == 'frequency'}
+        self.assertEqual(frequency, {'login': 12, 'purchase': 12, 'logout': 12})
+        self.assertIn(['login', 'purchase', 'logout'], [p['sequence'] for p in sequences])
+        self.assertEqual({p['pattern_type'] for p in sequences}, {'sequence'})
+        periodic = {p['event_type']: p['mean_interval'] for p in patterns if p['pattern_type'] == 'periodicity'}
+        self.assertEqual(periodic, {'login': 100.0, 'purchase': 100.0, 'logout': 100.0})
+
+    def test_restart_resumes_from_checkpoint(self):
+        """Test a restarted system restores checkpointed state and replays only newer events"""
+        from core.time_machine.time_machine_system import TimeMachineSystem
+
+        system = TimeMachineSystem(db_path=self.db_path)
+        asyncio.run(system.record_events('t', self._batch(0.0, 10)))
+        system._checkpoint_patterns()
+        asyncio.run(system.record_events('t', self._batch(1000.0, 5)))  # not checkpointed
+        expected = asyncio.run(system.detect_patterns('t'))
+        system.store.close()
+
+        restarted = TimeMachineSystem(db_path=self.db_path)
+        scanned = []
+        original_scan = restarted.store.scan
+        restarted.store.scan = lambda timeline_id: scanned.append(timeline_id) or original_scan(timeline_id)
+        self.assertEqual(asyncio.run(restarted.detect_patterns('t')), expected)
+        self.assertEqual(scanned, [])
+        self.assertEqual(restarted.pattern_detector.states['t'].events_seen, 15 * 3 + 4 + 2)
+
+    def test_restart_replays_backfilled_events(self):
+        """Test events recorded after a checkpoint are replayed even when older than it"""
+        from core.time_machine.time_machine_system import TimeMachineSystem
+
+        system = TimeMachineSystem(db_path=self.db_path)
+        asyncio.run(system.record_events('t', [{'event_type': 'a', 'data': {}, 'timestamp': 1000.0 + i}
+                                               for i in range(10)]))
+        system._checkpoint_patterns()
+        asyncio.run(system.record_events('t', [{'event_type': 'b', 'data': {}, 'timestamp': 500.0}] * 7))
+        asyncio.run(system.record_events('t', [{'event_type': 'c', 'data': {}, 'timestamp': 2000.0}] * 7))
+        expected = dict(system.pattern_detector.states['t'].type_counts)
+        system.store.close()
+
+        restarted = TimeMachineSystem(db_path=self.db_path)
+        asyncio.run(restarted.detect_patterns('t'))
+        self.assertEqual(dict(restarted.pattern_detector.states['t'].type_counts), expected)
+        self.assertEqual(expected, {'a': 10, 'b': 7, 'c': 7})
+
+class TestAuditWriter(unittest.TestCase):
+    """Test batched audit writes and the overflow policy"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def _audit(self, **overrides):
+        from core.audit.comprehensive_audit import AuditConfig, ComprehensiveAudit
+
+        config = AuditConfig(database_path=os.path.join(self.temp_dir, 'audit.db'),
+                             log_file_path=os.path.join(self.temp_dir, 'audit.log'), **overrides)
+        audit = ComprehensiveAudit(config)
+        self.addCleanup(audit.close)
+        return audit
+
+    def _log(self, audit, level, resource='report', details=None):
+        from core.audit.comprehensive_audit import AuditCategory
+
+        audit.log_event('user-1', 'session-1', '10.0.0.1', 'test', AuditCategory.DATA_ACCESS, level,
+                        'read', resource, details or {}, 'success')
+
+    def test_events_are_written_in_batches(self):
+        """Test queued events, encrypted details and compliance violations reach the database"""
+        from core.audit.comprehensive_audit import AuditLevel
+
+        audit = self._audit(batch_size=50)
+        for i in range(120):
+            self._log(audit, AuditLevel.INFO, details={'row': i})
+        self._log(audit, AuditLevel.WARNING, resource='payment_card', details={'card': '4242'})
+
+        self.assertTrue(audit.flush())
+        stats = audit.get_writer_stats()
+        self.assertEqual(stats['written'], 121)
+        self.assertGreaterEqual(stats['batches'], 3)
+
+        conn = audit.db_connection
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM audit_events').fetchone()[0], 121)
+        details, encrypted = conn.execute(
+            "SELECT details, encrypted FROM audit_events WHERE resource = 'payment_card'").fetchone()
+        self.assertEqual(encrypted, 1)
+        self.assertNotIn('4242', details)
+        # Every DATA_ACCESS rule is missing fields, three rules per event
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM compliance_violations').fetchone()[0], 363)
+
+    def test_full_queue_drops_info_but_waits_for_security_events(self):
+        """Test the overflow policy while the writer only wakes when asked to"""
+        from core.audit.comprehensive_audit import AuditLevel
+
+        audit = self._audit(queue_size=5, batch_size=100, flush_interval=60.0)
+        for _ in range(6):
+            self._log(audit, AuditLevel.INFO)
+        self._log(audit, AuditLevel.WARNING)
+        self._log(audit, AuditLevel.SECURITY)  # wakes the writer and waits for room
+
+        stats = audit.get_writer_stats()
+        self.assertEqual(stats['dropped'], {'info': 1, 'warning': 1})
+        self.assertEqual(stats['blocked'], 1)
+        self.assertEqual(stats['inline_writes'], 0)
+        self.assertTrue(audit.flush())
+        levels = audit.db_connection.execute('SELECT level, COUNT(*) FROM audit_events GROUP BY level').fetchall()
+        self.assertEqual(sorted(levels), [('info', 5), ('security', 1)])
+
+    def test_unencodable_event_fails_alone_and_locked_batches_retry(self):
+        """Test one bad event does not sink its batch and a locked database is retried"""
+        import threading
+        from datetime import datetime
+        from core.audit.comprehensive_audit import AuditLevel
+
+        audit = self._audit(batch_size=50, flush_interval=60.0, retry_backoff=0.05)
+        for i in range(10):
+            self._log(audit, AuditLevel.INFO, details={'row': i})
+        self._log(audit, AuditLevel.INFO, details={'at': datetime(2024, 1, 1)})
+        self.assertTrue(audit.flush())
+        stats = audit.get_writer_stats()
+        self.assertEqual((stats['written'], stats['failed']), (10, 1))
+
+        # Another connection holds the write lock past the writer's busy timeout
+        audit._writer_connection.execute('PRAGMA busy_timeout = 0')
+        audit.db_connection.execute('BEGIN IMMEDIATE')
+        release = threading.Timer(0.2, audit.db_connection.commit)
+        release.start()
+        for i in range(5):
+            self._log(audit, AuditLevel.INFO, details={'row': i})
+        self.assertTrue(audit.flush())
+        release.join()
+        stats = audit.get_writer_stats()
+        self.assertEqual((stats['written'], stats['failed']), (15, 1))
+        self.assertGreaterEqual(stats['retries'], 1)
+        self.assertEqual(audit.db_connection.execute('SELECT COUNT(*) FROM audit_events').fetchone()[0], 15)
+
+    def test_concurrent_producers_are_all_counted(self):
+        """Test flush waits for every event enqueued from many threads"""
+        import threading
+        from core.audit.comprehensive_audit import AuditLevel
+
+        audit = self._audit(batch_size=200)
+        producers = [threading.Thread(target=lambda: [self._log(audit, AuditLevel.INFO) for _ in range(300)])
+                     for _ in range(8)]
+        for producer in producers:
+            producer.start()
+        for producer in producers:
+            producer.join()
+        self.assertTrue(audit.flush())
+        stats = audit.get_writer_stats()
+        self.assertEqual((stats['enqueued'], stats['written']), (2400, 2400))
+        self.assertEqual(audit.db_connection.execute('SELECT COUNT(*) FROM audit_events').fetchone()[0], 2400)
+
+    def test_producers_do_not_take_the_stats_lock(self):
+        """Test enqueueing below the queue bound only counts, leaving the stats lock to the writer"""
+        import threading
+        from core.audit.comprehensive_audit import AuditLevel
+
+        audit = self._audit()
+        acquired_by = []
+        lock = audit._stats_lock
+
+        class RecordingLock:
+            def __enter__(self):
+                acquired_by.append(threading.current_thread())
+                return lock.__enter__()
+
+            def __exit__(self, *exc):
+                return lock.__exit__(*exc)
+
+        audit._stats_lock = RecordingLock()
+        for _ in range(50):
+            self._log(audit, AuditLevel.INFO)
+        self.assertNotIn(threading.current_thread(), acquired_by)
+        self.assertTrue(audit.flush())
+        stats = audit.get_writer_stats()
+        self.assertEqual((stats['enqueued'], stats['written']), (50, 50))
+
+class TestSOVRENBulkScoring(unittest.TestCase):
+    """Test bulk SOVREN scoring against the single-business path"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def _requests(self):
+        from core.scoring.sovren_score_engine import DIMENSION_FACTORS, ScoreRequest
+
+        metrics = [metric for factors in DIMENSION_FACTORS.values() for metric, _, _ in factors]
+        requests = []
+        for i in range(40):
+            values = {metric: ((i * 7 + j * 3) % 13) / (10.0 if j % 2 else 1) for j, metric in enumerate(metrics)}
+            if i % 9 == 0:
+                values.pop(metrics[i % len(metrics)])
+            if i == 5:
+                values['automation_rate'] = 'high'  # error path of the dimension calculator
+            requests.append(ScoreRequest(business_id=f'business-{i % 15}', metrics=values, time_period='daily',
+                                         include_recommendations=i % 4 != 0))
+        return requests
+
+    def _summary(self, score):
+        return (score.business_id, score.total_score, score.percentile, score.category, score.trajectory,
+                score.recommendations,
+                [(d, c.score, c.weight, c.factors, c.details) for d, c in score.components.items()])
+
+    def test_bulk_scores_match_single_path(self):
+        """Test bulk scoring gives the same scores, in order, as scoring one business at a time"""
+        import sqlite3
+        from core.scoring.sovren_score_engine import SOVRENScoreEngine
+
+        requests = self._requests()
+        single_engine = SOVRENScoreEngine(db_path=os.path.join(self.temp_dir, 'single.db'))
+        bulk_engine = SOVRENScoreEngine(db_path=os.path.join(self.temp_dir, 'bulk.db'))
+
+        async def score_one_by_one():
+            return [await single_engine.calculate_score(request) for request in requests]
+
+        single = asyncio.run(score_one_by_one())
+        bulk = asyncio.run(bulk_engine.calculate_scores_bulk(requests))
+
+        self.assertEqual([self._summary(s) for s in bulk], [self._summary(s) for s in single])
+        self.assertIn('error', bulk[5].components[list(bulk[5].components)[0]].details)
+        conn = sqlite3.connect(bulk_engine.db_path)
+        self.assertEqual(conn.execute('SELECT COUNT(*) FROM scores').fetchone()[0], len(requests))
+        conn.close()
+
+    def test_score_history_is_bounded(self):
+        """Test only the scores trajectory needs are kept per business"""
+        from core.scoring.sovren_score_engine import SCORE_HISTORY_LIMIT, SOVRENScoreEngine
+
+        engine = SOVRENScoreEngine(db_path=os.path.join(self.temp_dir, 'scores.db'))
+        for _ in range(3):
+            asyncio.run(engine.calculate_scores_bulk(self._requests()))
+
+        self.assertEqual(len(engine.score_history), 15)
+        self.assertTrue(all(len(h) == SCORE_HISTORY_LIMIT for h in engine.score_history.values()))
+
+class TestSOVRENScoreDistributions(unittest.TestCase):
+    """Test streaming score distributions behind SOVREN percentiles"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def test_percentiles_match_exact_percentiles(self):
+        """Test sketch percentiles against exact ranks for skewed and bimodal scores"""
+        import numpy as np
+        from core.scoring.sovren_score_engine import ScoreDistribution
+
+        rng = np.random.default_rng(0)
+        samples = {
+            'skewed': rng.gamma(2.0, 80.0, 100000),
+            'bimodal': np.r_[rng.normal(300, 40, 60000), rng.normal(700, 60, 40000)],
+        }
+        for name, scores in samples.items():
+            distribution = ScoreDistribution(window_days=0)
+            for chunk in np.array_split(scores, 500):
+                distribution.add(chunk, timestamp=0.0)
+            distribution.refresh(now=0.0)
+
+            ordered = np.sort(scores)
+            probes = np.quantile(scores, np.linspace(0.001, 0.999, 200))
+            exact = np.searchsorted(ordered, probes) / len(ordered) * 100
+            error = np.abs(distribution.percentiles(probes) - exact)
+            self.assertLess(error.max(), 1.0, name)
+            self.assertAlmostEqual(distribution.snapshot.quantile(0.99), np.quantile(scores, 0.99),
+                                   delta=0.01 * np.quantile(scores, 0.99), msg=name)
+
+    def test_rolling_window_drops_old_days(self):
+        """Test scores older than the window stop counting after a refresh"""
+        import numpy as np
+        from core.scoring.sovren_score_engine import ScoreDistribution, TDigest
+
+        distribution = ScoreDistribution(window_days=2)
+        day = 86400.0
+        distribution.add(np.full(1000, 900.0), timestamp=0.0)
+        distribution.add(np.linspace(0, 100, 1000), timestamp=day)
+        distribution.add(np.linspace(0, 100, 1000), timestamp=2 * day)
+
+        self.assertEqual(distribution.refresh(now=2 * day), [0])
+        self.assertEqual(distribution.samples, 2000)
+        self.assertEqual(distribution.percentiles(np.array([150.0]))[0], 100.0)
+        self.assertAlmostEqual(distribution.percentiles(np.array([50.0]))[0], 50.0, delta=0.5)
+
+        restored = TDigest.from_bytes(distribution.buckets[1].to_bytes())
+        self.assertEqual(restored.count, 1000)
+        self.assertAlmostEqual(restored.quantile(0.5), 50.0, delta=0.5)
+
+    def test_engine_checkpoints_and_replays_distributions(self):
+        """Test percentiles come from stored scores and survive a restart"""
+        from core.scoring.sovren_score_engine import DIMENSION_FACTORS, ScoreRequest, SOVRENScoreEngine
+
+        metrics = [metric for factors in DIMENSION_FACTORS.values() for metric, _, _ in factors]
+        requests = [ScoreRequest(business_id=f'business-{i}', time_period='daily',
+                                 metrics={metric: (i % 100) / 10 for metric in metrics})
+                    for i in range(500)]
+        db_path = os.path.join(self.temp_dir, 'scores.db')
+        engine = SOVRENScoreEngine(db_path=db_path)
+        asyncio.run(engine.calculate_scores_bulk(requests))
+        asyncio.run(engine._update_benchmarks())
+
+        # Scores run 0..99 in equal numbers; 80 is above about 80% of them
+        score = asyncio.run(engine.calculate_score(requests[80]))
+        self.assertAlmostEqual(score.percentile, 80.5, delta=1.0)
+        self.assertIn('operational_efficiency_90', {key.split('.')[0] for key in engine.benchmark_data})
+
+        # Sketches checkpointed before the last score; the restart replays it
+        restarted = SOVRENScoreEngine(db_path=db_path)
+        self.assertEqual(restarted.distributions['total'].samples, 501)
+        self.assertAlmostEqual(asyncio.run(restarted.calculate_score(requests[80])).percentile, score.percentile,
+                               delta=0.2)
+
+class TestProductionMetricsHistograms(unittest.TestCase):
+    """Test per-thread request histograms behind production metrics"""
+
+    def test_percentiles_match_exact_percentiles(self):
+        """Test histogram percentiles against exact quantiles of lognormal latencies"""
+        import random
+        from core.monitoring.production_metrics import LatencyHistogram
+
+        rng = random.Random(0)
+        durations = [rng.lognormvariate(3, 1) for _ in range(50000)] + [0.0, 0.004, 250000.0]
+        histogram = LatencyHistogram()
+        for duration in durations:
+            histogram.record(duration)
+
+        ordered = sorted(durations)
+        quantiles = [0.5, 0.9, 0.95, 0.99, 0.999]
+        for quantile, value in zip(quantiles, histogram.percentiles(quantiles)):
+            exact = ordered[int(len(ordered) * quantile)]
+            self.assertAlmostEqual(value, exact, delta=exact * 0.04, msg=quantile)
+        self.assertEqual(histogram.count, len(durations))
+        self.assertEqual(histogram.percentiles([1.0]), [250000.0])
+
+    def test_request_stats_per_key_and_window(self):
+        """Test request counts, rates and latencies per endpoint, method and status"""
+        from core.monitoring.production_metrics import ProductionMetrics, RequestSeries
+
+        metrics = ProductionMetrics()
+        for i in range(300):
+            metrics.record_request('/api/v1/scores', 'GET', 200, 10.0)
+        for i in range(100):
+            metrics.record_request('/api/v1/scores', 'POST', 500, 200.0)
+
+        stats = metrics.get_request_stats()
+        self.assertEqual(stats['total_requests'], 400)
+        self.assertEqual(stats['requests_last_hour'], 400)
+        self.assertAlmostEqual(stats['requests_per_second'], 400 / 60.0)
+        self.assertAlmostEqual(stats['max_latency_ms'], 200.0)
+        self.assertAlmostEqual(stats['p50_latency_ms'], 10.0, delta=0.4)
+        self.assertAlmostEqual(stats['p99_latency_ms'], 200.0, delta=8.0)
+
+        errors = metrics.get_request_stats(status_code=500)
+        self.assertEqual(errors['total_requests'], 100)
+        self.assertAlmostEqual(errors['avg_latency_ms'], 200.0)
+        self.assertEqual(metrics.get_request_stats(method='DELETE')['total_requests'], 0)
+
+        series = RequestSeries()
+        start = 1_700_000_040.0  # on a minute boundary
+        for second in range(7200):
+            series.record(5.0, start + second)
+        now = start + 7199
+        self.assertEqual(series.last_minute(now), 60)
+        self.assertEqual(series.last_hour(now), 3600)
+        self.assertEqual(series.last_minute(now + 3600), 0)
+        self.assertEqual(series.count, 7200)
+
+    def test_thread_shards_merge(self):
+        """Test requests recorded on other threads, including finished ones, are merged"""
+        import threading
+        from core.monitoring.production_metrics import ProductionMetrics
+
+        metrics = ProductionMetrics()
+        release = threading.Event()
+
+        def record(count: int, wait: bool):
+            for _ in range(count):
+                metrics.record_request('/api/v1/decisions', 'POST', 200, 25.0)
+            if wait:
+                release.wait(10)
+
+        finished = [threading.Thread(target=record, args=(1000, False)) for _ in range(3)]
+        running = threading.Thread(target=record, args=(500, True))
+        for thread in finished + [running]:
+            thread.start()
+        for thread in finished:
+            thread.join()
+        metrics.record_request('/api/v1/decisions', 'POST', 200, 25.0)
+
+        stats = metrics.get_request_stats(endpoint='/api/v1/decisions')
+        self.assertEqual(stats['total_requests'], 3501)
+        self.assertEqual(stats['requests_last_hour'], 3501)
+        self.assertEqual(len(metrics._retired), 1)
+        release.set()
+        running.join()
+        self.assertEqual(metrics.get_request_stats()['total_requests'], 3501)
+
+class TestMCPProtocol(unittest.TestCase):
+    """Test framed, multiplexed MCP messaging"""
+
+    @staticmethod
+    async def start_server(handle):
+        from api.mcp_protocol import serve_connection
+
+        async def client_connected(reader, writer):
+            async def write(data):
+                writer.write(data)
+                await writer.drain()
+            try:
+                await serve_connection(lambda: reader.read(65536), write, handle, lambda e: {'error': str(e)})
+            finally:
+                writer.close()
+
+        server = await asyncio.start_server(client_connected, '127.0.0.1', 0)
+        return server, server.sockets[0].getsockname()[1]
+
+    def test_split_and_coalesced_messages(self):
+        """Test frames and unframed JSON reassemble across arbitrary read boundaries"""
+        from api.mcp_protocol import (FRAME_REQUEST, FrameDecoder, JSONStreamSplitter, ProtocolError,
+                                      encode_frame)
+
+        stream = b''.join(encode_frame(FRAME_REQUEST, i, json.dumps({'i': i, 'pad': 'x' * i * 100}).encode())
+                          for i in range(1, 20))
+        decoder = FrameDecoder()
+        frames = []
+        for offset in range(0, len(stream), 7):
+            frames += decoder.feed(stream[offset:offset + 7])
+        self.assertEqual([request_id for _, request_id, _ in frames], list(range(1, 20)))
+        self.assertEqual(json.loads(frames[4][2])['i'], 5)
+        with self.assertRaises(ProtocolError):
+            FrameDecoder(max_message_bytes=100).feed(stream)
+
+        messages = [{'a': '}{"'}, {'b': {'c': [1, {'d': '\\'}]}}, {'e': 'é'}]
+        stream = b' '.join(json.dumps(m, ensure_ascii=False).encode('utf-8') for m in messages)
+        splitter = JSONStreamSplitter()
+        raw = []
+        for offset in range(len(stream)):
+            raw += splitter.feed(stream[offset:offset + 1])
+        raw += splitter.feed(b' oops {"f": 1')
+        self.assertEqual([json.loads(r) for r in raw[:3]], messages)
+        self.assertEqual(raw[3], b'oops ')
+        self.assertEqual(splitter.feed(b'}'), [b'{"f": 1}'])
+
+    def test_pipelined_requests_complete_out_of_order(self):
+        """Test concurrent requests share one connection and are answered as they finish"""
+        import time
+        from api.mcp_protocol import MCPChannel
+
+        async def handle(request):
+            await asyncio.sleep(request['delay'])
+            if request.get('fail'):
+                raise ValueError('bad request')
+            return {'i': request['i']}
+
+        async def run():
+            server, port = await self.start_server(handle)
+            channel = MCPChannel('127.0.0.1', port)
+            encoding = await channel.connect()
+            finished = []
+
+            async def call(i):
+                response = await channel.request({'i': i, 'delay': (5 - i) * 0.05})
+                finished.append(i)
+                return response
+
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(call(i) for i in range(5)))
+            elapsed = time.perf_counter() - started
+            failure = await channel.request({'i': 9, 'delay': 0, 'fail': True})
+            channel.close()
+            await asyncio.sleep(0.05)
+            server.close()
+            return encoding, responses, finished, elapsed, failure
+
+        encoding, responses, finished, elapsed, failure = asyncio.run(run())
+        self.assertIn(encoding, ('msgpack', 'json'))
+        self.assertEqual([r['i'] for r in responses], list(range(5)))
+        self.assertEqual(finished, [4, 3, 2, 1, 0])
+        self.assertLess(elapsed, 0.45)
+        self.assertEqual(failure, {'error': 'bad request'})
+
+    def test_unframed_fallback(self):
+        """Test unframed JSON peers on both sides of the connection"""
+        from api.mcp_protocol import MCPChannel
+
+        async def echo(request):
+            return {'echo': request}
+
+        async def legacy_client_connected(reader, writer):
+            # Previous servers: one recv per message, raw JSON replies
+            while True:
+                data = await reader.read(8192)
+                if not data:
+                    break
+                try:
+                    response = {'echo': json.loads(data.decode('utf-8'))}
+                except json.JSONDecodeError:
+                    response = {'error': 'Invalid JSON'}
+                writer.write(json.dumps(response).encode('utf-8'))
+                await writer.drain()
+            writer.close()
+
+        async def run():
+            legacy = await asyncio.start_server(legacy_client_connected, '127.0.0.1', 0)
+            channel = MCPChannel('127.0.0.1', legacy.sockets[0].getsockname()[1])
+            encoding = await channel.connect()
+            fallback = [await channel.request({'n': n}) for n in range(3)]
+            channel.close()
+
+            server, port = await self.start_server(echo)
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b'{"n": 1}{"n": 2}\n{"n"')
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            writer.write(b': 3}')
+            await writer.drain()
+            received = b''
+            while received.count(b'echo') < 3:
+                received += await reader.read(65536)
+            writer.close()
+            await asyncio.sleep(0.05)
+            legacy.close()
+            server.close()
+            return encoding, fallback, received
+
+        encoding, fallback, received = asyncio.run(run())
+        self.assertEqual(encoding, 'unframed')
+        self.assertEqual(fallback, [{'echo': {'n': n}} for n in range(3)])
+        self.assertEqual(received, b'{"echo": {"n": 1}}{"echo": {"n": 2}}{"echo": {"n": 3}}')
+
+    def test_unframed_timeout_drops_the_late_reply(self):
+        """Test a timed-out unframed request reconnects instead of leaving its reply for the next one"""
+        from api.mcp_protocol import MCPChannel
+
+        connections = []
+
+        async def slow_legacy(reader, writer):
+            connections.append(writer)
+            while True:
+                data = await reader.read(8192)
+                if not data:
+                    break
+                request = json.loads(data.decode('utf-8'))
+                await asyncio.sleep(request.get('delay', 0))
+                writer.write(json.dumps({'echo': request}).encode('utf-8'))
+                await writer.drain()
+            writer.close()
+
+        async def run():
+            legacy = await asyncio.start_server(slow_legacy, '127.0.0.1', 0)
+            channel = MCPChannel('127.0.0.1', legacy.sockets[0].getsockname()[1], timeout=0.1, framed=False)
+            await channel.connect()
+            with self.assertRaises(asyncio.TimeoutError):
+                await channel.request({'n': 1, 'delay': 0.3})
+            await asyncio.sleep(0.4)  # the late reply arrives on the dropped connection
+            after = await channel.request({'n': 2})
+            channel.close()
+            legacy.close()
+            return after
+
+        after = asyncio.run(run())
+        self.assertEqual(after, {'echo': {'n': 2}})
+        self.assertEqual(len(connections), 2)
+
+class TestMCPStreamServer(unittest.TestCase):
+    """Test the asyncio MCP stream server's connection management"""
+
+    @staticmethod
+    async def start_server(handle, **kwargs):
+        from api.mcp_protocol import MCPStreamServer
+        server = MCPStreamServer(lambda connection: (handle, lambda e: {'error': str(e)}), '127.0.0.1', 0, **kwargs)
+        await server.start()
+        return server
+
+    def test_connection_limit_and_idle_timeout(self):
+        """Test connections past the limit are refused and idle ones closed, and channels reconnect"""
+        from api.mcp_protocol import MCPChannel
+
+        async def echo(request):
+            return {'echo': request['n']}
+
+        async def run():
+            server = await self.start_server(echo, max_connections=2, idle_timeout=0.2)
+            channels = [MCPChannel('127.0.0.1', server.port, timeout=2.0) for _ in range(3)]
+            await channels[0].connect()
+            await channels[1].connect()
+            with self.assertRaises((ConnectionError, asyncio.IncompleteReadError)):
+                await channels[2].connect()
+            full = server.get_stats()
+            await asyncio.sleep(0.5)
+            idle = server.get_stats()
+            reconnected = await channels[0].request({'n': 1})
+            after = server.get_stats()
+            for channel in channels:
+                channel.close()
+            await server.shutdown()
+            return full, idle, reconnected, after
+
+        full, idle, reconnected, after = asyncio.run(run())
+        self.assertEqual((full['connections'], full['rejected']), (2, 1))
+        self.assertEqual((idle['connections'], idle['idle_closed']), (0, 2))
+        self.assertEqual(reconnected, {'echo': 1})
+        self.assertEqual((after['connections'], after['accepted']), (1, 3))
+
+    def test_inflight_limit_applies_backpressure(self):
+        """Test a connection stops reading requests past max_inflight until responses go out"""
+        from api.mcp_protocol import MCPChannel
+
+        release = None
+        started = []
+
+        async def handle(request):
+            started.append(request['n'])
+            await release.wait()
+            return {'n': request['n']}
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            server = await self.start_server(handle, max_inflight=2)
+            channel = MCPChannel('127.0.0.1', server.port)
+            await channel.connect()
+            calls = asyncio.gather(*(channel.request({'n': n}) for n in range(5)))
+            await asyncio.sleep(0.2)
+            blocked = (list(started), server.get_stats()['in_flight'])
+            release.set()
+            responses = await calls
+            channel.close()
+            await server.shutdown()
+            return blocked, responses
+
+        blocked, responses = asyncio.run(run())
+        self.assertEqual(blocked, ([0, 1], 2))
+        self.assertEqual(responses, [{'n': n} for n in range(5)])
+
+    def test_graceful_shutdown(self):
+        """Test shutdown finishes in-flight requests, stops accepting and cancels stuck requests at the deadline"""
+        from api.mcp_protocol import MCPChannel
+
+        async def handle(request):
+            await asyncio.sleep(request['delay'])
+            return {'done': request['delay']}
+
+        async def run():
+            server = await self.start_server(handle, drain_timeout=0.5)
+            quick, stuck = MCPChannel('127.0.0.1', server.port), MCPChannel('127.0.0.1', server.port)
+            await quick.connect()
+            await stuck.connect()
+            in_flight = asyncio.ensure_future(quick.request({'delay': 0.2}))
+            hung = asyncio.ensure_future(stuck.request({'delay': 60}))
+            await asyncio.sleep(0.05)
+            shutdown = asyncio.ensure_future(server.shutdown())
+            await asyncio.sleep(0.05)
+            late = MCPChannel('127.0.0.1', server.port, timeout=1.0)
+            with self.assertRaises(OSError):
+                await late.connect()
+            finished = await in_flight
+            with self.assertRaises(ConnectionError):
+                await hung
+            await shutdown
+            quick.close()
+            stuck.close()
+            return finished, server.get_stats()
+
+        finished, stats = asyncio.run(run())
+        self.assertEqual(finished, {'done': 0.2})
+        self.assertEqual((stats['connections'], stats['in_flight'], stats['draining']), (0, 0, True))
+
 class TestBayesianEngine(unittest.TestCase):
     """Test Bayesian engine functionality"""
     